@@ -0,0 +1,120 @@
+"""Repricing resting orders: cancel-then-new versus OrderAmender
+
+--orders resting LIMIT buys on a SimulatedExchange behind a LatencyClient
+with a --latency round trip are each repriced --reprices times:
+
+- cancel, wait, then place the new order (two round trips);
+- OrderAmender modifying in place (PUT, one round trip);
+- OrderAmender replacing, with cancel and new sent together (a client
+  without futures_modify_order, as for stop orders);
+- a burst of --burst amends per order fired without waiting, which the
+  amender coalesces into the latest target.
+
+Reports the wall time per reprice and the requests sent.
+
+    python bench/amend_repricing.py --orders 20 --reprices 10 --latency 0.02 --burst 10
+"""
+
+import argparse
+import common
+from common import Timer, percentile
+
+
+class NoModifyClient:
+    """Hides futures_modify_order so the amender replaces instead"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def __getattr__(self, name):
+        if name == "futures_modify_order":
+            raise AttributeError(name)
+        return getattr(self.client, name)
+
+
+def _setup(orders, latency):
+    from simulator import LatencyClient
+    exchange = common.flat_exchange(balance=1e9)
+    client = LatencyClient(exchange, latency)
+    placed = [exchange.futures_create_order(symbol="BTCUSDT", side="BUY", type="LIMIT", timeInForce="GTC",
+                                            quantity=0.01, price=29000.0 - i) for i in range(orders)]
+    return exchange, client, placed
+
+
+def _price(order_index, step):
+    return 29000.0 - order_index - (step + 1) * 0.5
+
+
+def cancel_then_new(orders, reprices, latency):
+    exchange, client, placed = _setup(orders, latency)
+    times = []
+    for step in range(reprices):
+        for i, order in enumerate(placed):
+            with Timer() as timer:
+                client.futures_cancel_order(symbol="BTCUSDT", orderId=order['orderId'])
+                placed[i] = client.futures_create_order(symbol="BTCUSDT", side="BUY", type="LIMIT",
+                                                        timeInForce="GTC", quantity=0.01, price=_price(i, step))
+            times.append(timer.elapsed)
+    return times, client.requests, exchange
+
+
+def amender_run(orders, reprices, latency, modify=True):
+    from advanced.amend import OrderAmender
+    exchange, client, placed = _setup(orders, latency)
+    amender = OrderAmender(client if modify else NoModifyClient(client))
+    handles = [amender.track(order) for order in placed]
+    times = []
+    try:
+        for step in range(reprices):
+            for i, handle in enumerate(handles):
+                with Timer() as timer:
+                    amender.amend_now(handle, price=_price(i, step))
+                times.append(timer.elapsed)
+    finally:
+        amender.close()
+    return times, client.requests, exchange
+
+
+def burst(orders, latency, amends):
+    from advanced.amend import OrderAmender
+    exchange, client, placed = _setup(orders, latency)
+    amender = OrderAmender(client)
+    handles = [amender.track(order) for order in placed]
+    with Timer() as timer:
+        futures = [amender.amend(handle, price=_price(i, step))
+                   for step in range(amends) for i, handle in enumerate(handles)]
+        for future in futures:
+            future.result()
+    amender.close()
+    final = [float(exchange.futures_get_order(symbol="BTCUSDT", orderId=h.order_id)['price']) for h in handles]
+    assert final == [_price(i, amends - 1) for i in range(orders)]
+    return timer.elapsed, client.requests, amender.stats['coalesced']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=20)
+    parser.add_argument("--reprices", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--burst", type=int, default=10)
+    args = parser.parse_args()
+    common.in_scratch_dir()
+
+    print(f"{args.orders} orders x {args.reprices} reprices, {args.latency * 1000:.0f} ms round trip\n")
+    print(f"{'method':<28}{'p50':>9}{'p99':>9}{'requests':>10}{'open orders':>13}")
+    for name, run in (("cancel then new", lambda: cancel_then_new(args.orders, args.reprices, args.latency)),
+                      ("amender: modify in place", lambda: amender_run(args.orders, args.reprices, args.latency)),
+                      ("amender: pipelined replace",
+                       lambda: amender_run(args.orders, args.reprices, args.latency, modify=False))):
+        times, requests, exchange = run()
+        resting = len(exchange.futures_get_open_orders(symbol="BTCUSDT"))
+        print(f"{name:<28}{percentile(times, 50) * 1000:>7.1f}ms{percentile(times, 99) * 1000:>7.1f}ms"
+              f"{requests:>10}{resting:>13}")
+
+    elapsed, requests, coalesced = burst(args.orders, args.latency, args.burst)
+    print(f"\nburst of {args.burst} amends per order ({args.orders * args.burst} amends): "
+          f"{requests} requests, {coalesced} coalesced, {elapsed * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Orders/sec of AsyncSimplifiedBot against the blocking SimplifiedBot
+
+Both bots trade on the simulated exchange behind the same fixed round trip
+(--latency), over --symbols symbols:
+
+    python bench/async_orders.py --orders 400 --latency 0.02
+"""
+
+import argparse
+import asyncio
+import common
+from common import Timer
+
+
+def blocking(orders, symbols, latency):
+    from bot import SimplifiedBot
+    from simulator import LatencyClient
+    bot = common.quiet_bot(SimplifiedBot(None, None, client=LatencyClient(common.flat_exchange(symbols), latency)))
+    for symbol in symbols:
+        bot.symbol_filters.get(symbol)
+    with Timer() as t:
+        placed = [bot.place_limit_order(symbols[i % len(symbols)], "BUY", 0.01, 29000 - i // len(symbols))
+                  for i in range(orders)]
+    bot.close()
+    return t.elapsed, sum(order is not None for order in placed)
+
+
+def concurrent(orders, symbols, latency, max_concurrency):
+    from async_bot import AsyncSimplifiedBot
+    from simulator import AsyncSimulatedExchange
+    from symbol_filters import SymbolFilterCache
+    client = AsyncSimulatedExchange(common.flat_exchange(symbols), latency)
+    bot = AsyncSimplifiedBot(client, max_concurrency, common.quiet_logger(), SymbolFilterCache(None, path=None))
+
+    async def run():
+        await bot.refresh_symbol_filters()
+        with Timer() as t:
+            placed = await asyncio.gather(*(
+                bot.place_limit_order(symbols[i % len(symbols)], "BUY", 0.01, 29000 - i // len(symbols))
+                for i in range(orders)
+            ))
+        return t.elapsed, sum(order is not None for order in placed)
+
+    return asyncio.run(run())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=400)
+    parser.add_argument("--symbols", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.02, help="Round trip in seconds")
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    common.in_scratch_dir()
+    symbols = [f"SYM{i}USDT" for i in range(args.symbols)]
+
+    print(f"{args.orders} limit orders over {args.symbols} symbols, {args.latency * 1000:.0f} ms round trip")
+    for name, (elapsed, ok) in (
+        ("SimplifiedBot (blocking)", blocking(args.orders, symbols, args.latency)),
+        (f"AsyncSimplifiedBot (concurrency {args.concurrency})",
+         concurrent(args.orders, symbols, args.latency, args.concurrency)),
+    ):
+        print(f"  {name:<40} {elapsed:7.3f} s  {ok / elapsed:9.1f} orders/s  ({ok} placed)")
+
+
+if __name__ == "__main__":
+    main()
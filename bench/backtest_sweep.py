@@ -0,0 +1,87 @@
+"""SimulatedExchange replay speed and vectorized bracket sweeps
+
+Replays --bars one-minute random-walk bars through run() with --orders
+resting limit orders spread around the price, reporting bars per second.
+Then evaluates --brackets take-profit/stop-loss pairs on the same path with
+sweep_brackets() and with a plain per-bar Python loop (timed on a sample of
+pairs and scaled up), checking both give the same exits.
+
+    python bench/backtest_sweep.py --bars 525600 --orders 200 --brackets 10000
+"""
+
+import argparse
+import numpy as np
+import common
+from common import START_MS, Timer
+
+
+def random_walk(bars, seed=1, price=30000.0, vol=0.0008):
+    rng = np.random.default_rng(seed)
+    closes = price * np.exp(np.cumsum(rng.normal(0, vol, bars)))
+    opens = np.concatenate(([price], closes[:-1]))
+    spread = np.abs(rng.normal(0, vol / 2, bars)) * closes
+    return opens, np.maximum(opens, closes) + spread, np.minimum(opens, closes) - spread, closes
+
+
+def replay(path, orders):
+    from simulator import SimulatedExchange
+    opens, highs, lows, closes = path
+    exchange = SimulatedExchange(balance=1e9)
+    times = START_MS + np.arange(len(closes), dtype=np.int64) * 60_000
+    exchange.add_klines("BTCUSDT", times, opens, highs, lows, closes)
+    rng = np.random.default_rng(2)
+    for level in opens[0] * (1 + rng.uniform(-0.3, 0.3, orders)):
+        side = "BUY" if level < opens[0] else "SELL"
+        exchange.futures_create_order(symbol="BTCUSDT", side=side, type="LIMIT", timeInForce="GTC",
+                                      quantity=0.01, price=round(level, 2))
+    with Timer() as timer:
+        exchange.run()
+    filled = sum(1 for o in exchange.orders.values() if o.status == "FILLED")
+    return timer.elapsed, filled
+
+
+def loop_brackets(opens, highs, lows, take_profits, stops):
+    """Reference: walk the bars for each long bracket in Python"""
+    exits = []
+    for tp, sl in zip(take_profits, stops):
+        exit_index = -1
+        for i in range(len(highs)):
+            if lows[i] <= sl or highs[i] >= tp:
+                exit_index = i
+                break
+        exits.append(exit_index)
+    return np.array(exits)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bars", type=int, default=525_600)
+    parser.add_argument("--orders", type=int, default=200)
+    parser.add_argument("--brackets", type=int, default=10_000)
+    parser.add_argument("--loop-sample", type=int, default=50, help="pairs timed with the Python loop")
+    args = parser.parse_args()
+    from simulator import sweep_brackets
+
+    path = random_walk(args.bars)
+    elapsed, filled = replay(path, args.orders)
+    print(f"run(): {args.bars} bars, {args.orders} resting orders ({filled} filled) in {elapsed:.2f}s "
+          f"= {args.bars / elapsed:,.0f} bars/s")
+
+    opens, highs, lows, _ = path
+    rng = np.random.default_rng(3)
+    entry = opens[0]
+    take_profits = entry * (1 + rng.uniform(0.005, 0.2, args.brackets))
+    stops = entry * (1 - rng.uniform(0.005, 0.2, args.brackets))
+    with Timer() as vectorized:
+        result = sweep_brackets(opens, highs, lows, 0, "BUY", take_profits, stops)
+    sample = min(args.loop_sample, args.brackets)
+    with Timer() as looped:
+        reference = loop_brackets(opens, highs, lows, take_profits[:sample], stops[:sample])
+    assert (reference == result['exit_index'][:sample]).all()
+    loop_total = looped.elapsed / sample * args.brackets
+    print(f"{args.brackets} brackets: sweep_brackets {vectorized.elapsed:.2f}s, "
+          f"Python loop ~{loop_total:.1f}s (from {sample} pairs), {loop_total / vectorized.elapsed:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
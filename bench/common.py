@@ -0,0 +1,57 @@
+"""Shared setup for the benchmark scripts (run them from any directory)"""
+
+import logging
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC)
+
+START_MS = 1_700_000_000_000
+
+
+def flat_exchange(symbols=("BTCUSDT",), price=30000.0, bars=600, **kwargs):
+    """SimulatedExchange with flat one-minute bars for each symbol"""
+    from simulator import SimulatedExchange
+    exchange = SimulatedExchange(**kwargs)
+    times = START_MS + np.arange(bars, dtype=np.int64) * 60_000
+    for symbol in symbols:
+        prices = np.full(bars, float(price))
+        exchange.add_klines(symbol, times, prices, prices, prices, prices, np.full(bars, 10.0))
+    return exchange
+
+
+def in_scratch_dir():
+    """Run in a temporary directory so bot.log and caches stay out of the tree"""
+    os.chdir(tempfile.mkdtemp(prefix="bench-"))
+
+
+def quiet_logger(name="bench"):
+    logger = logging.getLogger(name)
+    logger.handlers = [logging.NullHandler()]
+    logger.propagate = False
+    return logger
+
+
+def quiet_bot(bot):
+    """Drop a SimplifiedBot's console output (bot.log is still written)"""
+    for handler in bot.log_pipeline.listener.handlers:
+        if type(handler) is logging.StreamHandler:
+            handler.setLevel(logging.CRITICAL + 1)
+    return bot
+
+
+def percentile(values, q):
+    return float(np.percentile(np.asarray(values, dtype=float), q)) if len(values) else 0.0
+
+
+class Timer:
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
@@ -0,0 +1,126 @@
+"""Daemon load test: concurrent submitters against the local JSON API
+
+A BotDaemon serves a SimplifiedBot on a SimulatedExchange behind a
+LatencyClient with a --latency round trip. --clients threads each send
+--requests requests and wait for every answer before the next:
+
+- GET /health (API overhead alone, no exchange call);
+- POST /orders with one resting LIMIT order;
+- POST /orders with a list of --batch orders, run concurrently by the daemon;
+
+over HTTP with keep-alive, HTTP with a new connection per request, and
+the Unix socket. Every request carries the bearer token and the JSON
+content type, so the numbers include the CSRF/origin checks. Reports
+requests and orders per second, latency percentiles and failures.
+
+    python bench/daemon_load.py --clients 16 --requests 200 --batch 10 --latency 0.005
+"""
+
+import argparse
+import http.client
+import json
+import socket
+import threading
+import common
+from common import Timer, percentile
+
+TOKEN = "bench-token"
+HEADERS = {"Authorization": f"Bearer {TOKEN}", "Content-Type": "application/json"}
+
+
+class UnixConnection(http.client.HTTPConnection):
+    def __init__(self, path):
+        super().__init__("bot")
+        self.socket_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.socket_path)
+
+
+def _order(client, i):
+    return {"type": "limit", "symbol": "BTCUSDT", "side": "BUY", "quantity": 0.01,
+            "price": 29000 - (client * 7 + i) % 500}
+
+
+def _submitter(connect, keep_alive, path, body, client, requests, times, failures):
+    connection = connect()
+    for i in range(requests):
+        if not keep_alive:
+            connection = connect()
+        payload = json.dumps(body(client, i)) if body else None
+        with Timer() as timer:
+            connection.request("POST" if body else "GET", path, payload, HEADERS)
+            response = connection.getresponse()
+            data = json.loads(response.read())
+        times.append(timer.elapsed)
+        if response.status != 200 or not data.get("ok"):
+            failures.append(response.status)
+        if not keep_alive:
+            connection.close()
+    connection.close()
+
+
+def run(daemon, transport, keep_alive, path, body, clients, requests):
+    if transport == "unix":
+        def connect():
+            return UnixConnection(daemon.unix_socket)
+    else:
+        def connect():
+            return http.client.HTTPConnection("127.0.0.1", daemon.port)
+    times, failures = [], []
+    threads = [threading.Thread(target=_submitter,
+                                args=(connect, keep_alive, path, body, client, requests, times, failures))
+               for client in range(clients)]
+    with Timer() as timer:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    return timer.elapsed, times, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200, help="requests per client")
+    parser.add_argument("--batch", type=int, default=10, help="orders per list request")
+    parser.add_argument("--latency", type=float, default=0.005)
+    args = parser.parse_args()
+    common.in_scratch_dir()
+    from bot import SimplifiedBot
+    from daemon import BotDaemon
+    from simulator import LatencyClient
+
+    exchange = common.flat_exchange(balance=1e9)
+    bot = common.quiet_bot(SimplifiedBot(None, None, client=LatencyClient(exchange, args.latency)))
+    daemon = BotDaemon(bot, port=0, unix_socket="daemon.sock", token=TOKEN, batch_workers=args.batch).start()
+
+    def batch(client, i):
+        return [_order(client, i * args.batch + j) for j in range(args.batch)]
+
+    cases = [
+        ("health", "/health", None, 1),
+        ("one order", "/orders", _order, 1),
+        (f"list of {args.batch}", "/orders", batch, args.batch),
+    ]
+    transports = [("HTTP keep-alive", "http", True), ("HTTP per request", "http", False),
+                  ("Unix socket", "unix", True)]
+    print(f"{args.clients} clients x {args.requests} requests, {args.latency * 1000:.1f} ms exchange round trip\n")
+    print(f"{'request':<14}{'transport':<18}{'req/s':>9}{'orders/s':>10}{'p50':>9}{'p99':>9}{'failed':>8}")
+    try:
+        for name, path, body, orders in cases:
+            for transport_name, transport, keep_alive in transports:
+                elapsed, times, failures = run(daemon, transport, keep_alive, path, body,
+                                               args.clients, args.requests)
+                rate = len(times) / elapsed
+                print(f"{name:<14}{transport_name:<18}{rate:>9.0f}{rate * orders if body else 0:>10.0f}"
+                      f"{percentile(times, 50) * 1000:>7.2f}ms{percentile(times, 99) * 1000:>7.2f}ms"
+                      f"{len(failures):>8}")
+    finally:
+        daemon.stop()
+        bot.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Depth-snapshot pacing after a market-data reconnect
+
+Simulated clock: every book needs a weight-20 REST snapshot after a
+reconnect, fetched one at a time by the resync thread, while the bot keeps
+sending orders (weight 1) and polling open orders (weight 40) through the
+same governor. Compares unpaced snapshots with snapshots paced to a share
+of the weight budget: how long until every book is synced, how long orders
+and polls wait in the governor, and the weight budget left over for
+everything else in the minute after the reconnect.
+
+    python bench/depth_resync.py --symbols 200 --seconds 300
+"""
+
+import argparse
+import heapq
+import itertools
+import common
+from common import percentile
+from rate_limiter import PRIORITY_ORDER, PRIORITY_QUERY, TokenBucket
+
+SNAPSHOT_WEIGHT = 20
+POLL_WEIGHT = 40
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def simulate(symbols, seconds, share, latency, order_every, poll_every, weight_limit=2400, headroom=0.9,
+             step=0.005):
+    clock = Clock()
+    weight = TokenBucket(int(weight_limit * headroom), 60, clock)
+    budget = TokenBucket(max(SNAPSHOT_WEIGHT, weight.capacity * share), 60, clock) if share else None
+    queue = []  # governor queue: (priority, seq, kind, weight, arrival)
+    seq = itertools.count()
+    pending = symbols
+    snapshot_queued = False
+    busy_until = 0.0
+    synced_at = None
+    next_order = next_poll = 0.0
+    waits = {"order": [], "poll": []}
+    lowest = weight.capacity
+
+    while clock.now < seconds:
+        if clock.now >= next_order:
+            heapq.heappush(queue, (PRIORITY_ORDER, next(seq), "order", 1, clock.now))
+            next_order += order_every
+        if clock.now >= next_poll:
+            heapq.heappush(queue, (PRIORITY_QUERY, next(seq), "poll", POLL_WEIGHT, clock.now))
+            next_poll += poll_every
+        # The resync thread: one snapshot at a time, paced by its budget share
+        if pending and not snapshot_queued and clock.now >= busy_until:
+            if budget is None or budget.wait_time(SNAPSHOT_WEIGHT) <= 0:
+                if budget is not None:
+                    budget.consume(SNAPSHOT_WEIGHT)
+                heapq.heappush(queue, (PRIORITY_QUERY, next(seq), "snapshot", SNAPSHOT_WEIGHT, clock.now))
+                snapshot_queued = True
+        # The governor serves the head of its queue once the bucket covers it
+        while queue and weight.wait_time(queue[0][3]) <= 0:
+            _, _, kind, cost, arrival = heapq.heappop(queue)
+            weight.consume(cost)
+            if kind == "snapshot":
+                snapshot_queued = False
+                busy_until = clock.now + latency
+                pending -= 1
+                if not pending:
+                    synced_at = busy_until
+            else:
+                waits[kind].append(clock.now - arrival)
+        if clock.now <= 60:
+            weight._refill()
+            lowest = min(lowest, weight.tokens)
+        clock.now += step
+    return synced_at, waits, lowest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=300)
+    parser.add_argument("--latency", type=float, default=0.05, help="snapshot round trip (s)")
+    parser.add_argument("--order-every", type=float, default=0.2)
+    parser.add_argument("--poll-every", type=float, default=5)
+    args = parser.parse_args()
+
+    print(f"{args.symbols} books after a reconnect, {args.seconds:.0f} s simulated\n")
+    print(f"{'snapshots':<14}{'all synced':>11}{'order p99':>11}{'order max':>11}"
+          f"{'poll p99':>10}{'poll max':>10}{'min weight left':>17}")
+    for label, share in (("unpaced", None), ("50% budget", 0.5), ("25% budget", 0.25)):
+        synced_at, waits, lowest = simulate(args.symbols, args.seconds, share, args.latency,
+                                            args.order_every, args.poll_every)
+        synced = f"{synced_at:.1f} s" if synced_at is not None else "never"
+        print(f"{label:<14}{synced:>11}"
+              f"{percentile(waits['order'], 99) * 1000:>9.0f}ms{max(waits['order']) * 1000:>9.0f}ms"
+              f"{percentile(waits['poll'], 99):>9.2f}s{max(waits['poll']):>9.2f}s{lowest:>17.0f}")
+
+
+if __name__ == "__main__":
+    main()
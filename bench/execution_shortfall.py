@@ -0,0 +1,125 @@
+"""Implementation shortfall: plain TWAP versus adaptive passive-then-cross slices
+
+Replays synthetic quote/trade recordings (random-walk mid, one-tick spread,
+Poisson trades hitting either side) through a MarketDataStream on a
+ReplayClock, and executes the same parent order with the plain TWAPOrder
+(market slices) and with AdaptiveTWAPOrder resting post-only limits at the
+touch for --passive-timeout seconds before crossing. Fills come from
+QuoteFillClient. Shortfall is in bps versus the mid at the start (positive
+= cost); lower is better. Every variant trades the same recordings, so the
+paired difference to plain TWAP removes most of the market's own drift.
+
+    python bench/execution_shortfall.py --runs 50 --chunks 10 --interval 60 --spread-ticks 1
+"""
+
+import argparse
+import random
+import statistics
+import common
+from common import percentile
+
+TICK = 0.1
+
+
+def recording(seed, seconds, spread_ticks=1, quote_every=0.1, trades_per_second=2.0, start_price=30000.0,
+              vol_bps=0.5):
+    """bookTicker and aggTrade messages for ``seconds`` of a random-walk market"""
+    rng = random.Random(seed)
+    messages = []
+    mid = start_price
+    t = 0.0
+    next_trade = rng.expovariate(trades_per_second)
+    update = 0
+    while t < seconds:
+        mid += rng.gauss(0, mid * vol_bps / 10000)
+        bid = round(mid / TICK) * TICK
+        ask = bid + spread_ticks * TICK
+        update += 1
+        ms = int(1_700_000_000_000 + t * 1000)
+        messages.append({'e': "bookTicker", 's': "BTCUSDT", 'u': update, 'E': ms, 'b': f"{bid:.1f}",
+                         'B': "5", 'a': f"{ask:.1f}", 'A': "5"})
+        while next_trade < t + quote_every:
+            price = bid if rng.random() < 0.5 else ask
+            messages.append({'e': "aggTrade", 's': "BTCUSDT", 'E': int(1_700_000_000_000 + next_trade * 1000),
+                             'p': f"{price:.1f}", 'q': "0.5"})
+            next_trade += rng.expovariate(trades_per_second)
+        t += quote_every
+    return messages
+
+
+def _market(messages):
+    from market_data import MarketDataStream, ReplayClock
+    replay = ReplayClock(messages=messages)
+    stream = MarketDataStream(symbols=["BTCUSDT"], depth=False, mark_price=False, trades=True, clock=replay.now)
+    replay.market_data = stream
+    replay.advance_to(replay.now())
+    return replay, stream
+
+
+def plain_twap(messages, side, quantity, chunks, interval):
+    from advanced.execution import QuoteFillClient, _slippage_bps
+    from advanced.twap import TWAPOrder
+    replay, stream = _market(messages)
+    arrival = stream.mid_price("BTCUSDT")
+    orders = TWAPOrder(QuoteFillClient(stream), sleep=replay.sleep).place_order(
+        "BTCUSDT", side, quantity, chunks, interval)
+    filled = sum(float(o['executedQty']) for o in orders)
+    avg = sum(float(o['executedQty']) * float(o['avgPrice']) for o in orders) / filled
+    return _slippage_bps(side, avg, arrival), 0.0
+
+
+def adaptive_twap(messages, side, quantity, chunks, interval, passive_timeout, jitter):
+    from advanced.execution import AdaptiveTWAPOrder, QuoteFillClient
+    replay, stream = _market(messages)
+    engine = AdaptiveTWAPOrder(QuoteFillClient(stream), market_data=stream, sleep=replay.sleep, clock=replay.now,
+                               rng=random.Random(0))
+    report = engine.execute("BTCUSDT", side, quantity, chunks, interval, jitter=jitter,
+                            passive_timeout=passive_timeout)
+    passive = sum(s['passive_qty'] for s in report['slices'])
+    return report['shortfall_bps'], passive / report['executed_qty']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--quantity", type=float, default=1.0)
+    parser.add_argument("--chunks", type=int, default=10)
+    parser.add_argument("--interval", type=float, default=60)
+    parser.add_argument("--passive-timeout", type=float, default=20)
+    parser.add_argument("--spread-ticks", type=int, default=1)
+    args = parser.parse_args()
+
+    seconds = args.chunks * args.interval + 5
+    variants = {
+        "plain TWAP (market)": lambda m, side: plain_twap(m, side, args.quantity, args.chunks, args.interval),
+        "adaptive, market only": lambda m, side: adaptive_twap(
+            m, side, args.quantity, args.chunks, args.interval, 0, 0.0),
+        f"adaptive, passive {args.passive_timeout:g}s": lambda m, side: adaptive_twap(
+            m, side, args.quantity, args.chunks, args.interval, args.passive_timeout, 0.0),
+        f"adaptive, passive {args.passive_timeout:g}s + jitter": lambda m, side: adaptive_twap(
+            m, side, args.quantity, args.chunks, args.interval, args.passive_timeout, 0.2),
+    }
+    results = {name: ([], []) for name in variants}
+    for run in range(args.runs):
+        messages = recording(run, seconds, args.spread_ticks)
+        side = "BUY" if run % 2 == 0 else "SELL"
+        for name, variant in variants.items():
+            shortfall, passive = variant(messages, side)
+            results[name][0].append(shortfall)
+            results[name][1].append(passive)
+
+    half_spread = args.spread_ticks * TICK / 2 / 30000 * 10000
+    print(f"{args.runs} runs, {args.chunks} slices every {args.interval:g}s, "
+          f"half-spread ~{half_spread:.3f} bps\n")
+    print(f"{'variant':<34}{'mean bps':>9}{'stdev':>8}{'p95':>8}{'vs plain (±se)':>18}{'passive':>9}")
+    baseline = next(iter(results.values()))[0]
+    for name, (shortfalls, passive) in results.items():
+        diffs = [a - b for a, b in zip(shortfalls, baseline)]
+        se = statistics.pstdev(diffs) / len(diffs) ** 0.5
+        print(f"{name:<34}{statistics.mean(shortfalls):>9.3f}{statistics.pstdev(shortfalls):>8.3f}"
+              f"{percentile(shortfalls, 95):>8.3f}{statistics.mean(diffs):>+11.3f} ±{se:<5.3f}"
+              f"{statistics.mean(passive) * 100:>8.0f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Grid re-centering: diff-based GridOrder versus cancel-all and re-place
+
+A --levels-per-side grid (200 orders by default) rests on a
+SimulatedExchange behind a LatencyClient with a --latency round trip.
+The center then moves by 1, 5 and 20 levels and the grid is rebuilt:
+
+- GridOrder.place_order: keep matching levels, cancel and place the rest
+  in concurrent batches;
+- cancel-all: one futures_cancel_all_open_orders, then every level placed
+  again in batches of 5 (same batching, no diff);
+- one by one: every order cancelled and re-placed with single requests.
+
+Reports wall time, requests, request weight, orders counted against the
+order-rate limit, and how many resting orders lost their queue position.
+
+    python bench/grid_rebalance.py --levels 100 --spacing 5 --latency 0.02
+"""
+
+import argparse
+import threading
+import common
+from common import Timer
+
+LATENCY = 0.02
+
+
+class CountingClient:
+    """LatencyClient that tallies request weight and orders sent"""
+
+    def __init__(self, client):
+        from rate_limiter import ENDPOINT_WEIGHTS, ORDER_METHODS
+        self.client = client
+        self.weights = ENDPOINT_WEIGHTS
+        self.order_methods = ORDER_METHODS
+        self.requests = self.weight = self.orders = 0
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        method = getattr(self.client, name)
+        if not name.startswith("futures_"):
+            return method
+
+        def call(*args, **params):
+            weight = self.weights.get(name, 1)
+            with self._lock:
+                self.requests += 1
+                self.weight += weight(params) if callable(weight) else weight
+                if name in self.order_methods:
+                    self.orders += len(params.get("batchOrders", ())) or 1
+            return method(*args, **params)
+        return call
+
+
+def _grid_setup(levels, spacing):
+    from advanced.grid import GridOrder
+    from simulator import LatencyClient
+    from symbol_filters import SymbolFilterCache
+    exchange = common.flat_exchange(balance=1e9)
+    filters = SymbolFilterCache(exchange, path=None)
+    grid = GridOrder(exchange, symbol_filters=filters, workers=8)
+    grid.place_order("BTCUSDT", 30000.0, spacing, levels, 0.01)
+    client = CountingClient(LatencyClient(exchange, LATENCY))
+    return exchange, client, GridOrder(client, symbol_filters=filters, workers=8)
+
+
+def _order_ids(exchange):
+    return {o['orderId'] for o in exchange.futures_get_open_orders(symbol="BTCUSDT")}
+
+
+def diff_based(levels, spacing, shift):
+    exchange, client, grid = _grid_setup(levels, spacing)
+    before = _order_ids(exchange)
+    with Timer() as timer:
+        grid.place_order("BTCUSDT", 30000.0 + shift * spacing, spacing, levels, 0.01)
+    return timer.elapsed, client, len(before - _order_ids(exchange)), exchange
+
+
+def cancel_all(levels, spacing, shift):
+    from batch_orders import BatchOrderSubmitter
+    exchange, client, grid = _grid_setup(levels, spacing)
+    before = _order_ids(exchange)
+    with Timer() as timer:
+        targets = grid.build_orders("BTCUSDT", 30000.0 + shift * spacing, spacing, levels, 0.01)
+        client.futures_cancel_all_open_orders(symbol="BTCUSDT")
+        BatchOrderSubmitter(client).place_orders(targets)
+    return timer.elapsed, client, len(before - _order_ids(exchange)), exchange
+
+
+def one_by_one(levels, spacing, shift):
+    exchange, client, grid = _grid_setup(levels, spacing)
+    before = _order_ids(exchange)
+    with Timer() as timer:
+        targets = grid.build_orders("BTCUSDT", 30000.0 + shift * spacing, spacing, levels, 0.01)
+        for order in client.futures_get_open_orders(symbol="BTCUSDT"):
+            client.futures_cancel_order(symbol="BTCUSDT", orderId=order['orderId'])
+        for params in targets:
+            client.futures_create_order(**params)
+    return timer.elapsed, client, len(before - _order_ids(exchange)), exchange
+
+
+def main():
+    global LATENCY
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--levels", type=int, default=100, help="levels per side")
+    parser.add_argument("--spacing", type=float, default=5.0)
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+    LATENCY = args.latency
+    common.in_scratch_dir()
+
+    print(f"{2 * args.levels} orders, {args.spacing:g} apart, {args.latency * 1000:.0f} ms round trip\n")
+    print(f"{'shift':>5}  {'method':<14}{'time':>9}{'requests':>10}{'weight':>8}{'orders':>8}{'requeued':>10}")
+    for shift in (1, 5, 20):
+        resting = set()
+        for name, run in (("GridOrder", diff_based), ("cancel-all", cancel_all), ("one by one", one_by_one)):
+            elapsed, client, requeued, exchange = run(args.levels, args.spacing, shift)
+            # Buy levels moved up to the (flat) market fill at once, the same for every method
+            resting.add(len(_order_ids(exchange)))
+            assert len(resting) == 1, "methods ended with different grids"
+            print(f"{shift:>5}  {name:<14}{elapsed * 1000:>7.0f}ms{client.requests:>10}{client.weight:>8}"
+                  f"{client.orders:>8}{requeued:>10}")
+
+
+if __name__ == "__main__":
+    main()
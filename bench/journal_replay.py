@@ -0,0 +1,87 @@
+"""Order journal replay time for a large journal, before and after compact()
+
+Writes --entries journal lines as orders of intent, ack, partial fill and
+final fill/cancel (a --live fraction of orders is left open), then times
+OrderJournal.replay() against decoding every line with json.loads, checks
+both give the same statuses, and times compact() plus the replay after it.
+
+    python bench/journal_replay.py --entries 1000000 --live 0.01
+"""
+
+import argparse
+import json
+import os
+import random
+import common
+from common import Timer
+
+
+def write_journal(path, entries, live, seed=1):
+    """One order per four lines; returns the number of orders left open"""
+    rng = random.Random(seed)
+    open_orders = 0
+    ts = 1_700_000_000.0
+    with open(path, "w", encoding="utf-8") as f:
+        for n in range(entries // 4):
+            cid = f"sb-{n:030x}"
+            params = {'symbol': "BTCUSDT", 'side': "BUY" if n % 2 else "SELL", 'type': "LIMIT",
+                      'timeInForce': "GTC", 'quantity': 0.01, 'price': 29000.0 + n % 500,
+                      'newClientOrderId': cid}
+            still_open = rng.random() < live
+            final = ["U", ts, cid, "PARTIALLY_FILLED", "0.005"] if still_open else \
+                ["U", ts, cid, rng.choice(("FILLED", "CANCELED")), "0.01"]
+            open_orders += still_open
+            for entry in (["I", ts, cid, params], ["A", ts, cid, 4_000_000_000 + n, "NEW", "0"],
+                          ["U", ts, cid, "PARTIALLY_FILLED", "0.002"], final):
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            ts += 0.01
+    return open_orders
+
+
+def json_replay(path):
+    """Reference: decode and apply every line"""
+    from journal import OrderJournal
+    journal = OrderJournal.__new__(OrderJournal)
+    journal.orders, journal.schedules = {}, {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            journal._apply(json.loads(line))
+    return journal.orders
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--live", type=float, default=0.01, help="fraction of orders still open")
+    args = parser.parse_args()
+    from journal import FINAL_STATUSES, OrderJournal
+    common.in_scratch_dir()
+
+    path = os.path.abspath("orders.journal")
+    open_orders = write_journal(path, args.entries, args.live)
+    size_mb = os.path.getsize(path) / 1e6
+    print(f"{args.entries:,} entries ({size_mb:.0f} MB), {args.entries // 4:,} orders, {open_orders:,} open\n")
+
+    with Timer() as decoded:
+        reference = json_replay(path)
+    with Timer() as opened:
+        journal = OrderJournal(path, sync_interval=0)
+    assert {cid: r['status'] for cid, r in journal.orders.items()} == \
+        {cid: r['status'] for cid, r in reference.items()}
+    assert sum(r['status'] not in FINAL_STATUSES for r in journal.orders.values()) == open_orders
+
+    print(f"{'':<26}{'time':>9}{'entries/s':>14}")
+    print(f"{'json.loads every line':<26}{decoded.elapsed:>8.2f}s{args.entries / decoded.elapsed:>14,.0f}")
+    print(f"{'OrderJournal.replay':<26}{opened.elapsed:>8.2f}s{args.entries / opened.elapsed:>14,.0f}")
+
+    with Timer() as compacting:
+        kept = journal.compact()
+    journal.close()
+    with Timer() as reopened:
+        OrderJournal(path, sync_interval=0).close()
+    print(f"{'compact()':<26}{compacting.elapsed:>8.2f}s{'':>14}  ({kept:,} entries kept)")
+    print(f"{'replay after compact':<26}{reopened.elapsed:>8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
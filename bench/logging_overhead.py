@@ -0,0 +1,118 @@
+"""Caller-side cost of logging through the LogPipeline
+
+Times --calls log calls in the calling thread for a synchronous FileHandler,
+the stock QueueHandler (which formats in the caller) and the pipeline's lazy
+handler, with immutable arguments (deferred) and with a dict argument (now
+formatted at the call). Then shows what a mutated dict argument looks like
+in the log, and counts the pipelines (each a listener thread, a file handle
+and an atexit hook) built for --bots bots with a new pipeline per bot versus
+get_pipeline().
+
+    python bench/logging_overhead.py --calls 100000 --bots 20
+"""
+
+import argparse
+import logging
+import logging.handlers
+import os
+import queue
+import common
+from common import Timer
+
+
+def _fresh_logger(name):
+    logger = logging.getLogger(name)
+    logger.handlers = []
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+def _per_call_us(logger, calls, order):
+    with Timer() as timer:
+        for i in range(calls):
+            if order is None:
+                logger.info("Order %s %s %.2f x %d", "BTCUSDT", "BUY", 30000.5, i)
+            else:
+                logger.info("Order placed: %s", order)
+    return timer.elapsed / calls * 1e6
+
+
+def caller_cost(calls):
+    from log_pipeline import LogPipeline
+    order = {'orderId': 1, 'symbol': "BTCUSDT", 'status': "NEW", 'price': "30000.5"}
+    rows = []
+
+    logger = _fresh_logger("bench.sync")
+    handler = logging.FileHandler("sync.log")
+    handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+    logger.addHandler(handler)
+    rows.append(("FileHandler (sync)", _per_call_us(logger, calls, None), _per_call_us(logger, calls, order)))
+    handler.close()
+
+    logger = _fresh_logger("bench.stock")
+    stock_queue = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(stock_queue))
+    rows.append(("QueueHandler (stock)", _per_call_us(logger, calls, None), _per_call_us(logger, calls, order)))
+
+    logger = _fresh_logger("bench.lazy")
+    pipeline = LogPipeline(logger, "lazy.log", console=False)
+    rows.append(("LogPipeline (lazy)", _per_call_us(logger, calls, None), _per_call_us(logger, calls, order)))
+    pipeline.stop()
+    return rows
+
+
+def mutated_argument(path):
+    """Log a dict, change it right away, and return the line that was written"""
+    from log_pipeline import LogPipeline
+    logger = _fresh_logger("bench.mutated")
+    pipeline = LogPipeline(logger, path, console=False)
+    order = {'status': "NEW"}
+    logger.info("Order placed: %s", order)
+    order['status'] = "FILLED"
+    pipeline.stop()
+    with open(path) as f:
+        return f.read().strip().split(" - ", 2)[-1]
+
+
+def pipelines_per_bot(bots, shared):
+    """Return how many pipelines ``bots`` bots were given"""
+    import bot as bot_module
+    import log_pipeline
+    exchange = common.flat_exchange()
+    created = []
+    if not shared:
+        # What every bot did before pipelines were shared
+        bot_module.get_pipeline = lambda logger, *a, **kw: log_pipeline.LogPipeline(logger, *a, **kw)
+    try:
+        for _ in range(bots):
+            created.append(common.quiet_bot(bot_module.SimplifiedBot(None, None, client=exchange)))
+        built = len({id(bot.log_pipeline) for bot in created})
+    finally:
+        bot_module.get_pipeline = log_pipeline.get_pipeline
+        for bot in created:
+            bot.close()
+            bot.log_pipeline.stop()
+    return built
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=100_000)
+    parser.add_argument("--bots", type=int, default=20)
+    args = parser.parse_args()
+    common.in_scratch_dir()
+
+    print(f"{'handler':<22}{'immutable args':>16}{'dict arg':>12}   (µs per call, caller thread)")
+    for name, immutable, mutable in caller_cost(args.calls):
+        print(f"{name:<22}{immutable:>16.2f}{mutable:>12.2f}")
+
+    print(f"\nlogged dict, then set status=FILLED: {mutated_argument(os.path.abspath('mutated.log'))}")
+
+    print(f"\npipelines built for {args.bots} bots:")
+    print(f"  new pipeline per bot: {pipelines_per_bot(args.bots, shared=False)}")
+    print(f"  get_pipeline():       {pipelines_per_bot(args.bots, shared=True)}")
+
+
+if __name__ == "__main__":
+    main()
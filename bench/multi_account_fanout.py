@@ -0,0 +1,92 @@
+"""Fan one order out to many accounts: sequential, thread pool and process pool
+
+Each account is a SimulatedExchange behind a LatencyClient with a fixed
+round trip. Times the first fan-out (clients built, exchange info loaded,
+pool started) and the following warm fan-outs of a market order, and
+counts exchange-info fetches per mode (process workers get the parent's
+copy instead of fetching and racing on the cache file).
+
+    python bench/multi_account_fanout.py --accounts 50 --latency 0.05 --rounds 5
+"""
+
+import argparse
+import multiprocessing
+import common
+from common import Timer, percentile
+
+LATENCY = 0.05
+_fetches = None  # multiprocessing counter, inherited by forked workers
+
+
+def _factory(api_key, api_secret, testnet, governor):
+    from simulator import LatencyClient
+    exchange = common.flat_exchange()
+    original = exchange.futures_exchange_info
+
+    def counted(**params):
+        with _fetches.get_lock():
+            _fetches.value += 1
+        return original(**params)
+
+    exchange.futures_exchange_info = counted
+    return LatencyClient(exchange, LATENCY)
+
+
+def sequential(accounts, rounds):
+    from multi_account import execute_operation
+    from rate_limiter import RateLimitGovernor
+    from symbol_filters import SymbolFilterCache
+    times = []
+    clients = {}
+    filters = None
+    for _ in range(rounds):
+        with Timer() as timer:
+            for name, (key, secret) in accounts.items():
+                if name not in clients:
+                    clients[name] = _factory(key, secret, True, RateLimitGovernor())
+                    filters = filters or SymbolFilterCache(clients[name], path=None)
+                execute_operation(clients[name], "market", dict(symbol="BTCUSDT", side="BUY", quantity=0.01),
+                                  filters)
+        times.append(timer.elapsed)
+    return times
+
+
+def coordinated(accounts, rounds, mode):
+    from multi_account import MultiAccountCoordinator
+    coordinator = MultiAccountCoordinator(accounts, mode=mode, client_factory=_factory)
+    times = []
+    try:
+        for _ in range(rounds):
+            with Timer() as timer:
+                summary = coordinator.place_market_order("BTCUSDT", "BUY", 0.01)
+            assert summary['failed'] == 0, summary
+            times.append(timer.elapsed)
+    finally:
+        coordinator.close()
+    return times
+
+
+def main():
+    global LATENCY, _fetches
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--accounts", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    LATENCY = args.latency
+
+    accounts = {f"acct{i}": (f"key{i}", f"secret{i}") for i in range(args.accounts)}
+    print(f"{args.accounts} accounts, {args.latency * 1000:.0f} ms round trip\n")
+    print(f"{'mode':<12}{'first':>10}{'warm p50':>10}{'warm max':>10}{'info fetches':>14}")
+    for mode in ("sequential", "thread", "process"):
+        # Cold start: no exchange_info.json from the previous mode
+        common.in_scratch_dir()
+        _fetches = multiprocessing.Value("i", 0)
+        times = sequential(accounts, args.rounds) if mode == "sequential" else coordinated(accounts, args.rounds, mode)
+        warm = times[1:] or times
+        print(f"{mode:<12}{times[0] * 1000:>8.0f}ms{percentile(warm, 50) * 1000:>8.0f}ms"
+              f"{max(warm) * 1000:>8.0f}ms{_fetches.value:>14}")
+
+
+if __name__ == "__main__":
+    main()
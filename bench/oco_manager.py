@@ -0,0 +1,96 @@
+"""OCOManager sibling-cancel latency and memory
+
+Registers --pairs pairs, measuring memory per pair, then fills one leg of
+--fills pairs in a burst against a fake client with a fixed round trip and
+reports how long after each fill event its sibling cancel left, for a few
+cancel-pool sizes. Also times the per-event cost for orders that are not
+OCO legs (the common case on a busy account).
+
+    python bench/oco_manager.py --pairs 100000 --fills 200 --latency 0.02
+"""
+
+import argparse
+import threading
+import time
+import tracemalloc
+import common
+from common import Timer, percentile
+
+
+class FakeClient:
+    def __init__(self, latency):
+        self.latency = latency
+        self.sent_at = {}
+        self._lock = threading.Lock()
+
+    def futures_cancel_order(self, symbol, orderId):
+        with self._lock:
+            self.sent_at[orderId] = time.perf_counter()
+        time.sleep(self.latency)
+        return {'orderId': orderId, 'status': "CANCELED"}
+
+
+def memory_per_pair(pairs):
+    from advanced.oco_manager import OCOManager
+    tracemalloc.start()
+    manager = OCOManager(FakeClient(0))
+    before = tracemalloc.get_traced_memory()[0]
+    for i in range(pairs):
+        manager.register("BTCUSDT", 2 * i, 2 * i + 1)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    manager.shutdown()
+    return used / pairs
+
+
+def cancel_latency(pairs, fills, latency, workers):
+    from advanced.oco_manager import OCOManager
+    client = FakeClient(latency)
+    manager = OCOManager(client, cancel_workers=workers)
+    for i in range(pairs):
+        manager.register("BTCUSDT", 2 * i, 2 * i + 1)
+    filled_at = {}
+    for i in range(fills):
+        filled_at[2 * i + 1] = time.perf_counter()
+        manager.on_order_update(2 * i, "FILLED")
+    manager.shutdown()
+    return [(client.sent_at[sibling] - at) * 1000 for sibling, at in filled_at.items()]
+
+
+def unrelated_event_cost(pairs, events):
+    from advanced.oco_manager import OCOManager
+    manager = OCOManager(FakeClient(0))
+    for i in range(pairs):
+        manager.register("BTCUSDT", 2 * i, 2 * i + 1)
+    event = {'e': "ORDER_TRADE_UPDATE", 'o': {'i': -1, 'X': "FILLED"}}
+    with Timer() as timer:
+        for i in range(events):
+            event['o']['i'] = -i - 1
+            manager.on_event(event)
+    early = len(manager._early)
+    manager.shutdown()
+    return timer.elapsed / events * 1e6, early
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pairs", type=int, default=100000)
+    parser.add_argument("--fills", type=int, default=200, help="Pairs filled in one burst")
+    parser.add_argument("--latency", type=float, default=0.02, help="Fake cancel round trip in seconds")
+    parser.add_argument("--events", type=int, default=200000, help="Non-OCO order events to time")
+    args = parser.parse_args()
+
+    print(f"{args.pairs} registered pairs: {memory_per_pair(args.pairs):.0f} bytes per pair")
+    print(f"Burst of {args.fills} fills, {args.latency * 1000:.0f} ms cancel round trip "
+          f"(fill event -> sibling cancel sent)")
+    for workers in (1, 4, 16):
+        waits = cancel_latency(args.pairs, args.fills, args.latency, workers)
+        print(f"  {workers:>2} cancel worker(s): p50 {percentile(waits, 50):8.1f} ms  "
+              f"p99 {percentile(waits, 99):8.1f} ms")
+    cost, early = unrelated_event_cost(args.pairs, args.events)
+    print(f"{args.events} non-OCO final events: {cost:.2f} us each, {early} kept for late registers "
+          f"(dropped after early_ttl)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""RateLimitGovernor throughput and 429 avoidance
+
+Simulated clock: a trading loop (place, cancel, a full open-orders poll every
+--poll-every orders) runs against a fake API that enforces Binance's
+fixed-window weight and order-count limits, answers 429 with Retry-After and
+bans with 418 when a client keeps sending during a backoff. The loop runs
+bare (honouring Retry-After), through the governor, and through the governor
+with no rate-limit headers to resync from.
+
+    python bench/rate_governor.py --minutes 10 --latency 0.005
+"""
+
+import argparse
+import itertools
+import common
+from common import percentile
+
+
+class VirtualClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += max(0.0, seconds)
+
+
+class VirtualCondition:
+    """Single-threaded stand-in for the governor's Condition: waiting advances the clock"""
+
+    def __init__(self, clock):
+        self.clock = clock
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def wait(self, timeout=None):
+        if timeout is None:
+            raise RuntimeError("Nothing else can wake a single-threaded simulation")
+        # At least a microsecond, or float rounding can stall the clock
+        self.clock.sleep(max(timeout, 1e-6))
+
+    def notify(self):
+        pass
+
+    def notify_all(self):
+        pass
+
+
+class Response:
+    def __init__(self, headers):
+        self.headers = headers
+
+
+class RateLimitError(Exception):
+    def __init__(self, status_code, retry_after):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = Response({"Retry-After": str(max(1, int(retry_after + 0.999)))})
+
+
+class LimitedExchange:
+    """Fake futures API enforcing fixed-window request-weight and order limits"""
+
+    def __init__(self, clock, latency, weight_limit=2400, order_limit_1m=1200, order_limit_10s=300,
+                 headers=True, ban=120):
+        self.clock = clock
+        self.latency = latency
+        self.weight_limit = weight_limit
+        self.order_limit_1m = order_limit_1m
+        self.order_limit_10s = order_limit_10s
+        self.headers = headers
+        self.ban = ban
+        self.response = None
+        self.weight_used = self.orders_1m = self.orders_10s = 0
+        self.minute = self.ten_seconds = None
+        self.backoff_until = self.banned_until = 0.0
+        self.served_weight = 0
+        self.status = {429: 0, 418: 0}
+        self._ids = itertools.count(1)
+
+    def _request(self, weight, orders=0):
+        now = self.clock()
+        self.clock.sleep(self.latency)
+        if int(now // 60) != self.minute:
+            self.minute, self.weight_used, self.orders_1m = int(now // 60), 0, 0
+        if int(now // 10) != self.ten_seconds:
+            self.ten_seconds, self.orders_10s = int(now // 10), 0
+
+        if now < self.banned_until:
+            self._reject(418, self.banned_until - now)
+        over_weight = self.weight_used + weight > self.weight_limit
+        over_orders = orders and (self.orders_1m + orders > self.order_limit_1m
+                                  or self.orders_10s + orders > self.order_limit_10s)
+        if over_weight or over_orders:
+            if now < self.backoff_until:
+                # Still sending while told to back off: IP ban
+                self.banned_until = now + self.ban
+                self._reject(418, self.ban)
+            window = 60 if over_weight or self.orders_1m + orders > self.order_limit_1m else 10
+            self.backoff_until = (now // window + 1) * window
+            self._reject(429, self.backoff_until - now)
+
+        self.weight_used += weight
+        self.orders_1m += orders
+        self.orders_10s += orders
+        self.served_weight += weight
+        self.response = Response({
+            "X-MBX-USED-WEIGHT-1M": str(self.weight_used),
+            "X-MBX-ORDER-COUNT-1M": str(self.orders_1m),
+            "X-MBX-ORDER-COUNT-10S": str(self.orders_10s),
+        } if self.headers else {})
+
+    def _reject(self, status, retry_after):
+        self.status[status] += 1
+        self.response = Response({})
+        raise RateLimitError(status, retry_after)
+
+    def futures_create_order(self, **params):
+        self._request(1, orders=1)
+        return {'orderId': next(self._ids), 'symbol': params['symbol'], 'status': "NEW"}
+
+    def futures_cancel_order(self, **params):
+        self._request(1)
+        return {'orderId': params['orderId'], 'status': "CANCELED"}
+
+    def futures_get_open_orders(self, **params):
+        self._request(1 if params.get('symbol') else 40)
+        return []
+
+
+class BareClient:
+    """No governor: send immediately, wait out Retry-After on a 429/418"""
+
+    def __init__(self, exchange, clock):
+        self.exchange = exchange
+        self.clock = clock
+
+    def __getattr__(self, name):
+        method = getattr(self.exchange, name)
+
+        def call(**kwargs):
+            while True:
+                try:
+                    return method(**kwargs)
+                except RateLimitError as e:
+                    self.clock.sleep(float(e.response.headers["Retry-After"]))
+
+        return call
+
+
+def trading_loop(client, clock, minutes, poll_every):
+    """Place and cancel orders until the clock runs out
+
+    Returns:
+        tuple: (orders placed, cancel latencies in seconds, longest gap
+            between completed calls in seconds, calls given up on)
+    """
+    placed = failed = 0
+    cancel_latency = []
+    longest_gap = 0.0
+    last = clock()
+
+    def done():
+        nonlocal last, longest_gap
+        longest_gap = max(longest_gap, clock() - last)
+        last = clock()
+
+    while clock() < minutes * 60:
+        try:
+            order = client.futures_create_order(symbol="BTCUSDT", side="BUY", type="LIMIT",
+                                                timeInForce="GTC", quantity="0.001", price="29000")
+            placed += 1
+            done()
+            start = clock()
+            client.futures_cancel_order(symbol="BTCUSDT", orderId=order['orderId'])
+            cancel_latency.append(clock() - start)
+            done()
+            if placed % poll_every == 0:
+                client.futures_get_open_orders()
+                done()
+        except RateLimitError:
+            failed += 1
+    return placed, cancel_latency, longest_gap, failed
+
+
+def run(mode, minutes, latency, poll_every):
+    from rate_limiter import RateLimitGovernor, RateLimitedClient
+    clock = VirtualClock()
+    exchange = LimitedExchange(clock, latency, headers=mode != "governor, no headers")
+    if mode == "bare":
+        client = BareClient(exchange, clock)
+    else:
+        governor = RateLimitGovernor(clock=clock)
+        governor._cond = VirtualCondition(clock)
+        client = RateLimitedClient(exchange, governor, logger=common.quiet_logger())
+    placed, cancels, gap, failed = trading_loop(client, clock, minutes, poll_every)
+    return {
+        "orders/min": placed / minutes,
+        "weight/min": exchange.served_weight / minutes,
+        "429": exchange.status[429],
+        "418": exchange.status[418],
+        "failed": failed,
+        "gap": gap,
+        "cancel p99": percentile(cancels, 99) * 1000,
+        "cancel max": max(cancels) * 1000 if cancels else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--minutes", type=float, default=10)
+    parser.add_argument("--latency", type=float, default=0.005, help="Simulated round trip in seconds")
+    parser.add_argument("--poll-every", type=int, default=20, help="Orders between weight-40 open-order polls")
+    args = parser.parse_args()
+
+    print(f"{args.minutes:g} simulated minutes, {args.latency * 1000:.0f} ms round trip; "
+          f"limits 2400 weight/min, 1200 orders/min, 300 orders/10s")
+    print(f"  {'client':<22} {'orders/min':>10} {'weight/min':>10} {'429s':>5} {'418s':>5} {'failed':>6} "
+          f"{'longest stall':>14} {'cancel p99':>11} {'cancel max':>11}")
+    for mode in ("bare", "governor", "governor, no headers"):
+        r = run(mode, args.minutes, args.latency, args.poll_every)
+        print(f"  {mode:<22} {r['orders/min']:>10.0f} {r['weight/min']:>10.0f} {r['429']:>5} {r['418']:>5} "
+              f"{r['failed']:>6} {r['gap']:>12.2f} s {r['cancel p99']:>8.1f} ms {r['cancel max']:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
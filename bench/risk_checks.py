@@ -0,0 +1,91 @@
+"""Pre-trade risk checks per second with many open orders
+
+Seeds a RiskEngine with --open-orders resting orders spread over --symbols
+symbols (all limits enabled), then times check(), reserve() followed by
+settle() with the acknowledgement, and reserve() plus release() from
+--threads threads at once. Every case is also run on an empty engine: the
+checks read per-symbol totals, so their cost should not grow with the
+number of open orders.
+
+    python bench/risk_checks.py --open-orders 10000 --symbols 20 --checks 200000 --threads 8
+"""
+
+import argparse
+import threading
+import common  # noqa: F401  (puts src on the path)
+from common import Timer
+
+
+def seeded_engine(open_orders, symbols):
+    from risk import RiskEngine, RiskLimits
+    engine = RiskEngine(RiskLimits(max_position=1e9, max_notional=1e15, max_order_qty=1e6,
+                                   max_open_orders=open_orders + 1_000_000), max_loss=1e12)
+    for n in range(open_orders):
+        symbol = f"SYM{n % symbols}USDT"
+        engine.update_mark(symbol, 100.0)
+        engine.on_order({'orderId': n, 'symbol': symbol, 'side': "BUY" if n % 2 else "SELL", 'status': "NEW",
+                         'origQty': "1", 'executedQty': "0", 'price': "100"})
+    engine.update_mark("BTCUSDT", 30000.0)
+    return engine
+
+
+def run_checks(engine, checks):
+    with Timer() as timer:
+        for _ in range(checks):
+            engine.check("BTCUSDT", "BUY", 0.01, 30000.0)
+    return checks / timer.elapsed
+
+
+def run_reserve_settle(engine, checks, first_id=10**9):
+    ack = {'symbol': "BTCUSDT", 'side': "BUY", 'status': "FILLED", 'origQty': "0.01", 'executedQty': "0.01",
+           'avgPrice': "30000"}
+    with Timer() as timer:
+        for n in range(checks):
+            engine.reserve("BTCUSDT", "BUY", 0.01, 30000.0).settle(dict(ack, orderId=first_id + n))
+    return checks / timer.elapsed
+
+
+def run_threaded(engine, checks, threads):
+    per_thread = checks // threads
+
+    def work(thread):
+        symbol = f"SYM{thread}USDT"
+        for _ in range(per_thread):
+            engine.reserve(symbol, "BUY", 0.01, 100.0).release()
+    workers = [threading.Thread(target=work, args=(t,)) for t in range(threads)]
+    with Timer() as timer:
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    return per_thread * threads / timer.elapsed
+
+
+def held_exposure(engine):
+    return sum(state.open_buy + state.open_sell for state in engine.symbols.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--open-orders", type=int, default=10_000)
+    parser.add_argument("--symbols", type=int, default=20)
+    parser.add_argument("--checks", type=int, default=200_000)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"{args.checks:,} checks per case\n")
+    print(f"{'open orders':>12}{'check/s':>12}{'reserve+settle/s':>18}{f'{args.threads} threads/s':>14}")
+    run_checks(seeded_engine(0, args.symbols), args.checks // 10)  # warm-up
+    for open_orders in (0, args.open_orders):
+        engine = seeded_engine(open_orders, args.symbols)
+        checks = run_checks(engine, args.checks)
+        settled = run_reserve_settle(engine, args.checks)
+        engine = seeded_engine(open_orders, args.symbols)
+        exposure = held_exposure(engine)
+        threaded = run_threaded(engine, args.checks, args.threads)
+        assert abs(held_exposure(engine) - exposure) < 1e-6, "released reservations left exposure behind"
+        print(f"{open_orders:>12,}{checks:>12,.0f}{settled:>18,.0f}{threaded:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
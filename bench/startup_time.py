@@ -0,0 +1,98 @@
+"""Import time and bot startup, each measured in a fresh interpreter
+
+Every case runs --runs times in a new Python process (so nothing is
+already imported or cached) and the median is reported:
+
+- imports: `import bot` as shipped (order modules load on first use),
+  `import bot` plus every order/stream module the way the old bot.py
+  imported them up front, `import cli`, and the binance SDK on its own;
+- startup: SimplifiedBot on a simulated exchange with a --latency round
+  trip, timed to the first acknowledged market order, with the blocking
+  connection check and with fast_start (the check overlaps the order).
+
+The real create_client path is not timed: it needs the futures host.
+
+    python bench/startup_time.py --runs 10 --latency 0.1
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import common
+from common import SRC, percentile
+
+EAGER_MODULES = [
+    "market_orders", "limit_orders", "batch_orders", "journal", "user_stream", "market_data",
+    "advanced.stop_limit", "advanced.oco", "advanced.oco_manager", "advanced.twap", "advanced.twap_scheduler",
+    "advanced.execution", "advanced.amend", "advanced.grid",
+]
+
+PRELUDE = f"""
+import sys, time
+sys.path.insert(0, {os.path.abspath(SRC)!r})
+start = time.perf_counter()
+"""
+
+IMPORTS = {
+    "import bot (lazy)": "import bot",
+    "import bot + order modules (eager)": "import bot\nfor m in {!r}: __import__(m)".format(EAGER_MODULES),
+    "import cli": "import cli",
+    "import binance": "import binance",
+}
+
+STARTUP = """
+sys.path.insert(0, {bench!r})
+import common
+from bot import SimplifiedBot
+from simulator import LatencyClient
+client = LatencyClient(common.flat_exchange(), {latency!r})
+start = time.perf_counter()
+bot = SimplifiedBot(None, None, client=client, fast_start={fast!r})
+ready = time.perf_counter() - start
+order = bot.place_market_order("BTCUSDT", "BUY", 0.01)
+assert order is not None
+if {fast!r}:
+    assert bot.check_connection() is not None
+first_order = time.perf_counter() - start
+bot.close()
+bot.log_pipeline.stop()
+print(ready, first_order)
+"""
+
+
+def run(code, runs):
+    """Per-run stdout values of ``code`` in fresh interpreters"""
+    results = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+        results.append([float(v) for v in out.split()])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.1, help="simulated round trip (s)")
+    args = parser.parse_args()
+    common.in_scratch_dir()
+
+    print(f"median of {args.runs} fresh interpreters\n")
+    print(f"{'imports':<38}{'p50':>9}{'max':>9}")
+    for name, statement in IMPORTS.items():
+        times = [r[0] for r in run(PRELUDE + statement + "\nprint(time.perf_counter() - start)", args.runs)]
+        print(f"{name:<38}{percentile(times, 50) * 1000:>7.0f}ms{max(times) * 1000:>7.0f}ms")
+
+    bench_dir = os.path.dirname(os.path.abspath(__file__))
+    print(f"\n{'startup, ' + format(args.latency * 1000, '.0f') + ' ms round trip':<38}"
+          f"{'ready':>9}{'1st order':>11}")
+    for name, fast in (("blocking connection check", False), ("fast_start", True)):
+        code = PRELUDE + STARTUP.format(bench=bench_dir, latency=args.latency, fast=fast)
+        results = run(code, args.runs)
+        ready = percentile([r[0] for r in results], 50)
+        first = percentile([r[1] for r in results], 50)
+        print(f"{name:<38}{ready * 1000:>7.0f}ms{first * 1000:>9.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Local filter validation cost and exchange rejects avoided
+
+Random limit orders and TWAP splits are sent to a fake exchange that
+enforces LOT_SIZE / PRICE_FILTER / MIN_NOTIONAL like Binance (-1111
+precision, -4164 notional, -1013 lot size), once with the raw inputs and
+once quantized and validated through SymbolFilterCache first.
+
+    python bench/symbol_filters.py --orders 20000
+"""
+
+import argparse
+import random
+import time
+from decimal import Decimal
+import common
+
+EXCHANGE_INFO = {'symbols': [
+    {'symbol': symbol, 'filters': [
+        {'filterType': "PRICE_FILTER", 'tickSize': tick, 'minPrice': tick, 'maxPrice': "1000000"},
+        {'filterType': "LOT_SIZE", 'stepSize': step, 'minQty': step, 'maxQty': "10000"},
+        {'filterType': "MARKET_LOT_SIZE", 'stepSize': step, 'minQty': step, 'maxQty': "1000"},
+        {'filterType': "MIN_NOTIONAL", 'notional': "100"},
+    ]}
+    for symbol, tick, step in (("BTCUSDT", "0.10", "0.001"), ("ETHUSDT", "0.01", "0.001"),
+                               ("DOGEUSDT", "0.00001", "1"))
+]}
+PRICES = {"BTCUSDT": 30000.0, "ETHUSDT": 2000.0, "DOGEUSDT": 0.08}
+
+
+class RejectingExchange:
+    """Checks orders against the filters the way the exchange does"""
+
+    def __init__(self):
+        self.rules = {s['symbol']: {f['filterType']: f for f in s['filters']} for s in EXCHANGE_INFO['symbols']}
+        self.requests = 0
+        self.rejects = 0
+
+    def futures_exchange_info(self):
+        return EXCHANGE_INFO
+
+    def futures_create_order(self, **params):
+        self.requests += 1
+        rules = self.rules[params['symbol']]
+        lot = rules['MARKET_LOT_SIZE' if params['type'] == "MARKET" else 'LOT_SIZE']
+        quantity = Decimal(str(params['quantity']))
+        error = None
+        if quantity % Decimal(lot['stepSize']):
+            error = -1111
+        elif quantity < Decimal(lot['minQty']) or quantity > Decimal(lot['maxQty']):
+            error = -1013
+        elif 'price' in params:
+            price = Decimal(str(params['price']))
+            if price % Decimal(rules['PRICE_FILTER']['tickSize']):
+                error = -1111
+            elif quantity * price < Decimal(rules['MIN_NOTIONAL']['notional']):
+                error = -4164
+        if error:
+            self.rejects += 1
+            raise ValueError(f"APIError(code={error})")
+        return {'orderId': self.requests}
+
+
+def workload(count, seed=7):
+    rng = random.Random(seed)
+    orders = []
+    for _ in range(count):
+        symbol = rng.choice(list(PRICES))
+        price = PRICES[symbol] * rng.uniform(0.9, 1.1)
+        notional = rng.uniform(20, 2000)
+        if rng.random() < 0.5:
+            orders.append(("limit", symbol, notional / price, price))
+        else:
+            orders.append(("twap", symbol, notional / PRICES[symbol], rng.randint(2, 10)))
+    return orders
+
+
+def run(orders, symbol_filters):
+    from advanced.twap import TWAPOrder
+    from limit_orders import LimitOrder
+    exchange = RejectingExchange()
+    limit = LimitOrder(exchange, symbol_filters)
+    twap = TWAPOrder(exchange, None, symbol_filters)
+    local_rejects = 0
+    build_time = 0.0
+    for kind, symbol, quantity, extra in orders:
+        start = time.perf_counter()
+        try:
+            if kind == "limit":
+                requests = [limit.build_order(symbol, "BUY", quantity, extra)]
+            else:
+                requests = twap.build_orders(symbol, "BUY", quantity, extra)
+        except ValueError:
+            local_rejects += 1
+            continue
+        finally:
+            build_time += time.perf_counter() - start
+        for params in requests:
+            try:
+                exchange.futures_create_order(**params)
+            except ValueError:
+                pass
+    return exchange, local_rejects, build_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=20000)
+    args = parser.parse_args()
+    from symbol_filters import SymbolFilterCache
+
+    orders = workload(args.orders)
+    cache = SymbolFilterCache(RejectingExchange(), path=None)
+    for symbol in PRICES:
+        cache.get(symbol)
+
+    filters = cache.get("BTCUSDT")
+    iterations = 200000
+    start = time.perf_counter()
+    for i in range(iterations):
+        filters.validate(0.0123456 + i * 1e-7, 30000.123)
+    per_validate = (time.perf_counter() - start) / iterations
+
+    print(f"SymbolFilters.validate: {per_validate * 1e6:.2f} us per order")
+    print(f"{args.orders} orders (limit orders and TWAP splits, unrounded inputs):")
+    for name, symbol_filters in (("raw inputs", None), ("SymbolFilterCache", cache)):
+        exchange, local, build_time = run(orders, symbol_filters)
+        print(f"  {name:<18} requests {exchange.requests:6d}  exchange rejects {exchange.rejects:6d}  "
+              f"rejected locally {local:5d}  build {build_time * 1e6 / len(orders):.2f} us/order")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Request signing cost and server-time offset accuracy
+
+Signing: python-binance's per-request signing (sign, then sort and join
+the parameters again) against FastSigner on a typical LIMIT order.
+
+Offset: a simulated server --offset ms ahead, reached over a network whose
+one-way delays are --base ms plus exponential jitter (mean --jitter ms),
+independently each way, with occasional --spike ms stalls. Compares the
+error of taking each futures_time() sample as-is (what a plain
+offset measurement does) with ServerTimeSync's filtered, smoothed offset.
+
+    python bench/time_sync_signing.py --iterations 100000 --samples 2000 --jitter 5 --spike 200
+"""
+
+import argparse
+import random
+import common
+from common import percentile
+
+
+class NoisyServer:
+    """futures_time() over a jittery network, with a simulated wall clock"""
+
+    def __init__(self, offset_ms, base_ms, jitter_ms, spike_ms, spike_rate, seed=1):
+        self.rng = random.Random(seed)
+        self.now = 1_700_000_000.0
+        self.offset_ms = offset_ms
+        self.base, self.jitter, self.spike, self.spike_rate = base_ms, jitter_ms, spike_ms, spike_rate
+        self.timestamp_offset = 0
+
+    def clock(self):
+        return self.now
+
+    def _delay(self):
+        delay = self.base + self.rng.expovariate(1 / self.jitter) if self.jitter else self.base
+        if self.rng.random() < self.spike_rate:
+            delay += self.spike
+        return delay / 1000
+
+    def futures_time(self):
+        self.now += self._delay()
+        server_time = int(self.now * 1000 + self.offset_ms)
+        self.now += self._delay()
+        return {'serverTime': server_time}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=100_000)
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--offset", type=float, default=-850.0)
+    parser.add_argument("--base", type=float, default=10.0, help="one-way base delay (ms)")
+    parser.add_argument("--jitter", type=float, default=5.0, help="mean exponential jitter per leg (ms)")
+    parser.add_argument("--spike", type=float, default=200.0, help="stall added to a leg (ms)")
+    parser.add_argument("--spike-rate", type=float, default=0.02)
+    args = parser.parse_args()
+    from time_sync import ServerTimeSync, signing_cost
+
+    cost = signing_cost(iterations=args.iterations)
+    print(f"signing, {args.iterations:,} LIMIT orders: python-binance {cost['library'] / 1000:.1f} us, "
+          f"FastSigner {cost['fast'] / 1000:.1f} us ({cost['library'] / cost['fast']:.1f}x)\n")
+
+    server = NoisyServer(args.offset, args.base, args.jitter, args.spike, args.spike_rate)
+    sync = ServerTimeSync(server, clock=server.clock)
+    raw_errors, sync_errors = [], []
+    for _ in range(args.samples):
+        start = server.clock()
+        server_time = server.futures_time()['serverTime']
+        end = server.clock()
+        raw_errors.append(abs(server_time - (start + end) * 500 - args.offset))
+        sync_errors.append(abs(sync.sample() - args.offset))
+    # The first samples only seed the average
+    sync_errors = sync_errors[20:]
+    print(f"offset error over {args.samples} samples (ms)")
+    print(f"{'':<24}{'p50':>8}{'p99':>8}{'max':>8}")
+    for name, errors in (("single sample", raw_errors), ("ServerTimeSync", sync_errors)):
+        print(f"{name:<24}{percentile(errors, 50):>8.1f}{percentile(errors, 99):>8.1f}{max(errors):>8.1f}")
+    print(f"\nServerTimeSync: {sync.stats['discarded']} samples discarded, {sync.stats['jumps']} jumps")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""Order round-trip latency over the tuned transport, against a local HTTP stub
+
+A threaded HTTP/1.1 server on 127.0.0.1, in its own process, stands in for
+the futures API (POST/GET /fapi/v1/order with a fixed service time and
+rate-limit headers).
+--threads threads place orders through binance.Client with its stock
+session and with a TunedSession sized for the thread count, and the
+p50/p99 round trip and the number of TCP connections opened are reported.
+A last run drops --drop of the order responses after the order was taken,
+through IdempotentOrderClient, and counts duplicates on the stub.
+
+    python bench/transport.py --orders 2000 --threads 32 --service 0.002
+"""
+
+import argparse
+import json
+import multiprocessing
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import common
+from common import percentile
+
+
+class StubExchange(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, service_time, drop=0.0):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.service_time = service_time
+        self.drop = drop
+        self.orders = {}
+        self.placements = {}
+        self.connections = 0
+        self.lock = threading.Lock()
+        self.ids = iter(range(1, 10 ** 9))
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/fapi"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def _params(self):
+        params = parse_qs(urlparse(self.path).query)
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            params.update(parse_qs(self.rfile.read(length).decode()))
+        return {key: values[0] for key, values in params.items()}
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("X-MBX-USED-WEIGHT-1M", "1")
+        self.send_header("X-MBX-ORDER-COUNT-10S", "1")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        params = self._params()
+        time.sleep(self.server.service_time)
+        client_id = params["newClientOrderId"]
+        with self.server.lock:
+            self.server.placements[client_id] = self.server.placements.get(client_id, 0) + 1
+            order = self.server.orders.get(client_id)
+            if order is None:
+                order = {'orderId': next(self.server.ids), 'clientOrderId': client_id,
+                         'symbol': params["symbol"], 'status': "NEW"}
+                self.server.orders[client_id] = order
+        if self.server.drop and random.random() < self.server.drop:
+            # Taken, but the response is lost in transit
+            self.close_connection = True
+            return
+        self._reply(200, order)
+
+    def do_GET(self):
+        if self.path == "/stats":
+            with self.server.lock:
+                duplicates = sum(count - 1 for count in self.server.placements.values())
+                return self._reply(200, {'connections': self.server.connections, 'duplicates': duplicates})
+        params = self._params()
+        time.sleep(self.server.service_time)
+        order = self.server.orders.get(params.get("origClientOrderId"))
+        if order is None:
+            self._reply(400, {'code': -2013, 'msg': "Order does not exist."})
+        else:
+            self._reply(200, order)
+
+
+def _serve(service_time, drop, ready):
+    server = StubExchange(service_time, drop)
+    ready.put(server.url)
+    server.serve_forever()
+
+
+class StubProcess:
+    """StubExchange served from a child process, so it does not share the benchmark's GIL"""
+
+    def __init__(self, service_time, drop=0.0):
+        context = multiprocessing.get_context("fork")
+        ready = context.Queue()
+        self.process = context.Process(target=_serve, args=(service_time, drop, ready), daemon=True)
+        self.process.start()
+        self.url = ready.get(timeout=10)
+
+    def stats(self):
+        import requests
+        return requests.get(self.url.replace("/fapi", "/stats"), timeout=5).json()
+
+    def stop(self):
+        self.process.terminate()
+        self.process.join()
+
+
+def make_client(url, session=None):
+    """binance.Client aimed at the stub, built the way startup.create_client builds it"""
+    from binance import Client
+    from startup import FastSigner
+    from transport import configure_transport
+    client = Client.__new__(Client)
+    super(Client, client).__init__("key", "secret", testnet=True)
+    client.FUTURES_TESTNET_URL = url
+    if session is not None:
+        configure_transport(client, session=session)
+    FastSigner("secret").install(client)
+    return client
+
+
+def run(client, orders, threads):
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    counter = iter(range(orders))
+
+    def worker():
+        local = []
+        for _ in iter(lambda: next(counter, None), None):
+            start = time.perf_counter()
+            try:
+                client.futures_create_order(symbol="BTCUSDT", side="BUY", type="LIMIT", timeInForce="GTC",
+                                            quantity="0.001", price="29000",
+                                            newClientOrderId=f"b-{random.getrandbits(64):x}")
+            except Exception as e:
+                with lock:
+                    errors.append(e)
+                continue
+            local.append((time.perf_counter() - start) * 1000)
+        with lock:
+            latencies.extend(local)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return latencies, errors
+
+
+def report(label, stub, latencies, errors):
+    stats = stub.stats()
+    stub.stop()
+    print(f"  {label:<36} p50 {percentile(latencies, 50):6.2f} ms  p99 {percentile(latencies, 99):7.2f} ms  "
+          f"{stats['connections'] - 1:>4} connections  {len(errors):>3} errors  "
+          f"{stats['duplicates']:>3} duplicates")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--service", type=float, default=0.002, help="Stub service time in seconds")
+    parser.add_argument("--drop", type=float, default=0.05, help="Fraction of order responses lost")
+    args = parser.parse_args()
+    from transport import IdempotentOrderClient, TransportConfig, TunedSession
+
+    print(f"{args.orders} orders from {args.threads} threads, {args.service * 1000:.1f} ms stub service time")
+    configs = (
+        ("stock session (pool of 10)", lambda: None),
+        (f"TunedSession (pool of {args.threads})",
+         lambda: TunedSession(TransportConfig(pool_size=args.threads))),
+    )
+    for label, session in configs:
+        stub = StubProcess(args.service)
+        client = make_client(stub.url, session())
+        report(label, stub, *run(client, args.orders, args.threads))
+
+    stub = StubProcess(args.service, args.drop)
+    session = TunedSession(TransportConfig(pool_size=args.threads))
+    client = IdempotentOrderClient(make_client(stub.url, session), max_retries=2)
+    report(f"idempotent, {args.drop:.0%} responses lost", stub, *run(client, args.orders, args.threads))
+
+
+if __name__ == "__main__":
+    main()
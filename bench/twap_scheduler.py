@@ -0,0 +1,113 @@
+"""TWAPScheduler drift and CPU cost
+
+Simulated clock: --schedules schedules driven with run_pending(), measuring
+scheduler CPU per chunk. Real clock: the same workload against a fake
+client with a fixed round trip, one sender thread against a pool, measuring
+how late each chunk leaves relative to its due time.
+
+    python bench/twap_scheduler.py --schedules 10000 --live-schedules 500 --latency 0.02
+"""
+
+import argparse
+import itertools
+import threading
+import time
+import common
+from common import percentile
+
+
+class FakeClient:
+    """Records when each chunk was sent, by the scheduler's clock"""
+
+    def __init__(self, clock, latency=0.0):
+        self.clock = clock
+        self.latency = latency
+        self.sent = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def futures_create_order(self, **params):
+        sent_at = self.clock()
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.sent.setdefault(params['symbol'], []).append(sent_at)
+            return {'orderId': next(self._ids), 'symbol': params['symbol']}
+
+
+def chunks(symbol, count):
+    return [dict(symbol=symbol, side="BUY", type="MARKET", quantity="0.001") for _ in range(count)]
+
+
+def drift_ms(client, submitted, interval):
+    return [(sent_at - (submitted[symbol] + k * interval)) * 1000
+            for symbol, times in client.sent.items() for k, sent_at in enumerate(times)]
+
+
+def simulated(schedules, chunk_count, interval):
+    from advanced.twap_scheduler import TWAPScheduler
+    now = [0.0]
+    client = FakeClient(lambda: now[0])
+    scheduler = TWAPScheduler(client, clock=lambda: now[0])
+    submitted = {}
+    cpu = time.process_time()
+    for i in range(schedules):
+        # Spread the starts over one interval
+        now[0] = i * interval / schedules
+        symbol = f"S{i}"
+        submitted[symbol] = now[0]
+        scheduler.submit_chunks(symbol, "BUY", chunks(symbol, chunk_count), interval)
+    sent = 0
+    while True:
+        due = scheduler.next_due()
+        if due is None:
+            break
+        now[0] = due
+        sent += scheduler.run_pending()
+    cpu = time.process_time() - cpu
+    drifts = drift_ms(client, submitted, interval)
+    return sent, cpu, max(drifts)
+
+
+def live(schedules, chunk_count, interval, latency, workers):
+    from advanced.twap_scheduler import TWAPScheduler
+    client = FakeClient(time.monotonic, latency)
+    scheduler = TWAPScheduler(client, workers=workers)
+    scheduler.start()
+    submitted = {}
+    cpu = time.process_time()
+    for i in range(schedules):
+        symbol = f"S{i}"
+        submitted[symbol] = time.monotonic()
+        scheduler.submit_chunks(symbol, "BUY", chunks(symbol, chunk_count), interval)
+    while scheduler.active_count():
+        time.sleep(0.01)
+    cpu = time.process_time() - cpu
+    scheduler.stop()
+    drifts = drift_ms(client, submitted, interval)
+    return len(drifts), cpu, percentile(drifts, 50), percentile(drifts, 99), max(drifts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--schedules", type=int, default=10000)
+    parser.add_argument("--chunks", type=int, default=5)
+    parser.add_argument("--interval", type=float, default=1.0)
+    parser.add_argument("--live-schedules", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.02, help="Fake round trip in seconds")
+    args = parser.parse_args()
+
+    sent, cpu, worst = simulated(args.schedules, args.chunks, args.interval)
+    print(f"Simulated clock: {args.schedules} schedules x {args.chunks} chunks")
+    print(f"  {sent} chunks, scheduler CPU {cpu * 1e6 / sent:.1f} us/chunk, max drift {worst:.3f} ms")
+
+    print(f"Real clock: {args.live_schedules} schedules x 3 chunks every {args.interval}s, "
+          f"{args.latency * 1000:.0f} ms round trip")
+    for workers in (1, 32):
+        sent, cpu, p50, p99, worst = live(args.live_schedules, 3, args.interval, args.latency, workers)
+        print(f"  {workers:>2} sender(s): {sent} chunks, drift p50 {p50:8.1f} ms  p99 {p99:8.1f} ms  "
+              f"max {worst:8.1f} ms, CPU {cpu:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,11 +4,43 @@ Advanced order types for Binance Futures trading
 This module contains implementations of advanced order strategies:
 - Stop-Limit Orders
 - OCO (One-Cancels-Other) Orders
+- OCO Manager (cancels the surviving leg when one fills)
 - TWAP (Time-Weighted Average Price) Orders
+- TWAP Scheduler (many non-blocking TWAP orders on one timer thread)
+- Adaptive execution (VWAP, participation rate, passive-then-cross slices)
+- Order amender (modify in place or pipelined cancel+new, coalesced repricing)
+- Grid orders (ladders re-centered by diffing against open orders)
 """
 
-from .stop_limit import StopLimitOrder
-from .oco import OCOOrder
-from .twap import TWAPOrder
+import importlib
 
-__all__ = ['StopLimitOrder', 'OCOOrder', 'TWAPOrder']
\ No newline at end of file
+# Submodules are imported on first attribute access, so importing one order
+# type (e.g. advanced.oco) does not load the others
+_EXPORTS = {
+    'StopLimitOrder': '.stop_limit',
+    'OCOOrder': '.oco',
+    'OCOManager': '.oco_manager',
+    'OCOPair': '.oco_manager',
+    'TWAPOrder': '.twap',
+    'TWAPScheduler': '.twap_scheduler',
+    'TWAPSchedule': '.twap_scheduler',
+    'AdaptiveTWAPOrder': '.execution',
+    'QuoteFillClient': '.execution',
+    'ExecutionHalted': '.execution',
+    'OrderAmender': '.amend',
+    'AmendHandle': '.amend',
+    'AmendError': '.amend',
+    'GridOrder': '.grid',
+    'GridPlan': '.grid',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,379 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from transport import new_client_order_id
+
+# Only plain LIMIT orders can be changed in place (PUT /fapi/v1/order)
+MODIFIABLE_TYPES = ("LIMIT",)
+# "No need to modify the order": the target equals the live order
+NO_CHANGE_CODE = -5027
+# Statuses after which an order can no longer be amended
+FINAL_STATUSES = ("FILLED", "CANCELED", "EXPIRED", "REJECTED")
+# Carried over from the original order when it is re-placed
+REPLACE_FIELDS = ("symbol", "side", "type", "quantity", "price", "stopPrice", "timeInForce", "reduceOnly",
+                  "workingType", "priceProtect", "positionSide")
+
+
+class AmendError(Exception):
+    """An amend left the order in a different state than requested"""
+
+
+class AmendHandle:
+    """Current identity and parameters of an order being amended
+
+    ``order_id`` follows the order through cancel+new replacements, so
+    callers can keep one handle for the order's whole life. ``params``
+    and ``executed_qty`` describe the live exchange order.
+    """
+
+    __slots__ = ("symbol", "order_id", "client_order_id", "params", "state", "inflight", "queued", "replacements",
+                 "executed_qty", "previous_ids")
+
+    def __init__(self, symbol, order_id, client_order_id, params, executed_qty=0.0):
+        self.symbol = symbol
+        self.order_id = order_id
+        self.client_order_id = client_order_id
+        self.params = params
+        self.state = "OPEN"
+        self.inflight = False
+        # (target, futures) waiting for the in-flight amend to finish
+        self.queued = None
+        self.replacements = 0
+        self.executed_qty = executed_qty
+        # orderIds this order had before its replacements
+        self.previous_ids = []
+
+
+def _params_from_order(order):
+    """futures_create_order params reconstructed from an order response"""
+    params = {
+        'symbol': order['symbol'],
+        'side': order['side'],
+        'type': order.get('type') or order.get('origType'),
+        'quantity': order.get('origQty') or order.get('quantity'),
+    }
+    for key in ("price", "stopPrice", "timeInForce", "workingType", "positionSide"):
+        value = order.get(key)
+        if value not in (None, "", "0", "0.0", "0.00") and not (key == "positionSide" and value == "BOTH"):
+            params[key] = value
+    if str(order.get('reduceOnly', False)).lower() == "true":
+        params['reduceOnly'] = True
+    return params
+
+
+class OrderAmender:
+    """Change the price or quantity of resting orders with as few round trips as possible
+
+    LIMIT orders are modified in place (one request, same orderId). Other
+    orders, such as stop-limits, are replaced: the cancel and the new order
+    are sent concurrently, so the switch costs one round trip rather than
+    two, and the handle then tracks the new orderId. Amends that arrive
+    while one is in flight for the same order are coalesced: only the
+    latest target is sent, and every caller's Future gets that result.
+    """
+
+    def __init__(self, client, logger=None, symbol_filters=None, workers=4):
+        """Initialize the amender
+
+        Args:
+            client: Binance client; futures_modify_order is used when present
+            logger (logging.Logger): Optional logger
+            symbol_filters (SymbolFilterCache): Optional cache to quantize new prices/quantities
+            workers (int): Threads sending amends (and, separately, pipelined cancels)
+        """
+        self.client = client
+        self.logger = logger
+        self.symbol_filters = symbol_filters
+        self.modify_supported = hasattr(client, "futures_modify_order")
+        self._handles = {}
+        self._aliases = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="Amend")
+        self._cancel_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="AmendCancel")
+        self.stats = {'amends': 0, 'coalesced': 0, 'modified': 0, 'replaced': 0, 'requests': 0}
+
+    def track(self, order):
+        """Start tracking an order response (as returned by place_order)
+
+        Returns:
+            AmendHandle
+        """
+        with self._lock:
+            handle = self._handles.get(order['orderId'])
+            if handle is None:
+                handle = AmendHandle(order['symbol'], order['orderId'], order.get('clientOrderId'),
+                                     _params_from_order(order), float(order.get('executedQty') or 0))
+                if order.get('status') in FINAL_STATUSES:
+                    # Nothing to amend; not kept
+                    handle.state = order['status']
+                else:
+                    self._handles[order['orderId']] = handle
+            return handle
+
+    def forget(self, order_id):
+        """Stop tracking an order (e.g. after cancelling it) and drop its past orderIds"""
+        with self._lock:
+            handle = self._handles.get(self._resolve(order_id))
+            if handle is not None:
+                if handle.state == "OPEN":
+                    handle.state = "CLOSED"
+                self._retire(handle)
+
+    def _retire(self, handle):
+        """Drop a handle that can no longer be amended, with its aliases (lock held)"""
+        if self._handles.get(handle.order_id) is handle:
+            del self._handles[handle.order_id]
+        for order_id in handle.previous_ids:
+            self._aliases.pop(order_id, None)
+
+    def handle(self, order_id):
+        """Handle of an order, following replacements from any of its past orderIds"""
+        with self._lock:
+            return self._handles.get(self._resolve(order_id))
+
+    def current_order_id(self, order_id):
+        """Latest orderId of an order that may have been replaced"""
+        with self._lock:
+            return self._resolve(order_id)
+
+    def _resolve(self, order_id):
+        seen = order_id
+        while order_id in self._aliases:
+            order_id = self._aliases[order_id]
+        if order_id != seen:
+            self._aliases[seen] = order_id
+        return order_id
+
+    def amend(self, order, price=None, quantity=None, stop_price=None):
+        """Request a new price/quantity/stop price without blocking
+
+        Args:
+            order: AmendHandle, order response dict, or orderId of a tracked order
+            price (float): New limit price
+            quantity (float): New quantity
+            stop_price (float): New trigger price (forces a replacement)
+
+        Returns:
+            Future: Resolves to the live order after the amend, or raises
+        """
+        if isinstance(order, AmendHandle):
+            handle = order
+        elif isinstance(order, dict):
+            handle = self.handle(order['orderId']) or self.track(order)
+        else:
+            handle = self.handle(order)
+            if handle is None:
+                raise ValueError(f"Order {order} is not tracked")
+
+        target = {}
+        if price is not None:
+            target['price'] = price
+        if quantity is not None:
+            target['quantity'] = quantity
+        if stop_price is not None:
+            target['stopPrice'] = stop_price
+        if not target:
+            raise ValueError("Nothing to amend: pass price, quantity or stop_price")
+        for key, value in target.items():
+            if value <= 0:
+                raise ValueError(f"{key} must be positive")
+
+        future = Future()
+        with self._lock:
+            self.stats['amends'] += 1
+            if handle.state != "OPEN":
+                future.set_exception(AmendError(f"Order {handle.order_id} is {handle.state}"))
+                return future
+            if handle.inflight:
+                # Only the latest target is sent once the current amend returns
+                if handle.queued:
+                    queued_target, futures = handle.queued
+                    queued_target.update(target)
+                    futures.append(future)
+                    self.stats['coalesced'] += 1
+                else:
+                    handle.queued = (target, [future])
+                return future
+            handle.inflight = True
+        self._executor.submit(self._run, handle, target, [future])
+        return future
+
+    def amend_now(self, order, price=None, quantity=None, stop_price=None, timeout=None):
+        """Amend and wait for the result"""
+        return self.amend(order, price, quantity, stop_price).result(timeout)
+
+    def _run(self, handle, target, futures):
+        while True:
+            try:
+                result = self._send(handle, target)
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+            else:
+                for future in futures:
+                    future.set_result(result)
+
+            with self._lock:
+                if handle.queued is None or handle.state != "OPEN":
+                    if handle.queued is not None:
+                        for future in handle.queued[1]:
+                            future.set_exception(AmendError(f"Order {handle.order_id} is {handle.state}"))
+                        handle.queued = None
+                    handle.inflight = False
+                    return
+                target, futures = handle.queued
+                handle.queued = None
+
+    def _quantize(self, handle, target):
+        if not self.symbol_filters:
+            return target
+        filters = self.symbol_filters.get(handle.symbol)
+        quantized = dict(target)
+        for key in ("price", "stopPrice"):
+            if key in quantized:
+                quantized[key] = filters.quantize_price(quantized[key])
+        if 'quantity' in quantized:
+            quantized['quantity'] = filters.validate(quantized['quantity'])[0]
+        return quantized
+
+    def _send(self, handle, target):
+        target = self._quantize(handle, target)
+        params = dict(handle.params, **target)
+        if self.modify_supported and params.get('type') in MODIFIABLE_TYPES and 'stopPrice' not in target:
+            return self._modify(handle, params)
+        return self._replace(handle, params)
+
+    def _modify(self, handle, params):
+        self.stats['requests'] += 1
+        try:
+            order = self.client.futures_modify_order(
+                symbol=handle.symbol, orderId=handle.order_id, side=params['side'],
+                quantity=params['quantity'], price=params['price'],
+            )
+        except Exception as e:
+            if getattr(e, "code", None) != NO_CHANGE_CODE:
+                self._close_if_gone(handle, e)
+                raise
+            order = dict(handle.params, orderId=handle.order_id, clientOrderId=handle.client_order_id)
+        handle.params = params
+        handle.executed_qty = float(order.get('executedQty') or handle.executed_qty)
+        self.stats['modified'] += 1
+        if self.logger:
+            self.logger.info("Order %s modified: %s @ %s", handle.order_id, params['quantity'], params.get('price'))
+        return order
+
+    def _remaining(self, handle, quantity):
+        """Quantity left for a replacement of a live order resized to ``quantity``, or None"""
+        remaining = float(quantity) - handle.executed_qty
+        if self.symbol_filters:
+            filters = self.symbol_filters.get(handle.symbol)
+            units = filters.quantity_units(remaining)
+            return filters.format_quantity(units) if units > 0 else None
+        return round(remaining, 12) if remaining > 1e-12 else None
+
+    def _replace(self, handle, params):
+        old_order_id = handle.order_id
+        executed = handle.executed_qty
+        # The replacement only carries what the live order has not filled yet
+        remaining = self._remaining(handle, params['quantity'])
+        if remaining is None:
+            raise AmendError(f"Order {old_order_id} has {executed} of {params['quantity']} filled; "
+                             f"nothing left to replace")
+        new_params = {key: params[key] for key in REPLACE_FIELDS if key in params}
+        new_params['quantity'] = remaining
+        new_params['newClientOrderId'] = new_client_order_id()
+
+        # Cancel and new go out together: one round trip instead of two
+        self.stats['requests'] += 2
+        cancel = self._cancel_executor.submit(
+            self.client.futures_cancel_order, symbol=handle.symbol, orderId=old_order_id
+        )
+        new_error = None
+        try:
+            new_order = self.client.futures_create_order(**new_params)
+        except Exception as e:
+            new_error = e
+        try:
+            cancelled = cancel.result()
+            cancel_error = None
+        except Exception as e:
+            cancel_error = e
+
+        if cancel_error is not None:
+            # The old order filled or was cancelled meanwhile: undo the new one
+            if new_error is None:
+                self._roll_back(handle, new_order)
+            with self._lock:
+                handle.state = "CLOSED"
+                self._retire(handle)
+            raise AmendError(f"Order {old_order_id} could not be cancelled ({cancel_error}); not replaced")
+        if new_error is not None:
+            with self._lock:
+                handle.state = "CANCELED"
+                self._retire(handle)
+            raise AmendError(f"Order {old_order_id} was cancelled but its replacement failed: {new_error}")
+
+        with self._lock:
+            handle.previous_ids.append(old_order_id)
+            self._aliases[old_order_id] = new_order['orderId']
+            self._handles[new_order['orderId']] = handle
+            self._handles.pop(old_order_id, None)
+            handle.order_id = new_order['orderId']
+            handle.client_order_id = new_order.get('clientOrderId', new_params['newClientOrderId'])
+            handle.params = dict(params, quantity=remaining)
+            handle.executed_qty = float(new_order.get('executedQty') or 0)
+            handle.replacements += 1
+        self.stats['replaced'] += 1
+        if self.logger:
+            self.logger.info("Order %s replaced by %s", old_order_id, new_order['orderId'])
+
+        filled_meanwhile = float((cancelled or {}).get('executedQty') or executed) - executed
+        if filled_meanwhile > 1e-12:
+            # Fills landed between the last update and the cancel: shrink the replacement to match
+            if self.logger:
+                self.logger.warning("Order %s filled %s more while being replaced; resizing %s",
+                                    old_order_id, filled_meanwhile, new_order['orderId'])
+            quantity = float(remaining) - filled_meanwhile
+            if quantity <= 1e-12:
+                self._roll_back(handle, new_order)
+                with self._lock:
+                    handle.state = "FILLED"
+                    self._retire(handle)
+                raise AmendError(f"Order {old_order_id} filled while being replaced")
+            return self._replace(handle, dict(handle.params, quantity=quantity))
+        return new_order
+
+    def _roll_back(self, handle, new_order):
+        try:
+            self.stats['requests'] += 1
+            self.client.futures_cancel_order(symbol=handle.symbol, orderId=new_order['orderId'])
+        except Exception as e:
+            if self.logger:
+                self.logger.error("Failed to roll back replacement order %s: %s", new_order['orderId'], e)
+
+    def _close_if_gone(self, handle, error):
+        # -2013 "Order does not exist" / -2011 "Unknown order": nothing left to amend
+        if getattr(error, "code", None) in (-2011, -2013):
+            with self._lock:
+                handle.state = "CLOSED"
+                self._retire(handle)
+
+    def on_order_update(self, event):
+        """UserDataStream listener: stop amending orders that filled or were cancelled"""
+        if event.get('e') != "ORDER_TRADE_UPDATE":
+            return
+        o = event['o']
+        with self._lock:
+            handle = self._handles.get(o['i'])
+            if handle is None or handle.order_id != o['i']:
+                return
+            handle.executed_qty = max(handle.executed_qty, float(o.get('z') or 0))
+            if o.get('X') in FINAL_STATUSES:
+                handle.state = o['X']
+                self._retire(handle)
+
+    def attach(self, user_stream):
+        user_stream.add_listener(self.on_order_update)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self._cancel_executor.shutdown(wait=True)
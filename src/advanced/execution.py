@@ -0,0 +1,405 @@
+import itertools
+import random
+import time
+from user_stream import FINAL_ORDER_STATUSES
+from .twap import TWAPOrder
+
+EXECUTION_MODES = ("TWAP", "VWAP", "POV")
+
+
+class ExecutionHalted(Exception):
+    """A passive slice could not be confirmed closed, so the execution stopped
+
+    Crossing the spread for the rest of the slice while the limit may still
+    be resting could fill the slice twice. ``order`` is the last known state
+    of the resting order and ``report`` the execution report up to the halt.
+    """
+
+    def __init__(self, message, order=None):
+        super().__init__(message)
+        self.order = order
+        self.report = None
+
+
+class AdaptiveTWAPOrder(TWAPOrder):
+    """TWAP/VWAP/participation execution with passive slices and slippage accounting
+
+    Each slice can first rest a post-only limit at the near touch for
+    ``passive_timeout`` seconds and then cross the spread with a market
+    order for whatever did not fill. Every slice records its arrival price
+    (mid at decision time) and fill price, and the run reports implementation
+    shortfall against the mid at the start. ``sleep`` and ``clock`` are
+    injectable so a run can be replayed against recorded market data
+    (see market_data.ReplayClock).
+    """
+
+    def __init__(self, client, logger=None, symbol_filters=None, market_data=None,
+                 sleep=time.sleep, clock=time.time, rng=None, cancel_attempts=3, cancel_retry_delay=0.5):
+        """Initialize the engine
+
+        Args:
+            client: Binance client (or a simulated one)
+            logger (logging.Logger): Optional logger
+            symbol_filters (SymbolFilterCache): Optional lot/tick size cache
+            market_data (MarketDataStream): Top of book, mark price and traded volume
+            sleep (callable): Sleep function
+            clock (callable): Time source matching ``sleep``
+            rng (random.Random): Randomness for slice timing jitter
+            cancel_attempts (int): Cancel/query rounds before a resting passive
+                slice that is still open halts the execution
+            cancel_retry_delay (float): Seconds between those rounds (grows linearly)
+        """
+        super().__init__(client, logger, symbol_filters, sleep)
+        self.market_data = market_data
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.cancel_attempts = cancel_attempts
+        self.cancel_retry_delay = cancel_retry_delay
+
+    def slice_quantities(self, total_quantity, chunks, mode="TWAP", volume_profile=None):
+        """Split the parent quantity into slice targets
+
+        Args:
+            total_quantity (float): Parent order size
+            chunks (int): Number of slices
+            mode (str): 'TWAP' (equal slices) or 'VWAP' (weighted by volume_profile)
+            volume_profile (list): Relative traded volume per period (e.g. per
+                hour of day); resampled to ``chunks`` buckets
+
+        Returns:
+            list: Slice quantities (floats) summing to total_quantity
+        """
+        if chunks <= 0:
+            raise ValueError("Chunks must be positive")
+        if mode == "VWAP":
+            if not volume_profile:
+                raise ValueError("VWAP mode requires a volume_profile")
+            weights = _resample(volume_profile, chunks)
+            if sum(weights) <= 0:
+                raise ValueError("volume_profile must contain positive volume")
+        else:
+            weights = [1.0] * chunks
+        total_weight = sum(weights)
+        return [total_quantity * w / total_weight for w in weights]
+
+    def slice_offsets(self, chunks, interval, jitter=0.0):
+        """Start offsets (seconds) of each slice, randomized by up to ``jitter`` * interval
+
+        The first slice starts immediately and offsets stay in order, so
+        slices never bunch up or overlap.
+        """
+        if not 0 <= jitter < 0.5:
+            raise ValueError("Jitter must be in [0, 0.5)")
+        offsets = [0.0]
+        for i in range(1, chunks):
+            offsets.append(i * interval + self.rng.uniform(-jitter, jitter) * interval)
+        return offsets
+
+    def execute(self, symbol, side, total_quantity, chunks=5, interval=10, mode="TWAP",
+                volume_profile=None, participation_rate=0.1, jitter=0.0, passive_timeout=0):
+        """Execute a parent order
+
+        Args:
+            symbol (str): Trading pair
+            side (str): 'BUY' or 'SELL'
+            total_quantity (float): Parent order size
+            chunks (int): Number of slices (POV: maximum number of intervals)
+            interval (float): Seconds between slices
+            mode (str): 'TWAP', 'VWAP' or 'POV'
+            volume_profile (list): Relative volume per period (VWAP)
+            participation_rate (float): Share of market volume to trade (POV)
+            jitter (float): Random slice timing, as a fraction of interval
+            passive_timeout (float): Seconds a post-only limit rests at the
+                near touch before the rest of the slice crosses (0: market only)
+
+        Returns:
+            dict: Execution report with per-slice fills, slippage (bps) and
+                implementation shortfall versus the arrival mid
+
+        Raises:
+            ExecutionHalted: A passive slice was still open after every cancel
+                attempt (its ``report`` covers the slices executed so far)
+        """
+        side = side.upper()
+        symbol = symbol.upper()
+        mode = mode.upper()
+        if side not in ["BUY", "SELL"]:
+            raise ValueError("Side must be BUY or SELL")
+        if mode not in EXECUTION_MODES:
+            raise ValueError(f"Mode must be one of {', '.join(EXECUTION_MODES)}")
+        if total_quantity <= 0:
+            raise ValueError("Total quantity must be positive")
+        if interval <= 0:
+            raise ValueError("Interval must be positive")
+        if passive_timeout and not self.market_data:
+            raise ValueError("Passive slices require market_data")
+        if passive_timeout >= interval:
+            raise ValueError("passive_timeout must be shorter than interval")
+        if mode == "POV":
+            if not self.market_data or not getattr(self.market_data, "trades", False):
+                raise ValueError("POV mode requires market_data with trades=True")
+            if not 0 < participation_rate <= 1:
+                raise ValueError("participation_rate must be in (0, 1]")
+
+        report = {
+            'symbol': symbol,
+            'side': side,
+            'mode': mode,
+            'total_quantity': total_quantity,
+            'arrival_price': self._mid(symbol),
+            'slices': [],
+            'orders': [],
+        }
+        start = self.clock()
+        remaining = total_quantity
+        try:
+            if mode == "POV":
+                last_volume = self.market_data.traded_volume(symbol)
+                for i in range(chunks):
+                    self.sleep(interval)
+                    if i == chunks - 1:
+                        target = remaining
+                    else:
+                        volume = self.market_data.traded_volume(symbol)
+                        target = min(remaining, participation_rate * (volume - last_volume))
+                        last_volume = volume
+                    remaining -= self._run_slice(report, i, symbol, side, target, passive_timeout)
+                    if self._is_dust(symbol, remaining):
+                        break
+            else:
+                targets = self.slice_quantities(total_quantity, chunks, mode, volume_profile)
+                offsets = self.slice_offsets(chunks, interval, jitter)
+                carry = 0.0
+                for i, (target, offset) in enumerate(zip(targets, offsets)):
+                    wait = start + offset - self.clock()
+                    if wait > 0:
+                        self.sleep(wait)
+                    # Unfilled and sub-lot quantity rolls into the next slice
+                    target = remaining if i == chunks - 1 else min(remaining, target + carry)
+                    filled = self._run_slice(report, i, symbol, side, target, passive_timeout)
+                    carry = target - filled
+                    remaining -= filled
+        except ExecutionHalted as e:
+            e.report = self._summarize(report, sum(s['filled_qty'] for s in report['slices']))
+            raise
+        return self._summarize(report, total_quantity - remaining)
+
+    def _run_slice(self, report, index, symbol, side, target, passive_timeout):
+        quantity = self._lot_quantity(symbol, target)
+        if not quantity:
+            return 0.0
+
+        arrival = self._mid(symbol)
+        fills = []
+        left = quantity
+        passive_qty = 0.0
+        if passive_timeout:
+            passive = self._passive_fill(report, symbol, side, quantity, passive_timeout)
+            if passive:
+                fills.append(passive)
+                passive_qty = passive[0]
+                left = self._lot_quantity(symbol, quantity - passive_qty)
+        if left:
+            order = self.client.futures_create_order(
+                symbol=symbol, side=side, type="MARKET", quantity=self._format(symbol, left),
+                newOrderRespType="RESULT",
+            )
+            report['orders'].append(order)
+            executed = float(order.get('executedQty') or 0)
+            if executed:
+                fills.append((executed, float(order.get('avgPrice') or 0)))
+
+        filled = sum(q for q, _ in fills)
+        avg_price = sum(q * p for q, p in fills) / filled if filled else None
+        report['slices'].append({
+            'slice': index + 1,
+            'time': self.clock(),
+            'target_qty': quantity,
+            'filled_qty': filled,
+            'passive_qty': passive_qty,
+            'avg_price': avg_price,
+            'arrival_price': arrival,
+            'slippage_bps': _slippage_bps(side, avg_price, arrival),
+        })
+        if self.logger:
+            self.logger.info("%s slice %s: %s @ %s", report['mode'], index + 1, filled, avg_price)
+        return filled
+
+    def _passive_fill(self, report, symbol, side, quantity, timeout):
+        """Rest a post-only limit at the near touch; return (qty, price) filled"""
+        price = self.market_data.best_bid(symbol) if side == "BUY" else self.market_data.best_ask(symbol)
+        if price is None:
+            return None
+        params = dict(symbol=symbol, side=side, type="LIMIT", timeInForce="GTX",
+                      quantity=self._format(symbol, quantity), price=price)
+        if self.symbol_filters:
+            params['quantity'], params['price'] = self.symbol_filters.get(symbol).validate(quantity, price)
+        try:
+            order = self.client.futures_create_order(**params)
+        except Exception as e:
+            # Post-only rejected (the book moved through the price): cross instead
+            if self.logger:
+                self.logger.warning("Passive slice rejected: %s", e)
+            return None
+        report['orders'].append(order)
+
+        self.sleep(timeout)
+        final = self._cancel_until_final(symbol, order)
+        executed = float(final.get('executedQty') or 0)
+        if not executed:
+            return None
+        return executed, float(final.get('avgPrice') or final.get('price'))
+
+    def _cancel_until_final(self, symbol, order):
+        """Cancel a resting passive order and return it once the exchange reports it final
+
+        A failed cancel usually means the order filled in the meantime, but
+        it can also be a timeout or rate limit with the order still resting,
+        so the order is re-queried rather than assumed closed.
+        """
+        last = order
+        for attempt in range(self.cancel_attempts):
+            try:
+                self.client.futures_cancel_order(symbol=symbol, orderId=order['orderId'])
+            except Exception as e:
+                if self.logger:
+                    self.logger.warning("Passive slice cancel failed: %s", e)
+            try:
+                last = self.client.futures_get_order(symbol=symbol, orderId=order['orderId'])
+            except Exception as e:
+                if self.logger:
+                    self.logger.warning("Passive slice status query failed: %s", e)
+            else:
+                if last.get('status') in FINAL_ORDER_STATUSES:
+                    return last
+            if attempt < self.cancel_attempts - 1:
+                self.sleep(self.cancel_retry_delay * (attempt + 1))
+        raise ExecutionHalted(
+            f"Passive order {order['orderId']} is still {last.get('status', 'unknown')} after "
+            f"{self.cancel_attempts} cancel attempts; not crossing the spread", last
+        )
+
+    def _mid(self, symbol):
+        return self.market_data.mid_price(symbol) if self.market_data else None
+
+    def _lot_quantity(self, symbol, quantity):
+        """Quantity rounded down to a tradable lot, or 0.0 if below the minimum"""
+        if quantity <= 0:
+            return 0.0
+        if self.symbol_filters:
+            filters = self.symbol_filters.get(symbol)
+            units = filters.quantity_units(quantity, market=True)
+            if units <= 0 or units < filters.market_min_qty_units:
+                return 0.0
+            return units / filters.qty_scale
+        return round(quantity, 8)
+
+    def _is_dust(self, symbol, quantity):
+        return not self._lot_quantity(symbol, quantity)
+
+    def _format(self, symbol, quantity):
+        if self.symbol_filters:
+            return self.symbol_filters.get(symbol).quantize_quantity(quantity, market=True)
+        return quantity
+
+    def _summarize(self, report, executed):
+        notional = sum(s['filled_qty'] * s['avg_price'] for s in report['slices'] if s['filled_qty'])
+        report['executed_qty'] = executed
+        report['remaining_qty'] = report['total_quantity'] - executed
+        report['avg_price'] = notional / executed if executed else None
+        report['shortfall_bps'] = _slippage_bps(report['side'], report['avg_price'], report['arrival_price'])
+        if self.logger:
+            self.logger.info(
+                "%s completed: %s/%s @ %s (shortfall %s bps)", report['mode'], executed,
+                report['total_quantity'], report['avg_price'], report['shortfall_bps'],
+            )
+        return report
+
+
+def _slippage_bps(side, price, reference):
+    """Signed cost in basis points (positive = worse than reference)"""
+    if price is None or not reference:
+        return None
+    sign = 1 if side == "BUY" else -1
+    return sign * (price - reference) / reference * 10000
+
+
+def _resample(profile, buckets):
+    """Resample a volume profile to ``buckets`` equal-width buckets (area preserving)"""
+    n = len(profile)
+    weights = []
+    for b in range(buckets):
+        lo, hi = b * n / buckets, (b + 1) * n / buckets
+        total = 0.0
+        i = int(lo)
+        while i < hi and i < n:
+            overlap = min(hi, i + 1) - max(lo, i)
+            total += profile[i] * overlap
+            i += 1
+        weights.append(total)
+    return weights
+
+
+class QuoteFillClient:
+    """Minimal fill model for replaying executions against recorded quotes
+
+    MARKET orders fill in full at the opposite best price. Post-only LIMIT
+    orders are rejected if they would cross, otherwise they rest and fill
+    once a trade (or the opposite touch) reaches their price.
+    """
+
+    def __init__(self, market_data):
+        self.market_data = market_data
+        self.orders = {}
+        self._placed_volume = {}
+        self._ids = itertools.count(1)
+
+    def futures_create_order(self, symbol, side, type, quantity, price=None, **params):
+        quantity = float(quantity)
+        bid = self.market_data.best_bid(symbol)
+        ask = self.market_data.best_ask(symbol)
+        order = {'orderId': next(self._ids), 'symbol': symbol, 'side': side, 'type': type,
+                 'origQty': quantity, 'executedQty': 0.0, 'avgPrice': 0.0, 'status': "NEW"}
+        if type == "MARKET":
+            order.update(status="FILLED", executedQty=quantity, avgPrice=ask if side == "BUY" else bid)
+        elif type == "LIMIT":
+            price = float(price)
+            if params.get('timeInForce') == "GTX" and (
+                    (side == "BUY" and ask is not None and price >= ask) or
+                    (side == "SELL" and bid is not None and price <= bid)):
+                raise ValueError("Post-only order would immediately match")
+            order['price'] = price
+            self._placed_volume[order['orderId']] = self.market_data.traded_volume(symbol)
+        else:
+            raise ValueError(f"Unsupported order type: {type}")
+        self.orders[order['orderId']] = order
+        return dict(order)
+
+    def _update(self, order):
+        if order['status'] != "NEW":
+            return
+        symbol = order['symbol']
+        # Only trades printed after the order was placed can fill it
+        traded = self.market_data.traded_volume(symbol) > self._placed_volume.get(order['orderId'], 0.0)
+        trade = self.market_data.last_trade_price(symbol) if traded else None
+        if order['side'] == "BUY":
+            touch = self.market_data.best_ask(symbol)
+            hit = (trade is not None and trade <= order['price']) or (touch is not None and touch <= order['price'])
+        else:
+            touch = self.market_data.best_bid(symbol)
+            hit = (trade is not None and trade >= order['price']) or (touch is not None and touch >= order['price'])
+        if hit:
+            order.update(status="FILLED", executedQty=order['origQty'], avgPrice=order['price'])
+
+    def futures_get_order(self, symbol, orderId):
+        order = self.orders[orderId]
+        self._update(order)
+        return dict(order)
+
+    def futures_cancel_order(self, symbol, orderId):
+        order = self.orders[orderId]
+        self._update(order)
+        if order['status'] != "NEW":
+            raise ValueError("Unknown order sent.")
+        order['status'] = "CANCELED"
+        return dict(order)
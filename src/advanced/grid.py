@@ -0,0 +1,261 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from batch_orders import BatchOrderSubmitter, MAX_BATCH_SIZE
+from transport import new_client_order_id
+
+# futures_cancel_orders accepts at most 10 orderIds per request
+MAX_CANCEL_BATCH = 10
+# Price/quantity resolution used when no symbol filters are available
+DEFAULT_DECIMALS = 8
+
+
+def grid_prices(center, spacing, levels, geometric=False):
+    """Buy and sell ladder prices around a center price
+
+    Args:
+        center (float): Reference price (e.g. the mid)
+        spacing (float): Distance between levels; a fraction (0.002 = 0.2%) when geometric
+        levels (int): Levels per side
+        geometric (bool): Space levels by a constant ratio instead of a constant step
+
+    Returns:
+        tuple: (buy prices, sell prices) as ndarrays, nearest level first
+    """
+    steps = np.arange(1, levels + 1, dtype=float)
+    if geometric:
+        return center * (1 - spacing) ** steps, center * (1 + spacing) ** steps
+    return center - spacing * steps, center + spacing * steps
+
+
+class GridPlan:
+    """Minimal change set turning the open grid orders into the target grid"""
+
+    __slots__ = ("symbol", "cancel", "place", "kept")
+
+    def __init__(self, symbol, cancel, place, kept):
+        self.symbol = symbol
+        # orderIds of open grid orders not in the target
+        self.cancel = cancel
+        # futures_create_order params of target orders not open yet
+        self.place = place
+        # Open grid orders already matching a target level
+        self.kept = kept
+
+
+class GridOrder:
+    """Ladder of limit orders, re-centered by diffing against the open orders
+
+    Target levels are computed as arrays and quantized to the symbol's tick
+    and lot size in one pass. Each target is keyed by (side, price, quantity)
+    in integer units and compared with the open orders carrying the grid's
+    clientOrderId prefix: matching orders stay on the book, the rest are
+    cancelled in batches of 10, and missing levels are placed in batches of
+    5, with batches sent concurrently. Moving the center by a few levels
+    therefore touches only the levels that changed.
+    """
+
+    def __init__(self, client, logger=None, symbol_filters=None, name="grid", workers=4):
+        """Initialize the grid
+
+        Args:
+            client: Binance client exposing futures_cancel_orders and
+                futures_place_batch_order
+            logger (logging.Logger): Optional logger
+            symbol_filters (SymbolFilterCache): Optional lot/tick size cache
+            name (str): clientOrderId tag identifying this grid's orders (up to 8 characters)
+            workers (int): Batch requests in flight at once
+        """
+        if not name or len(name) > 8 or not name.replace("_", "").isalnum():
+            raise ValueError("Grid name must be 1-8 letters, digits or underscores")
+        self.client = client
+        self.logger = logger
+        self.symbol_filters = symbol_filters
+        # Every order of this grid carries the prefix, so other orders on the symbol are never touched
+        self.prefix = "grid-" if name == "grid" else f"grid{name}-"
+        self.workers = workers
+
+    def _scales(self, symbol):
+        if self.symbol_filters:
+            f = self.symbol_filters.get(symbol)
+            return f, f.price_scale, f.tick_units or 1, f.qty_scale, f.step_units or 1
+        scale = 10 ** DEFAULT_DECIMALS
+        return None, scale, 1, scale, 1
+
+    def build_orders(self, symbol, center, spacing, levels, quantity, geometric=False, post_only=False):
+        """Target grid as order params
+
+        Args:
+            symbol (str): Trading pair
+            center (float): Price the grid is centered on
+            spacing (float): Level spacing (a fraction when geometric)
+            levels (int): Levels per side
+            quantity (float or sequence): Quantity per level, or one per
+                level distance (nearest first), applied to both sides
+            geometric (bool): Constant-ratio spacing
+            post_only (bool): Maker-only orders (GTX)
+
+        Returns:
+            list: Keyword arguments for futures_create_order, without clientOrderIds
+        """
+        symbol = symbol.upper()
+        if center <= 0 or spacing <= 0:
+            raise ValueError("Center and spacing must be positive")
+        if levels <= 0:
+            raise ValueError("Levels must be positive")
+        if geometric and spacing >= 1:
+            raise ValueError("Geometric spacing must be a fraction below 1")
+        quantities = np.broadcast_to(np.asarray(quantity, dtype=float), (levels,))
+        if (quantities <= 0).any():
+            raise ValueError("Quantity must be positive")
+
+        filters, price_scale, tick, qty_scale, step = self._scales(symbol)
+        buys, sells = grid_prices(center, spacing, levels, geometric)
+        prices = np.concatenate([buys, sells])
+        sides = np.repeat(np.array(["BUY", "SELL"]), levels)
+        price_units = np.rint(prices * price_scale / tick).astype(np.int64) * tick
+        qty_units = np.floor(np.round(np.tile(quantities, 2) * qty_scale, 6) / step).astype(np.int64) * step
+
+        valid = (price_units > 0) & (qty_units > 0)
+        if filters:
+            valid &= price_units >= filters.min_price_units
+            if filters.max_price_units:
+                valid &= price_units <= filters.max_price_units
+            valid &= qty_units >= filters.min_qty_units
+            if filters.max_qty_units:
+                valid &= qty_units <= filters.max_qty_units
+            valid &= qty_units * price_units >= filters.min_notional_units
+        if not valid.all() and self.logger:
+            self.logger.warning("Grid %s: %s levels outside the symbol's filters dropped", symbol,
+                                int((~valid).sum()))
+
+        price_decimals = len(str(price_scale)) - 1
+        qty_decimals = len(str(qty_scale)) - 1
+        time_in_force = "GTX" if post_only else "GTC"
+        orders = []
+        seen = set()
+        for side, p, q in zip(sides[valid].tolist(), price_units[valid].tolist(), qty_units[valid].tolist()):
+            # Close levels can round to the same tick
+            if (side, p) in seen:
+                continue
+            seen.add((side, p))
+            orders.append(dict(
+                symbol=symbol,
+                side=side,
+                type="LIMIT",
+                quantity=f"{q / qty_scale:.{qty_decimals}f}",
+                price=f"{p / price_scale:.{price_decimals}f}",
+                timeInForce=time_in_force,
+            ))
+        return orders
+
+    def plan(self, targets, open_orders):
+        """Diff target order params against the open orders
+
+        Args:
+            targets (list): Params from build_orders (one symbol)
+            open_orders (list): Open orders of that symbol (REST or user stream);
+                orders without this grid's clientOrderId prefix are ignored
+
+        Returns:
+            GridPlan
+        """
+        if not targets:
+            raise ValueError("Grid has no orders")
+        symbol = targets[0]['symbol']
+        _, price_scale, _, qty_scale, _ = self._scales(symbol)
+
+        def key(side, price, quantity):
+            return side, round(float(price) * price_scale), round(float(quantity) * qty_scale)
+
+        wanted = {key(t['side'], t['price'], t['quantity']): t for t in targets}
+        cancel = []
+        kept = []
+        for order in open_orders:
+            if not str(order.get('clientOrderId', "")).startswith(self.prefix) or order['symbol'] != symbol:
+                continue
+            k = key(order['side'], order['price'], order['origQty'])
+            if k in wanted:
+                kept.append(order)
+                del wanted[k]  # A duplicate at the same level is cancelled
+            else:
+                cancel.append(order['orderId'])
+        place = [dict(t, newClientOrderId=new_client_order_id(self.prefix[:-1])[:36]) for t in wanted.values()]
+        return GridPlan(symbol, cancel, place, kept)
+
+    def apply(self, plan):
+        """Send a plan's cancels, then its placements, in concurrent batches
+
+        Cancels go first so margin is released before new orders need it.
+
+        Returns:
+            dict: cancelled/placed orders, failures and the number of requests
+        """
+        cancel_batches = [plan.cancel[i:i + MAX_CANCEL_BATCH]
+                          for i in range(0, len(plan.cancel), MAX_CANCEL_BATCH)]
+        place_batches = [plan.place[i:i + MAX_BATCH_SIZE] for i in range(0, len(plan.place), MAX_BATCH_SIZE)]
+        submitter = BatchOrderSubmitter(self.client, self.logger)
+        cancelled, placed, failed = [], [], []
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="Grid") as executor:
+            cancel_results = executor.map(lambda ids: self._cancel_batch(plan.symbol, ids), cancel_batches)
+            for order_id, result in zip(plan.cancel, (r for results in cancel_results for r in results)):
+                if isinstance(result, Exception):
+                    failed.append(('cancel', order_id, str(result)))
+                elif 'code' in result and 'orderId' not in result:
+                    failed.append(('cancel', order_id, result.get('msg')))
+                else:
+                    cancelled.append(result)
+            place_results = executor.map(submitter.place_orders, place_batches)
+            for params, result in zip(plan.place, (r for results in place_results for r in results)):
+                if isinstance(result, Exception):
+                    failed.append(('place', params['price'], str(result)))
+                else:
+                    placed.append(result)
+
+        report = {
+            'symbol': plan.symbol,
+            'kept': len(plan.kept),
+            'cancelled': cancelled,
+            'placed': placed,
+            'failed': failed,
+            'requests': len(cancel_batches) + len(place_batches),
+        }
+        if self.logger:
+            self.logger.info("Grid %s: %s kept, %s cancelled, %s placed, %s failed in %s requests", plan.symbol,
+                             report['kept'], len(cancelled), len(placed), len(failed), report['requests'])
+        return report
+
+    def _cancel_batch(self, symbol, order_ids):
+        try:
+            return self.client.futures_cancel_orders(
+                symbol=symbol, orderIdList=json.dumps(order_ids, separators=(",", ":"))
+            )
+        except Exception as e:
+            return [e] * len(order_ids)
+
+    def place_order(self, symbol, center, spacing, levels, quantity, geometric=False, post_only=False,
+                    open_orders=None):
+        """Place or re-center a grid with the fewest cancels and placements
+
+        Args:
+            open_orders (list): Current open orders of the symbol, e.g. from
+                the user stream's book; fetched over REST when omitted
+            (other arguments as in build_orders)
+
+        Returns:
+            dict: Report from apply()
+        """
+        targets = self.build_orders(symbol, center, spacing, levels, quantity, geometric, post_only)
+        if open_orders is None:
+            open_orders = self.client.futures_get_open_orders(symbol=symbol.upper())
+        return self.apply(self.plan(targets, open_orders))
+
+    def cancel_all(self, symbol, open_orders=None):
+        """Cancel this grid's orders only (other orders on the symbol stay)"""
+        symbol = symbol.upper()
+        if open_orders is None:
+            open_orders = self.client.futures_get_open_orders(symbol=symbol)
+        cancel = [o['orderId'] for o in open_orders
+                  if o['symbol'] == symbol and str(o.get('clientOrderId', "")).startswith(self.prefix)]
+        return self.apply(GridPlan(symbol, cancel, [], []))
@@ -1,12 +1,18 @@
+from batch_orders import BatchOrderSubmitter
+from transport import new_client_order_id
+
+
 class OCOOrder:
     """Simulate OCO (One-Cancels-Other) orders for Futures"""
     
-    def __init__(self, client, logger=None):
+    def __init__(self, client, logger=None, symbol_filters=None, market_data=None):
         self.client = client
         self.logger = logger
+        self.symbol_filters = symbol_filters
+        self.market_data = market_data
 
-    def place_order(self, symbol, side, quantity, take_profit_price, stop_price):
-        """Place OCO order (Take-Profit + Stop-Loss)
+    def build_orders(self, symbol, side, quantity, take_profit_price, stop_price):
+        """Validate inputs and build both OCO leg request parameters
         
         Args:
             symbol (str): Trading pair
@@ -16,7 +22,7 @@ class OCOOrder:
             stop_price (float): Stop loss level
             
         Returns:
-            list: List of both orders [take_profit_order, stop_loss_order]
+            list: Keyword arguments for futures_create_order [take_profit, stop_loss]
         """
         side = side.upper()
         if side not in ["BUY", "SELL"]:
@@ -36,36 +42,91 @@ class OCOOrder:
             if take_profit_price >= stop_price:
                 raise ValueError("For SELL positions: take_profit_price must be < stop_price")
 
+        # Both legs must sit on either side of the market, or one triggers immediately
+        # (checked against the last price, which CONTRACT_PRICE stops trigger on)
+        if self.market_data:
+            reference = self.market_data.trigger_price(symbol)
+            if reference is not None:
+                low, high = (stop_price, take_profit_price) if side == "BUY" else (take_profit_price, stop_price)
+                if not low < reference < high:
+                    raise ValueError(
+                        f"Market price {reference} must lie between the OCO levels {low} and {high}"
+                    )
+
+        # Quantize to the symbol's lot/tick size (reduceOnly legs skip min notional)
+        if self.symbol_filters:
+            filters = self.symbol_filters.get(symbol)
+            quantity, _ = filters.validate(quantity, market=True)
+            take_profit_price = filters.quantize_price(take_profit_price)
+            stop_price = filters.quantize_price(stop_price)
+
+        # Paired clientOrderIds (oco-<key>-tp/-sl) let journal recovery find both legs
+        pair_id = new_client_order_id("oco")[:28]
+
+        # Determine closing side (opposite of original position)
+        close_side = "SELL" if side == "BUY" else "BUY"
+        
+        # Fixed: Use reduceOnly instead of closePosition for better control
+        take_profit = dict(
+            symbol=symbol.upper(),
+            side=close_side,
+            type="TAKE_PROFIT_MARKET",
+            stopPrice=take_profit_price,
+            quantity=quantity,
+            reduceOnly=True,
+            newClientOrderId=f"{pair_id}-tp"
+        )
+        stop_loss = dict(
+            symbol=symbol.upper(),
+            side=close_side,
+            type="STOP_MARKET",
+            stopPrice=stop_price,
+            quantity=quantity,
+            reduceOnly=True,
+            newClientOrderId=f"{pair_id}-sl"
+        )
+        return [take_profit, stop_loss]
+
+    def place_order(self, symbol, side, quantity, take_profit_price, stop_price):
+        """Place OCO order (Take-Profit + Stop-Loss)
+        
+        Args:
+            symbol (str): Trading pair
+            side (str): Original position side ('BUY' or 'SELL')
+            quantity (float): Position size to close
+            take_profit_price (float): Take profit level
+            stop_price (float): Stop loss level
+            
+        Returns:
+            list: List of both orders [take_profit_order, stop_loss_order]
+        """
+        take_profit, stop_loss = self.build_orders(
+            symbol, side, quantity, take_profit_price, stop_price
+        )
+
         orders = []
         try:
-            # Determine closing side (opposite of original position)
-            close_side = "SELL" if side == "BUY" else "BUY"
-            
-            # Fixed: Use reduceOnly instead of closePosition for better control
-            # Take-profit order
-            tp_order = self.client.futures_create_order(
-                symbol=symbol.upper(),
-                side=close_side,
-                type="TAKE_PROFIT_MARKET",
-                stopPrice=take_profit_price,
-                quantity=quantity,
-                reduceOnly=True
-            )
-            orders.append(tp_order)
-            
-            # Stop-loss order
-            sl_order = self.client.futures_create_order(
-                symbol=symbol.upper(),
-                side=close_side,
-                type="STOP_MARKET",
-                stopPrice=stop_price,
-                quantity=quantity,
-                reduceOnly=True
-            )
-            orders.append(sl_order)
+            if hasattr(self.client, "futures_place_batch_order"):
+                # Both legs in one batchOrders request
+                results = BatchOrderSubmitter(self.client, self.logger).place_orders(
+                    [take_profit, stop_loss]
+                )
+                orders = [r for r in results if not isinstance(r, Exception)]
+                errors = [r for r in results if isinstance(r, Exception)]
+                if errors:
+                    raise errors[0]
+                tp_order, sl_order = results
+            else:
+                # Take-profit order
+                tp_order = self.client.futures_create_order(**take_profit)
+                orders.append(tp_order)
+                
+                # Stop-loss order
+                sl_order = self.client.futures_create_order(**stop_loss)
+                orders.append(sl_order)
 
             if self.logger:
-                self.logger.info(f"OCO orders placed: TP={tp_order['orderId']}, SL={sl_order['orderId']}")
+                self.logger.info("OCO orders placed: TP=%s, SL=%s", tp_order['orderId'], sl_order['orderId'])
             
             return orders
             
@@ -78,10 +139,10 @@ class OCOOrder:
                         orderId=order['orderId']
                     )
                     if self.logger:
-                        self.logger.info(f"Cancelled order {order['orderId']} due to OCO failure")
+                        self.logger.info("Cancelled order %s due to OCO failure", order['orderId'])
                 except:
                     pass
             
             if self.logger:
-                self.logger.error(f"OCO order failed: {e}")
+                self.logger.error("OCO order failed: %s", e)
             raise
\ No newline at end of file
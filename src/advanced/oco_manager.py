@@ -0,0 +1,229 @@
+import itertools
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from .oco import OCOOrder
+
+FINAL_STATUSES = ("FILLED", "CANCELED", "EXPIRED", "REJECTED")
+
+
+class OCOPair:
+    """Take-profit / stop-loss order ids linked as one OCO"""
+
+    __slots__ = ("pair_id", "symbol", "take_profit_id", "stop_loss_id", "state")
+
+    def __init__(self, pair_id, symbol, take_profit_id, stop_loss_id):
+        self.pair_id = pair_id
+        self.symbol = symbol
+        self.take_profit_id = take_profit_id
+        self.stop_loss_id = stop_loss_id
+        self.state = "ACTIVE"
+
+    def sibling_of(self, order_id):
+        return self.stop_loss_id if order_id == self.take_profit_id else self.take_profit_id
+
+
+class OCOManager:
+    """Cancel the surviving OCO leg as soon as the other one fills
+
+    Pairs are indexed by orderId and symbol, so an order event is matched in
+    O(1) no matter how many pairs are active. Feed it order events with
+    attach(user_stream) or on_order_update(); nothing is polled.
+
+    A leg can fill before its pair is registered (the event overtakes the
+    REST acknowledgement), so final statuses of unknown orders are kept for
+    ``early_ttl`` seconds and applied on register(). After each user-stream
+    resync, pairs are reconciled against the exchange's open orders.
+    """
+
+    def __init__(self, client, logger=None, symbol_filters=None, cancel_workers=4, market_data=None,
+                 early_ttl=30, clock=time.monotonic):
+        """Initialize the manager
+
+        Args:
+            client: Binance client used to place legs and cancel siblings
+            logger (logging.Logger): Optional logger
+            symbol_filters (SymbolFilterCache): Optional lot/tick size cache
+            cancel_workers (int): Threads sending sibling cancels
+            market_data (MarketDataStream): Optional price source for leg sanity checks
+            early_ttl (float): Seconds a final status for an unregistered order is kept
+            clock (callable): Monotonic time source in seconds
+        """
+        self.client = client
+        self.logger = logger
+        self.symbol_filters = symbol_filters
+        self.market_data = market_data
+        self._pairs = {}
+        self._by_order = {}
+        self._by_symbol = {}
+        # Final statuses of orders not (yet) in a pair: order id -> status
+        self._early = {}
+        self._early_times = deque()
+        self.early_ttl = early_ttl
+        self.clock = clock
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=cancel_workers, thread_name_prefix="OCOCancel")
+
+    def place(self, symbol, side, quantity, take_profit_price, stop_price):
+        """Place both legs and start tracking them
+
+        Returns:
+            tuple: (OCOPair, [take_profit_order, stop_loss_order])
+        """
+        orders = OCOOrder(self.client, self.logger, self.symbol_filters, self.market_data).place_order(
+            symbol, side, quantity, take_profit_price, stop_price
+        )
+        pair = self.register(symbol, orders[0]['orderId'], orders[1]['orderId'])
+        return pair, orders
+
+    def register(self, symbol, take_profit_id, stop_loss_id):
+        """Track two already-placed orders as an OCO pair
+
+        If a leg already reached a final state (its event arrived first),
+        the pair is closed and the sibling cancelled right away.
+        """
+        symbol = symbol.upper()
+        with self._lock:
+            pair = OCOPair(next(self._ids), symbol, take_profit_id, stop_loss_id)
+            self._pairs[pair.pair_id] = pair
+            self._by_order[take_profit_id] = pair
+            self._by_order[stop_loss_id] = pair
+            self._by_symbol.setdefault(symbol, set()).add(pair.pair_id)
+            self._drop_early(self.clock())
+            early = [(order_id, self._early.pop(order_id)) for order_id in (take_profit_id, stop_loss_id)
+                     if order_id in self._early]
+        for order_id, status in early:
+            self.on_order_update(order_id, status)
+        return pair
+
+    def _drop_early(self, now):
+        while self._early_times and now - self._early_times[0][0] > self.early_ttl:
+            _, order_id = self._early_times.popleft()
+            self._early.pop(order_id, None)
+
+    def _unregister(self, pair):
+        self._pairs.pop(pair.pair_id, None)
+        self._by_order.pop(pair.take_profit_id, None)
+        self._by_order.pop(pair.stop_loss_id, None)
+        symbol_pairs = self._by_symbol.get(pair.symbol)
+        if symbol_pairs is not None:
+            symbol_pairs.discard(pair.pair_id)
+            if not symbol_pairs:
+                del self._by_symbol[pair.symbol]
+
+    def attach(self, user_stream):
+        """Receive order events and resyncs from a UserDataStream"""
+        user_stream.add_listener(self.on_event)
+        user_stream.add_resync_listener(self.reconcile)
+
+    def on_event(self, event):
+        """UserDataStream listener"""
+        if event.get('e') == "ORDER_TRADE_UPDATE":
+            o = event['o']
+            return self.on_order_update(o['i'], o['X'])
+
+    def on_order_update(self, order_id, status):
+        """Handle an order status change
+
+        When a leg reaches a final state (filled, cancelled, expired) the pair
+        is closed and its sibling is cancelled. Partial fills are ignored:
+        the reduceOnly sibling shrinks with the position.
+
+        Returns:
+            Future: The sibling cancel, or None if the order is not a tracked leg
+        """
+        if status not in FINAL_STATUSES:
+            return None
+
+        with self._lock:
+            pair = self._by_order.get(order_id)
+            if pair is None:
+                # May be a leg whose pair is about to be registered
+                now = self.clock()
+                self._drop_early(now)
+                self._early[order_id] = status
+                self._early_times.append((now, order_id))
+                return None
+            pair.state = "FILLED" if status == "FILLED" else "CLOSED"
+            self._unregister(pair)
+
+        sibling_id = pair.sibling_of(order_id)
+        return self._executor.submit(self._cancel_sibling, pair, order_id, sibling_id, status)
+
+    def _cancel_sibling(self, pair, order_id, sibling_id, status):
+        try:
+            self.client.futures_cancel_order(symbol=pair.symbol, orderId=sibling_id)
+            if self.logger:
+                self.logger.info(
+                    "OCO %d: order %s %s, cancelled sibling %s", pair.pair_id, order_id, status, sibling_id
+                )
+        except Exception as e:
+            # -2011: sibling already filled/cancelled
+            if self.logger:
+                self.logger.error("OCO %d: failed to cancel sibling %s: %s", pair.pair_id, sibling_id, e)
+
+    def reconcile(self, open_orders):
+        """Close pairs with a leg that is no longer open (events missed in a stream gap)
+
+        Args:
+            open_orders (list): futures_get_open_orders() response
+
+        Returns:
+            int: Number of pairs closed
+        """
+        open_ids = {o['orderId'] for o in open_orders}
+        with self._lock:
+            pairs = list(self._pairs.values())
+        closed = 0
+        for pair in pairs:
+            for order_id in (pair.take_profit_id, pair.stop_loss_id):
+                if order_id in open_ids:
+                    continue
+                try:
+                    status = self.client.futures_get_order(symbol=pair.symbol, orderId=order_id)['status']
+                except Exception as e:
+                    if self.logger:
+                        self.logger.error("OCO %d: failed to reconcile %s: %s", pair.pair_id, order_id, e)
+                    continue
+                # Placed after the snapshot was taken if still NEW
+                if self.on_order_update(order_id, status) is not None:
+                    closed += 1
+                    break
+        if closed and self.logger:
+            self.logger.info("OCO reconcile closed %d pair(s) after a stream gap", closed)
+        return closed
+
+    def cancel_pair(self, pair_id):
+        """Cancel both legs of a pair and stop tracking it"""
+        with self._lock:
+            pair = self._pairs.get(pair_id)
+            if pair is None:
+                raise ValueError(f"Unknown OCO pair: {pair_id}")
+            pair.state = "CANCELLED"
+            self._unregister(pair)
+
+        for order_id in (pair.take_profit_id, pair.stop_loss_id):
+            try:
+                self.client.futures_cancel_order(symbol=pair.symbol, orderId=order_id)
+            except Exception as e:
+                if self.logger:
+                    self.logger.error("OCO %d: failed to cancel %s: %s", pair.pair_id, order_id, e)
+        return pair
+
+    def get_pair(self, order_id):
+        """Return the active pair an order belongs to, or None"""
+        return self._by_order.get(order_id)
+
+    def pairs_for_symbol(self, symbol):
+        """Active pairs for a symbol"""
+        with self._lock:
+            return [self._pairs[pid] for pid in self._by_symbol.get(symbol.upper(), ())]
+
+    def active_count(self):
+        return len(self._pairs)
+
+    def shutdown(self):
+        """Wait for in-flight sibling cancels to finish"""
+        self._executor.shutdown(wait=True)
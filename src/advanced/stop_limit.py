@@ -1,11 +1,13 @@
 class StopLimitOrder:
     """Place stop-limit orders (conditional orders)"""
     
-    def __init__(self, client):
+    def __init__(self, client, symbol_filters=None, market_data=None):
         self.client = client
+        self.symbol_filters = symbol_filters
+        self.market_data = market_data
 
-    def place_order(self, symbol, side, quantity, stop_price, limit_price):
-        """Place a stop-limit order
+    def build_order(self, symbol, side, quantity, stop_price, limit_price):
+        """Validate inputs and build stop-limit order request parameters
         
         Args:
             symbol (str): Trading pair
@@ -15,7 +17,7 @@ class StopLimitOrder:
             limit_price (float): Limit price after trigger
             
         Returns:
-            dict: Order response from Binance API
+            dict: Keyword arguments for futures_create_order
         """
         side = side.upper()
         if side not in ["BUY", "SELL"]:
@@ -27,8 +29,24 @@ class StopLimitOrder:
         if stop_price <= 0 or limit_price <= 0:
             raise ValueError("Prices must be positive")
         
+        # A stop on the wrong side of the market would trigger immediately
+        # (checked against the last price, which CONTRACT_PRICE stops trigger on)
+        if self.market_data:
+            reference = self.market_data.trigger_price(symbol)
+            if reference is not None:
+                if side == "BUY" and stop_price <= reference:
+                    raise ValueError(f"BUY stop price {stop_price} must be above the market ({reference})")
+                if side == "SELL" and stop_price >= reference:
+                    raise ValueError(f"SELL stop price {stop_price} must be below the market ({reference})")
+        
+        # Quantize to the symbol's lot/tick size and check min notional
+        if self.symbol_filters:
+            filters = self.symbol_filters.get(symbol)
+            quantity, limit_price = filters.validate(quantity, limit_price)
+            stop_price = filters.quantize_price(stop_price)
+        
         # Fixed: Use STOP type instead of STOP_MARKET for stop-limit
-        return self.client.futures_create_order(
+        return dict(
             symbol=symbol.upper(),
             side=side,
             type="STOP",
@@ -36,4 +54,21 @@ class StopLimitOrder:
             quantity=quantity,
             price=limit_price,
             stopPrice=stop_price
+        )
+
+    def place_order(self, symbol, side, quantity, stop_price, limit_price):
+        """Place a stop-limit order
+        
+        Args:
+            symbol (str): Trading pair
+            side (str): 'BUY' or 'SELL'
+            quantity (float): Amount to trade
+            stop_price (float): Trigger price
+            limit_price (float): Limit price after trigger
+            
+        Returns:
+            dict: Order response from Binance API
+        """
+        return self.client.futures_create_order(
+            **self.build_order(symbol, side, quantity, stop_price, limit_price)
         )
\ No newline at end of file
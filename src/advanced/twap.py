@@ -3,22 +3,25 @@ import time
 class TWAPOrder:
     """Time-Weighted Average Price orders - split large orders over time"""
     
-    def __init__(self, client, logger=None):
+    def __init__(self, client, logger=None, symbol_filters=None, sleep=time.sleep, journal=None):
         self.client = client
         self.logger = logger
+        self.symbol_filters = symbol_filters
+        self.sleep = sleep
+        # OrderJournal: records the schedule so a restart can resume it
+        self.journal = journal
 
-    def place_order(self, symbol, side, total_quantity, chunks=5, interval=10):
-        """Execute TWAP order strategy
+    def build_orders(self, symbol, side, total_quantity, chunks=5):
+        """Validate inputs and split a TWAP order into chunk request parameters
         
         Args:
             symbol (str): Trading pair
             side (str): 'BUY' or 'SELL'
             total_quantity (float): Total amount to trade
             chunks (int): Number of smaller orders
-            interval (int): Seconds between each order
             
         Returns:
-            list: List of executed orders
+            list: Keyword arguments for futures_create_order, one per chunk
         """
         side = side.upper()
         if side not in ["BUY", "SELL"]:
@@ -29,47 +32,92 @@ class TWAPOrder:
             raise ValueError("Total quantity must be positive")
         if chunks <= 0:
             raise ValueError("Chunks must be positive")
-        if interval <= 0:
-            raise ValueError("Interval must be positive")
         
-        # Fixed: Better chunk calculation to ensure exact total
-        base_chunk_size = total_quantity / chunks
-        chunks_list = [base_chunk_size] * (chunks - 1)
-        # Last chunk gets the remainder to ensure exact total
-        last_chunk = total_quantity - sum(chunks_list)
-        chunks_list.append(last_chunk)
+        if self.symbol_filters:
+            # Lot-aligned chunks, validated locally instead of rejected by the exchange
+            quantities = self.symbol_filters.get(symbol).split_quantity(total_quantity, chunks)
+        else:
+            # Fixed: Better chunk calculation to ensure exact total
+            base_chunk_size = total_quantity / chunks
+            chunks_list = [base_chunk_size] * (chunks - 1)
+            # Last chunk gets the remainder to ensure exact total
+            last_chunk = total_quantity - sum(chunks_list)
+            chunks_list.append(last_chunk)
+            quantities = [round(chunk_size, 8) for chunk_size in chunks_list if chunk_size > 0]
+        
+        return [
+            dict(
+                symbol=symbol.upper(),
+                side=side,
+                type="MARKET",
+                quantity=quantity
+            )
+            for quantity in quantities
+        ]
+
+    def place_order(self, symbol, side, total_quantity, chunks=5, interval=10):
+        """Execute TWAP order strategy
         
+        Args:
+            symbol (str): Trading pair
+            side (str): 'BUY' or 'SELL'
+            total_quantity (float): Total amount to trade
+            chunks (int): Number of smaller orders
+            interval (int): Seconds between each order
+            
+        Returns:
+            list: List of executed orders
+        """
+        chunk_orders = self.build_orders(symbol, side, total_quantity, chunks)
+        if interval <= 0:
+            raise ValueError("Interval must be positive")
+        return self.execute_chunks(chunk_orders, interval, total_quantity)
+
+    def execute_chunks(self, chunk_orders, interval, total_quantity=None, journal_key=None):
+        """Send prepared chunk orders, sleeping between them
+
+        Args:
+            chunk_orders (list): Keyword arguments for futures_create_order
+            interval (int): Seconds between each order
+            total_quantity (float): Total for the completion log line
+            journal_key (str): Journal schedule being resumed (default: start a new one)
+
+        Returns:
+            list: List of executed orders
+        """
+        chunks = len(chunk_orders)
+        if self.journal and journal_key is None and chunk_orders:
+            journal_key = self.journal.begin_schedule(
+                chunk_orders[0]['symbol'], chunk_orders[0]['side'], chunk_orders, interval
+            )
+
         executed_orders = []
 
         try:
-            for i, chunk_size in enumerate(chunks_list):
-                if chunk_size <= 0:
-                    continue
-                    
-                order = self.client.futures_create_order(
-                    symbol=symbol.upper(),
-                    side=side,
-                    type="MARKET",
-                    quantity=round(chunk_size, 8)
-                )
+            for i, params in enumerate(chunk_orders):
+                order = self.client.futures_create_order(**params)
                 executed_orders.append(order)
                 
                 if self.logger:
-                    self.logger.info(f"TWAP chunk {i+1}/{chunks} executed: {order}")
+                    self.logger.info("TWAP chunk %s/%s executed: %s", i + 1, chunks, order.get('orderId'))
                 
                 # Don't sleep after the last chunk
-                if i < len(chunks_list) - 1:
+                if i < len(chunk_orders) - 1:
                     if self.logger:
-                        self.logger.info(f"Waiting {interval} seconds before next chunk...")
-                    time.sleep(interval)
+                        self.logger.info("Waiting %s seconds before next chunk...", interval)
+                    self.sleep(interval)
             
             if self.logger:
                 total_executed = sum(float(order.get('executedQty', 0)) for order in executed_orders)
-                self.logger.info(f"TWAP completed: {total_executed}/{total_quantity}")
+                self.logger.info("TWAP completed: %s/%s", total_executed, total_quantity)
+            if journal_key:
+                self.journal.end_schedule(journal_key, "COMPLETED")
             
             return executed_orders
             
         except Exception as e:
+            if journal_key:
+                self.journal.end_schedule(journal_key, "FAILED")
             if self.logger:
-                self.logger.error(f"TWAP order failed: {e}")
+                self.logger.error("TWAP order failed: %s", e)
             raise
\ No newline at end of file
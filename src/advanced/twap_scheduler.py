@@ -0,0 +1,350 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from .twap import TWAPOrder
+
+
+class TWAPSchedule:
+    """State of a single scheduled TWAP order"""
+
+    __slots__ = (
+        "schedule_id", "symbol", "side", "chunk_orders", "interval",
+        "on_progress", "state", "next_chunk", "orders", "error", "generation",
+        "journal_key", "inflight",
+    )
+
+    def __init__(self, schedule_id, symbol, side, chunk_orders, interval, on_progress=None):
+        self.schedule_id = schedule_id
+        self.symbol = symbol
+        self.side = side
+        self.chunk_orders = chunk_orders
+        self.interval = interval
+        self.on_progress = on_progress
+        self.state = "ACTIVE"
+        self.next_chunk = 0
+        self.orders = []
+        self.error = None
+        # Bumped on pause/resume/cancel so stale timer entries are skipped
+        self.generation = 0
+        self.journal_key = None
+        # A chunk is being sent; the next one is queued when it returns
+        self.inflight = False
+
+    @property
+    def total_chunks(self):
+        return len(self.chunk_orders)
+
+    def progress(self):
+        """Snapshot of the schedule's progress
+
+        Returns:
+            dict: id, symbol, side, state, executed/total chunks and error
+        """
+        return {
+            "schedule_id": self.schedule_id,
+            "symbol": self.symbol,
+            "side": self.side,
+            "state": self.state,
+            "executed_chunks": self.next_chunk,
+            "total_chunks": self.total_chunks,
+            "error": str(self.error) if self.error else None,
+        }
+
+
+class TWAPScheduler:
+    """Run many TWAP orders from one timer thread instead of sleeping per order
+
+    Pending chunks live in a heap keyed by due time, so thousands of schedules
+    across symbols share a single timer thread. Due chunks are handed to a
+    pool of sender threads, so one chunk's round trip does not delay the
+    others due at the same time. Chunks are scheduled relative to their
+    previous due time (not to when they actually ran), which keeps drift from
+    accumulating. Pass a custom ``clock`` and drive the scheduler with
+    ``run_pending(now)`` to simulate time; without start() chunks are sent
+    inline.
+    """
+
+    def __init__(self, client, logger=None, symbol_filters=None, clock=time.monotonic, journal=None, workers=16,
+                 retention=300):
+        """Initialize the scheduler
+
+        Args:
+            client: Binance client used to send chunk orders
+            logger (logging.Logger): Optional logger
+            symbol_filters (SymbolFilterCache): Optional lot-size cache for chunking
+            clock (callable): Monotonic time source in seconds
+            journal (OrderJournal): Optional journal recording schedules for crash recovery
+            workers (int): Chunks sent concurrently once started
+            retention (float): Seconds a finished schedule stays queryable
+        """
+        if workers <= 0:
+            raise ValueError("workers must be positive")
+        self.client = client
+        self.logger = logger
+        self.symbol_filters = symbol_filters
+        self.clock = clock
+        self.journal = journal
+        self.workers = workers
+        self.retention = retention
+        self._heap = []
+        self._schedules = {}
+        # (finished at, schedule id), oldest first
+        self._finished = deque()
+        self._ids = itertools.count(1)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._executor = None
+        self._running = False
+
+    def submit(self, symbol, side, total_quantity, chunks=5, interval=10, on_progress=None):
+        """Schedule a TWAP order; the first chunk is due immediately
+
+        Args:
+            symbol (str): Trading pair
+            side (str): 'BUY' or 'SELL'
+            total_quantity (float): Total amount to trade
+            chunks (int): Number of smaller orders
+            interval (float): Seconds between each order
+            on_progress (callable): Called with the TWAPSchedule after each chunk
+                and when the schedule is cancelled
+
+        Returns:
+            int: Schedule id
+        """
+        chunk_orders = TWAPOrder(self.client, self.logger, self.symbol_filters).build_orders(
+            symbol, side, total_quantity, chunks
+        )
+        return self.submit_chunks(symbol, side, chunk_orders, interval, on_progress)
+
+    def submit_chunks(self, symbol, side, chunk_orders, interval, on_progress=None, journal_key=None):
+        """Schedule prepared chunk orders (e.g. the remainder of a recovered schedule)
+
+        Args:
+            symbol (str): Trading pair
+            side (str): 'BUY' or 'SELL'
+            chunk_orders (list): Keyword arguments for futures_create_order
+            interval (float): Seconds between each order
+            on_progress (callable): Called with the TWAPSchedule after each chunk
+                and when the schedule is cancelled
+            journal_key (str): Journal schedule being resumed (default: start a new one)
+
+        Returns:
+            int: Schedule id
+        """
+        if interval <= 0:
+            raise ValueError("Interval must be positive")
+        if not chunk_orders:
+            raise ValueError("No chunk orders to schedule")
+        if self.journal and journal_key is None:
+            journal_key = self.journal.begin_schedule(symbol.upper(), side.upper(), chunk_orders, interval)
+
+        with self._cond:
+            schedule_id = next(self._ids)
+            schedule = TWAPSchedule(
+                schedule_id, symbol.upper(), side.upper(), chunk_orders, interval, on_progress
+            )
+            schedule.journal_key = journal_key
+            self._schedules[schedule_id] = schedule
+            self._push(schedule, self.clock())
+            self._cond.notify()
+
+        if self.logger:
+            self.logger.info(
+                "TWAP schedule %d submitted: %s %s in %d chunks every %ss",
+                schedule_id, side.upper(), symbol.upper(), len(chunk_orders), interval
+            )
+        return schedule_id
+
+    def get(self, schedule_id):
+        """Return the TWAPSchedule for an id (finished ones until their retention ends)"""
+        try:
+            return self._schedules[schedule_id]
+        except KeyError:
+            raise ValueError(f"Unknown TWAP schedule: {schedule_id}")
+
+    def progress(self, schedule_id):
+        """Return a progress snapshot for an id"""
+        return self.get(schedule_id).progress()
+
+    def cancel(self, schedule_id):
+        """Stop a schedule; chunks already sent are not reverted"""
+        with self._cond:
+            schedule = self.get(schedule_id)
+            cancelled = schedule.state in ("ACTIVE", "PAUSED")
+            if cancelled:
+                schedule.generation += 1
+                self._finish(schedule, "CANCELLED")
+        if cancelled:
+            self._notify_progress(schedule)
+        return schedule.progress()
+
+    def pause(self, schedule_id):
+        """Suspend a schedule until resume() is called"""
+        with self._cond:
+            schedule = self.get(schedule_id)
+            if schedule.state != "ACTIVE":
+                raise ValueError(f"TWAP schedule {schedule_id} is {schedule.state}")
+            schedule.state = "PAUSED"
+            schedule.generation += 1
+        return schedule.progress()
+
+    def resume(self, schedule_id):
+        """Resume a paused schedule; the next chunk is due immediately"""
+        with self._cond:
+            schedule = self.get(schedule_id)
+            if schedule.state != "PAUSED":
+                raise ValueError(f"TWAP schedule {schedule_id} is {schedule.state}")
+            schedule.state = "ACTIVE"
+            schedule.generation += 1
+            # A chunk still in flight queues the next one itself when it returns
+            if not schedule.inflight:
+                self._push(schedule, self.clock())
+                self._cond.notify()
+        return schedule.progress()
+
+    def active_count(self):
+        """Number of schedules that still have chunks to send"""
+        return sum(1 for s in self._schedules.values() if s.state in ("ACTIVE", "PAUSED"))
+
+    def _push(self, schedule, due):
+        heapq.heappush(self._heap, (due, next(self._seq), schedule, schedule.generation))
+
+    def _prune(self):
+        """Drop heap entries invalidated by pause/resume/cancel"""
+        while self._heap:
+            _, _, schedule, generation = self._heap[0]
+            if schedule.state == "ACTIVE" and schedule.generation == generation:
+                return self._heap[0][0]
+            heapq.heappop(self._heap)
+        return None
+
+    def next_due(self):
+        """Due time of the earliest pending chunk, or None if idle"""
+        with self._cond:
+            return self._prune()
+
+    def run_pending(self, now=None):
+        """Send every chunk due at ``now``
+
+        Args:
+            now (float): Current time, defaults to the scheduler clock
+
+        Returns:
+            int: Number of chunks sent
+        """
+        if now is None:
+            now = self.clock()
+
+        due_entries = []
+        with self._cond:
+            while self._prune() is not None and self._heap[0][0] <= now:
+                entry = heapq.heappop(self._heap)
+                entry[2].inflight = True
+                due_entries.append(entry)
+            self._drop_finished(now)
+            executor = self._executor
+
+        for due, _, schedule, _ in due_entries:
+            if executor is not None:
+                executor.submit(self._run_chunk, schedule, due)
+            else:
+                self._run_chunk(schedule, due)
+        return len(due_entries)
+
+    def _run_chunk(self, schedule, due):
+        index = schedule.next_chunk
+        try:
+            order = self.client.futures_create_order(**schedule.chunk_orders[index])
+        except Exception as e:
+            with self._cond:
+                schedule.inflight = False
+                schedule.error = e
+                if schedule.state != "CANCELLED":
+                    self._finish(schedule, "FAILED")
+            if self.logger:
+                self.logger.error("TWAP schedule %d failed: %s", schedule.schedule_id, e)
+            self._notify_progress(schedule)
+            return
+
+        with self._cond:
+            schedule.inflight = False
+            schedule.orders.append(order)
+            schedule.next_chunk = index + 1
+            # A cancel that landed while this chunk was in flight stands
+            if schedule.state != "CANCELLED":
+                if schedule.next_chunk >= schedule.total_chunks:
+                    self._finish(schedule, "COMPLETED")
+                elif schedule.state == "ACTIVE":
+                    self._push(schedule, due + schedule.interval)
+                    self._cond.notify()
+
+        if self.logger:
+            self.logger.info(
+                "TWAP schedule %d chunk %d/%d executed: %s",
+                schedule.schedule_id, index + 1, schedule.total_chunks, order.get('orderId')
+            )
+        self._notify_progress(schedule)
+
+    def _finish(self, schedule, state):
+        schedule.state = state
+        now = self.clock()
+        self._drop_finished(now)
+        self._finished.append((now, schedule.schedule_id))
+        if self.journal and schedule.journal_key:
+            self.journal.end_schedule(schedule.journal_key, state)
+
+    def _drop_finished(self, now):
+        """Forget schedules finished more than ``retention`` seconds ago"""
+        while self._finished and now - self._finished[0][0] > self.retention:
+            _, schedule_id = self._finished.popleft()
+            self._schedules.pop(schedule_id, None)
+
+    def _notify_progress(self, schedule):
+        if schedule.on_progress:
+            try:
+                schedule.on_progress(schedule)
+            except Exception as e:
+                if self.logger:
+                    self.logger.error("TWAP progress callback failed: %s", e)
+
+    def start(self):
+        """Run the scheduler in a background thread"""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="TWAPSend")
+        self._thread = threading.Thread(target=self._run, name="TWAPScheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """Stop the background threads; pending schedules are kept
+
+        Chunks already handed to a sender finish before this returns.
+        """
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        with self._cond:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._running:
+                    return
+                due = self._prune()
+                timeout = None if due is None else due - self.clock()
+                if timeout is None or timeout > 0:
+                    self._cond.wait(timeout)
+                    continue
+            self.run_pending()
@@ -0,0 +1,239 @@
+import asyncio
+import logging
+from market_orders import MarketOrder
+from limit_orders import LimitOrder
+from advanced.stop_limit import StopLimitOrder
+from advanced.oco import OCOOrder
+from advanced.twap import TWAPOrder
+from symbol_filters import SymbolFilterCache
+from time_sync import FastSigner
+
+
+class AsyncSimplifiedBot:
+    """Asyncio counterpart of SimplifiedBot for concurrent order execution
+
+    Order parameters are validated with the same order classes used by the
+    blocking bot; only the transport differs. Any client exposing coroutine
+    versions of futures_create_order / futures_cancel_order / futures_account
+    can be plugged in (binance.AsyncClient or a local fake exchange).
+    """
+
+    def __init__(self, client, max_concurrency=50, logger=None, symbol_filters=None):
+        """Initialize the async trading bot
+
+        Args:
+            client: Async Binance client (e.g. binance.AsyncClient)
+            max_concurrency (int): Maximum number of requests in flight
+            logger (logging.Logger): Logger, defaults to the SimplifiedBot logger
+            symbol_filters (SymbolFilterCache): Optional preloaded lot/tick size cache
+        """
+        if max_concurrency <= 0:
+            raise ValueError("max_concurrency must be positive")
+
+        self.client = client
+        self.logger = logger or logging.getLogger("SimplifiedBot")
+        self.symbol_filters = symbol_filters
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._filters_lock = asyncio.Lock()
+
+    @classmethod
+    async def create(cls, api_key, api_secret, testnet=True, max_concurrency=50, logger=None):
+        """Create a bot backed by python-binance's AsyncClient
+
+        Args:
+            api_key (str): Binance API key
+            api_secret (str): Binance API secret
+            testnet (bool): Use testnet (True) or live trading (False)
+            max_concurrency (int): Maximum number of requests in flight
+            logger (logging.Logger): Optional logger
+
+        Returns:
+            AsyncSimplifiedBot: Connected bot
+        """
+        if not api_key or not api_secret:
+            raise ValueError("❌ API key and secret are required")
+
+        from binance import AsyncClient
+        client = await AsyncClient.create(api_key, api_secret, testnet=testnet)
+        FastSigner(api_secret).install(client)
+        bot = cls(client, max_concurrency, logger)
+
+        try:
+            # Test connection
+            await client.futures_account()
+
+            # The cache cannot refresh through an async client; the bot
+            # reloads it (see refresh_symbol_filters) when it goes stale or
+            # an unknown symbol is traded
+            bot.symbol_filters = SymbolFilterCache(None, path=None)
+            await bot.refresh_symbol_filters()
+
+            env = "Testnet" if testnet else "Live"
+            bot.logger.info("✅ Async bot initialized on Binance Futures %s", env)
+            return bot
+
+        except Exception as e:
+            bot.logger.error("❌ Failed to initialize async bot: %s", e)
+            await bot.close()
+            raise
+
+    async def close(self):
+        """Close the underlying client session"""
+        close = getattr(self.client, "close_connection", None)
+        if close:
+            await close()
+
+    async def refresh_symbol_filters(self):
+        """Reload exchange info through the async client (new listings, changed filters)"""
+        async with self._semaphore:
+            exchange_info = await self.client.futures_exchange_info()
+        self.symbol_filters.load(exchange_info)
+
+    def _filters_current(self, symbol):
+        age = self.symbol_filters.age()
+        if age is None or age > self.symbol_filters.ttl:
+            return False
+        # Unknown symbols reload at most every unknown_refresh seconds, so a
+        # mistyped symbol does not fetch exchange info on every order
+        return symbol in self.symbol_filters or age < self.symbol_filters.unknown_refresh
+
+    async def _ensure_filters(self, symbol):
+        """Refresh the filter cache before building an order when it is stale or lacks ``symbol``"""
+        if self.symbol_filters is None or self._filters_current(symbol):
+            return
+        async with self._filters_lock:
+            # Another task may have reloaded while this one waited
+            if not self._filters_current(symbol):
+                await self.refresh_symbol_filters()
+
+    async def _submit(self, params):
+        """Send one order request, bounded by the concurrency limit"""
+        async with self._semaphore:
+            return await self.client.futures_create_order(**params)
+
+    async def _cancel(self, symbol, order_id):
+        """Cancel one order, bounded by the concurrency limit"""
+        async with self._semaphore:
+            return await self.client.futures_cancel_order(symbol=symbol, orderId=order_id)
+
+    async def place_orders(self, order_params):
+        """Submit many prepared orders concurrently
+
+        Args:
+            order_params (list): Keyword arguments for futures_create_order,
+                e.g. built with MarketOrder.build_order / LimitOrder.build_order
+
+        Returns:
+            list: Order responses in input order; failed orders are returned
+                as the exception raised for them
+        """
+        return await asyncio.gather(
+            *(self._submit(params) for params in order_params),
+            return_exceptions=True
+        )
+
+    async def place_market_order(self, symbol, side, quantity):
+        """Place market order"""
+        try:
+            await self._ensure_filters(symbol)
+            params = MarketOrder(self.client, self.symbol_filters).build_order(symbol, side, quantity)
+            order = await self._submit(params)
+            self.logger.info("✅ Market order executed: %s", order['orderId'])
+            return order
+        except Exception as e:
+            self.logger.error("❌ Market order failed: %s", e)
+            return None
+
+    async def place_limit_order(self, symbol, side, quantity, price):
+        """Place limit order"""
+        try:
+            await self._ensure_filters(symbol)
+            params = LimitOrder(self.client, self.symbol_filters).build_order(symbol, side, quantity, price)
+            order = await self._submit(params)
+            self.logger.info("✅ Limit order placed: %s", order['orderId'])
+            return order
+        except Exception as e:
+            self.logger.error("❌ Limit order failed: %s", e)
+            return None
+
+    async def place_stop_limit_order(self, symbol, side, quantity, stop_price, limit_price):
+        """Place stop-limit order"""
+        try:
+            await self._ensure_filters(symbol)
+            params = StopLimitOrder(self.client, self.symbol_filters).build_order(
+                symbol, side, quantity, stop_price, limit_price
+            )
+            order = await self._submit(params)
+            self.logger.info("✅ Stop-limit order placed: %s", order['orderId'])
+            return order
+        except Exception as e:
+            self.logger.error("❌ Stop-limit order failed: %s", e)
+            return None
+
+    async def place_oco_order(self, symbol, side, quantity, take_profit_price, stop_price):
+        """Place OCO order, sending both legs concurrently"""
+        try:
+            await self._ensure_filters(symbol)
+            legs = OCOOrder(self.client, self.logger, self.symbol_filters).build_orders(
+                symbol, side, quantity, take_profit_price, stop_price
+            )
+            results = await asyncio.gather(
+                *(self._submit(params) for params in legs),
+                return_exceptions=True
+            )
+            errors = [r for r in results if isinstance(r, Exception)]
+            if errors:
+                # Rollback: Cancel any successfully placed legs
+                for order in results:
+                    if isinstance(order, Exception):
+                        continue
+                    try:
+                        await self._cancel(order['symbol'], order['orderId'])
+                        self.logger.info("Cancelled order %s due to OCO failure", order['orderId'])
+                    except Exception:
+                        pass
+                raise errors[0]
+
+            self.logger.info("✅ OCO orders placed: %s orders", len(results))
+            return results
+        except Exception as e:
+            self.logger.error("❌ OCO order failed: %s", e)
+            return None
+
+    async def place_twap_order(self, symbol, side, total_quantity, chunks=5, interval=10):
+        """Place TWAP order without blocking the event loop between chunks"""
+        try:
+            await self._ensure_filters(symbol)
+            chunk_orders = TWAPOrder(self.client, self.logger, self.symbol_filters).build_orders(
+                symbol, side, total_quantity, chunks
+            )
+            if interval <= 0:
+                raise ValueError("Interval must be positive")
+
+            orders = []
+            for i, params in enumerate(chunk_orders):
+                order = await self._submit(params)
+                orders.append(order)
+                self.logger.info("TWAP chunk %s/%s executed: %s", i + 1, len(chunk_orders), order['orderId'])
+
+                # Don't sleep after the last chunk
+                if i < len(chunk_orders) - 1:
+                    await asyncio.sleep(interval)
+
+            self.logger.info("✅ TWAP completed: %s chunks executed", len(orders))
+            return orders
+        except Exception as e:
+            self.logger.error("❌ TWAP order failed: %s", e)
+            return None
+
+    async def get_account_info(self):
+        """Get account balance and positions"""
+        try:
+            async with self._semaphore:
+                account = await self.client.futures_account()
+            balance = float(account['totalWalletBalance'])
+            self.logger.info("💰 Account Balance: %s USDT", balance)
+            return account
+        except Exception as e:
+            self.logger.error("❌ Failed to get account info: %s", e)
+            return None
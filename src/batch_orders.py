@@ -0,0 +1,118 @@
+import threading
+from concurrent.futures import Future
+
+# Binance futures accepts at most 5 orders per batchOrders request
+MAX_BATCH_SIZE = 5
+
+
+class BatchOrderError(Exception):
+    """Error returned for a single order inside a batch response"""
+
+    def __init__(self, code, message, params=None):
+        super().__init__(f"APIError(code={code}): {message}")
+        self.code = code
+        self.message = message
+        self.params = params
+
+
+def _encode_order(params):
+    """Convert order params to the all-string JSON form batchOrders expects"""
+    encoded = {}
+    for key, value in params.items():
+        if isinstance(value, bool):
+            encoded[key] = "true" if value else "false"
+        else:
+            encoded[key] = str(value)
+    return encoded
+
+
+class BatchOrderSubmitter:
+    """Group orders into futures_place_batch_order requests
+
+    Orders are queued with submit(), which returns a Future, and sent by
+    flush() in requests of up to ``batch_size`` orders. Each Future receives
+    its own order response or a BatchOrderError, so callers see per-order
+    results even though orders share a round trip.
+    """
+
+    def __init__(self, client, logger=None, batch_size=MAX_BATCH_SIZE):
+        """Initialize the submitter
+
+        Args:
+            client: Binance client exposing futures_place_batch_order
+            logger (logging.Logger): Optional logger
+            batch_size (int): Orders per request (1-5)
+        """
+        if not 1 <= batch_size <= MAX_BATCH_SIZE:
+            raise ValueError(f"batch_size must be between 1 and {MAX_BATCH_SIZE}")
+
+        self.client = client
+        self.logger = logger
+        self.batch_size = batch_size
+        self._pending = []
+        self._lock = threading.Lock()
+
+    def submit(self, params):
+        """Queue an order for the next flush
+
+        Args:
+            params (dict): Keyword arguments for futures_create_order
+
+        Returns:
+            Future: Resolves to the order response or raises BatchOrderError
+        """
+        future = Future()
+        with self._lock:
+            self._pending.append((params, future))
+        return future
+
+    def flush(self):
+        """Send all queued orders
+
+        Returns:
+            int: Number of batch requests sent
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+
+        requests_sent = 0
+        for start in range(0, len(pending), self.batch_size):
+            self._send(pending[start:start + self.batch_size])
+            requests_sent += 1
+        return requests_sent
+
+    def _send(self, batch):
+        try:
+            results = self.client.futures_place_batch_order(
+                batchOrders=[_encode_order(params) for params, _ in batch]
+            )
+        except Exception as e:
+            # The whole request failed: every order in it failed
+            for _, future in batch:
+                future.set_exception(e)
+            if self.logger:
+                self.logger.error("Batch order request failed: %s", e)
+            return
+
+        for i, (params, future) in enumerate(batch):
+            result = results[i] if i < len(results) else None
+            if result is None:
+                future.set_exception(BatchOrderError(None, "Missing result in batch response", params))
+            elif 'code' in result and 'orderId' not in result:
+                future.set_exception(BatchOrderError(result['code'], result.get('msg'), params))
+            else:
+                future.set_result(result)
+
+    def place_orders(self, order_params):
+        """Submit orders in as few batch requests as possible and wait for results
+
+        Args:
+            order_params (list): Keyword arguments for futures_create_order
+
+        Returns:
+            list: Order responses in input order; failed orders are returned
+                as the exception raised for them
+        """
+        futures = [self.submit(params) for params in order_params]
+        self.flush()
+        return [f.exception() or f.result() for f in futures]
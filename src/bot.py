@@ -1,133 +1,601 @@
 import logging
 import sys
 import os
-from market_orders import MarketOrder
-from limit_orders import LimitOrder
-from advanced.stop_limit import StopLimitOrder
-from advanced.oco import OCOOrder
-from advanced.twap import TWAPOrder
+import threading
+import time
+from symbol_filters import SymbolFilterCache
+from rate_limiter import RateLimitedClient
+from transport import TransportConfig, IdempotentOrderClient, warm_up
+from metrics import LatencyRecorder, InstrumentedClient, instrument_signing
+from log_pipeline import get_pipeline
+from startup import TimeOffsetCache, ConnectionCheck, create_client
+from time_sync import ServerTimeSync
+from risk import RiskReservation
+
+# Order, stream and journal modules are imported where they are first used,
+# so short-lived scripted runs only pay for what they touch.
 
 
 class SimplifiedBot:
     """Simplified CLI-based trading bot for Binance Futures Testnet"""
     
-    def __init__(self, api_key, api_secret, testnet=True):
+    def __init__(self, api_key, api_secret, testnet=True, transport=None, client=None, metrics=None,
+                 json_logs=False, journal=None, fast_start=False, risk=None):
         """Initialize the trading bot
         
         Args:
             api_key (str): Binance API key
             api_secret (str): Binance API secret
             testnet (bool): Use testnet (True) or live trading (False)
+            transport (TransportConfig): HTTP pool/timeout/retry settings
+            client: Pre-built client (e.g. simulator.SimulatedExchange); skips
+                building binance.Client, so api_key/api_secret may be None
+            metrics (LatencyRecorder): Per-stage order latency recorder;
+                instrumentation is disabled when omitted
+            json_logs (bool): Write bot.log as compact JSON lines
+            journal (str): Order journal file; every order intent, ack, fill and
+                cancel is recorded there and recover() resumes after a crash
+            fast_start (bool): Don't wait for the connectivity check; it runs in
+                the background (see check_connection) alongside the first request
+            risk (RiskEngine): Pre-trade limits every place_* call is checked
+                against; disabled when omitted
         """
         self.testnet = testnet
-        self.setup_logger()
+        self.twap_scheduler = None
+        self.user_stream = None
+        self.oco_manager = None
+        self.amender = None
+        self.market_data = None
+        self.journal = None
+        self.connection_check = None
+        self.time_sync = None
+        self.risk = risk
+        self.metrics = metrics or LatencyRecorder(enabled=False)
+        self.setup_logger(json_logs)
         
         # Validate API credentials
-        if not api_key or not api_secret:
+        if client is None and (not api_key or not api_secret):
             raise ValueError("❌ API key and secret are required")
         
         try:
-            from binance import Client
-            self.client = Client(api_key, api_secret, testnet=testnet)
+            transport = transport or TransportConfig()
+            raw_client = None
+            if client is None:
+                raw_client = create_client(api_key, api_secret, testnet, transport)
+                if self.metrics.enabled:
+                    instrument_signing(raw_client, self.metrics)
+                
+                # All order classes share one governed client (request weight / order count)
+                self.client = RateLimitedClient(
+                    IdempotentOrderClient(raw_client, transport.max_retries, self.logger),
+                    logger=self.logger
+                )
+                self.governor = self.client.governor
+            else:
+                self.client = client
+                self.governor = None
+            if journal:
+                from journal import OrderJournal, JournaledClient
+                self.journal = OrderJournal(journal, logger=self.logger)
+                self.client = JournaledClient(self.client, self.journal)
+            if self.metrics.enabled:
+                self.client = InstrumentedClient(self.client, self.metrics)
+            # Lot/tick sizes loaded lazily from exchange info (cached on disk,
+            # except for pre-built clients such as the simulator)
+            self.symbol_filters = SymbolFilterCache(
+                self.client, path="exchange_info.json" if client is None else None, logger=self.logger
+            )
+            # Simulated clients bring their own clock
+            self.sleep = getattr(client, "sleep", time.sleep)
+            self.clock = getattr(client, "now", time.time)
             
-            # Test connection
-            self.client.futures_account()
+            # Server-time offset comes from disk when fresh; otherwise the
+            # connection check measures it
+            time_offsets = TimeOffsetCache() if raw_client is not None else None
+            self.connection_check = ConnectionCheck(self.client, raw_client, time_offsets, self.logger)
+            if raw_client is not None:
+                # Keeps the offset current afterwards; -1021 rejects resync and retry
+                self.time_sync = ServerTimeSync(raw_client, cache=time_offsets, logger=self.logger).install()
+                self.time_sync.start()
+            if fast_start:
+                self.connection_check.start()
+            else:
+                # Test connection
+                self.connection_check.run()
+                self.connection_check.result()
+                
+                # Open the rest of the keep-alive pool before the first order
+                if client is None:
+                    warm_up(self.client, transport.warm_up_connections - 1)
             
             env = "Testnet" if testnet else "Live"
-            self.logger.info(f"✅ Bot initialized on Binance Futures {env}")
+            self.logger.info("✅ Bot initialized on Binance Futures %s", env)
             
         except Exception as e:
-            self.logger.error(f"❌ Failed to initialize bot: {str(e)}")
+            self.logger.error("❌ Failed to initialize bot: %s", e)
             raise
 
-    def setup_logger(self):
-        """Setup logging to file and console"""
-        self.logger = logging.getLogger("SimplifiedBot")
-        self.logger.setLevel(logging.INFO)
+    def check_connection(self, timeout=None):
+        """Wait for the connectivity check (started in the background with fast_start)
         
-        # Clear existing handlers
-        if self.logger.hasHandlers():
-            self.logger.handlers.clear()
-        
-        # File handler
-        fh = logging.FileHandler("bot.log")
-        fh.setLevel(logging.INFO)
-        
-        # Console handler
-        ch = logging.StreamHandler()
-        ch.setLevel(logging.INFO)
+        Returns:
+            dict: futures_account() response, or None if the check failed
+        """
+        try:
+            return self.connection_check.result(timeout)
+        except Exception as e:
+            self.logger.error("❌ Connection check failed: %s", e)
+            return None
+
+    def _record_risk(self, *orders):
+        if self.risk:
+            for order in orders:
+                self.risk.on_order(order)
+
+    def _reserve_risk(self, symbol, side, quantity, price=None, reduce_only=False, orders=1):
+        """Check an order and hold its exposure until it is settled (nothing to hold without a risk engine)"""
+        if self.risk is None:
+            return RiskReservation(None, [])
+        return self.risk.reserve(symbol, side, quantity, price, reduce_only, orders)
+
+    def setup_logger(self, json_logs=False):
+        """Setup non-blocking logging to file and console
         
-        # Formatter
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        fh.setFormatter(formatter)
-        ch.setFormatter(formatter)
+        Records are queued and written by a background thread in batches,
+        so disk and console I/O never sit on the order path. Bots in one
+        process share the pipeline (one listener thread, one file handle).
         
-        self.logger.addHandler(fh)
-        self.logger.addHandler(ch)
+        Args:
+            json_logs (bool): Write compact JSON lines instead of text
+        """
+        self.logger = logging.getLogger("SimplifiedBot")
+        self.log_pipeline = get_pipeline(self.logger, "bot.log", logging.INFO, json_lines=json_logs)
 
     def place_market_order(self, symbol, side, quantity):
         """Place market order"""
         try:
-            order = MarketOrder(self.client).place_order(symbol, side, quantity)
-            self.logger.info(f"✅ Market order executed: {order['orderId']}")
+            from market_orders import MarketOrder
+            with self._reserve_risk(symbol, side, quantity) as reservation:
+                with self.metrics.span("MARKET", symbol):
+                    order = MarketOrder(self.client, self.symbol_filters).place_order(symbol, side, quantity)
+                reservation.settle(order)
+            self.logger.info("✅ Market order executed: %s", order['orderId'])
             return order
         except Exception as e:
-            self.logger.error(f"❌ Market order failed: {str(e)}")
+            self.logger.error("❌ Market order failed: %s", e)
             return None
 
     def place_limit_order(self, symbol, side, quantity, price):
         """Place limit order"""
         try:
-            order = LimitOrder(self.client).place_order(symbol, side, quantity, price)
-            self.logger.info(f"✅ Limit order placed: {order['orderId']}")
+            from limit_orders import LimitOrder
+            with self._reserve_risk(symbol, side, quantity, price) as reservation:
+                with self.metrics.span("LIMIT", symbol):
+                    order = LimitOrder(self.client, self.symbol_filters).place_order(symbol, side, quantity, price)
+                reservation.settle(order)
+            self.logger.info("✅ Limit order placed: %s", order['orderId'])
             return order
         except Exception as e:
-            self.logger.error(f"❌ Limit order failed: {str(e)}")
+            self.logger.error("❌ Limit order failed: %s", e)
             return None
 
     def place_stop_limit_order(self, symbol, side, quantity, stop_price, limit_price):
         """Place stop-limit order"""
         try:
-            order = StopLimitOrder(self.client).place_order(symbol, side, quantity, stop_price, limit_price)
-            self.logger.info(f"✅ Stop-limit order placed: {order['orderId']}")
+            from advanced.stop_limit import StopLimitOrder
+            with self._reserve_risk(symbol, side, quantity, limit_price) as reservation:
+                with self.metrics.span("STOP", symbol):
+                    order = StopLimitOrder(self.client, self.symbol_filters, self.market_data).place_order(
+                        symbol, side, quantity, stop_price, limit_price
+                    )
+                reservation.settle(order)
+            self.logger.info("✅ Stop-limit order placed: %s", order['orderId'])
             return order
         except Exception as e:
-            self.logger.error(f"❌ Stop-limit order failed: {str(e)}")
+            self.logger.error("❌ Stop-limit order failed: %s", e)
             return None
 
     def place_oco_order(self, symbol, side, quantity, take_profit_price, stop_price):
         """Place OCO order"""
         try:
-            orders = OCOOrder(self.client, self.logger).place_order(
-                symbol, side, quantity, take_profit_price, stop_price
-            )
-            self.logger.info(f"✅ OCO orders placed: {len(orders)} orders")
+            from advanced.oco import OCOOrder
+            # Both legs are reduce-only closing orders
+            close_side = "SELL" if side.upper() == "BUY" else "BUY"
+            with self._reserve_risk(symbol, close_side, quantity, reduce_only=True, orders=2) as reservation:
+                with self.metrics.span("OCO", symbol):
+                    orders = OCOOrder(self.client, self.logger, self.symbol_filters, self.market_data).place_order(
+                        symbol, side, quantity, take_profit_price, stop_price
+                    )
+                reservation.settle(*orders)
+            if self.oco_manager:
+                self.oco_manager.register(symbol, orders[0]['orderId'], orders[1]['orderId'])
+            self.logger.info("✅ OCO orders placed: %s orders", len(orders))
             return orders
         except Exception as e:
-            self.logger.error(f"❌ OCO order failed: {str(e)}")
+            self.logger.error("❌ OCO order failed: %s", e)
             return None
 
     def place_twap_order(self, symbol, side, total_quantity, chunks=5, interval=10):
         """Place TWAP order"""
         try:
-            orders = TWAPOrder(self.client, self.logger).place_order(
-                symbol, side, total_quantity, chunks, interval
-            )
-            self.logger.info(f"✅ TWAP completed: {len(orders)} chunks executed")
+            from advanced.twap import TWAPOrder
+            # The whole TWAP is checked and held up front
+            with self._reserve_risk(symbol, side, total_quantity, orders=0) as reservation:
+                orders = TWAPOrder(self.client, self.logger, self.symbol_filters, self.sleep,
+                                   self.journal).place_order(symbol, side, total_quantity, chunks, interval)
+                reservation.settle(*orders)
+            self.logger.info("✅ TWAP completed: %s chunks executed", len(orders))
             return orders
         except Exception as e:
-            self.logger.error(f"❌ TWAP order failed: {str(e)}")
+            self.logger.error("❌ TWAP order failed: %s", e)
+            return None
+
+    def place_adaptive_twap_order(self, symbol, side, total_quantity, chunks=5, interval=10, mode="TWAP",
+                                  volume_profile=None, participation_rate=0.1, jitter=0.0, passive_timeout=0):
+        """Execute a parent order as TWAP/VWAP/POV slices (see AdaptiveTWAPOrder.execute)
+        
+        Passive slices and POV need market data; the stream is started for
+        ``symbol`` if it is not running yet.
+        
+        Returns:
+            dict: Execution report with fills and implementation shortfall, None on failure
+        """
+        try:
+            from advanced.execution import AdaptiveTWAPOrder, ExecutionHalted
+            # The whole parent order is checked and held up front
+            with self._reserve_risk(symbol, side, total_quantity, orders=0) as reservation:
+                if (passive_timeout or str(mode).upper() == "POV") and self.market_data is None:
+                    self.start_market_data([symbol])
+                engine = AdaptiveTWAPOrder(self.client, self.logger, self.symbol_filters, self.market_data,
+                                           sleep=self.sleep, clock=self.clock)
+                try:
+                    report = engine.execute(symbol, side, total_quantity, chunks, interval, mode, volume_profile,
+                                            participation_rate, jitter, passive_timeout)
+                except ExecutionHalted as e:
+                    reservation.settle(*e.report['orders'])
+                    raise
+                reservation.settle(*report['orders'])
+            self.logger.info("✅ %s completed: %s/%s filled, shortfall %s bps", report['mode'],
+                             report['executed_qty'], total_quantity, report['shortfall_bps'])
+            return report
+        except Exception as e:
+            self.logger.error("❌ Adaptive TWAP order failed: %s", e)
+            return None
+
+    def place_batch_orders(self, order_params):
+        """Place many prepared orders using batch requests (5 orders per call)
+        
+        Args:
+            order_params (list): Keyword arguments for futures_create_order,
+                e.g. built with LimitOrder(...).build_order(...)
+                
+        Returns:
+            list: Order responses in input order; failed orders are returned
+                as the exception raised for them
+        """
+        from batch_orders import BatchOrderSubmitter
+        reservation = RiskReservation(None, [])
+        if self.risk:
+            try:
+                reservation = self.risk.reserve_orders(order_params)
+            except ValueError as e:
+                self.logger.error("❌ Batch placement rejected: %s", e)
+                return [e] * len(order_params)
+        with reservation:
+            results = BatchOrderSubmitter(self.client, self.logger).place_orders(order_params)
+            reservation.settle(*(r for r in results if not isinstance(r, Exception)))
+        failed = sum(1 for r in results if isinstance(r, Exception))
+        if failed:
+            self.logger.error("❌ Batch placement: %s/%s orders failed", failed, len(results))
+        else:
+            self.logger.info("✅ Batch placement: %s orders placed", len(results))
+        return results
+
+    def place_grid_order(self, symbol, center, spacing, levels, quantity, geometric=False, post_only=False):
+        """Place a grid of limit orders around ``center``, or re-center the running one
+        
+        Only levels that differ from the grid's open orders are cancelled or
+        placed, in batch requests.
+        
+        Returns:
+            dict: Grid report (kept/cancelled/placed/failed/requests), None on failure
+        """
+        try:
+            from advanced.grid import GridOrder
+            grid = GridOrder(self.client, self.logger, self.symbol_filters)
+            targets = grid.build_orders(symbol, center, spacing, levels, quantity, geometric, post_only)
+            if self.user_stream:
+                open_orders = self.user_stream.book.open_orders(symbol.upper())
+            else:
+                open_orders = self.client.futures_get_open_orders(symbol=symbol.upper())
+            plan = grid.plan(targets, open_orders)
+            reservation = self.risk.reserve_orders(plan.place) if self.risk else RiskReservation(None, [])
+            with reservation:
+                with self.metrics.span("GRID", symbol):
+                    report = grid.apply(plan)
+                reservation.settle(*report['cancelled'], *report['placed'])
+            if report['failed']:
+                self.logger.error("❌ Grid: %s of %s changes failed", len(report['failed']),
+                                  len(plan.cancel) + len(plan.place))
+            else:
+                self.logger.info("✅ Grid placed: %s kept, %s cancelled, %s placed", report['kept'],
+                                 len(report['cancelled']), len(report['placed']))
+            return report
+        except Exception as e:
+            self.logger.error("❌ Grid order failed: %s", e)
+            return None
+
+    def schedule_twap_order(self, symbol, side, total_quantity, chunks=5, interval=10, on_progress=None):
+        """Schedule a TWAP order without blocking the caller
+        
+        Returns:
+            int: Schedule id for cancel/pause/resume via self.twap_scheduler
+        """
+        try:
+            # Held until each chunk is acknowledged; the unsent rest is released when the schedule ends
+            reservation = self._reserve_risk(symbol, side, total_quantity, orders=0)
+            try:
+                if self.risk:
+                    on_progress = self._risk_progress(on_progress, reservation)
+                if self.twap_scheduler is None:
+                    self._start_twap_scheduler()
+                schedule_id = self.twap_scheduler.submit(
+                    symbol, side, total_quantity, chunks, interval, on_progress
+                )
+            except Exception:
+                reservation.release()
+                raise
+            self.logger.info("✅ TWAP scheduled: id %s", schedule_id)
+            return schedule_id
+        except Exception as e:
+            self.logger.error("❌ TWAP scheduling failed: %s", e)
+            return None
+
+    def cancel_order(self, symbol, order_id):
+        """Cancel an open order (following it to its current id if it was amended)"""
+        try:
+            if self.amender:
+                order_id = self.amender.current_order_id(order_id)
+            order = self.client.futures_cancel_order(symbol=symbol.upper(), orderId=order_id)
+            self._record_risk(order)
+            if self.amender:
+                self.amender.forget(order_id)
+            self.logger.info("✅ Order cancelled: %s", order_id)
+            return order
+        except Exception as e:
+            self.logger.error("❌ Cancel failed: %s", e)
+            return None
+
+    def amend_order(self, symbol, order_id, price=None, quantity=None, stop_price=None, wait=True):
+        """Change a resting order's price, quantity or stop price
+        
+        LIMIT orders are modified in place; other types are replaced with
+        the cancel and the new order sent concurrently. Rapid amends of the
+        same order are coalesced, so only the latest target reaches the
+        exchange. Amending by an orderId that was since replaced follows the
+        order to its current id.
+        
+        Args:
+            wait (bool): Block until the amend is acknowledged; otherwise
+                return a concurrent.futures.Future
+        
+        Returns:
+            dict: The live order after the amend (or a Future), None on failure
+        """
+        try:
+            if self.amender is None:
+                from advanced.amend import OrderAmender
+                self.amender = OrderAmender(self.client, self.logger, self.symbol_filters)
+                if self.user_stream:
+                    self.amender.attach(self.user_stream)
+            handle = self.amender.handle(order_id)
+            if handle is None:
+                order = self.get_order_status(symbol, order_id)
+                if order is None:
+                    raise ValueError(f"Order {order_id} not found")
+                handle = self.amender.track(order)
+            old_order_id, old_quantity = handle.order_id, float(handle.params['quantity'])
+            reservation = RiskReservation(None, [])
+            if self.risk and quantity is not None and quantity > old_quantity:
+                # Order prices come back from the exchange as strings
+                limit_price = price if price is not None else handle.params.get('price')
+                reservation = self.risk.reserve(symbol, handle.params['side'], quantity - old_quantity,
+                                                float(limit_price) if limit_price is not None else None,
+                                                orders=0)
+            try:
+                future = self.amender.amend(handle, price, quantity, stop_price)
+            except Exception:
+                reservation.release()
+                raise
+            if not wait:
+                future.add_done_callback(lambda f: self._settle_amend(f, reservation, handle.symbol, old_order_id,
+                                                                      old_quantity))
+                return future
+            self._settle_amend(future, reservation, handle.symbol, old_order_id, old_quantity)
+            order = future.result()
+            self.logger.info("✅ Order amended: %s", order['orderId'])
+            return order
+        except Exception as e:
+            self.logger.error("❌ Amend failed: %s", e)
+            return None
+
+    def _settle_amend(self, future, reservation, symbol, old_order_id, old_quantity):
+        """Record an amend's outcome in the risk engine and drop its reservation"""
+        if future.cancelled() or future.exception() is not None:
+            reservation.release()
+            return
+        order = future.result()
+        if order['orderId'] != old_order_id:
+            # Replaced: the old order no longer holds exposure
+            reservation.settle({'orderId': old_order_id, 'symbol': symbol, 'status': "CANCELED",
+                                'origQty': old_quantity}, order)
+        else:
+            reservation.settle(order)
+
+    def sync_risk(self):
+        """Seed the risk engine with positions and open orders from REST (startup)"""
+        try:
+            self.risk.load_positions(self.client.futures_position_information(),
+                                     self.client.futures_get_open_orders())
+            return self.risk.snapshot()
+        except Exception as e:
+            self.logger.error("❌ Failed to load positions for risk checks: %s", e)
+            return None
+
+    def _risk_progress(self, on_progress, reservation):
+        """Wrap a TWAP progress callback so each sent chunk settles its part of the reservation"""
+        lock = threading.Lock()
+        settled = [0]
+
+        def record(schedule):
+            with lock:
+                # Progress of a chunk and a cancel can be reported from different threads
+                for index in range(settled[0], len(schedule.orders)):
+                    reservation.settle(schedule.orders[index],
+                                       quantity=float(schedule.chunk_orders[index]['quantity']))
+                settled[0] = len(schedule.orders)
+                if schedule.state not in ("ACTIVE", "PAUSED") and not schedule.inflight:
+                    # Completed, failed or cancelled: chunks that were never sent hold nothing
+                    reservation.release()
+            if on_progress:
+                on_progress(schedule)
+        return record
+
+    def _start_twap_scheduler(self):
+        from advanced.twap_scheduler import TWAPScheduler
+        self.twap_scheduler = TWAPScheduler(self.client, self.logger, self.symbol_filters, journal=self.journal)
+        self.twap_scheduler.start()
+
+    def recover(self):
+        """Resume from the order journal after a restart
+        
+        Reconciles journaled orders with the exchange's open orders, cancels
+        OCO legs whose sibling is gone, re-registers complete OCO pairs (when
+        the user stream runs) and reschedules the unsent chunks of unfinished
+        TWAP orders under their original clientOrderIds.
+        
+        Returns:
+            dict: Recovery report from OrderJournal.recover, plus resumed
+                TWAP schedule ids
+        """
+        if self.journal is None:
+            raise ValueError("Recovery requires an order journal")
+        report = self.journal.recover(self.client)
+
+        for symbol, order_id in report['oco']['orphans']:
+            try:
+                self.client.futures_cancel_order(symbol=symbol, orderId=order_id)
+                self.logger.info("Cancelled orphaned OCO leg %s", order_id)
+            except Exception as e:
+                self.logger.error("❌ Failed to cancel orphaned OCO leg %s: %s", order_id, e)
+        if self.oco_manager:
+            for symbol, tp_order_id, sl_order_id in report['oco']['pairs']:
+                self.oco_manager.register(symbol, tp_order_id, sl_order_id)
+        elif report['oco']['pairs']:
+            self.logger.warning("%s OCO pairs recovered; start the user stream to manage them",
+                                len(report['oco']['pairs']))
+
+        report['resumed'] = []
+        for schedule in report['schedules']:
+            if self.twap_scheduler is None:
+                self._start_twap_scheduler()
+            report['resumed'].append(self.twap_scheduler.submit_chunks(
+                schedule['symbol'], schedule['side'], schedule['chunk_orders'], schedule['interval'],
+                journal_key=schedule['key']
+            ))
+        # Finished orders are no longer needed; keep the next replay short
+        self.journal.compact()
+        self.logger.info("✅ Recovery finished: %s open orders, %s TWAP schedules resumed",
+                         len(report['open_orders']), len(report['resumed']))
+        return report
+
+    def start_user_stream(self):
+        """Start the user-data stream so order/position lookups are local reads"""
+        try:
+            if self.user_stream is None:
+                from user_stream import UserDataStream
+                from advanced.oco_manager import OCOManager
+                self.user_stream = UserDataStream(self.client, self.logger, testnet=self.testnet)
+                # OCO siblings are cancelled from fill events once the stream runs
+                self.oco_manager = OCOManager(self.client, self.logger, self.symbol_filters, market_data=self.market_data)
+                self.oco_manager.attach(self.user_stream)
+                if self.journal:
+                    self.journal.attach(self.user_stream)
+                if self.risk:
+                    self.risk.attach(self.user_stream)
+                if self.amender:
+                    self.amender.attach(self.user_stream)
+                self.user_stream.start()
+            return self.user_stream
+        except Exception as e:
+            self.logger.error("❌ Failed to start user stream: %s", e)
+            self.user_stream = None
+            self.oco_manager = None
+            return None
+
+    def start_market_data(self, symbols):
+        """Stream books, best bid/ask and mark prices for ``symbols``
+        
+        Once running, stop-limit and OCO prices are checked against the
+        market locally before they are sent. Depth snapshots are paced
+        through the client's rate-limit governor.
+        """
+        try:
+            if self.market_data is None:
+                from market_data import MarketDataStream
+                # aggTrade gives the last price that stop orders trigger on
+                self.market_data = MarketDataStream(self.client, symbols, self.logger, testnet=self.testnet,
+                                                    trades=True, governor=self.governor)
+                if self.oco_manager:
+                    self.oco_manager.market_data = self.market_data
+                if self.risk:
+                    self.risk.market_data = self.market_data
+                self.market_data.start()
+            return self.market_data
+        except Exception as e:
+            self.logger.error("❌ Failed to start market data: %s", e)
+            self.market_data = None
+            return None
+
+    def close(self):
+        """Stop background threads (scheduler, streams, OCO cancels, time sync, amender)"""
+        if self.twap_scheduler:
+            self.twap_scheduler.stop(timeout=5)
+        if self.user_stream:
+            self.user_stream.stop()
+        if self.oco_manager:
+            self.oco_manager.shutdown()
+        if self.market_data:
+            self.market_data.stop()
+        if self.time_sync:
+            self.time_sync.stop()
+        if self.amender:
+            self.amender.close()
+
+    def get_order_status(self, symbol, order_id):
+        """Get order state, from the user stream when running"""
+        try:
+            if self.user_stream:
+                order = self.user_stream.book.get_order(order_id)
+                if order:
+                    return order
+            return self.client.futures_get_order(symbol=symbol.upper(), orderId=order_id)
+        except Exception as e:
+            self.logger.error("❌ Failed to get order status: %s", e)
             return None
 
     def get_account_info(self):
         """Get account balance and positions"""
         try:
-            account = self.client.futures_account()
+            if self.user_stream:
+                account = self.user_stream.book.account_snapshot()
+            else:
+                account = self.client.futures_account()
             balance = float(account['totalWalletBalance'])
-            self.logger.info(f"💰 Account Balance: {balance} USDT")
+            self.logger.info("💰 Account Balance: %s USDT", balance)
             return account
         except Exception as e:
-            self.logger.error(f"❌ Failed to get account info: {str(e)}")
+            self.logger.error("❌ Failed to get account info: %s", e)
             return None
 
 
@@ -202,72 +670,86 @@ def main():
         print(f"❌ Connection failed: {str(e)}")
         return
     
-    # Main trading loop
-    while True:
-        try:
-            display_menu()
-            choice = get_user_input("👆 Select option (0-6): ")
+    # Main trading loop; background threads are stopped however it ends
+    try:
+        while True:
+            try:
+                display_menu()
+                choice = get_user_input("👆 Select option (0-6): ")
             
-            if choice == "0":
-                print("👋 Goodbye! Happy trading!")
-                break
-            elif choice == "6":
-                bot.get_account_info()
-                continue
-            elif choice not in ["1", "2", "3", "4", "5"]:
-                print("❌ Invalid choice! Please select 0-6.")
-                continue
+                if choice == "0":
+                    if bot.twap_scheduler and bot.twap_scheduler.active_count():
+                        print("⚠️  Unfinished TWAP schedules will stop on exit.")
+                    print("👋 Goodbye! Happy trading!")
+                    break
+                elif choice == "6":
+                    bot.get_account_info()
+                    continue
+                elif choice not in ["1", "2", "3", "4", "5"]:
+                    print("❌ Invalid choice! Please select 0-6.")
+                    continue
             
-            # Get common parameters
-            print(f"\n📊 Setting up your order...")
-            symbol = get_user_input("📊 Symbol (e.g., BTCUSDT): ").upper()
-            side = get_user_input("📈 Side (BUY/SELL): ", validator=lambda x: x.upper() in ["BUY", "SELL"]).upper()
+                # Get common parameters
+                print(f"\n📊 Setting up your order...")
+                symbol = get_user_input("📊 Symbol (e.g., BTCUSDT): ").upper()
+                side = get_user_input("📈 Side (BUY/SELL): ", validator=lambda x: x.upper() in ["BUY", "SELL"]).upper()
             
-            print(f"\n⏳ Processing {['Market', 'Limit', 'Stop-Limit', 'OCO', 'TWAP'][int(choice)-1]} order...")
+                print(f"\n⏳ Processing {['Market', 'Limit', 'Stop-Limit', 'OCO', 'TWAP'][int(choice)-1]} order...")
             
-            # Execute based on choice
-            if choice == "1":  # Market Order
-                quantity = get_user_input("📦 Quantity: ", float, lambda x: x > 0)
-                result = bot.place_market_order(symbol, side, quantity)
+                # Execute based on choice
+                if choice == "1":  # Market Order
+                    quantity = get_user_input("📦 Quantity: ", float, lambda x: x > 0)
+                    result = bot.place_market_order(symbol, side, quantity)
                 
-            elif choice == "2":  # Limit Order
-                quantity = get_user_input("📦 Quantity: ", float, lambda x: x > 0)
-                price = get_user_input("💰 Limit Price: ", float, lambda x: x > 0)
-                result = bot.place_limit_order(symbol, side, quantity, price)
+                elif choice == "2":  # Limit Order
+                    quantity = get_user_input("📦 Quantity: ", float, lambda x: x > 0)
+                    price = get_user_input("💰 Limit Price: ", float, lambda x: x > 0)
+                    result = bot.place_limit_order(symbol, side, quantity, price)
                 
-            elif choice == "3":  # Stop-Limit Order
-                quantity = get_user_input("📦 Quantity: ", float, lambda x: x > 0)
-                stop_price = get_user_input("🛑 Stop Price: ", float, lambda x: x > 0)
-                limit_price = get_user_input("💰 Limit Price: ", float, lambda x: x > 0)
-                result = bot.place_stop_limit_order(symbol, side, quantity, stop_price, limit_price)
+                elif choice == "3":  # Stop-Limit Order
+                    quantity = get_user_input("📦 Quantity: ", float, lambda x: x > 0)
+                    stop_price = get_user_input("🛑 Stop Price: ", float, lambda x: x > 0)
+                    limit_price = get_user_input("💰 Limit Price: ", float, lambda x: x > 0)
+                    result = bot.place_stop_limit_order(symbol, side, quantity, stop_price, limit_price)
                 
-            elif choice == "4":  # OCO Order
-                quantity = get_user_input("📦 Quantity: ", float, lambda x: x > 0)
-                take_profit_price = get_user_input("🎯 Take Profit Price: ", float, lambda x: x > 0)
-                stop_price = get_user_input("🛑 Stop Loss Price: ", float, lambda x: x > 0)
-                result = bot.place_oco_order(symbol, side, quantity, take_profit_price, stop_price)
+                elif choice == "4":  # OCO Order
+                    quantity = get_user_input("📦 Quantity: ", float, lambda x: x > 0)
+                    take_profit_price = get_user_input("🎯 Take Profit Price: ", float, lambda x: x > 0)
+                    stop_price = get_user_input("🛑 Stop Loss Price: ", float, lambda x: x > 0)
+                    result = bot.place_oco_order(symbol, side, quantity, take_profit_price, stop_price)
                 
-            elif choice == "5":  # TWAP Order
-                total_quantity = get_user_input("📦 Total Quantity: ", float, lambda x: x > 0)
-                chunks = get_user_input("📊 Number of chunks (default 5): ", int, lambda x: x > 0) or 5
-                interval = get_user_input("⏱️  Interval seconds (default 10): ", int, lambda x: x > 0) or 10
-                result = bot.place_twap_order(symbol, side, total_quantity, chunks, interval)
+                elif choice == "5":  # TWAP Order
+                    total_quantity = get_user_input("📦 Total Quantity: ", float, lambda x: x > 0)
+                    chunks = get_user_input("📊 Number of chunks (default 5): ", int, lambda x: x > 0) or 5
+                    interval = get_user_input("⏱️  Interval seconds (default 10): ", int, lambda x: x > 0) or 10
+                    result = bot.schedule_twap_order(symbol, side, total_quantity, chunks, interval)
             
-            if result:
-                print("✅ Order completed successfully!")
-                print("📄 Check 'bot.log' for detailed information.")
-            else:
-                print("❌ Order failed! Check logs for details.")
+                if result and choice == "5":
+                    # Only scheduled: the chunks go out one by one from the background scheduler
+                    print(f"⏱️  TWAP schedule {result} accepted: {chunks} chunks, one every {interval}s")
+                    print("📄 Check 'bot.log' for each chunk as it executes.")
+                elif result:
+                    print("✅ Order completed successfully!")
+                    print("📄 Check 'bot.log' for detailed information.")
+                else:
+                    print("❌ Order failed! Check logs for details.")
             
-            input("\n📱 Press Enter to continue...")
+                input("\n📱 Press Enter to continue...")
             
-        except KeyboardInterrupt:
-            print("\n👋 Goodbye!")
-            break
-        except Exception as e:
-            print(f"❌ Error: {str(e)}")
-            input("📱 Press Enter to continue...")
+            except KeyboardInterrupt:
+                print("\n👋 Goodbye!")
+                break
+            except Exception as e:
+                print(f"❌ Error: {str(e)}")
+                input("📱 Press Enter to continue...")
+    finally:
+        bot.close()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if len(sys.argv) > 1:
+        # Headless mode: python bot.py <command> ... (see cli.py)
+        from cli import main as cli_main
+        cli_main()
+    else:
+        main()
\ No newline at end of file
@@ -0,0 +1,475 @@
+"""
+Headless command-line interface for the trading bot
+
+Single orders:
+    python bot.py market BTCUSDT BUY 0.01
+    python bot.py limit BTCUSDT BUY 0.01 30000
+    python bot.py stop-limit BTCUSDT BUY 0.01 31000 31050
+    python bot.py oco BTCUSDT BUY 0.01 32000 29000
+    python bot.py twap BTCUSDT BUY 0.05 --chunks 5 --interval 10
+    python bot.py adaptive-twap BTCUSDT BUY 0.05 --mode POV --participation-rate 0.05 --passive-timeout 3
+    python bot.py amend BTCUSDT 123456 --price 30100
+    python bot.py grid BTCUSDT 30000 25 100 0.002   (re-run to re-center)
+    python bot.py account
+
+Batch mode (CSV with a header row, or JSONL; '-' reads stdin):
+    python bot.py batch orders.csv --workers 8 --output results.jsonl
+
+Offline runs against historical klines (no credentials needed):
+    python bot.py --simulate BTCUSDT-1m-2024-01.csv oco BTCUSDT BUY 0.01 45000 41000
+
+Daemon mode (one warm bot serving a local JSON API; see daemon.py):
+    BOT_DAEMON_TOKEN=... python bot.py daemon --port 8765 --socket /tmp/bot.sock
+    python bot.py daemon --port -1 --socket /tmp/bot.sock     (Unix socket only, no token)
+
+Crash recovery (orders are journaled; 'recover' reconciles and resumes TWAPs):
+    python bot.py --journal orders.journal twap BTCUSDT BUY 0.05 --chunks 5
+    python bot.py --journal orders.journal recover
+
+Credentials come from --api-key/--api-secret or the BINANCE_API_KEY /
+BINANCE_API_SECRET environment variables.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+# Order type -> (SimplifiedBot method, positional fields)
+ORDER_COMMANDS = {
+    "market": ("place_market_order", ["symbol", "side", "quantity"]),
+    "limit": ("place_limit_order", ["symbol", "side", "quantity", "price"]),
+    "stop-limit": ("place_stop_limit_order", ["symbol", "side", "quantity", "stop_price", "limit_price"]),
+    "oco": ("place_oco_order", ["symbol", "side", "quantity", "take_profit_price", "stop_price"]),
+    "twap": ("place_twap_order", ["symbol", "side", "quantity", "chunks", "interval"]),
+    "adaptive-twap": ("place_adaptive_twap_order", [
+        "symbol", "side", "quantity", "chunks", "interval", "mode", "volume_profile", "participation_rate",
+        "jitter", "passive_timeout",
+    ]),
+    "grid": ("place_grid_order", ["symbol", "center", "spacing", "levels", "quantity"]),
+}
+
+INT_FIELDS = {"chunks", "interval", "levels"}
+# Fields that fall back to the method default when missing
+OPTIONAL_FIELDS = INT_FIELDS | {"mode", "volume_profile", "participation_rate", "jitter", "passive_timeout"}
+
+# Options shared by every command, not order fields
+GLOBAL_OPTIONS = (
+    "command", "api_key", "api_secret", "live", "metrics", "simulate", "journal", "check_connection",
+    "max_position", "max_notional", "max_loss",
+)
+FLOAT_FIELDS = {"quantity", "price", "stop_price", "limit_price", "take_profit_price", "center", "spacing",
+                "participation_rate", "jitter", "passive_timeout"}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="bot.py", description="Binance Futures trading bot (headless mode)")
+    parser.add_argument("--api-key", default=os.environ.get("BINANCE_API_KEY"))
+    parser.add_argument("--api-secret", default=os.environ.get("BINANCE_API_SECRET"))
+    parser.add_argument("--live", action="store_true", help="Trade on live Binance Futures instead of testnet")
+    parser.add_argument("--metrics", metavar="FILE", help="Write per-stage latency histograms (Prometheus text) on exit")
+    parser.add_argument("--simulate", metavar="KLINES_CSV", action="append",
+                        help="Run against a simulated exchange replaying this kline CSV (symbol from the "
+                             "file name, e.g. BTCUSDT-1m-2024-01.csv); repeat for more symbols")
+    parser.add_argument("--journal", metavar="FILE",
+                        help="Record every order in this journal so 'recover' can resume after a crash")
+    parser.add_argument("--check-connection", action="store_true",
+                        help="Validate credentials before running the command instead of alongside it")
+    parser.add_argument("--max-position", type=float, metavar="QTY",
+                        help="Reject orders that could take a symbol's position beyond QTY")
+    parser.add_argument("--max-notional", type=float, metavar="USDT",
+                        help="Reject orders that could take a symbol's position value beyond USDT")
+    parser.add_argument("--max-loss", type=float, metavar="USDT",
+                        help="Only allow reduce-only orders once the account has lost USDT")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("market", help="Market order")
+    _add_order_args(p)
+
+    p = sub.add_parser("limit", help="Limit order")
+    _add_order_args(p)
+    p.add_argument("price", type=float)
+
+    p = sub.add_parser("stop-limit", help="Stop-limit order")
+    _add_order_args(p)
+    p.add_argument("stop_price", type=float)
+    p.add_argument("limit_price", type=float)
+
+    p = sub.add_parser("oco", help="Take-profit + stop-loss pair")
+    _add_order_args(p)
+    p.add_argument("take_profit_price", type=float)
+    p.add_argument("stop_price", type=float)
+
+    p = sub.add_parser("twap", help="TWAP order")
+    _add_order_args(p)
+    p.add_argument("--chunks", type=int, default=5)
+    p.add_argument("--interval", type=int, default=10)
+
+    p = sub.add_parser("adaptive-twap", help="TWAP/VWAP/POV slices with optional passive limits first")
+    _add_order_args(p)
+    p.add_argument("--chunks", type=int, default=5)
+    p.add_argument("--interval", type=int, default=10)
+    p.add_argument("--mode", type=str.upper, choices=["TWAP", "VWAP", "POV"], default="TWAP")
+    p.add_argument("--volume-profile", type=float, nargs="+", metavar="VOLUME",
+                   help="Relative volume per period (VWAP)")
+    p.add_argument("--participation-rate", type=float, default=0.1, help="Share of market volume (POV)")
+    p.add_argument("--jitter", type=float, default=0.0, help="Random slice timing, fraction of interval")
+    p.add_argument("--passive-timeout", type=float, default=0,
+                   help="Seconds a post-only limit rests at the touch before crossing (0: market only)")
+
+    p = sub.add_parser("grid", help="Grid of limit orders around a center price; re-running re-centers it")
+    p.add_argument("symbol")
+    p.add_argument("center", type=float)
+    p.add_argument("spacing", type=float, help="Price distance between levels")
+    p.add_argument("levels", type=int, help="Levels per side")
+    p.add_argument("quantity", type=float, help="Quantity per level")
+
+    p = sub.add_parser("amend", help="Change a resting order's price/quantity (modified in place or replaced)")
+    p.add_argument("symbol")
+    p.add_argument("order_id", type=int)
+    p.add_argument("--price", type=float)
+    p.add_argument("--quantity", type=float)
+    p.add_argument("--stop-price", type=float)
+
+    sub.add_parser("account", help="Account balance and positions")
+
+    sub.add_parser("recover", help="Reconcile the --journal with the exchange and resume unfinished TWAPs")
+
+    p = sub.add_parser("daemon", help="Keep the bot connected and accept orders over a local HTTP/Unix-socket API")
+    p.add_argument("--host", default="127.0.0.1", help="HTTP bind address (default: 127.0.0.1)")
+    p.add_argument("--port", type=int, default=8765, help="HTTP port; 0 picks a free one, -1 disables HTTP")
+    p.add_argument("--socket", metavar="PATH", help="Also listen on this Unix socket (mode 0600)")
+    p.add_argument("--token", default=os.environ.get("BOT_DAEMON_TOKEN"),
+                   help="Require 'Authorization: Bearer TOKEN' (default: $BOT_DAEMON_TOKEN); needed for HTTP")
+    p.add_argument("--no-token", action="store_true",
+                   help="Serve HTTP without a token (any local process may submit orders)")
+    p.add_argument("--symbols", nargs="+", default=[], help="Keep market-data streams open for these symbols")
+    p.add_argument("--workers", type=int, default=8, help="Orders of one list request executed concurrently")
+
+    p = sub.add_parser("batch", help="Execute orders from a CSV/JSONL file or stdin")
+    p.add_argument("file", help="Path to a .csv/.jsonl file, or '-' for stdin")
+    p.add_argument("--format", choices=["csv", "jsonl"], help="Input format (default: from extension/content)")
+    p.add_argument("--workers", type=int, default=4, help="Orders executed concurrently")
+    p.add_argument("--output", default="-", help="JSONL results file (default: stdout)")
+    return parser
+
+
+def _add_order_args(parser):
+    parser.add_argument("symbol")
+    parser.add_argument("side", type=str.upper, choices=["BUY", "SELL"])
+    parser.add_argument("quantity", type=float)
+
+
+def _to_json(value):
+    return json.dumps(value, default=str)
+
+
+def parse_order(record):
+    """Normalize a batch record into (order_type, kwargs)
+
+    Args:
+        record (dict): Row with a 'type' field plus the order's fields
+
+    Returns:
+        tuple: (order type, keyword arguments for the SimplifiedBot method)
+    """
+    order_type = str(record.get("type", "")).strip().lower().replace("_", "-")
+    if order_type not in ORDER_COMMANDS:
+        raise ValueError(f"Unknown order type: {record.get('type')!r}")
+
+    _, fields = ORDER_COMMANDS[order_type]
+    kwargs = {}
+    for field in fields:
+        value = record.get(field)
+        if value in (None, ""):
+            if field in OPTIONAL_FIELDS:
+                continue  # Use the method default
+            raise ValueError(f"Missing field '{field}' for {order_type} order")
+        if field in INT_FIELDS:
+            value = int(value)
+        elif field in FLOAT_FIELDS:
+            value = float(value)
+        elif field == "volume_profile":
+            # CSV cells hold a space/comma separated list
+            if isinstance(value, str):
+                value = value.replace(",", " ").split()
+            value = [float(v) for v in value]
+        kwargs[field] = value
+    if order_type in ("twap", "adaptive-twap"):
+        kwargs["total_quantity"] = kwargs.pop("quantity")
+    return order_type, kwargs
+
+
+def execute_order(bot, order_type, kwargs):
+    method_name, _ = ORDER_COMMANDS[order_type]
+    return getattr(bot, method_name)(**kwargs)
+
+
+def read_records(stream, fmt=None):
+    """Yield batch records from a CSV (with header) or JSONL stream, lazily"""
+    if fmt is None:
+        # Sniff: JSONL lines start with '{'
+        first = stream.readline()
+        while first and not first.strip():
+            first = stream.readline()
+        fmt = "jsonl" if first.lstrip().startswith("{") else "csv"
+        lines = _chain([first], stream)
+    else:
+        lines = stream
+
+    if fmt == "csv":
+        yield from csv.DictReader(lines)
+    else:
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _chain(head, stream):
+    yield from head
+    yield from stream
+
+
+def run_batch(bot, records, output, workers=4, poll_interval=0.05):
+    """Execute batch records concurrently and write one JSONL result per order
+
+    At most ``workers * 2`` orders are held in memory, so arbitrarily large
+    inputs can be streamed. TWAP records are handed to the bot's TWAP
+    scheduler instead of occupying a worker for their whole duration; their
+    results are written once every schedule has finished.
+
+    Returns:
+        dict: Summary with total/succeeded/failed counts, wall time and throughput
+    """
+    if workers <= 0:
+        raise ValueError("workers must be positive")
+
+    def work(line_no, record):
+        try:
+            order_type, kwargs = parse_order(record)
+            if order_type == "twap":
+                schedule_id = bot.schedule_twap_order(**kwargs)
+                if schedule_id is not None:
+                    return {"line": line_no, "request": record, "schedule_id": schedule_id}
+                result = None
+            else:
+                result = execute_order(bot, order_type, kwargs)
+            if result is None:
+                return {"line": line_no, "ok": False, "request": record, "error": "Order failed, see bot.log"}
+            return {"line": line_no, "ok": True, "request": record, "result": result}
+        except Exception as e:
+            return {"line": line_no, "ok": False, "request": record, "error": str(e)}
+
+    summary = {"total": 0, "succeeded": 0, "failed": 0}
+    scheduled = []
+
+    def write(result):
+        summary["total"] += 1
+        summary["succeeded" if result["ok"] else "failed"] += 1
+        output.write(_to_json(result) + "\n")
+
+    def collect(done):
+        for future in done:
+            result = future.result()
+            if "schedule_id" in result:
+                scheduled.append(result)
+            else:
+                write(result)
+
+    start = time.perf_counter()
+    pending = set()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for line_no, record in enumerate(records, 1):
+            pending.add(executor.submit(work, line_no, record))
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+        collect(pending)
+
+    for entry in scheduled:
+        schedule_id = entry.pop("schedule_id")
+        schedule = bot.twap_scheduler.get(schedule_id)
+        while schedule.state in ("ACTIVE", "PAUSED"):
+            time.sleep(poll_interval)
+        entry["ok"] = schedule.state == "COMPLETED"
+        if entry["ok"]:
+            entry["result"] = schedule.orders
+        else:
+            entry["error"] = f"TWAP {schedule.state.lower()}: {schedule.error or 'see bot.log'}"
+        write(entry)
+    output.flush()
+
+    elapsed = time.perf_counter() - start
+    summary["wall_time_s"] = round(elapsed, 3)
+    summary["orders_per_s"] = round(summary["total"] / elapsed, 2) if elapsed > 0 else None
+    return summary
+
+
+def create_simulator(paths):
+    from simulator import SimulatedExchange
+    simulator = SimulatedExchange()
+    for path in paths:
+        simulator.load_csv(path)
+    return simulator
+
+
+def create_bot(args, client=None):
+    from bot import SimplifiedBot
+    from metrics import LatencyRecorder
+    metrics = LatencyRecorder() if args.metrics else None
+    risk = None
+    if args.max_position is not None or args.max_notional is not None or args.max_loss is not None:
+        from risk import RiskEngine, RiskLimits
+        risk = RiskEngine(RiskLimits(max_position=args.max_position, max_notional=args.max_notional),
+                          max_loss=args.max_loss)
+    bot = SimplifiedBot(args.api_key, args.api_secret, testnet=not args.live, client=client, metrics=metrics,
+                        journal=args.journal, fast_start=not args.check_connection, risk=risk)
+    if risk is not None:
+        bot.sync_risk()
+    return bot
+
+
+def run(argv=None, bot=None, stdin=None, stdout=None, stderr=None):
+    """Run a headless command
+
+    Args:
+        argv (list): Command-line arguments (default: sys.argv[1:])
+        bot: SimplifiedBot-compatible object to use instead of connecting
+        stdin, stdout, stderr: Streams (default: sys streams)
+
+    Returns:
+        int: Process exit code
+    """
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    stderr = stderr or sys.stderr
+    args = build_parser().parse_args(argv)
+
+    simulator = None
+    # A bot passed in belongs to the caller, who closes it
+    owned = bot is None
+    if bot is None:
+        try:
+            if args.simulate:
+                simulator = create_simulator(args.simulate)
+            bot = create_bot(args, simulator)
+        except Exception as e:
+            stderr.write(f"❌ Connection failed: {e}\n")
+            return 2
+
+    try:
+        code = _run_command(args, bot, stdin, stdout, stderr)
+        if simulator is not None:
+            # Play out the rest of the data so resting and conditional orders resolve
+            simulator.run()
+            stderr.write(_to_json(simulator.summary()) + "\n")
+        return code
+    finally:
+        metrics = getattr(bot, "metrics", None)
+        if args.metrics and metrics is not None and metrics.enabled:
+            metrics.write(args.metrics)
+        if owned:
+            # Stops the scheduler, streams and executors before the journal closes
+            bot.close()
+        journal = getattr(bot, "journal", None)
+        if journal is not None:
+            journal.close()
+
+
+def _run_command(args, bot, stdin, stdout, stderr):
+    if args.command == "account":
+        result = bot.get_account_info()
+        stdout.write(_to_json(result) + "\n")
+        return 0 if result is not None else 1
+
+    if args.command == "amend":
+        if args.price is None and args.quantity is None and args.stop_price is None:
+            stderr.write("❌ Nothing to amend: pass --price, --quantity or --stop-price\n")
+            return 2
+        result = bot.amend_order(args.symbol, args.order_id, args.price, args.quantity, args.stop_price)
+        stdout.write(_to_json(result) + "\n")
+        return 0 if result is not None else 1
+
+    if args.command == "recover":
+        from transport import OrderStateUnknown
+        try:
+            report = bot.recover()
+        except (ValueError, OrderStateUnknown) as e:
+            stderr.write(f"❌ {e}\n")
+            return 2
+        stdout.write(_to_json(report) + "\n")
+        # Resumed TWAP chunks run on the scheduler thread; wait for them
+        while bot.twap_scheduler and bot.twap_scheduler.active_count():
+            time.sleep(0.5)
+        return 0
+
+    if args.command == "daemon":
+        return run_daemon(args, bot, stderr)
+
+    if args.command == "batch":
+        if args.output == "-":
+            output = stdout
+        else:
+            output = open(args.output, "w")
+        source = stdin if args.file == "-" else open(args.file, newline="")
+        fmt = args.format
+        if fmt is None and args.file != "-":
+            fmt = "csv" if args.file.lower().endswith(".csv") else "jsonl"
+        try:
+            summary = run_batch(bot, read_records(source, fmt), output, args.workers)
+        finally:
+            if source is not stdin:
+                source.close()
+            if output is not stdout:
+                output.close()
+        stderr.write(_to_json(summary) + "\n")
+        return 0 if summary["failed"] == 0 else 1
+
+    record = {"type": args.command}
+    record.update({k: v for k, v in vars(args).items() if k not in GLOBAL_OPTIONS})
+    order_type, kwargs = parse_order(record)
+    result = execute_order(bot, order_type, kwargs)
+    stdout.write(_to_json(result) + "\n")
+    return 0 if result is not None else 1
+
+
+def run_daemon(args, bot, stderr):
+    """Serve the bot until SIGINT/SIGTERM or POST /shutdown"""
+    import signal
+    from daemon import BotDaemon
+    try:
+        # Validated before any stream is opened
+        daemon = BotDaemon(bot, args.host, args.port if args.port >= 0 else None, args.socket, args.token,
+                           args.workers, bot.logger, allow_no_token=args.no_token)
+        if not args.simulate:
+            # Warm streams: order status, fills and books become local reads
+            bot.start_user_stream()
+            if args.symbols:
+                bot.start_market_data([s.upper() for s in args.symbols])
+        daemon.start()
+    except (OSError, ValueError) as e:
+        stderr.write(f"❌ Daemon failed to start: {e}\n")
+        bot.close()
+        return 2
+    stderr.write(_to_json({"listening": daemon.addresses()}) + "\n")
+
+    def stop(signum, frame):
+        threading.Thread(target=daemon.stop, daemon=True).start()
+
+    previous = {sig: signal.signal(sig, stop) for sig in (signal.SIGINT, signal.SIGTERM)}
+    try:
+        while not daemon.wait(1):
+            pass
+    finally:
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
+        bot.close()
+    return 0
+
+
+def main(argv=None):
+    sys.exit(run(argv))
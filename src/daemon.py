@@ -0,0 +1,317 @@
+"""
+Long-running bot daemon with a local JSON API
+
+One SimplifiedBot (client, keep-alive pool, streams, caches) stays warm
+and serves order requests from any number of local submitters over HTTP
+on 127.0.0.1 and/or a Unix socket:
+
+    BOT_DAEMON_TOKEN=... python bot.py daemon --port 8765 --socket /tmp/bot.sock
+
+    curl -s localhost:8765/orders -H "Authorization: Bearer $BOT_DAEMON_TOKEN" \
+         -H "Content-Type: application/json" -d '{"type": "limit", "symbol": "BTCUSDT",
+         "side": "BUY", "quantity": 0.01, "price": 30000}'
+    curl -s --unix-socket /tmp/bot.sock http://bot/account
+
+Any web page the user visits can send requests to 127.0.0.1, so the HTTP
+listener needs a token unless explicitly opened (allow_no_token). Requests
+with a foreign Origin or, over HTTP, a Host other than the bound address
+(DNS rebinding) are refused, and POST bodies must be application/json,
+which a browser cannot send cross-origin without a CORS preflight the
+daemon never answers. A Unix-socket-only daemon (mode 0600) needs no token.
+
+Endpoints (JSON bodies use the batch-file fields, see cli.parse_order):
+    GET  /health                      uptime and request counters
+    GET  /account                     balance and positions
+    GET  /orders/<symbol>/<orderId>   order status
+    GET  /metrics                     latency histograms (Prometheus text, with --metrics)
+    POST /orders                      one order object, or a list run concurrently
+    POST /amend                       {"symbol", "order_id", "price"/"quantity"/"stop_price"}
+    POST /cancel                      {"symbol", "order_id"}
+    POST /shutdown                    stop the daemon
+"""
+
+import hmac
+import io
+import json
+import os
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from cli import parse_order, execute_order, run_batch, _to_json
+
+# Largest request body accepted (a batch of a few thousand orders)
+MAX_BODY = 1 << 20
+
+
+class DaemonError(ValueError):
+    """Request rejected by the daemon, with the HTTP status to answer with"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Keep-alive: submitters reuse one connection for many orders
+    protocol_version = "HTTP/1.1"
+    server_version = "SimplifiedBot"
+    # Buffer each response into one send: separate header and body writes
+    # stall ~40 ms per request on TCP (Nagle vs. delayed ACK)
+    wbufsize = -1
+
+    def log_message(self, format, *args):
+        pass  # Orders are logged by the bot; per-request access logs would sit on the order path
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method):
+        daemon = self.server.bot_daemon
+        body = None
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            if length > MAX_BODY:
+                raise DaemonError(413, "Request body too large")
+            raw = self.rfile.read(length) if length else b""
+            daemon.check_origin(self.headers, over_http=self.server.over_http)
+            if not daemon.authorized(self.headers.get("Authorization")):
+                raise DaemonError(401, "Missing or invalid token")
+            if method == "POST" and _media_type(self.headers.get("Content-Type")) != "application/json":
+                raise DaemonError(415, "POST bodies must be sent as Content-Type: application/json")
+            if raw:
+                try:
+                    body = json.loads(raw)
+                except ValueError:
+                    raise DaemonError(400, "Body is not valid JSON")
+            status, payload = daemon.handle(method, self.path, body)
+        except DaemonError as e:
+            status, payload = e.status, {"ok": False, "error": str(e)}
+
+        if isinstance(payload, str):
+            data, content_type = payload.encode(), "text/plain; version=0.0.4"
+        else:
+            data, content_type = (_to_json(payload) + "\n").encode(), "application/json"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    # Many submitters connect at once; the default backlog of 5 resets them
+    request_queue_size = 128
+    over_http = True
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    request_queue_size = 128
+    over_http = False
+
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)  # Stale socket from a previous run
+        super().server_bind()
+        # Only the owner may submit orders
+        os.chmod(self.server_address, 0o600)
+
+
+class BotDaemon:
+    """Serve a warm SimplifiedBot over local HTTP and/or a Unix socket
+
+    Each connection is handled on its own thread and kept alive, so many
+    concurrent submitters share the bot's client, rate limiter and
+    connection pool without reconnecting per order.
+    """
+
+    def __init__(self, bot, host="127.0.0.1", port=8765, unix_socket=None, token=None, batch_workers=8,
+                 logger=None, allow_no_token=False):
+        """Initialize the daemon
+
+        Args:
+            bot (SimplifiedBot): Connected bot
+            host (str): HTTP bind address (keep it local)
+            port (int): HTTP port; None disables HTTP
+            unix_socket (str): Unix socket path; None disables it
+            token (str): Require "Authorization: Bearer <token>" on every request
+            batch_workers (int): Orders of one list request executed concurrently
+            logger (logging.Logger): Optional logger
+            allow_no_token (bool): Serve HTTP without a token (any local process may submit orders)
+
+        Raises:
+            ValueError: No listener, or HTTP enabled without a token
+        """
+        if port is None and not unix_socket:
+            raise ValueError("Enable HTTP (port) and/or a Unix socket")
+        if port is not None and not token and not allow_no_token:
+            raise ValueError("HTTP needs a token (--token or $BOT_DAEMON_TOKEN); or serve only the Unix socket "
+                             "(--port -1 --socket PATH), or pass --no-token to accept any local caller")
+        self.bot = bot
+        self.host = host
+        self.port = port
+        self.unix_socket = unix_socket
+        self.token = token
+        self.batch_workers = batch_workers
+        self.logger = logger
+        self.started_at = None
+        self.stats = {'requests': 0, 'errors': 0}
+        self._servers = []
+        self._threads = []
+        self._stopped = threading.Event()
+        self._stats_lock = threading.Lock()
+
+    def authorized(self, header):
+        if not self.token:
+            return True
+        return header is not None and hmac.compare_digest(header.encode(), f"Bearer {self.token}".encode())
+
+    def local_hosts(self):
+        """Host header values a request to the HTTP listener may carry"""
+        return {f"{host}:{self.port}" for host in (self.host, "127.0.0.1", "localhost", "[::1]")}
+
+    def check_origin(self, headers, over_http=True):
+        """Refuse browser requests from other sites (CSRF) and rebound host names
+
+        Raises:
+            DaemonError: 403 for a foreign Origin, or a foreign Host over HTTP
+        """
+        origin = headers.get("Origin")
+        if origin is not None and origin.rstrip("/").partition("://")[2] not in self.local_hosts():
+            raise DaemonError(403, f"Cross-origin request from {origin} refused")
+        host = headers.get("Host")
+        if over_http and host is not None and host.lower() not in self.local_hosts():
+            raise DaemonError(403, f"Unexpected Host header {host!r}")
+
+    def start(self):
+        """Bind the listeners and serve them on background threads"""
+        if self.port is not None:
+            self._servers.append(_HTTPServer((self.host, self.port), _Handler))
+        if self.unix_socket:
+            self._servers.append(_UnixHTTPServer(self.unix_socket, _Handler))
+        for server in self._servers:
+            server.bot_daemon = self
+            server.daemon_threads = True
+            thread = threading.Thread(target=server.serve_forever, name="DaemonServer", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        if self.port == 0 and self._servers:
+            self.port = self._servers[0].server_address[1]
+        self.started_at = time.time()
+        if self.logger:
+            self.logger.info("✅ Daemon listening on %s", ", ".join(self.addresses()))
+        return self
+
+    def addresses(self):
+        addresses = []
+        if self.port is not None:
+            addresses.append(f"http://{self.host}:{self.port}")
+        if self.unix_socket:
+            addresses.append(f"unix:{self.unix_socket}")
+        return addresses
+
+    def wait(self, timeout=None):
+        """Block until stop() (e.g. from a signal handler or POST /shutdown)"""
+        return self._stopped.wait(timeout)
+
+    def stop(self):
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+        if self.unix_socket and os.path.exists(self.unix_socket):
+            os.unlink(self.unix_socket)
+        self._servers = []
+        self._stopped.set()
+        if self.logger:
+            self.logger.info("Daemon stopped after %s requests", self.stats['requests'])
+
+    def handle(self, method, path, body=None):
+        """Route one request
+
+        Args:
+            method (str): 'GET' or 'POST'
+            path (str): Request path
+            body: Decoded JSON body
+
+        Returns:
+            tuple: (HTTP status, JSON-serializable payload or Prometheus text)
+        """
+        with self._stats_lock:
+            self.stats['requests'] += 1
+        parts = [p for p in path.split("?", 1)[0].split("/") if p]
+        try:
+            status, payload = self._route(method, parts, body)
+        except DaemonError:
+            with self._stats_lock:
+                self.stats['errors'] += 1
+            raise
+        except (ValueError, TypeError, KeyError) as e:
+            status, payload = 400, {"ok": False, "error": str(e)}
+        if status >= 400:
+            with self._stats_lock:
+                self.stats['errors'] += 1
+        return status, payload
+
+    def _route(self, method, parts, body):
+        route = (method, parts[0] if parts else "")
+        if route == ("GET", "health"):
+            return 200, {"ok": True, "uptime_s": round(time.time() - self.started_at, 3), **self.stats}
+        if route == ("GET", "account"):
+            return self._result(self.bot.get_account_info())
+        if route == ("GET", "orders") and len(parts) == 3:
+            return self._result(self.bot.get_order_status(parts[1], int(parts[2])))
+        if route == ("GET", "metrics"):
+            if not self.bot.metrics.enabled:
+                raise DaemonError(404, "Metrics are disabled; start the daemon with --metrics")
+            return 200, self.bot.metrics.to_prometheus()
+        if route == ("POST", "orders"):
+            if isinstance(body, list):
+                return self._batch(body)
+            if not isinstance(body, dict):
+                raise DaemonError(400, "Expected an order object or a list of them")
+            order_type, kwargs = parse_order(body)
+            return self._result(execute_order(self.bot, order_type, kwargs))
+        if route == ("POST", "amend"):
+            body = self._object(body)
+            return self._result(self.bot.amend_order(
+                body['symbol'], int(body['order_id']), _float(body.get('price')),
+                _float(body.get('quantity')), _float(body.get('stop_price')),
+            ))
+        if route == ("POST", "cancel"):
+            body = self._object(body)
+            return self._result(self.bot.cancel_order(body['symbol'], int(body['order_id'])))
+        if route == ("POST", "shutdown"):
+            # Answer first; stopping joins the server threads
+            threading.Timer(0.05, self.stop).start()
+            return 200, {"ok": True}
+        raise DaemonError(404, f"No route for {method} /{'/'.join(parts)}")
+
+    @staticmethod
+    def _object(body):
+        if not isinstance(body, dict):
+            raise DaemonError(400, "Expected a JSON object")
+        return body
+
+    @staticmethod
+    def _result(result):
+        if result is None:
+            return 422, {"ok": False, "error": "Request failed, see bot.log"}
+        return 200, {"ok": True, "result": result}
+
+    def _batch(self, records):
+        output = io.StringIO()
+        summary = run_batch(self.bot, records, output, self.batch_workers)
+        results = sorted((json.loads(line) for line in output.getvalue().splitlines()), key=lambda r: r["line"])
+        return 200, {"ok": summary["failed"] == 0, "summary": summary, "results": results}
+
+
+def _media_type(content_type):
+    return (content_type or "").split(";", 1)[0].strip().lower()
+
+
+def _float(value):
+    return float(value) if value is not None else None
@@ -0,0 +1,481 @@
+import json
+import os
+import threading
+import time
+import uuid
+from transport import (
+    EXECUTION_STATUS_UNKNOWN, ORDER_DOES_NOT_EXIST, UNKNOWN_ORDER_SENT, OrderStateUnknown, new_client_order_id,
+    outcome_unknown,
+)
+
+FINAL_STATUSES = ("FILLED", "CANCELED", "EXPIRED", "REJECTED", "CLOSED", "LOST")
+
+# Entry layouts (one compact JSON array per line):
+#   ["I", ts, cid, params]                              order intent, written before sending
+#   ["A", ts, cid, orderId, status, executedQty]        exchange acknowledgement
+#   ["R", ts, cid, error]                               rejected by the exchange
+#   ["U", ts, cid, status, executedQty]                 status change (fill, cancel, recovery)
+#   ["S", ts, key, symbol, side, interval, chunks]      TWAP schedule with its chunk params
+#   ["E", ts, key, state]                               schedule finished
+INTENT, ACK, REJECT, UPDATE, SCHEDULE, SCHEDULE_END = "I", "A", "R", "U", "S", "E"
+
+
+class OrderJournal:
+    """Append-only JSONL journal of order intents, acks, fills and cancels
+
+    Every entry is written and flushed to the OS as it is appended, so a
+    process crash loses nothing; fsync runs in batches on a background
+    thread (every ``sync_interval`` seconds) so the order path never waits
+    on the disk. Opening a journal replays it into an index by
+    clientOrderId; recover() reconciles that index with the exchange.
+    """
+
+    def __init__(self, path="orders.journal", sync_interval=0.05, logger=None):
+        """Open (and replay) a journal
+
+        Args:
+            path (str): Journal file
+            sync_interval (float): Seconds between batched fsyncs (0: fsync every entry)
+            logger (logging.Logger): Optional logger
+        """
+        self.path = path
+        self.sync_interval = sync_interval
+        self.logger = logger
+        self.orders = {}     # cid -> {'symbol', 'params', 'orderId', 'status', 'executedQty'}
+        self.schedules = {}  # key -> {'symbol', 'side', 'interval', 'chunk_orders', 'state'}
+        self.entries = 0
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._closed = threading.Event()
+
+        self.replay()
+        self._file = open(path, "a", encoding="utf-8")
+        self._thread = None
+        if sync_interval > 0:
+            self._thread = threading.Thread(target=self._sync_loop, name="OrderJournalSync", daemon=True)
+            self._thread.start()
+
+    # Replay --------------------------------------------------------------
+
+    def replay(self):
+        """Rebuild the in-memory index from the journal file
+
+        The scan only splits each line on its first quotes to find the
+        entry type and clientOrderId, keeping the latest line per order;
+        each order's final state is then decoded once, and intent params
+        only for orders that are still unfinished.
+
+        Returns:
+            int: Entries replayed
+        """
+        self.orders = {}
+        self.schedules = {}
+        self.entries = 0
+        if not os.path.exists(self.path):
+            return 0
+
+        with open(self.path, "rb") as f:
+            lines = f.read().split(b"\n")
+        if lines and not lines[-1]:
+            lines.pop()
+
+        intents, acks, latest = {}, {}, {}
+        last = len(lines) - 1
+        for n, line in enumerate(lines):
+            # ["<type>",ts,"<cid or key>",...]
+            parts = line.split(b'"', 4)
+            if len(parts) < 5 or line[-1:] != b"]":
+                if n == last:
+                    # Torn final write from a crash: cut it so new entries start on a fresh line
+                    with open(self.path, "r+b") as f:
+                        f.truncate(os.path.getsize(self.path) - len(line))
+                    lines.pop()
+                    break
+                raise ValueError(f"Corrupt journal entry at line {n + 1} of {self.path}")
+            kind = parts[1]
+            if kind == b"U" or kind == b"R":
+                latest[parts[3]] = line
+            elif kind == b"A":
+                acks[parts[3]] = latest[parts[3]] = line
+            elif kind == b"I":
+                # A resent intent starts the order over
+                cid = parts[3]
+                intents[cid] = parts[4]
+                acks.pop(cid, None)
+                latest.pop(cid, None)
+            else:
+                self._apply(json.loads(line))
+
+        orders = self.orders
+        for cid, params in intents.items():
+            record = {'symbol': None, 'params': params[1:-1], 'orderId': None, 'status': "INTENT",
+                      'executedQty': "0"}
+            ack = acks.get(cid)
+            if ack is not None:
+                # ["A",ts,"cid",orderId,"status","qty"]
+                fields = ack.split(b'"')
+                record['orderId'] = json.loads(fields[4][1:-1])
+            line = latest.get(cid)
+            if line is not None:
+                if line[2:3] == b"R":
+                    record['status'] = "REJECTED"
+                    record['error'] = json.loads(line)[3]
+                else:
+                    # ["U",ts,"cid","status","qty"] or the ack above
+                    fields = line.split(b'"')
+                    record['status'] = fields[5].decode()
+                    record['executedQty'] = fields[7].decode()
+            # Only unfinished orders need their request params
+            if record['status'] in FINAL_STATUSES:
+                record['params'] = None
+            else:
+                record['params'] = json.loads(record['params'])
+                record['symbol'] = record['params'].get('symbol')
+            orders[cid.decode()] = record
+
+        self.entries = len(lines)
+        return self.entries
+
+    def _apply(self, entry):
+        kind = entry[0]
+        if kind == UPDATE:
+            record = self.orders.get(entry[2])
+            if record is not None:
+                record['status'] = entry[3]
+                record['executedQty'] = entry[4]
+        elif kind == INTENT:
+            params = entry[3]
+            self.orders[entry[2]] = {
+                'symbol': params.get('symbol'),
+                'params': params,
+                'orderId': None,
+                'status': "INTENT",
+                'executedQty': "0",
+            }
+        elif kind == ACK:
+            record = self.orders.get(entry[2])
+            if record is not None:
+                record['orderId'] = entry[3]
+                record['status'] = entry[4]
+                record['executedQty'] = entry[5]
+        elif kind == REJECT:
+            record = self.orders.get(entry[2])
+            if record is not None:
+                record['status'] = "REJECTED"
+                record['error'] = entry[3]
+        elif kind == SCHEDULE:
+            self.schedules[entry[2]] = {
+                'symbol': entry[3],
+                'side': entry[4],
+                'interval': entry[5],
+                'chunk_orders': entry[6],
+                'state': "ACTIVE",
+            }
+        elif kind == SCHEDULE_END:
+            schedule = self.schedules.get(entry[2])
+            if schedule is not None:
+                schedule['state'] = entry[3]
+
+    # Writing -------------------------------------------------------------
+
+    def _append(self, entry):
+        line = json.dumps(entry, separators=(",", ":"), default=str) + "\n"
+        with self._lock:
+            self._apply(entry)
+            self._file.write(line)
+            self._file.flush()
+            self.entries += 1
+            if self.sync_interval > 0:
+                self._dirty = True
+            else:
+                os.fsync(self._file.fileno())
+
+    def record_intent(self, cid, params):
+        self._append([INTENT, time.time(), cid, params])
+
+    def record_ack(self, cid, order):
+        self._append([ACK, time.time(), cid, order.get('orderId'), order.get('status', "NEW"),
+                      str(order.get('executedQty', "0"))])
+
+    def record_reject(self, cid, error):
+        self._append([REJECT, time.time(), cid, str(error)])
+
+    def record_update(self, cid, status, executed_qty="0"):
+        self._append([UPDATE, time.time(), cid, status, str(executed_qty)])
+
+    def begin_schedule(self, symbol, side, chunk_orders, interval):
+        """Journal a TWAP schedule, giving each chunk a deterministic clientOrderId
+
+        The chunk params are modified in place, so resent chunks reuse their
+        ids and the exchange rejects duplicates.
+
+        Returns:
+            str: Schedule key
+        """
+        key = uuid.uuid4().hex[:20]
+        for i, params in enumerate(chunk_orders):
+            params['newClientOrderId'] = f"twap-{key}-{i}"
+        self._append([SCHEDULE, time.time(), key, symbol, side, interval, chunk_orders])
+        return key
+
+    def end_schedule(self, key, state):
+        self._append([SCHEDULE_END, time.time(), key, state])
+
+    def on_event(self, event):
+        """UserDataStream listener: journal status changes of journaled orders"""
+        if event.get('e') != "ORDER_TRADE_UPDATE":
+            return
+        o = event['o']
+        record = self.orders.get(o.get('c'))
+        if record is not None and (record['status'] != o['X'] or record['executedQty'] != o.get('z')):
+            if record['orderId'] is None:
+                self.record_ack(o['c'], {'orderId': o['i'], 'status': o['X'], 'executedQty': o.get('z', "0")})
+            else:
+                self.record_update(o['c'], o['X'], o.get('z', "0"))
+
+    def attach(self, user_stream):
+        """Journal fills and cancels pushed by a UserDataStream"""
+        user_stream.add_listener(self.on_event)
+
+    def sync(self):
+        """Flush and fsync now"""
+        with self._lock:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._dirty = False
+
+    def _sync_loop(self):
+        while not self._closed.wait(self.sync_interval):
+            if self._dirty:
+                try:
+                    self.sync()
+                except (OSError, ValueError):
+                    return
+
+    def close(self):
+        """Final fsync and close"""
+        self._closed.set()
+        if self._thread:
+            self._thread.join()
+        self.sync()
+        self._file.close()
+
+    def compact(self):
+        """Rewrite the journal with only unfinished orders and schedules
+
+        Keeps replay time proportional to live state instead of history.
+
+        Returns:
+            int: Entries in the compacted journal
+        """
+        with self._lock:
+            now = time.time()
+            entries = []
+            for key, schedule in self.schedules.items():
+                if schedule['state'] == "ACTIVE":
+                    entries.append([SCHEDULE, now, key, schedule['symbol'], schedule['side'],
+                                    schedule['interval'], schedule['chunk_orders']])
+                    # Finished chunks must survive so they are not resent
+                    for params in schedule['chunk_orders']:
+                        record = self.orders.get(params['newClientOrderId'])
+                        if record is not None and record['status'] in FINAL_STATUSES and record['status'] != "LOST":
+                            entries.append([INTENT, now, params['newClientOrderId'], params])
+                            entries.append([UPDATE, now, params['newClientOrderId'], record['status'],
+                                            record['executedQty']])
+            for cid, record in self.orders.items():
+                if record['status'] not in FINAL_STATUSES:
+                    entries.append([INTENT, now, cid, record['params']])
+                    if record['orderId'] is not None:
+                        entries.append([ACK, now, cid, record['orderId'], record['status'], record['executedQty']])
+
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for entry in entries:
+                    f.write(json.dumps(entry, separators=(",", ":"), default=str) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._file.close()
+            os.replace(tmp_path, self.path)
+            self._file = open(self.path, "a", encoding="utf-8")
+            self._dirty = False
+
+        self.replay()
+        return self.entries
+
+    # Recovery ------------------------------------------------------------
+
+    def recover(self, client, lookup_attempts=3, retry_delay=1.0):
+        """Reconcile the journal with the exchange after a restart
+
+        Unfinished orders are matched against one futures_get_open_orders()
+        call. Only intents that were never acknowledged (in flight at the
+        crash) are looked up individually by clientOrderId. Acknowledged
+        orders that are no longer open are marked CLOSED; intents the
+        exchange reports as unknown (-2013/-2011) are marked LOST so their
+        chunks can be resent.
+
+        Args:
+            client: Exchange client
+            lookup_attempts: Tries per in-flight intent before giving up
+            retry_delay: Seconds between lookup tries
+
+        Returns:
+            dict: open orders, lost intents, OCO pairs/orphans, unfinished
+                schedules (remaining chunk params) and elapsed time
+
+        Raises:
+            OrderStateUnknown: An in-flight intent could not be looked up
+                (timeout, rate limit, ...). It stays pending and nothing is
+                resumed; run recover again once the exchange answers.
+        """
+        start = time.perf_counter()
+        pending = [cid for cid, record in self.orders.items() if record['status'] not in FINAL_STATUSES]
+        open_orders = {o.get('clientOrderId'): o for o in client.futures_get_open_orders()} if pending else {}
+
+        open_records, lost = [], []
+        for cid in pending:
+            record = self.orders[cid]
+            order = open_orders.get(cid)
+            if order is None and record['orderId'] is None:
+                order = self._lookup_intent(client, cid, record['symbol'], lookup_attempts, retry_delay)
+                if order is None:
+                    self.record_update(cid, "LOST")
+                    lost.append(cid)
+                    continue
+            if order is None:
+                self.record_update(cid, "CLOSED", record['executedQty'])
+                continue
+            if record['orderId'] is None:
+                self.record_ack(cid, order)
+            elif order.get('status') != record['status']:
+                self.record_update(cid, order.get('status'), order.get('executedQty', "0"))
+            if order.get('status') not in FINAL_STATUSES:
+                open_records.append(dict(self.orders[cid], clientOrderId=cid))
+
+        report = {
+            'entries': self.entries,
+            'orders': len(self.orders),
+            'reconciled': len(pending),
+            'open_orders': open_records,
+            'lost': lost,
+            'oco': self._oco_groups(),
+            'schedules': self._unfinished_schedules(),
+        }
+        report['elapsed_s'] = round(time.perf_counter() - start, 6)
+        if self.logger:
+            self.logger.info(
+                "Journal recovered: %s entries, %s open orders, %s lost intents, %s schedules to resume",
+                report['entries'], len(open_records), len(lost), len(report['schedules'])
+            )
+        return report
+
+    def _lookup_intent(self, client, cid, symbol, attempts, retry_delay):
+        """Exchange copy of an unacknowledged order, or None if it never arrived"""
+        for attempt in range(attempts):
+            try:
+                return client.futures_get_order(symbol=symbol, origClientOrderId=cid)
+            except Exception as e:
+                if getattr(e, "code", None) in (ORDER_DOES_NOT_EXIST, UNKNOWN_ORDER_SENT):
+                    return None
+                # Anything else says nothing about the order; marking it LOST would resend a live chunk
+                if attempt + 1 == attempts:
+                    raise OrderStateUnknown(cid, e) from e
+                if self.logger:
+                    self.logger.warning("Lookup of in-flight order %s failed (%s), retrying", cid, e)
+                time.sleep(retry_delay)
+
+    def _oco_groups(self):
+        """OCO legs (clientOrderId oco-<key>-tp/-sl) grouped by pair"""
+        legs = {}
+        for cid, record in self.orders.items():
+            if cid.startswith("oco-"):
+                key, _, leg = cid[4:].rpartition("-")
+                legs.setdefault(key, {})[leg] = record
+        pairs, orphans = [], []
+        for key, group in legs.items():
+            live = {leg: r for leg, r in group.items() if r['status'] not in FINAL_STATUSES}
+            if len(live) == 2:
+                pairs.append((group['tp']['symbol'], group['tp']['orderId'], group['sl']['orderId']))
+            elif len(live) == 1:
+                # The other leg filled, failed or never arrived: this one must go
+                record = next(iter(live.values()))
+                orphans.append((record['symbol'], record['orderId']))
+        return {'pairs': pairs, 'orphans': orphans}
+
+    def _unfinished_schedules(self):
+        schedules = []
+        for key, schedule in self.schedules.items():
+            if schedule['state'] != "ACTIVE":
+                continue
+            remaining = []
+            for params in schedule['chunk_orders']:
+                record = self.orders.get(params['newClientOrderId'])
+                if record is None or record['status'] == "LOST":
+                    remaining.append(params)
+            if not remaining:
+                self.end_schedule(key, "COMPLETED")
+                continue
+            schedules.append({
+                'key': key,
+                'symbol': schedule['symbol'],
+                'side': schedule['side'],
+                'interval': schedule['interval'],
+                'chunk_orders': remaining,
+                'executed_chunks': len(schedule['chunk_orders']) - len(remaining),
+            })
+        return schedules
+
+
+class JournaledClient:
+    """Client wrapper that journals every order intent before it is sent
+
+    Orders get a newClientOrderId if they have none, so each journal entry
+    can be matched to the exchange's order after a crash. Other attribute
+    access is forwarded to the wrapped client.
+    """
+
+    def __init__(self, client, journal):
+        self.client = client
+        self.journal = journal
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    def futures_create_order(self, **params):
+        if not params.get("newClientOrderId"):
+            params["newClientOrderId"] = new_client_order_id()
+        cid = params["newClientOrderId"]
+        self.journal.record_intent(cid, params)
+        try:
+            order = self.client.futures_create_order(**params)
+        except Exception as e:
+            # Timeouts, failed lookups, -1007 and 5xx may have been executed: the
+            # intent stays pending for recover() to resolve
+            if not outcome_unknown(e):
+                self.journal.record_reject(cid, e)
+            raise
+        self.journal.record_ack(cid, order)
+        return order
+
+    def futures_place_batch_order(self, batchOrders, **kwargs):
+        # Copies: the caller's dicts must not pick up our clientOrderIds
+        batchOrders = [dict(params) for params in batchOrders]
+        for params in batchOrders:
+            if not params.get("newClientOrderId"):
+                params["newClientOrderId"] = new_client_order_id()
+            self.journal.record_intent(params["newClientOrderId"], params)
+        results = self.client.futures_place_batch_order(batchOrders=batchOrders, **kwargs)
+        for params, result in zip(batchOrders, results):
+            if 'code' in result and 'orderId' not in result:
+                if result['code'] != EXECUTION_STATUS_UNKNOWN:
+                    self.journal.record_reject(params["newClientOrderId"], result.get('msg'))
+            else:
+                self.journal.record_ack(params["newClientOrderId"], result)
+        return results
+
+    def futures_cancel_order(self, **params):
+        result = self.client.futures_cancel_order(**params)
+        cid = result.get('clientOrderId')
+        if cid in self.journal.orders:
+            self.journal.record_update(cid, result.get('status', "CANCELED"), result.get('executedQty', "0"))
+        return result
@@ -1,11 +1,12 @@
 class LimitOrder:
     """Place limit orders at specific price levels"""
     
-    def __init__(self, client):
+    def __init__(self, client, symbol_filters=None):
         self.client = client
+        self.symbol_filters = symbol_filters
 
-    def place_order(self, symbol, side, quantity, price):
-        """Place a limit order
+    def build_order(self, symbol, side, quantity, price):
+        """Validate inputs and build limit order request parameters
         
         Args:
             symbol (str): Trading pair (e.g., 'BTCUSDT')
@@ -14,7 +15,7 @@ class LimitOrder:
             price (float): Desired price level
             
         Returns:
-            dict: Order response from Binance API
+            dict: Keyword arguments for futures_create_order
         """
         side = side.upper()
         if side not in ["BUY", "SELL"]:
@@ -26,11 +27,31 @@ class LimitOrder:
         if price <= 0:
             raise ValueError("Price must be positive")
         
-        return self.client.futures_create_order(
+        # Quantize to the symbol's lot/tick size and check min notional
+        if self.symbol_filters:
+            quantity, price = self.symbol_filters.get(symbol).validate(quantity, price)
+        
+        return dict(
             symbol=symbol.upper(),
             side=side,
             type="LIMIT",
             timeInForce="GTC",
             quantity=quantity,
             price=price
+        )
+
+    def place_order(self, symbol, side, quantity, price):
+        """Place a limit order
+        
+        Args:
+            symbol (str): Trading pair (e.g., 'BTCUSDT')
+            side (str): 'BUY' or 'SELL'
+            quantity (float): Amount to trade
+            price (float): Desired price level
+            
+        Returns:
+            dict: Order response from Binance API
+        """
+        return self.client.futures_create_order(
+            **self.build_order(symbol, side, quantity, price)
         )
\ No newline at end of file
@@ -0,0 +1,209 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Argument types that cannot change between the log call and formatting
+_IMMUTABLE_ARG_TYPES = frozenset({str, int, float, bool, bytes, type(None)})
+
+_pipelines_lock = threading.Lock()
+
+
+class JsonLineFormatter(logging.Formatter):
+    """One compact JSON object per record"""
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+class _LazyQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that defers message formatting to the listener thread
+
+    The stock QueueHandler formats every record in the caller's thread so it
+    can be pickled; records here never leave the process, so the caller only
+    pays for an enqueue. Messages whose arguments could still change (dicts,
+    lists, order objects) are interpolated before enqueueing, so the log
+    shows their state at the time of the call.
+    """
+
+    def prepare(self, record):
+        args = record.args
+        if not isinstance(record.msg, str) or (args and not (
+                type(args) is tuple and all(type(arg) in _IMMUTABLE_ARG_TYPES for arg in args))):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+class _BatchFlushMixin:
+    """File handler that flushes once per batch instead of once per record"""
+
+    def flush(self):
+        pass
+
+    def flush_batch(self):
+        self.acquire()
+        try:
+            if self.stream and hasattr(self.stream, "flush"):
+                self.stream.flush()
+        finally:
+            self.release()
+
+
+class BatchRotatingFileHandler(_BatchFlushMixin, logging.handlers.RotatingFileHandler):
+    """Size-rotated log file flushed per batch"""
+
+
+class BatchTimedRotatingFileHandler(_BatchFlushMixin, logging.handlers.TimedRotatingFileHandler):
+    """Time-rotated log file flushed per batch"""
+
+
+class BatchingQueueListener:
+    """Drain a log queue on a background thread, writing records in batches"""
+
+    _SENTINEL = None
+
+    def __init__(self, log_queue, handlers, batch_size=256):
+        self.queue = log_queue
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="LogPipeline", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread:
+            self.queue.put(self._SENTINEL)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = False
+            for record in batch:
+                if record is self._SENTINEL:
+                    stop = True
+                    continue
+                for handler in self.handlers:
+                    if record.levelno >= handler.level:
+                        handler.handle(record)
+            for handler in self.handlers:
+                if hasattr(handler, "flush_batch"):
+                    handler.flush_batch()
+                else:
+                    handler.flush()
+            if stop:
+                return
+
+
+class LogPipeline:
+    """Queue-based logging: callers enqueue, a listener thread does the I/O
+
+    Use get_pipeline() to share one pipeline per logger instead of building
+    a new listener thread and file handle for every caller.
+    """
+
+    def __init__(self, logger, path="bot.log", level=logging.INFO, json_lines=False, console=True,
+                 max_bytes=10 * 1024 * 1024, backup_count=5, when=None, batch_size=256):
+        """Attach a non-blocking pipeline to ``logger``
+
+        Args:
+            logger (logging.Logger): Logger to attach to (existing handlers are removed)
+            path (str): Log file path
+            level (int): Minimum level
+            json_lines (bool): Write compact JSON lines instead of text
+            console (bool): Also write to stderr
+            max_bytes (int): Rotate the file at this size (0 disables)
+            backup_count (int): Rotated files to keep
+            when (str): Rotate by time instead of size (e.g. 'midnight', 'H')
+            batch_size (int): Maximum records written per flush
+        """
+        # What get_pipeline() compares to decide whether this pipeline can be reused
+        self.settings = (os.path.abspath(path), level, json_lines, console, max_bytes, backup_count, when,
+                         batch_size)
+        formatter = JsonLineFormatter() if json_lines else logging.Formatter(TEXT_FORMAT)
+
+        if when:
+            fh = BatchTimedRotatingFileHandler(path, when=when, backupCount=backup_count, encoding="utf-8")
+        else:
+            fh = BatchRotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        fh.setLevel(level)
+        fh.setFormatter(formatter)
+        handlers = [fh]
+
+        if console:
+            ch = logging.StreamHandler(sys.stderr)
+            ch.setLevel(level)
+            ch.setFormatter(formatter)
+            handlers.append(ch)
+
+        self.logger = logger
+        self.queue = queue.SimpleQueue()
+        self.listener = BatchingQueueListener(self.queue, handlers, batch_size)
+
+        logger.setLevel(level)
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+            owner = getattr(handler, "pipeline", None)
+            if owner is not None:
+                owner.stop()
+        queue_handler = _LazyQueueHandler(self.queue)
+        queue_handler.pipeline = self
+        logger.addHandler(queue_handler)
+        self.handler = queue_handler
+
+        self.stopped = False
+        self.listener.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        """Flush pending records and stop the listener thread"""
+        if self.stopped:
+            return
+        self.stopped = True
+        atexit.unregister(self.stop)
+        # Nothing would drain the queue any more
+        self.logger.removeHandler(self.handler)
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            if isinstance(handler, logging.FileHandler):
+                handler.close()
+
+
+def get_pipeline(logger, path="bot.log", level=logging.INFO, json_lines=False, console=True,
+                 max_bytes=10 * 1024 * 1024, backup_count=5, when=None, batch_size=256):
+    """Return the running pipeline attached to ``logger``, creating it if needed
+
+    A pipeline built with the same settings is reused; otherwise a new one
+    replaces (and stops) it. Arguments are those of LogPipeline.
+    """
+    settings = (os.path.abspath(path), level, json_lines, console, max_bytes, backup_count, when, batch_size)
+    with _pipelines_lock:
+        for handler in logger.handlers:
+            pipeline = getattr(handler, "pipeline", None)
+            if pipeline is not None and not pipeline.stopped and pipeline.settings == settings:
+                return pipeline
+        return LogPipeline(logger, path, level, json_lines, console, max_bytes, backup_count, when, batch_size)
@@ -1,11 +1,12 @@
 class MarketOrder:
     """Execute market orders immediately at current market price"""
     
-    def __init__(self, client):
+    def __init__(self, client, symbol_filters=None):
         self.client = client
+        self.symbol_filters = symbol_filters
 
-    def place_order(self, symbol, side, quantity):
-        """Place a market order
+    def build_order(self, symbol, side, quantity):
+        """Validate inputs and build market order request parameters
         
         Args:
             symbol (str): Trading pair (e.g., 'BTCUSDT')
@@ -13,7 +14,7 @@ class MarketOrder:
             quantity (float): Amount to trade
             
         Returns:
-            dict: Order response from Binance API
+            dict: Keyword arguments for futures_create_order
         """
         side = side.upper()
         if side not in ["BUY", "SELL"]:
@@ -23,9 +24,28 @@ class MarketOrder:
         if quantity <= 0:
             raise ValueError("Quantity must be positive")
         
-        return self.client.futures_create_order(
+        # Quantize to the symbol's lot size before anything is sent
+        if self.symbol_filters:
+            quantity, _ = self.symbol_filters.get(symbol).validate(quantity, market=True)
+        
+        return dict(
             symbol=symbol.upper(),
             side=side,
             type="MARKET",
             quantity=quantity
+        )
+
+    def place_order(self, symbol, side, quantity):
+        """Place a market order
+        
+        Args:
+            symbol (str): Trading pair (e.g., 'BTCUSDT')
+            side (str): 'BUY' or 'SELL'
+            quantity (float): Amount to trade
+            
+        Returns:
+            dict: Order response from Binance API
+        """
+        return self.client.futures_create_order(
+            **self.build_order(symbol, side, quantity)
         )
\ No newline at end of file
@@ -0,0 +1,252 @@
+import bisect
+import os
+import threading
+import time
+
+# Histogram bucket upper bounds in seconds (Prometheus "le" labels)
+LATENCY_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram with approximate percentiles"""
+
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def percentile(self, q):
+        """Estimate the q-th quantile (0-1) by interpolating inside its bucket"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = LATENCY_BUCKETS[i - 1] if i > 0 else 0.0
+                upper = LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else LATENCY_BUCKETS[-1]
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return LATENCY_BUCKETS[-1]
+
+
+class Span:
+    """Timing of one order placement, split into stages
+
+    Stages are measured with a monotonic clock between successive mark()
+    calls; marking the same stage twice adds to it.
+    """
+
+    __slots__ = ("recorder", "order_type", "symbol", "start", "last", "stages", "_previous")
+
+    def __init__(self, recorder, order_type, symbol):
+        self.recorder = recorder
+        self.order_type = order_type
+        self.symbol = symbol
+        self.stages = {}
+
+    def mark(self, stage):
+        """Close the current stage: time since the previous mark goes to ``stage``"""
+        now = time.perf_counter_ns()
+        self.stages[stage] = self.stages.get(stage, 0) + now - self.last
+        self.last = now
+
+    def add(self, stage, elapsed_ns):
+        """Attribute a duration measured elsewhere to ``stage``"""
+        self.stages[stage] = self.stages.get(stage, 0) + elapsed_ns
+
+    def __enter__(self):
+        local = self.recorder._local
+        self._previous = getattr(local, "span", NULL_SPAN)
+        local.span = self
+        self.start = self.last = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        self.recorder._local.span = self._previous
+        self.recorder._finish(self, end - self.start, exc_type is not None)
+        return False
+
+
+class _NullSpan:
+    """No-op span returned while instrumentation is disabled"""
+
+    __slots__ = ()
+
+    def mark(self, stage):
+        pass
+
+    def add(self, stage, elapsed_ns):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class LatencyRecorder:
+    """Per-order-type/symbol latency histograms for each placement stage
+
+    Stages recorded by InstrumentedClient:
+        validate: span start until the request is handed to the client
+                  (local validation, quantization, risk checks)
+        request:  client call until the response is parsed (network,
+                  exchange processing, rate-limit queueing)
+        sign:     HMAC signing, measured inside ``request``
+        total:    whole span
+    With enabled=False, span() returns a shared no-op object.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._histograms = {}
+        self._errors = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def span(self, order_type, symbol):
+        """Context manager timing one order placement"""
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, order_type, symbol.upper())
+
+    def current(self):
+        """Span active on this thread, or the no-op span"""
+        return getattr(self._local, "span", NULL_SPAN)
+
+    def observe(self, order_type, symbol, stage, seconds):
+        """Record a latency measured outside a span"""
+        with self._lock:
+            self._observe_locked(order_type, symbol, stage, seconds)
+
+    def _finish(self, span, total_ns, failed):
+        with self._lock:
+            if failed:
+                key = (span.order_type, span.symbol)
+                self._errors[key] = self._errors.get(key, 0) + 1
+                return
+            for stage, elapsed_ns in span.stages.items():
+                self._observe_locked(span.order_type, span.symbol, stage, elapsed_ns / 1e9)
+            self._observe_locked(span.order_type, span.symbol, "total", total_ns / 1e9)
+
+    def _observe_locked(self, order_type, symbol, stage, seconds):
+        key = (order_type, symbol, stage)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = Histogram()
+        histogram.observe(seconds)
+
+    def summary(self):
+        """Percentiles per (order type, symbol, stage)
+
+        Returns:
+            dict: {(order_type, symbol, stage): {count, mean, p50, p90, p99}} in seconds
+        """
+        with self._lock:
+            return {
+                key: {
+                    "count": h.count,
+                    "mean": h.total / h.count,
+                    "p50": h.percentile(0.50),
+                    "p90": h.percentile(0.90),
+                    "p99": h.percentile(0.99),
+                }
+                for key, h in self._histograms.items()
+            }
+
+    def to_prometheus(self):
+        """Render all histograms in the Prometheus text exposition format"""
+        lines = [
+            "# HELP order_latency_seconds Order placement latency by stage",
+            "# TYPE order_latency_seconds histogram",
+        ]
+        with self._lock:
+            for (order_type, symbol, stage), h in sorted(self._histograms.items()):
+                labels = f'type="{order_type}",symbol="{symbol}",stage="{stage}"'
+                cumulative = 0
+                for bound, n in zip(LATENCY_BUCKETS, h.counts):
+                    cumulative += n
+                    lines.append(f'order_latency_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'order_latency_seconds_bucket{{{labels},le="+Inf"}} {h.count}')
+                lines.append(f"order_latency_seconds_sum{{{labels}}} {h.total:.9f}")
+                lines.append(f"order_latency_seconds_count{{{labels}}} {h.count}")
+
+            lines.append("# HELP order_errors_total Failed order placements")
+            lines.append("# TYPE order_errors_total counter")
+            for (order_type, symbol), n in sorted(self._errors.items()):
+                lines.append(f'order_errors_total{{type="{order_type}",symbol="{symbol}"}} {n}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path="metrics.prom"):
+        """Write Prometheus text to a file atomically (textfile-collector style)"""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+
+class InstrumentedClient:
+    """Client wrapper that marks validate/request stages on the current span
+
+    Wrap the outermost client so ``request`` covers everything below it.
+    """
+
+    TIMED_METHODS = ("futures_create_order", "futures_modify_order", "futures_place_batch_order",
+                     "futures_cancel_order")
+
+    def __init__(self, client, recorder):
+        self.client = client
+        self.recorder = recorder
+
+    def __getattr__(self, name):
+        attr = getattr(self.client, name)
+        if name not in self.TIMED_METHODS:
+            return attr
+
+        recorder = self.recorder
+
+        def timed(*args, **kwargs):
+            span = recorder.current()
+            span.mark("validate")
+            try:
+                return attr(*args, **kwargs)
+            finally:
+                span.mark("request")
+
+        return timed
+
+
+def instrument_signing(raw_client, recorder):
+    """Time HMAC signing of a binance.Client into the current span's ``sign`` stage
+
+    Works with python-binance's own signing and with an installed
+    time_sync.FastSigner (raw_client.signer).
+    """
+    signer = getattr(raw_client, "signer", None)
+    owner, name = (signer, "sign") if signer is not None else (raw_client, "_generate_signature")
+    generate_signature = getattr(owner, name)
+
+    def timed_signature(data):
+        start = time.perf_counter_ns()
+        try:
+            return generate_signature(data)
+        finally:
+            recorder.current().add("sign", time.perf_counter_ns() - start)
+
+    setattr(owner, name, timed_signature)
@@ -0,0 +1,309 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from market_orders import MarketOrder
+from limit_orders import LimitOrder
+from advanced.stop_limit import StopLimitOrder
+from advanced.oco import OCOOrder
+from advanced.twap import TWAPOrder
+from advanced.twap_scheduler import TWAPScheduler
+from symbol_filters import SymbolFilterCache
+from rate_limiter import RateLimitGovernor, RateLimitedClient
+from transport import TransportConfig, IdempotentOrderClient
+from startup import create_client
+
+# Binance request weight is counted per IP; order counts per account
+IP_WEIGHT_LIMIT = 2400
+
+OPERATIONS = ("market", "limit", "stop-limit", "oco", "twap", "account", "cancel-all")
+
+
+def build_client(api_key, api_secret, testnet=True, governor=None, logger=None, transport=None):
+    """Governed, pooled binance.Client stack for one account (as used by SimplifiedBot)"""
+    transport = transport or TransportConfig()
+    raw_client = create_client(api_key, api_secret, testnet, transport)
+    return RateLimitedClient(
+        IdempotentOrderClient(raw_client, transport.max_retries, logger),
+        governor=governor,
+        logger=logger,
+    )
+
+
+def execute_operation(client, operation, kwargs, symbol_filters=None, logger=None):
+    """Run one order operation against a client
+
+    Args:
+        client: Binance client (or compatible)
+        operation (str): One of OPERATIONS
+        kwargs (dict): Arguments of the order class's place_order
+        symbol_filters (SymbolFilterCache): Optional lot/tick size cache
+        logger (logging.Logger): Optional logger
+
+    Returns:
+        Order response(s) from the exchange
+    """
+    if operation == "market":
+        return MarketOrder(client, symbol_filters).place_order(**kwargs)
+    if operation == "limit":
+        return LimitOrder(client, symbol_filters).place_order(**kwargs)
+    if operation == "stop-limit":
+        return StopLimitOrder(client, symbol_filters).place_order(**kwargs)
+    if operation == "oco":
+        return OCOOrder(client, logger, symbol_filters).place_order(**kwargs)
+    if operation == "twap":
+        return TWAPOrder(client, logger, symbol_filters).place_order(**kwargs)
+    if operation == "account":
+        return client.futures_account()
+    if operation == "cancel-all":
+        return client.futures_cancel_all_open_orders(symbol=kwargs['symbol'].upper())
+    raise ValueError(f"Unknown operation: {operation}")
+
+
+class AccountResult:
+    """Outcome of one operation on one account"""
+
+    __slots__ = ("account", "ok", "result", "error", "elapsed")
+
+    def __init__(self, account, ok, result=None, error=None, elapsed=0.0):
+        self.account = account
+        self.ok = ok
+        self.result = result
+        self.error = error
+        self.elapsed = elapsed
+
+    def to_dict(self):
+        return {
+            'account': self.account,
+            'ok': self.ok,
+            'result': self.result,
+            'error': self.error,
+            'elapsed_s': round(self.elapsed, 6),
+        }
+
+
+# Per-process client cache for process-pool workers
+_worker_clients = {}
+# Exchange info the parent loaded, set once per worker process by _init_worker
+_worker_exchange_info = None
+
+
+def _init_worker(exchange_info):
+    global _worker_exchange_info
+    _worker_exchange_info = exchange_info
+
+
+def _worker_run(name, credentials, testnet, client_factory, weight_limit, operation, kwargs):
+    entry = _worker_clients.get(name)
+    if entry is None:
+        governor = RateLimitGovernor(weight_limit=weight_limit)
+        client = client_factory(credentials[0], credentials[1], testnet, governor)
+        # In memory only: workers never fetch or write the shared cache file on start
+        symbol_filters = SymbolFilterCache(client, path=None)
+        if _worker_exchange_info is not None:
+            symbol_filters.load(*_worker_exchange_info)
+        entry = _worker_clients[name] = (client, symbol_filters)
+    client, symbol_filters = entry
+    return _timed(name, lambda: execute_operation(client, operation, kwargs, symbol_filters))
+
+
+def _timed(name, func):
+    start = time.perf_counter()
+    try:
+        result = func()
+        return AccountResult(name, True, result, elapsed=time.perf_counter() - start)
+    except Exception as e:
+        return AccountResult(name, False, error=str(e), elapsed=time.perf_counter() - start)
+
+
+def _default_factory(api_key, api_secret, testnet, governor):
+    return build_client(api_key, api_secret, testnet, governor)
+
+
+class MultiAccountCoordinator:
+    """Fan the same order or TWAP out to many accounts in parallel
+
+    Each account gets its own client and RateLimitGovernor. Accounts on the
+    same IP share Binance's request-weight limit, so by default each
+    governor gets an equal share of it, while order-count limits apply in
+    full per account. With mode="process" every worker process builds its
+    own clients (credentials are sent, clients are not pickled), which
+    avoids the GIL for CPU-heavy fan-outs; governors then live per worker.
+    Exchange info is loaded once in the parent and handed to each worker
+    when the pool starts, instead of every worker fetching it.
+    """
+
+    def __init__(self, accounts, mode="thread", max_workers=None, testnet=True, logger=None,
+                 client_factory=None, weight_limit=IP_WEIGHT_LIMIT, shared_ip=True):
+        """Initialize the coordinator
+
+        Args:
+            accounts (dict): Account name -> (api_key, api_secret)
+            mode (str): 'thread' or 'process'
+            max_workers (int): Pool size (default: one per account, at most 64)
+            testnet (bool): Use testnet
+            logger (logging.Logger): Optional logger
+            client_factory (callable): (api_key, api_secret, testnet, governor) -> client;
+                must be a module-level function in process mode
+            weight_limit (int): Request weight per minute available to all accounts
+            shared_ip (bool): Split weight_limit between accounts (same IP)
+        """
+        if not accounts:
+            raise ValueError("At least one account is required")
+        if mode not in ("thread", "process"):
+            raise ValueError("Mode must be 'thread' or 'process'")
+
+        self.accounts = dict(accounts)
+        self.mode = mode
+        self.testnet = testnet
+        self.logger = logger
+        self.client_factory = client_factory or _default_factory
+        self.account_weight_limit = weight_limit / len(self.accounts) if shared_ip else weight_limit
+        self.max_workers = max_workers or min(64, len(self.accounts))
+
+        self._clients = {}
+        self._schedulers = {}
+        self._lock = threading.Lock()
+        self._pool_lock = threading.Lock()
+        self.symbol_filters = None
+        if mode == "thread":
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="Account")
+        else:
+            # Started on the first fan-out, once the exchange info is loaded
+            self._executor = None
+
+    def client(self, name):
+        """Governed client for an account, built on first use (process mode: parent-side only)
+
+        Clients are built on the worker threads, so connecting 50 accounts
+        takes about as long as connecting one.
+        """
+        client = self._clients.get(name)
+        if client is None:
+            api_key, api_secret = self.accounts[name]
+            governor = RateLimitGovernor(weight_limit=self.account_weight_limit)
+            built = self.client_factory(api_key, api_secret, self.testnet, governor)
+            with self._lock:
+                client = self._clients.setdefault(name, built)
+                if self.symbol_filters is None:
+                    # Exchange info is public and identical for every account
+                    self.symbol_filters = SymbolFilterCache(client)
+        return client
+
+    def _process_pool(self):
+        """Worker processes, started with the parent's exchange info"""
+        with self._pool_lock:
+            if self._executor is None:
+                # Exchange info is public; any account's client can fetch it
+                self.client(next(iter(self.accounts)))
+                exchange_info = self.symbol_filters.export()
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                                     initargs=(exchange_info,))
+            return self._executor
+
+    def _run_local(self, name, operation, kwargs):
+        return _timed(name, lambda: execute_operation(
+            self.client(name), operation, kwargs, self.symbol_filters, self.logger
+        ))
+
+    def fan_out(self, operation, accounts=None, overrides=None, **kwargs):
+        """Run one operation on many accounts concurrently
+
+        Args:
+            operation (str): One of OPERATIONS
+            accounts (list): Account names (default: all)
+            overrides (dict): Account name -> kwargs replacing the shared ones,
+                e.g. per-account quantities
+            **kwargs: place_order arguments shared by all accounts
+
+        Returns:
+            dict: results (account -> AccountResult), succeeded/failed counts
+                and wall time
+        """
+        if operation not in OPERATIONS:
+            raise ValueError(f"Unknown operation: {operation}")
+        names = list(accounts) if accounts is not None else list(self.accounts)
+        unknown = [n for n in names if n not in self.accounts]
+        if unknown:
+            raise ValueError(f"Unknown accounts: {', '.join(unknown)}")
+        overrides = overrides or {}
+
+        start = time.perf_counter()
+        futures = {}
+        for name in names:
+            call_kwargs = dict(kwargs, **overrides.get(name, {}))
+            if self.mode == "thread":
+                future = self._executor.submit(self._run_local, name, operation, call_kwargs)
+            else:
+                future = self._process_pool().submit(
+                    _worker_run, name, self.accounts[name], self.testnet, self.client_factory,
+                    self.account_weight_limit, operation, call_kwargs,
+                )
+            futures[future] = name
+
+        results = {}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                # Worker process died or the task could not be pickled
+                results[name] = AccountResult(name, False, error=str(e))
+
+        failed = [name for name, r in results.items() if not r.ok]
+        summary = {
+            'operation': operation,
+            'results': results,
+            'succeeded': len(results) - len(failed),
+            'failed': len(failed),
+            'wall_time_s': round(time.perf_counter() - start, 6),
+        }
+        if self.logger:
+            if failed:
+                self.logger.error("%s fan-out: %s/%s accounts failed (%s)", operation, len(failed),
+                                  len(results), ", ".join(sorted(failed)))
+            else:
+                self.logger.info("%s fan-out: %s accounts in %ss", operation, len(results), summary['wall_time_s'])
+        return summary
+
+    def place_market_order(self, symbol, side, quantity, accounts=None, overrides=None):
+        return self.fan_out("market", accounts, overrides, symbol=symbol, side=side, quantity=quantity)
+
+    def place_limit_order(self, symbol, side, quantity, price, accounts=None, overrides=None):
+        return self.fan_out("limit", accounts, overrides, symbol=symbol, side=side, quantity=quantity, price=price)
+
+    def schedule_twap_order(self, symbol, side, total_quantity, chunks=5, interval=10, accounts=None,
+                            overrides=None):
+        """Schedule the same TWAP on many accounts without blocking (thread mode)
+
+        Each account gets its own TWAPScheduler, so chunks are paced by that
+        account's governor and one slow account never delays the others.
+
+        Returns:
+            dict: Account name -> schedule id (or the error message)
+        """
+        if self.mode != "thread":
+            raise ValueError("TWAP scheduling requires mode='thread'; use fan_out('twap', ...) instead")
+        names = list(accounts) if accounts is not None else list(self.accounts)
+        overrides = overrides or {}
+        schedule_ids = {}
+        for name in names:
+            scheduler = self._schedulers.get(name)
+            if scheduler is None:
+                scheduler = self._schedulers[name] = TWAPScheduler(
+                    self.client(name), self.logger, self.symbol_filters
+                )
+                scheduler.start()
+            params = dict(symbol=symbol, side=side, total_quantity=total_quantity, chunks=chunks,
+                          interval=interval, **overrides.get(name, {}))
+            try:
+                schedule_ids[name] = scheduler.submit(**params)
+            except Exception as e:
+                schedule_ids[name] = str(e)
+        return schedule_ids
+
+    def close(self):
+        """Stop TWAP schedulers and the worker pool"""
+        for scheduler in self._schedulers.values():
+            scheduler.stop()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
@@ -0,0 +1,270 @@
+import heapq
+import itertools
+import threading
+import time
+
+# Lower value = served first when requests are queued
+PRIORITY_CANCEL = 0
+PRIORITY_ORDER = 1
+PRIORITY_QUERY = 2
+
+# USD-M futures request weights; callables receive the call's kwargs
+ENDPOINT_WEIGHTS = {
+    "futures_create_order": 1,
+    "futures_modify_order": 1,
+    "futures_cancel_order": 1,
+    "futures_cancel_orders": 1,
+    "futures_cancel_all_open_orders": 1,
+    "futures_place_batch_order": 5,
+    "futures_get_order": 1,
+    "futures_get_open_orders": lambda params: 1 if params.get("symbol") else 40,
+    "futures_get_all_orders": 5,
+    "futures_account": 5,
+    "futures_account_balance": 5,
+    "futures_position_information": 5,
+    "futures_exchange_info": 1,
+    "futures_ping": 1,
+    "futures_time": 1,
+    "futures_symbol_ticker": lambda params: 1 if params.get("symbol") else 2,
+    "futures_orderbook_ticker": lambda params: 1 if params.get("symbol") else 2,
+    "futures_mark_price": 1,
+    "futures_order_book": lambda params: _depth_weight(params.get("limit", 500)),
+    "futures_stream_get_listen_key": 1,
+    "futures_stream_keepalive": 1,
+    "futures_stream_close": 1,
+}
+
+CANCEL_METHODS = {"futures_cancel_order", "futures_cancel_orders", "futures_cancel_all_open_orders"}
+ORDER_METHODS = {"futures_create_order", "futures_modify_order", "futures_place_batch_order"}
+
+
+def _depth_weight(limit):
+    limit = int(limit)
+    if limit <= 50:
+        return 2
+    if limit <= 100:
+        return 5
+    if limit <= 500:
+        return 10
+    return 20
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``capacity`` tokens per ``period``"""
+
+    def __init__(self, capacity, period, clock=time.monotonic):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.clock = clock
+        self.tokens = float(capacity)
+        self._updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount):
+        """Seconds until ``amount`` tokens are available (0 if available now)"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount):
+        self._refill()
+        self.tokens -= amount
+
+    def sync_used(self, used):
+        """Resync with the exchange's count of tokens already used"""
+        self._refill()
+        self.tokens = min(self.tokens, self.capacity - used)
+
+
+class RateLimitGovernor:
+    """Client-side request-weight and order-count governor
+
+    Requests wait in a priority queue until every bucket they draw from has
+    enough tokens, so bursts are smoothed instead of tripping 429/418 bans.
+    Cancels are served before new orders, new orders before queries.
+    Bucket levels are resynced from the X-MBX-USED-WEIGHT / X-MBX-ORDER-COUNT
+    response headers.
+    """
+
+    def __init__(self, weight_limit=2400, order_limit_1m=1200, order_limit_10s=300,
+                 headroom=0.9, clock=time.monotonic):
+        """Initialize the governor
+
+        Args:
+            weight_limit (int): Request weight per minute
+            order_limit_1m (int): Orders per minute
+            order_limit_10s (int): Orders per 10 seconds
+            headroom (float): Fraction of each limit the governor will use
+            clock (callable): Monotonic time source in seconds
+        """
+        self.clock = clock
+        self.weight = TokenBucket(int(weight_limit * headroom), 60, clock)
+        self.orders_1m = TokenBucket(int(order_limit_1m * headroom), 60, clock)
+        self.orders_10s = TokenBucket(int(order_limit_10s * headroom), 10, clock)
+        self._cond = threading.Condition()
+        self._queue = []
+        self._seq = itertools.count()
+        self._blocked_until = 0.0
+
+    def _wait_time(self, weight, orders):
+        wait = max(self._blocked_until - self.clock(), self.weight.wait_time(weight))
+        if orders:
+            wait = max(wait, self.orders_1m.wait_time(orders), self.orders_10s.wait_time(orders))
+        return wait
+
+    def acquire(self, weight=1, orders=0, priority=PRIORITY_QUERY):
+        """Block until the request may be sent, then consume its tokens
+
+        Args:
+            weight (int): Request weight of the call
+            orders (int): Number of orders the call creates
+            priority (int): PRIORITY_CANCEL, PRIORITY_ORDER or PRIORITY_QUERY
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        start = self.clock()
+        ticket = (priority, next(self._seq))
+        with self._cond:
+            heapq.heappush(self._queue, ticket)
+            try:
+                while True:
+                    if self._queue[0] == ticket:
+                        wait = self._wait_time(weight, orders)
+                        if wait <= 0:
+                            break
+                        self._cond.wait(wait)
+                    else:
+                        self._cond.wait()
+            finally:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+                self._cond.notify_all()
+
+            self.weight.consume(weight)
+            if orders:
+                self.orders_1m.consume(orders)
+                self.orders_10s.consume(orders)
+        return self.clock() - start
+
+    def update_from_headers(self, headers):
+        """Resync buckets from Binance rate-limit response headers"""
+        if not headers:
+            return
+        with self._cond:
+            for name, value in headers.items():
+                name = name.upper()
+                if name == "X-MBX-USED-WEIGHT-1M":
+                    self.weight.sync_used(int(value))
+                elif name == "X-MBX-ORDER-COUNT-1M":
+                    self.orders_1m.sync_used(int(value))
+                elif name == "X-MBX-ORDER-COUNT-10S":
+                    self.orders_10s.sync_used(int(value))
+
+    def backoff(self, seconds):
+        """Block all requests for ``seconds`` (after a 429/418 response)"""
+        with self._cond:
+            self._blocked_until = max(self._blocked_until, self.clock() + seconds)
+            self._cond.notify_all()
+
+
+class RateLimitedClient:
+    """Wrap a Binance client so every futures call passes through a governor
+
+    Attribute access is forwarded to the wrapped client, so order classes
+    use it exactly like binance.Client. Rate-limit headers are taken from
+    each call's own response: binance.Client keeps only the latest response
+    in ``client.response``, which another thread may already have replaced,
+    so responses are recorded per thread by a hook on the HTTP session.
+    """
+
+    def __init__(self, client, governor=None, logger=None, max_retries=2):
+        """Initialize the wrapper
+
+        Args:
+            client: Binance client to wrap
+            governor (RateLimitGovernor): Shared governor (one per API key/IP)
+            logger (logging.Logger): Optional logger
+            max_retries (int): Retries after a 429/418 response
+        """
+        self.client = client
+        self.governor = governor or RateLimitGovernor()
+        self.logger = logger
+        self.max_retries = max_retries
+        self._local = threading.local()
+        hooks = getattr(getattr(client, "session", None), "hooks", None)
+        self._hooked = isinstance(hooks, dict) and "response" in hooks
+        if self._hooked:
+            hooks["response"].append(self._record_response)
+
+    def _record_response(self, response, *args, **kwargs):
+        self._local.response = response
+
+    def __getattr__(self, name):
+        attr = getattr(self.client, name)
+        if not name.startswith("futures_") or not callable(attr):
+            return attr
+
+        def governed(*args, **kwargs):
+            return self._call(name, attr, args, kwargs)
+
+        return governed
+
+    def _call(self, name, method, args, kwargs):
+        weight = ENDPOINT_WEIGHTS.get(name, 1)
+        if callable(weight):
+            weight = weight(kwargs)
+
+        orders = 0
+        priority = PRIORITY_QUERY
+        if name in CANCEL_METHODS:
+            priority = PRIORITY_CANCEL
+        elif name in ORDER_METHODS:
+            priority = PRIORITY_ORDER
+            orders = len(kwargs.get("batchOrders", ())) or 1
+
+        for attempt in range(self.max_retries + 1):
+            self.governor.acquire(weight, orders, priority)
+            self._local.response = None
+            try:
+                result = method(*args, **kwargs)
+            except Exception as e:
+                status = getattr(e, "status_code", None)
+                if status not in (418, 429) or attempt == self.max_retries:
+                    self._sync_headers(getattr(e, "response", None))
+                    raise
+                retry_after = self._retry_after(e)
+                self.governor.backoff(retry_after)
+                if self.logger:
+                    self.logger.warning(
+                        "Rate limited (%s) on %s, backing off %ss", status, name, retry_after
+                    )
+                continue
+            self._sync_headers(self._response())
+            return result
+
+    def _response(self):
+        """HTTP response of this thread's last call"""
+        if self._hooked:
+            return self._local.response
+        # Clients without a requests session (simulator, fakes)
+        return getattr(self.client, "response", None)
+
+    def _sync_headers(self, response):
+        headers = getattr(response, "headers", None)
+        if headers:
+            self.governor.update_from_headers(headers)
+
+    @staticmethod
+    def _retry_after(error):
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        try:
+            return float(headers.get("Retry-After", 60))
+        except (TypeError, ValueError):
+            return 60.0
@@ -0,0 +1,452 @@
+import threading
+from collections import deque
+
+OPEN_STATUSES = ("NEW", "PARTIALLY_FILLED")
+# Recently finished orders remembered so late REST acks don't reopen them
+CLOSED_ORDER_MEMORY = 10000
+
+
+class RiskCheckError(ValueError):
+    """Order rejected by a pre-trade risk limit"""
+
+
+class RiskLimits:
+    """Per-symbol pre-trade limits; None disables a limit"""
+
+    __slots__ = ("max_position", "max_notional", "max_order_qty", "max_open_orders")
+
+    def __init__(self, max_position=None, max_notional=None, max_order_qty=None, max_open_orders=None):
+        """Initialize limits
+
+        Args:
+            max_position (float): Largest absolute position (base asset) the symbol
+                may reach if every open order fills
+            max_notional (float): Largest absolute position value (quote asset),
+                open orders included
+            max_order_qty (float): Largest single order quantity
+            max_open_orders (int): Most resting orders on the symbol
+        """
+        self.max_position = max_position
+        self.max_notional = max_notional
+        self.max_order_qty = max_order_qty
+        self.max_open_orders = max_open_orders
+
+
+class SymbolRisk:
+    """Incrementally maintained position, exposure and PnL of one symbol"""
+
+    __slots__ = (
+        "symbol", "limits", "position", "entry_price", "mark_price", "open_buy", "open_sell",
+        "open_orders", "realized_pnl", "unrealized_pnl",
+    )
+
+    def __init__(self, symbol, limits):
+        self.symbol = symbol
+        self.limits = limits
+        self.position = 0.0
+        self.entry_price = 0.0
+        self.mark_price = None
+        # Unfilled quantity of resting orders that can grow the position
+        self.open_buy = 0.0
+        self.open_sell = 0.0
+        self.open_orders = 0
+        self.realized_pnl = 0.0
+        self.unrealized_pnl = 0.0
+
+    def snapshot(self):
+        return {name: getattr(self, name) for name in self.__slots__ if name != "limits"}
+
+
+class RiskReservation:
+    """Exposure held for orders between their risk check and acknowledgement
+
+    Use it as a context manager: whatever is still held when the block
+    exits (the order failed, a TWAP was cancelled) is released.
+    """
+
+    __slots__ = ("engine", "legs")
+
+    def __init__(self, engine, legs):
+        self.engine = engine
+        # [SymbolRisk, side, held quantity, held open orders]
+        self.legs = legs
+
+    @property
+    def quantity(self):
+        return sum(leg[2] for leg in self.legs)
+
+    def settle(self, *orders, quantity=None):
+        """Record acknowledged orders and stop holding their exposure, atomically
+
+        Args:
+            orders: Order responses, recorded as by RiskEngine.on_order
+            quantity (float): Quantity to stop holding (e.g. one TWAP chunk);
+                everything still held when omitted
+        """
+        if self.engine is not None:
+            self.engine._settle(self, orders, quantity)
+
+    def release(self):
+        """Stop holding whatever is left (no orders to record)"""
+        self.settle()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class RiskEngine:
+    """Pre-trade risk checks against locally tracked positions and open orders
+
+    State is updated from order acknowledgements (on_order) and, once
+    attached, from user-stream events, so check() is a handful of
+    attribute reads and comparisons: no REST call. Without a user stream,
+    fills of resting orders are not seen and those orders keep counting as
+    exposure until cancelled, which errs on the safe side.
+    """
+
+    def __init__(self, limits=None, symbol_limits=None, max_loss=None, market_data=None, logger=None):
+        """Initialize the engine
+
+        Args:
+            limits (RiskLimits): Default limits for every symbol
+            symbol_limits (dict): Symbol -> RiskLimits overriding the default
+            max_loss (float): Account loss (realized + unrealized, quote asset) at
+                which only reduce-only orders are accepted
+            market_data (MarketDataStream): Optional source of mark prices for
+                notional and unrealized PnL
+            logger (logging.Logger): Optional logger
+        """
+        self.limits = limits or RiskLimits()
+        self.symbol_limits = {s.upper(): l for s, l in (symbol_limits or {}).items()}
+        self.max_loss = max_loss
+        self.market_data = market_data
+        self.logger = logger
+        self.symbols = {}
+        self.realized_pnl = 0.0
+        self.unrealized_pnl = 0.0
+        self.streaming = False
+        # orderId -> [SymbolRisk, side sign, remaining qty, reduce only, executed qty]
+        self._orders = {}
+        self._closed = set()
+        self._closed_order = deque()
+        self._lock = threading.RLock()
+
+    def state(self, symbol):
+        """SymbolRisk for a symbol (created on first use)"""
+        state = self.symbols.get(symbol)
+        if state is None:
+            symbol = symbol.upper()
+            state = self.symbols.get(symbol)
+            if state is None:
+                state = self.symbols[symbol] = SymbolRisk(symbol, self.symbol_limits.get(symbol, self.limits))
+        return state
+
+    def set_limits(self, symbol, limits):
+        """Replace the limits of one symbol"""
+        symbol = symbol.upper()
+        self.symbol_limits[symbol] = limits
+        self.state(symbol).limits = limits
+
+    # Checks --------------------------------------------------------------
+
+    def check(self, symbol, side, quantity, price=None, reduce_only=False):
+        """Raise RiskCheckError if an order would breach a limit
+
+        The position limit assumes every open order on the same side fills
+        too, so concurrent TWAP chunks and batches cannot add up past it.
+        check() holds nothing: an order placed after it should be checked
+        with reserve() instead, so a concurrent check sees its exposure.
+
+        Args:
+            symbol (str): Trading pair
+            side (str): 'BUY' or 'SELL'
+            quantity (float): Order quantity
+            price (float): Limit price; market orders use the mark price
+            reduce_only (bool): Order can only shrink the position
+        """
+        with self._lock:
+            self._check(self.state(symbol), side.upper(), quantity, price, reduce_only)
+
+    def reserve(self, symbol, side, quantity, price=None, reduce_only=False, orders=1):
+        """Check an order and hold its exposure until it is acknowledged
+
+        The check and the hold happen under one lock, so concurrent orders
+        cannot each pass against exposure the other is about to add.
+
+        Args:
+            symbol (str): Trading pair
+            side (str): 'BUY' or 'SELL'
+            quantity (float): Order quantity (a TWAP's whole remaining quantity)
+            price (float): Limit price; market orders use the mark price
+            reduce_only (bool): Order can only shrink the position
+            orders (int): Open orders to hold (0 for market-order schedules)
+
+        Returns:
+            RiskReservation: Settle it with the acknowledged orders
+
+        Raises:
+            RiskCheckError: The order would breach a limit; nothing is held
+        """
+        with self._lock:
+            state = self.state(symbol)
+            side, quantity = side.upper(), float(quantity)
+            self._check(state, side, quantity, price, reduce_only)
+            return self._hold([[state, side, 0.0 if reduce_only else quantity, orders]])
+
+    def _check(self, state, side, quantity, price, reduce_only):
+        limits = state.limits
+
+        if limits.max_order_qty is not None and quantity > limits.max_order_qty:
+            raise RiskCheckError(
+                f"{state.symbol}: order quantity {quantity} exceeds limit {limits.max_order_qty}"
+            )
+        if limits.max_open_orders is not None and state.open_orders >= limits.max_open_orders:
+            raise RiskCheckError(
+                f"{state.symbol}: {state.open_orders} open orders, limit {limits.max_open_orders}"
+            )
+        if reduce_only:
+            return
+
+        if self.max_loss is not None:
+            if self.market_data is not None:
+                self._refresh_mark(state)
+            loss = -(self.realized_pnl + self.unrealized_pnl)
+            if loss >= self.max_loss:
+                raise RiskCheckError(
+                    f"Account loss {loss:.2f} reached limit {self.max_loss}; only reduce-only orders allowed"
+                )
+
+        if side == "BUY":
+            worst = state.position + state.open_buy + quantity
+        else:
+            worst = state.position - state.open_sell - quantity
+        if limits.max_position is not None and abs(worst) > limits.max_position:
+            raise RiskCheckError(
+                f"{state.symbol}: position could reach {worst:g}, limit {limits.max_position}"
+            )
+        if limits.max_notional is not None:
+            if price is None:
+                price = self._mark(state)
+            if price is not None and abs(worst) * price > limits.max_notional:
+                raise RiskCheckError(
+                    f"{state.symbol}: notional could reach {abs(worst) * price:.2f}, limit {limits.max_notional}"
+                )
+
+    def check_orders(self, orders):
+        """Check a batch of futures_create_order params as if they all rest at once
+
+        Raises:
+            RiskCheckError: For the first order that would breach a limit
+        """
+        self.reserve_orders(orders).release()
+
+    def reserve_orders(self, orders):
+        """Check a batch of futures_create_order params and hold their exposure
+
+        Each order is checked with the ones before it already held.
+
+        Returns:
+            RiskReservation: Settle it with the acknowledged orders
+
+        Raises:
+            RiskCheckError: For the first order that would breach a limit;
+                nothing is held
+        """
+        legs = []
+        with self._lock:
+            try:
+                for params in orders:
+                    state = self.state(params['symbol'])
+                    side = params['side'].upper()
+                    price = params.get('price')
+                    reduce_only = str(params.get('reduceOnly', False)).lower() == "true"
+                    quantity = float(params['quantity'])
+                    self._check(state, side, quantity, float(price) if price is not None else None, reduce_only)
+                    leg = [state, side, 0.0 if reduce_only else quantity, 1]
+                    self._add_exposure(*leg)
+                    legs.append(leg)
+            except Exception:
+                for leg in legs:
+                    self._add_exposure(leg[0], leg[1], -leg[2], -leg[3])
+                raise
+        return RiskReservation(self, legs)
+
+    def _hold(self, legs):
+        for leg in legs:
+            self._add_exposure(*leg)
+        return RiskReservation(self, legs)
+
+    def _settle(self, reservation, orders, quantity):
+        with self._lock:
+            for leg in reservation.legs:
+                state, side, held, count = leg
+                if quantity is None:
+                    self._add_exposure(state, side, -held, -count)
+                    leg[2] = leg[3] = 0
+                else:
+                    released = min(quantity, held)
+                    self._add_exposure(state, side, -released, 0)
+                    leg[2] -= released
+                    quantity -= released
+            for order in orders:
+                self.on_order(order)
+
+    def _add_exposure(self, state, side, quantity, orders=1):
+        if side == "BUY":
+            state.open_buy += quantity
+        else:
+            state.open_sell += quantity
+        state.open_orders += orders
+
+    def _mark(self, state):
+        if self.market_data is not None:
+            price = self.market_data.reference_price(state.symbol)
+            if price is not None:
+                return price
+        return state.mark_price
+
+    def _refresh_mark(self, state):
+        price = self.market_data.mark_price(state.symbol)
+        if price is not None and price != state.mark_price:
+            self.update_mark(state.symbol, price)
+
+    # State updates -------------------------------------------------------
+
+    def update_mark(self, symbol, price):
+        """Revalue a symbol's position at a new mark price"""
+        with self._lock:
+            state = self.state(symbol)
+            state.mark_price = price
+            self._set_unrealized(state, state.position * (price - state.entry_price) if state.position else 0.0)
+
+    def _set_unrealized(self, state, value):
+        self.unrealized_pnl += value - state.unrealized_pnl
+        state.unrealized_pnl = value
+
+    def _apply_fill(self, state, signed_qty, price):
+        """Average-cost position accounting for one fill"""
+        position = state.position
+        if position == 0 or (position > 0) == (signed_qty > 0):
+            new_position = position + signed_qty
+            state.entry_price = (position * state.entry_price + signed_qty * price) / new_position
+        else:
+            closed = min(abs(signed_qty), abs(position))
+            realized = closed * (price - state.entry_price) * (1 if position > 0 else -1)
+            state.realized_pnl += realized
+            self.realized_pnl += realized
+            new_position = position + signed_qty
+            if abs(new_position) < 1e-12:
+                new_position = 0.0
+                state.entry_price = 0.0
+            elif (new_position > 0) != (position > 0):
+                state.entry_price = price
+        state.position = new_position
+        state.mark_price = price if state.mark_price is None else state.mark_price
+        mark = state.mark_price
+        self._set_unrealized(state, new_position * (mark - state.entry_price) if new_position else 0.0)
+
+    def _track(self, order_id, state, side, status, orig_qty, executed_qty, reduce_only):
+        """Update the open-order book entry of an order; returns the newly filled quantity"""
+        entry = self._orders.get(order_id)
+        if entry is None:
+            if order_id in self._closed:
+                return 0.0
+            if status not in OPEN_STATUSES:
+                self._remember_closed(order_id)
+                return executed_qty
+            entry = self._orders[order_id] = [state, 1 if side == "BUY" else -1, 0.0, reduce_only, 0.0]
+            state.open_orders += 1
+        if executed_qty < entry[4]:
+            return 0.0  # Stale update (e.g. a REST ack arriving after stream fills)
+        filled = executed_qty - entry[4]
+        entry[4] = executed_qty
+        remaining = max(orig_qty - executed_qty, 0.0) if status in OPEN_STATUSES else 0.0
+        if not entry[3]:
+            delta = remaining - entry[2]
+            if entry[1] > 0:
+                state.open_buy += delta
+            else:
+                state.open_sell += delta
+        entry[2] = remaining
+        if status not in OPEN_STATUSES:
+            del self._orders[order_id]
+            state.open_orders -= 1
+            self._remember_closed(order_id)
+        return filled
+
+    def _remember_closed(self, order_id):
+        self._closed.add(order_id)
+        self._closed_order.append(order_id)
+        if len(self._closed_order) > CLOSED_ORDER_MEMORY:
+            self._closed.discard(self._closed_order.popleft())
+
+    def on_order(self, order):
+        """Record an order acknowledged by the REST API (resting exposure and, without
+        a user stream, its immediate fill)"""
+        if not order or 'orderId' not in order:
+            return
+        with self._lock:
+            state = self.state(order['symbol'])
+            executed = float(order.get('executedQty') or 0)
+            filled = self._track(
+                order['orderId'], state, order.get('side'), order.get('status', "NEW"),
+                float(order.get('origQty') or order.get('quantity') or 0), executed,
+                str(order.get('reduceOnly', False)).lower() == "true",
+            )
+            if not self.streaming and filled > 0:
+                price = float(order.get('avgPrice') or order.get('price') or 0) or state.mark_price
+                if price:
+                    self._apply_fill(state, filled if order.get('side') == "BUY" else -filled, price)
+
+    def on_event(self, event):
+        """UserDataStream listener: fills, cancels and position updates"""
+        event_type = event.get('e')
+        if event_type == "ORDER_TRADE_UPDATE":
+            o = event['o']
+            with self._lock:
+                state = self.state(o['s'])
+                self._track(o['i'], state, o.get('S'), o.get('X'), float(o.get('q') or 0),
+                            float(o.get('z') or 0), bool(o.get('R')))
+                last_qty = float(o.get('l') or 0)
+                if o.get('x') == "TRADE" and last_qty > 0:
+                    self._apply_fill(state, last_qty if o.get('S') == "BUY" else -last_qty, float(o['L']))
+        elif event_type == "ACCOUNT_UPDATE":
+            # Authoritative position and entry price from the exchange
+            with self._lock:
+                for p in event['a'].get('P', []):
+                    state = self.state(p['s'])
+                    state.position = float(p.get('pa') or 0)
+                    state.entry_price = float(p.get('ep') or 0)
+                    self._set_unrealized(state, float(p.get('up') or 0))
+
+    def attach(self, user_stream):
+        """Take fills and positions from a UserDataStream instead of REST acknowledgements"""
+        self.streaming = True
+        user_stream.add_listener(self.on_event)
+
+    def load_positions(self, positions=(), open_orders=()):
+        """Seed state from futures_position_information() / futures_get_open_orders()"""
+        for p in positions:
+            with self._lock:
+                state = self.state(p['symbol'])
+                state.position = float(p.get('positionAmt') or 0)
+                state.entry_price = float(p.get('entryPrice') or 0)
+                mark = p.get('markPrice')
+                if mark:
+                    state.mark_price = float(mark)
+                self._set_unrealized(state, float(p.get('unRealizedProfit') or 0))
+        for o in open_orders:
+            self.on_order(o)
+
+    def snapshot(self):
+        """Positions, exposure and PnL per symbol plus account totals"""
+        with self._lock:
+            return {
+                'realized_pnl': self.realized_pnl,
+                'unrealized_pnl': self.unrealized_pnl,
+                'open_orders': len(self._orders),
+                'symbols': {symbol: state.snapshot() for symbol, state in self.symbols.items()},
+            }
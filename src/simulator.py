@@ -0,0 +1,771 @@
+"""
+Simulated Binance Futures exchange for backtests and offline runs
+
+SimulatedExchange implements the futures_* client surface the order classes
+use, matching orders against historical klines (or trades) held in NumPy
+arrays. Time only moves when advance_to()/sleep()/run() is called; trigger
+detection for all open orders is a vectorized scan over the bars ahead, so
+long quiet stretches cost one array operation.
+
+    sim = SimulatedExchange.from_csv("BTCUSDT-1m-2024-01.csv")
+    bot = SimplifiedBot(None, None, client=sim)
+    bot.place_oco_order("BTCUSDT", "BUY", 0.01, 45000, 41000)
+    sim.run()
+
+LatencyClient and AsyncSimulatedExchange put a fixed round trip in front of
+an exchange, as blocking and asyncio transports, for tests and benchmarks.
+"""
+
+import asyncio
+import csv
+import itertools
+import json
+import os
+import threading
+import time
+import numpy as np
+
+# Bars scanned per vectorized step (a scan stops at the first window that reaches an order)
+SCAN_WINDOW = 4096
+
+CONDITIONAL_TYPES = ("STOP", "STOP_MARKET", "TAKE_PROFIT", "TAKE_PROFIT_MARKET")
+ORDER_TYPES = ("MARKET", "LIMIT") + CONDITIONAL_TYPES
+
+
+class SimulatedAPIError(Exception):
+    """Exchange-side rejection, shaped like binance.exceptions.BinanceAPIException"""
+
+    def __init__(self, code, message):
+        super().__init__(f"APIError(code={code}): {message}")
+        self.code = code
+        self.message = message
+        self.status_code = 400
+
+
+def first_touch(highs, lows, levels, upward):
+    """First bar at which each level is reached
+
+    Args:
+        highs (ndarray): Bar highs, shape (bars,)
+        lows (ndarray): Bar lows, shape (bars,)
+        levels (ndarray): Price levels, shape (n,)
+        upward (ndarray): True where the level is reached from below (high >= level)
+
+    Returns:
+        ndarray: Bar index per level, -1 where it is never reached
+    """
+    # The running high only rises and the running low only falls, so each
+    # level's first touch is a binary search instead of a bars x levels scan
+    levels = np.asarray(levels, dtype=float)
+    upward = np.asarray(upward, dtype=bool)
+    bars = np.full(len(levels), -1)
+    if not len(highs):
+        return bars
+    if upward.any():
+        found = np.searchsorted(np.maximum.accumulate(highs), levels[upward], side="left")
+        bars[upward] = np.where(found < len(highs), found, -1)
+    if not upward.all():
+        found = np.searchsorted(-np.minimum.accumulate(lows), -levels[~upward], side="left")
+        bars[~upward] = np.where(found < len(lows), found, -1)
+    return bars
+
+
+def sweep_brackets(opens, highs, lows, entry_index, side, take_profits, stops):
+    """Evaluate many take-profit/stop-loss pairs over one price path at once
+
+    Every pair enters at the open of ``entry_index``; when both legs are
+    reached in the same bar the stop is assumed to fill first.
+
+    Args:
+        opens, highs, lows (ndarray): Bar prices
+        entry_index (int): Entry bar
+        side (str): 'BUY' (long) or 'SELL' (short)
+        take_profits (ndarray): Take-profit levels, shape (n,)
+        stops (ndarray): Stop-loss levels, shape (n,)
+
+    Returns:
+        dict: exit_index, exit_price and pnl (per unit) arrays of shape (n,);
+            exit_index is -1 for pairs still open at the end of the data
+    """
+    take_profits = np.asarray(take_profits, dtype=float)
+    stops = np.asarray(stops, dtype=float)
+    long = side.upper() == "BUY"
+    entry = opens[entry_index]
+    highs = highs[entry_index:]
+    lows = lows[entry_index:]
+    opens = opens[entry_index:]
+    n = len(take_profits)
+
+    tp_bar = np.full(n, -1)
+    sl_bar = np.full(n, -1)
+    for start in range(0, len(highs), SCAN_WINDOW):
+        open_tp = tp_bar < 0
+        open_sl = sl_bar < 0
+        if not open_tp.any() and not open_sl.any():
+            break
+        h = highs[start:start + SCAN_WINDOW]
+        l = lows[start:start + SCAN_WINDOW]
+        if open_tp.any():
+            found = first_touch(h, l, take_profits[open_tp], np.full(open_tp.sum(), long))
+            tp_bar[open_tp] = np.where(found >= 0, found + start, -1)
+        if open_sl.any():
+            found = first_touch(h, l, stops[open_sl], np.full(open_sl.sum(), not long))
+            sl_bar[open_sl] = np.where(found >= 0, found + start, -1)
+
+    never = len(highs) + 1
+    tp_at = np.where(tp_bar >= 0, tp_bar, never)
+    sl_at = np.where(sl_bar >= 0, sl_bar, never)
+    stop_first = sl_at <= tp_at
+    exit_bar = np.minimum(tp_at, sl_at)
+    level = np.where(stop_first, stops, take_profits)
+    bar_open = opens[np.minimum(exit_bar, len(opens) - 1)]
+    # Gaps fill at the open when it is already through the level
+    reached_up = stop_first != long
+    exit_price = np.where(reached_up, np.maximum(level, bar_open), np.minimum(level, bar_open))
+    closed = exit_bar < never
+    direction = 1 if long else -1
+    return {
+        'exit_index': np.where(closed, exit_bar + entry_index, -1),
+        'exit_price': np.where(closed, exit_price, np.nan),
+        'pnl': np.where(closed, (exit_price - entry) * direction, np.nan),
+    }
+
+
+class _Market:
+    """Price history, filters and position for one simulated symbol"""
+
+    def __init__(self, symbol, times, opens, highs, lows, closes, volumes, tick_size, step_size,
+                 min_qty, min_notional):
+        self.symbol = symbol
+        self.times = np.asarray(times, dtype=np.int64)
+        self.opens = np.asarray(opens, dtype=float)
+        self.highs = np.asarray(highs, dtype=float)
+        self.lows = np.asarray(lows, dtype=float)
+        self.closes = np.asarray(closes, dtype=float)
+        self.volumes = np.asarray(volumes, dtype=float) if volumes is not None else np.zeros(len(self.times))
+        self.tick_size = tick_size
+        self.step_size = step_size
+        self.min_qty = min_qty
+        self.min_notional = min_notional
+        self.cursor = 0  # next bar to process
+        self.position = 0.0
+        self.entry_price = 0.0
+        self.realized_pnl = 0.0
+
+    def price(self):
+        return float(self.closes[self.cursor - 1] if self.cursor else self.opens[0])
+
+
+class _SimOrder:
+    __slots__ = (
+        "order_id", "client_order_id", "symbol", "side", "type", "quantity", "price", "stop_price",
+        "time_in_force", "reduce_only", "status", "executed_qty", "avg_price", "triggered",
+        "time", "update_time",
+    )
+
+    def level(self):
+        """(price level, reached from below) the order is waiting for"""
+        if self.type in CONDITIONAL_TYPES and not self.triggered:
+            stop_up = self.type.startswith("STOP")
+            return self.stop_price, stop_up == (self.side == "BUY")
+        # Resting limit: a buy fills when price falls to it, a sell when it rises
+        return self.price, self.side == "SELL"
+
+    def response(self):
+        return {
+            'orderId': self.order_id,
+            'clientOrderId': self.client_order_id,
+            'symbol': self.symbol,
+            'side': self.side,
+            'type': self.type,
+            'status': self.status,
+            'timeInForce': self.time_in_force,
+            'reduceOnly': self.reduce_only,
+            'price': repr(self.price or 0.0),
+            'stopPrice': repr(self.stop_price or 0.0),
+            'origQty': repr(self.quantity),
+            'executedQty': repr(self.executed_qty),
+            'avgPrice': repr(self.avg_price),
+            'time': self.time,
+            'updateTime': self.update_time,
+        }
+
+
+def _flag(value):
+    if isinstance(value, str):
+        return value.lower() == "true"
+    return bool(value)
+
+
+class SimulatedExchange:
+    """Futures matching engine over historical bars
+
+    Fill model: market orders fill at the last close (plus ``slippage_bps``);
+    resting limits and triggered stops fill in full at their level, or at
+    the bar open when the market gaps through it. Orders submitted while
+    handling a bar's events take effect from the next bar. Register
+    listeners with add_listener() to receive ORDER_TRADE_UPDATE and
+    ACCOUNT_UPDATE events in user-data-stream format, so OCOManager and
+    OrderStateBook run unchanged against the simulator.
+    """
+
+    def __init__(self, balance=10000.0, asset="USDT", taker_fee=0.0004, maker_fee=0.0002, slippage_bps=0.0,
+                 logger=None):
+        """Initialize an exchange with no markets
+
+        Args:
+            balance (float): Starting wallet balance
+            asset (str): Margin asset
+            taker_fee (float): Fee rate for market and triggered market orders
+            maker_fee (float): Fee rate for resting limit fills
+            slippage_bps (float): Adverse slippage applied to market fills
+            logger (logging.Logger): Optional logger
+        """
+        self.balance = float(balance)
+        self.asset = asset
+        self.taker_fee = taker_fee
+        self.maker_fee = maker_fee
+        self.slippage_bps = slippage_bps
+        self.logger = logger
+        self.markets = {}
+        self.orders = {}
+        self._open = {}  # symbol -> {order_id: _SimOrder}
+        self._client_ids = {}
+        self._ids = itertools.count(1)
+        self._listeners = []
+        self._lock = threading.RLock()
+        self.time = None
+
+    # Data --------------------------------------------------------------
+
+    def add_klines(self, symbol, times, opens, highs, lows, closes, volumes=None, tick_size=0.01,
+                   step_size=0.001, min_qty=0.001, min_notional=5.0):
+        """Add a market from OHLC arrays (times in ms, ascending)"""
+        symbol = symbol.upper()
+        market = _Market(symbol, times, opens, highs, lows, closes, volumes, tick_size, step_size,
+                         min_qty, min_notional)
+        if not len(market.times):
+            raise ValueError(f"No price data for {symbol}")
+        self.markets[symbol] = market
+        self._open[symbol] = {}
+        start = int(market.times[0])
+        self.time = start if self.time is None else min(self.time, start)
+        return market
+
+    def add_trades(self, symbol, times, prices, quantities=None, **filters):
+        """Add a market from a trade tape (each trade is a zero-range bar)"""
+        prices = np.asarray(prices, dtype=float)
+        return self.add_klines(symbol, times, prices, prices, prices, prices, quantities, **filters)
+
+    @classmethod
+    def from_csv(cls, path, symbol=None, **kwargs):
+        """Build an exchange from a Binance kline CSV (data.binance.vision layout)
+
+        Args:
+            path (str): CSV with open_time, open, high, low, close, volume, ...
+                columns, with or without a header row
+            symbol (str): Market symbol (default: file name prefix, e.g.
+                'BTCUSDT' for BTCUSDT-1m-2024-01.csv)
+        """
+        exchange = cls(**kwargs)
+        exchange.load_csv(path, symbol)
+        return exchange
+
+    def load_csv(self, path, symbol=None):
+        symbol = symbol or os.path.basename(path).split("-")[0].split(".")[0]
+        with open(path, newline="") as f:
+            rows = [row for row in csv.reader(f) if row]
+        if rows and not rows[0][0].strip().lstrip("-").isdigit():
+            rows = rows[1:]  # header
+        data = np.array([row[:6] for row in rows], dtype=float)
+        return self.add_klines(symbol, data[:, 0].astype(np.int64), data[:, 1], data[:, 2], data[:, 3],
+                               data[:, 4], data[:, 5])
+
+    # Clock -------------------------------------------------------------
+
+    def now(self):
+        """Simulated time in seconds
+
+        Raises:
+            ValueError: No market is loaded yet, so the clock has no start
+        """
+        return self._current_time() / 1000
+
+    def sleep(self, seconds):
+        """Advance simulated time (drop-in for time.sleep)"""
+        self.advance_to(self._current_time() + int(seconds * 1000))
+
+    def run(self):
+        """Process every remaining bar (nothing to do without markets)"""
+        if not self.markets:
+            return
+        end = max(int(m.times[-1]) for m in self.markets.values())
+        self.advance_to(end)
+
+    def _current_time(self):
+        if self.time is None:
+            raise ValueError("Simulated clock not started: load klines or trades first")
+        return self.time
+
+    def advance_to(self, target_ms):
+        """Process all bars stamped at or before ``target_ms``"""
+        self._current_time()
+        with self._lock:
+            while True:
+                # Earliest order event across all markets
+                best = None
+                for market in self.markets.values():
+                    end = int(np.searchsorted(market.times, target_ms, side="right"))
+                    event = self._next_event(market, end)
+                    if event is not None:
+                        event_time = int(market.times[event[0]])
+                        if best is None or event_time < best[0]:
+                            best = (event_time, market, event)
+                if best is None:
+                    break
+                event_time, market, (bar, orders) = best
+                market.cursor = bar
+                self.time = max(self.time, event_time)
+                for order in orders:
+                    if order.status == "NEW":
+                        self._touch(market, order, bar)
+                market.cursor = bar + 1
+
+            for market in self.markets.values():
+                market.cursor = max(market.cursor, int(np.searchsorted(market.times, target_ms, side="right")))
+            self.time = max(self.time, target_ms)
+
+    def _next_event(self, market, end):
+        """(bar, orders reached at it) for the first bar in [cursor, end) that reaches an order"""
+        pending = list(self._open[market.symbol].values())
+        if not pending or market.cursor >= end:
+            return None
+        levels = np.array([o.level()[0] for o in pending])
+        upward = np.array([o.level()[1] for o in pending])
+        for start in range(market.cursor, end, SCAN_WINDOW):
+            stop = min(end, start + SCAN_WINDOW)
+            bars = first_touch(market.highs[start:stop], market.lows[start:stop], levels, upward)
+            reached = bars >= 0
+            if reached.any():
+                first = bars[reached].min()
+                orders = [o for o, b in zip(pending, bars) if b == first]
+                orders.sort(key=lambda o: o.order_id)
+                return start + int(first), orders
+        return None
+
+    def _touch(self, market, order, bar):
+        level, upward = order.level()
+        bar_open = float(market.opens[bar])
+        price = max(level, bar_open) if upward else min(level, bar_open)
+
+        if order.type in CONDITIONAL_TYPES and not order.triggered:
+            order.triggered = True
+            if order.type.endswith("_MARKET"):
+                self._fill(market, order, price, maker=False)
+            elif (order.side == "BUY" and price <= order.price) or (order.side == "SELL" and price >= order.price):
+                self._fill(market, order, price, maker=False)
+            else:
+                # Triggered through the limit: rest as a limit order
+                self._emit_order(order, "NEW")
+        else:
+            self._fill(market, order, price, maker=True)
+
+    # Matching ----------------------------------------------------------
+
+    def _fill(self, market, order, price, maker):
+        quantity = order.quantity
+        position = market.position
+        if order.reduce_only:
+            closing = -position if order.side == "BUY" else position
+            quantity = min(quantity, max(0.0, closing))
+            if quantity <= 0:
+                self._close(order, "EXPIRED")
+                return
+
+        signed = quantity if order.side == "BUY" else -quantity
+        if position and (position > 0) != (signed > 0):
+            closed = min(abs(signed), abs(position))
+            pnl = closed * (price - market.entry_price) * (1 if position > 0 else -1)
+            market.realized_pnl += pnl
+            self.balance += pnl
+        new_position = position + signed
+        if abs(new_position) < 1e-12:
+            new_position = 0.0
+            market.entry_price = 0.0
+        elif position == 0 or (position > 0) != (new_position > 0):
+            market.entry_price = price
+        elif (position > 0) == (signed > 0):
+            market.entry_price = (abs(position) * market.entry_price + quantity * price) / abs(new_position)
+        market.position = new_position
+        self.balance -= quantity * price * (self.maker_fee if maker else self.taker_fee)
+
+        order.executed_qty = quantity
+        order.avg_price = price
+        self._close(order, "FILLED", price)
+        self._emit_account(market)
+
+    def _close(self, order, status, last_price=0.0):
+        order.status = status
+        order.update_time = self.time
+        self._open[order.symbol].pop(order.order_id, None)
+        self._emit_order(order, "TRADE" if status == "FILLED" else status, last_price)
+
+    # Events ------------------------------------------------------------
+
+    def add_listener(self, callback):
+        """Call ``callback(event)`` with user-data-stream events"""
+        self._listeners.append(callback)
+
+    def _emit(self, event):
+        for callback in self._listeners:
+            try:
+                callback(event)
+            except Exception as e:
+                if self.logger:
+                    self.logger.error("Simulator listener failed: %s", e)
+
+    def _emit_order(self, order, execution_type, last_price=0.0):
+        if not self._listeners:
+            return
+        filled = execution_type == "TRADE"
+        self._emit({
+            'e': "ORDER_TRADE_UPDATE",
+            'E': self.time,
+            'T': self.time,
+            'o': {
+                's': order.symbol, 'c': order.client_order_id, 'S': order.side, 'o': order.type,
+                'f': order.time_in_force, 'q': repr(order.quantity), 'p': repr(order.price or 0.0),
+                'ap': repr(order.avg_price), 'sp': repr(order.stop_price or 0.0), 'x': execution_type,
+                'X': order.status, 'i': order.order_id, 'l': repr(order.executed_qty if filled else 0.0),
+                'z': repr(order.executed_qty), 'L': repr(last_price), 'T': self.time, 'R': order.reduce_only,
+            },
+        })
+
+    def _emit_account(self, market):
+        if not self._listeners:
+            return
+        self._emit({
+            'e': "ACCOUNT_UPDATE",
+            'E': self.time,
+            'T': self.time,
+            'a': {
+                'B': [{'a': self.asset, 'wb': repr(self.balance), 'cw': repr(self.balance)}],
+                'P': [{'s': market.symbol, 'pa': repr(market.position), 'ep': repr(market.entry_price),
+                       'up': repr(self._unrealized(market))}],
+            },
+        })
+
+    # futures_* client surface ------------------------------------------
+
+    def _market(self, symbol):
+        market = self.markets.get(str(symbol).upper())
+        if market is None:
+            raise SimulatedAPIError(-1121, "Invalid symbol.")
+        return market
+
+    def futures_create_order(self, **params):
+        with self._lock:
+            return self._create(params)
+
+    def _create(self, params):
+        market = self._market(params.get('symbol'))
+        side = str(params.get('side', "")).upper()
+        order_type = str(params.get('type', "")).upper()
+        if side not in ("BUY", "SELL"):
+            raise SimulatedAPIError(-1117, "Invalid side.")
+        if order_type not in ORDER_TYPES:
+            raise SimulatedAPIError(-1116, "Invalid orderType.")
+        quantity = float(params.get('quantity') or 0)
+        if quantity < market.min_qty:
+            raise SimulatedAPIError(-4003, "Quantity less than or equal to zero.")
+
+        order = _SimOrder()
+        order.order_id = next(self._ids)
+        order.client_order_id = params.get('newClientOrderId') or f"sim-{order.order_id}"
+        order.symbol = market.symbol
+        order.side = side
+        order.type = order_type
+        order.quantity = quantity
+        order.price = float(params['price']) if params.get('price') is not None else None
+        order.stop_price = float(params['stopPrice']) if params.get('stopPrice') is not None else None
+        order.time_in_force = params.get('timeInForce', "GTC")
+        order.reduce_only = _flag(params.get('reduceOnly', False))
+        order.status = "NEW"
+        order.executed_qty = 0.0
+        order.avg_price = 0.0
+        order.triggered = False
+        order.time = order.update_time = self.time
+
+        current = market.price()
+        if order_type in ("LIMIT", "STOP", "TAKE_PROFIT") and order.price is None:
+            raise SimulatedAPIError(-1102, "Mandatory parameter 'price' was not sent.")
+        if order_type in CONDITIONAL_TYPES:
+            if order.stop_price is None:
+                raise SimulatedAPIError(-1102, "Mandatory parameter 'stopPrice' was not sent.")
+            _, upward = order.level()
+            if (upward and current >= order.stop_price) or (not upward and current <= order.stop_price):
+                raise SimulatedAPIError(-2021, "Order would immediately trigger.")
+        if order_type != "MARKET":
+            notional_price = order.price or order.stop_price
+            if not order.reduce_only and quantity * notional_price < market.min_notional:
+                raise SimulatedAPIError(-4164, f"Order's notional must be no smaller than {market.min_notional}")
+
+        self.orders[order.order_id] = order
+        self._client_ids[order.client_order_id] = order.order_id
+        self._open[market.symbol][order.order_id] = order
+        self._emit_order(order, "NEW")
+
+        marketable = order_type == "LIMIT" and (
+            (side == "BUY" and order.price >= current) or (side == "SELL" and order.price <= current)
+        )
+        if order_type == "MARKET" or marketable:
+            if marketable and order.time_in_force == "GTX":
+                self._close(order, "EXPIRED")
+                raise SimulatedAPIError(-5022, "Due to the order could not be executed as maker, the Post Only order will be rejected.")
+            slip = current * self.slippage_bps / 10000
+            self._fill(market, order, current + slip if side == "BUY" else current - slip, maker=False)
+        return order.response()
+
+    def futures_place_batch_order(self, batchOrders):
+        results = []
+        for params in batchOrders:
+            try:
+                results.append(self.futures_create_order(**params))
+            except SimulatedAPIError as e:
+                results.append({'code': e.code, 'msg': e.message})
+        return results
+
+    def _find(self, symbol, orderId=None, origClientOrderId=None):
+        if orderId is None and origClientOrderId is not None:
+            orderId = self._client_ids.get(origClientOrderId)
+        order = self.orders.get(int(orderId)) if orderId is not None else None
+        if order is None or order.symbol != str(symbol).upper():
+            raise SimulatedAPIError(-2013, "Order does not exist.")
+        return order
+
+    def futures_get_order(self, symbol, orderId=None, origClientOrderId=None, **params):
+        with self._lock:
+            return self._find(symbol, orderId, origClientOrderId).response()
+
+    def futures_cancel_order(self, symbol, orderId=None, origClientOrderId=None, **params):
+        with self._lock:
+            try:
+                order = self._find(symbol, orderId, origClientOrderId)
+            except SimulatedAPIError:
+                raise SimulatedAPIError(-2011, "Unknown order sent.")
+            if order.status != "NEW":
+                raise SimulatedAPIError(-2011, "Unknown order sent.")
+            self._close(order, "CANCELED")
+            return order.response()
+
+    def futures_modify_order(self, symbol, side, quantity, price, orderId=None, origClientOrderId=None, **params):
+        with self._lock:
+            order = self._find(symbol, orderId, origClientOrderId)
+            if order.status != "NEW" or order.type != "LIMIT":
+                raise SimulatedAPIError(-2013, "Order does not exist.")
+            quantity, price = float(quantity), float(price)
+            if quantity <= order.executed_qty:
+                raise SimulatedAPIError(-4003, "Quantity less than or equal to zero.")
+            if quantity == order.quantity and price == order.price:
+                raise SimulatedAPIError(-5027, "No need to modify the order.")
+            order.quantity = quantity
+            order.price = price
+            order.update_time = self.time
+            self._emit_order(order, "AMENDMENT")
+
+            current = self._market(symbol).price()
+            if (order.side == "BUY" and price >= current) or (order.side == "SELL" and price <= current):
+                slip = current * self.slippage_bps / 10000
+                self._fill(self._market(symbol), order, current + slip if order.side == "BUY" else current - slip,
+                           maker=False)
+            return order.response()
+
+    def futures_cancel_orders(self, symbol, orderIdList=None, origClientOrderIdList=None, **params):
+        # The REST API takes JSON-encoded lists
+        if isinstance(orderIdList, str):
+            orderIdList = json.loads(orderIdList)
+        if isinstance(origClientOrderIdList, str):
+            origClientOrderIdList = json.loads(origClientOrderIdList)
+        results = []
+        for order_id in orderIdList or ():
+            try:
+                results.append(self.futures_cancel_order(symbol=symbol, orderId=order_id))
+            except SimulatedAPIError as e:
+                results.append({'code': e.code, 'msg': e.message})
+        for client_id in origClientOrderIdList or ():
+            try:
+                results.append(self.futures_cancel_order(symbol=symbol, origClientOrderId=client_id))
+            except SimulatedAPIError as e:
+                results.append({'code': e.code, 'msg': e.message})
+        return results
+
+    def futures_cancel_all_open_orders(self, symbol, **params):
+        with self._lock:
+            for order in list(self._open[self._market(symbol).symbol].values()):
+                self._close(order, "CANCELED")
+            return {'code': 200, 'msg': "The operation of cancel all open order is done."}
+
+    def futures_get_open_orders(self, symbol=None, **params):
+        with self._lock:
+            symbols = [self._market(symbol).symbol] if symbol else list(self._open)
+            return [o.response() for s in symbols for o in self._open[s].values()]
+
+    def futures_get_all_orders(self, symbol, **params):
+        with self._lock:
+            symbol = self._market(symbol).symbol
+            return [o.response() for o in self.orders.values() if o.symbol == symbol]
+
+    def _unrealized(self, market):
+        return market.position * (market.price() - market.entry_price)
+
+    def futures_position_information(self, symbol=None, **params):
+        with self._lock:
+            markets = [self._market(symbol)] if symbol else list(self.markets.values())
+            return [{
+                'symbol': m.symbol,
+                'positionAmt': repr(m.position),
+                'entryPrice': repr(m.entry_price),
+                'markPrice': repr(m.price()),
+                'unRealizedProfit': repr(self._unrealized(m)),
+            } for m in markets]
+
+    def futures_account_balance(self, **params):
+        with self._lock:
+            return [{'asset': self.asset, 'balance': repr(self.balance), 'crossWalletBalance': repr(self.balance)}]
+
+    def futures_account(self, **params):
+        with self._lock:
+            unrealized = sum(self._unrealized(m) for m in self.markets.values())
+            positions = self.futures_position_information()
+            return {
+                'totalWalletBalance': repr(self.balance),
+                'totalUnrealizedProfit': repr(unrealized),
+                'totalMarginBalance': repr(self.balance + unrealized),
+                'availableBalance': repr(self.balance + unrealized),
+                'assets': [{'asset': self.asset, 'walletBalance': repr(self.balance)}],
+                'positions': positions,
+            }
+
+    def futures_exchange_info(self, **params):
+        return {
+            'serverTime': self.time,
+            'symbols': [{
+                'symbol': m.symbol,
+                'status': "TRADING",
+                'filters': [
+                    {'filterType': "PRICE_FILTER", 'tickSize': repr(m.tick_size), 'minPrice': repr(m.tick_size),
+                     'maxPrice': "0"},
+                    {'filterType': "LOT_SIZE", 'stepSize': repr(m.step_size), 'minQty': repr(m.min_qty),
+                     'maxQty': "0"},
+                    {'filterType': "MARKET_LOT_SIZE", 'stepSize': repr(m.step_size), 'minQty': repr(m.min_qty),
+                     'maxQty': "0"},
+                    {'filterType': "MIN_NOTIONAL", 'notional': repr(m.min_notional)},
+                ],
+            } for m in self.markets.values()],
+        }
+
+    def futures_symbol_ticker(self, symbol=None, **params):
+        markets = [self._market(symbol)] if symbol else list(self.markets.values())
+        tickers = [{'symbol': m.symbol, 'price': repr(m.price()), 'time': self.time} for m in markets]
+        return tickers[0] if symbol else tickers
+
+    def futures_mark_price(self, symbol=None, **params):
+        markets = [self._market(symbol)] if symbol else list(self.markets.values())
+        marks = [{'symbol': m.symbol, 'markPrice': repr(m.price()), 'time': self.time} for m in markets]
+        return marks[0] if symbol else marks
+
+    def futures_orderbook_ticker(self, symbol=None, **params):
+        markets = [self._market(symbol)] if symbol else list(self.markets.values())
+        tickers = []
+        for m in markets:
+            price = m.price()
+            tickers.append({'symbol': m.symbol, 'bidPrice': repr(price - m.tick_size / 2), 'bidQty': "0",
+                            'askPrice': repr(price + m.tick_size / 2), 'askQty': "0", 'time': self.time})
+        return tickers[0] if symbol else tickers
+
+    def futures_ping(self, **params):
+        return {}
+
+    def futures_time(self, **params):
+        return {'serverTime': self.time}
+
+    def summary(self):
+        """Order counts by status, positions and balance"""
+        with self._lock:
+            statuses = {}
+            for order in self.orders.values():
+                statuses[order.status] = statuses.get(order.status, 0) + 1
+            return {
+                'time': self.time,
+                'balance': self.balance,
+                'orders': statuses,
+                'positions': {
+                    m.symbol: {'positionAmt': m.position, 'entryPrice': m.entry_price,
+                               'realizedPnl': m.realized_pnl, 'unrealizedPnl': self._unrealized(m)}
+                    for m in self.markets.values()
+                },
+            }
+
+
+class LatencyClient:
+    """Blocking facade that sleeps ``latency`` seconds before every futures_* call
+
+    Stands in for a network client: requests from several threads overlap
+    the way real round trips do, while the wrapped exchange stays the
+    source of truth. Other attributes are passed through.
+    """
+
+    def __init__(self, client, latency=0.02):
+        self.client = client
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        method = getattr(self.client, name)
+        if not name.startswith("futures_") or not callable(method):
+            return method
+
+        def call(*args, **params):
+            with self._lock:
+                self.requests += 1
+            if self.latency:
+                time.sleep(self.latency)
+            return method(*args, **params)
+        return call
+
+
+class AsyncSimulatedExchange:
+    """Coroutine facade over an exchange, for AsyncSimplifiedBot
+
+    Every futures_* method awaits ``latency`` seconds and then runs on the
+    wrapped (blocking) exchange, so it can replace binance.AsyncClient in
+    tests and benchmarks.
+    """
+
+    def __init__(self, exchange, latency=0.0):
+        self.exchange = exchange
+        self.latency = latency
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def __getattr__(self, name):
+        method = getattr(self.exchange, name)
+        if not name.startswith("futures_") or not callable(method):
+            return method
+
+        async def call(*args, **params):
+            self.requests += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                return method(*args, **params)
+            finally:
+                self.in_flight -= 1
+        return call
+
+    async def close_connection(self):
+        pass
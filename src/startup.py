@@ -0,0 +1,182 @@
+import json
+import os
+import threading
+import time
+from symbol_filters import write_json_atomic
+from transport import TunedSession, configure_transport
+from time_sync import FastSigner
+
+# Futures ping endpoints, used to open the first pooled connection early
+FUTURES_PING_URLS = {
+    True: "https://testnet.binancefuture.com/fapi/v1/ping",
+    False: "https://fapi.binance.com/fapi/v1/ping",
+}
+
+
+def _open_connection(session, url):
+    try:
+        session.get(url)
+    except Exception:
+        pass  # The first real request reconnects and reports the error
+
+
+def create_client(api_key, api_secret, testnet=True, transport=None):
+    """binance.Client on a TunedSession, built without blocking on the network
+
+    The first keep-alive connection (DNS, TCP, TLS) to the futures host is
+    opened on a background thread while the SDK is imported, which takes
+    about as long. Client.__init__ is bypassed because all it adds is a
+    ping to the *spot* API, a host futures requests never use. Signed
+    requests are built by a FastSigner.
+
+    Args:
+        api_key (str): Binance API key
+        api_secret (str): Binance API secret
+        testnet (bool): Use testnet
+        transport (TransportConfig): HTTP pool/timeout/retry settings
+
+    Returns:
+        binance.Client
+    """
+    session = TunedSession(transport)
+    threading.Thread(
+        target=_open_connection, args=(session, FUTURES_PING_URLS[bool(testnet)]),
+        name="OpenConnection", daemon=True,
+    ).start()
+    from binance import Client
+    client = Client.__new__(Client)
+    super(Client, client).__init__(api_key, api_secret, testnet=testnet)
+    configure_transport(client, session=session)
+    FastSigner(api_secret).install(client)
+    if not hasattr(client, "futures_modify_order"):
+        # Older python-binance releases lack PUT /fapi/v1/order (modify a LIMIT order)
+        client.futures_modify_order = lambda **params: client._request_futures_api('put', 'order', True, data=params)
+    return client
+
+
+def measure_time_offset(client):
+    """Server time minus local time in milliseconds, from one futures_time() call"""
+    start = time.time()
+    server_time = client.futures_time()['serverTime']
+    end = time.time()
+    return int(server_time - (start + end) * 500)
+
+
+class TimeOffsetCache:
+    """Server-time offset persisted to disk, so signed requests need no time call at startup"""
+
+    def __init__(self, path="time_offset.json", max_age=3600, clock=time.time):
+        """Initialize the cache
+
+        Args:
+            path (str): JSON file the offset is persisted to
+            max_age (float): Seconds before a cached offset is measured again
+            clock (callable): Wall-clock time source in seconds
+        """
+        self.path = path
+        self.max_age = max_age
+        self.clock = clock
+
+    def load(self):
+        """Return the cached offset in milliseconds, or None if missing or expired"""
+        if not self.path or not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path) as f:
+                cached = json.load(f)
+            if self.clock() - cached['measured_at'] > self.max_age:
+                return None
+            return int(cached['offset_ms'])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save(self, offset):
+        if not self.path:
+            return
+        try:
+            write_json_atomic(self.path, {'measured_at': self.clock(), 'offset_ms': offset})
+        except OSError:
+            pass  # The offset is applied in memory; the next start measures it again
+
+    def apply(self, raw_client):
+        """Set raw_client.timestamp_offset from the cache
+
+        Returns:
+            bool: True if a cached offset was applied
+        """
+        offset = self.load()
+        if offset is None:
+            return False
+        raw_client.timestamp_offset = offset
+        return True
+
+    def refresh(self, raw_client):
+        """Measure, apply and persist the offset"""
+        offset = measure_time_offset(raw_client)
+        raw_client.timestamp_offset = offset
+        self.save(offset)
+        return offset
+
+
+class ConnectionCheck:
+    """Validate credentials (and measure the server-time offset) on a background thread
+
+    The check runs concurrently with the first real request instead of
+    delaying startup; result() waits for it and raises its error.
+    """
+
+    def __init__(self, client, raw_client=None, time_offsets=None, logger=None):
+        """Initialize the check
+
+        Args:
+            client: Client used for the futures_account() call
+            raw_client (binance.Client): Client whose timestamp_offset is set
+            time_offsets (TimeOffsetCache): Offset cache; a fresh cached offset is
+                applied right away, otherwise the check measures and saves one
+            logger (logging.Logger): Optional logger
+        """
+        self.client = client
+        self.raw_client = raw_client
+        self.time_offsets = time_offsets
+        self.logger = logger
+        self.account = None
+        self.error = None
+        self._thread = None
+        self._measure_offset = (
+            raw_client is not None and time_offsets is not None and not time_offsets.apply(raw_client)
+        )
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name="ConnectionCheck", daemon=True)
+        self._thread.start()
+        return self
+
+    def run(self):
+        try:
+            if self._measure_offset:
+                self.time_offsets.refresh(self.raw_client)
+            self.account = self.client.futures_account()
+        except Exception as e:
+            self.error = e
+            if self.logger:
+                self.logger.error("❌ Connection check failed: %s", e)
+
+    def done(self):
+        return self._thread is None or not self._thread.is_alive()
+
+    def result(self, timeout=None):
+        """Wait for the check
+
+        Returns:
+            dict: futures_account() response
+
+        Raises:
+            The check's exception, or TimeoutError if it is still running
+        """
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                raise TimeoutError("Connection check still running")
+        if self.error is not None:
+            raise self.error
+        return self.account
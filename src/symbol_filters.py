@@ -0,0 +1,317 @@
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from decimal import Decimal
+
+
+def _scale_of(value):
+    """Number of decimal places needed to represent a filter value exactly"""
+    exponent = Decimal(str(value)).normalize().as_tuple().exponent
+    return max(0, -exponent)
+
+
+def _to_units(value, decimals):
+    """Convert a decimal string/float to integer units at 10**-decimals"""
+    return int(Decimal(str(value)).scaleb(decimals))
+
+
+def write_json_atomic(path, data):
+    """Replace ``path`` with a JSON document, written to a unique temporary file first
+
+    Several threads or processes may save the same cache at once: each
+    writes its own temporary file in the target directory, so readers only
+    ever see a complete document and the last writer wins.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                                    prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class SymbolFilters:
+    """LOT_SIZE / PRICE_FILTER / MIN_NOTIONAL rules for one symbol
+
+    Step and tick sizes are converted once to integer units so quantizing and
+    validating an order is a few integer operations, with no Decimal maths on
+    the order path.
+    """
+
+    __slots__ = (
+        "symbol", "qty_decimals", "qty_scale", "step_units", "min_qty_units", "max_qty_units",
+        "market_step_units", "market_min_qty_units", "market_max_qty_units",
+        "price_decimals", "price_scale", "tick_units", "min_price_units", "max_price_units",
+        "min_notional_units",
+    )
+
+    def __init__(self, symbol, step_size, min_qty, max_qty, tick_size, min_price=0, max_price=0,
+                 min_notional=0, market_step_size=None, market_min_qty=None, market_max_qty=None):
+        self.symbol = symbol
+        market_step_size = market_step_size or step_size
+        market_min_qty = market_min_qty if market_min_qty is not None else min_qty
+        market_max_qty = market_max_qty if market_max_qty is not None else max_qty
+
+        self.qty_decimals = max(_scale_of(step_size), _scale_of(market_step_size))
+        self.qty_scale = 10 ** self.qty_decimals
+        self.step_units = _to_units(step_size, self.qty_decimals)
+        self.min_qty_units = _to_units(min_qty, self.qty_decimals)
+        self.max_qty_units = _to_units(max_qty, self.qty_decimals)
+        self.market_step_units = _to_units(market_step_size, self.qty_decimals)
+        self.market_min_qty_units = _to_units(market_min_qty, self.qty_decimals)
+        self.market_max_qty_units = _to_units(market_max_qty, self.qty_decimals)
+
+        self.price_decimals = _scale_of(tick_size)
+        self.price_scale = 10 ** self.price_decimals
+        self.tick_units = _to_units(tick_size, self.price_decimals)
+        self.min_price_units = _to_units(min_price, self.price_decimals)
+        self.max_price_units = _to_units(max_price, self.price_decimals)
+
+        # Notional is compared in qty_units * price_units
+        self.min_notional_units = _to_units(min_notional, self.qty_decimals + self.price_decimals)
+
+    @classmethod
+    def from_symbol_info(cls, symbol_info):
+        """Build filters from one entry of futures_exchange_info()['symbols']"""
+        filters = {f['filterType']: f for f in symbol_info.get('filters', [])}
+        lot = filters.get('LOT_SIZE', {})
+        market_lot = filters.get('MARKET_LOT_SIZE', {})
+        price = filters.get('PRICE_FILTER', {})
+        notional = filters.get('MIN_NOTIONAL', {})
+        return cls(
+            symbol_info['symbol'],
+            step_size=lot.get('stepSize', '0.00000001'),
+            min_qty=lot.get('minQty', '0'),
+            max_qty=lot.get('maxQty', '0'),
+            tick_size=price.get('tickSize', '0.00000001'),
+            min_price=price.get('minPrice', '0'),
+            max_price=price.get('maxPrice', '0'),
+            # Futures use "notional", spot uses "minNotional"
+            min_notional=notional.get('notional', notional.get('minNotional', '0')),
+            market_step_size=market_lot.get('stepSize'),
+            market_min_qty=market_lot.get('minQty'),
+            market_max_qty=market_lot.get('maxQty'),
+        )
+
+    def quantity_units(self, quantity, market=False):
+        """Round a quantity down to the lot step, in integer units"""
+        step = self.market_step_units if market else self.step_units
+        units = math.floor(round(float(quantity) * self.qty_scale, 6))
+        if step:
+            units -= units % step
+        return units
+
+    def price_units(self, price):
+        """Round a price to the nearest tick, in integer units"""
+        units = round(float(price) * self.price_scale)
+        if self.tick_units:
+            units = round(units / self.tick_units) * self.tick_units
+        return units
+
+    def format_quantity(self, units):
+        return f"{units / self.qty_scale:.{self.qty_decimals}f}"
+
+    def format_price(self, units):
+        return f"{units / self.price_scale:.{self.price_decimals}f}"
+
+    def quantize_quantity(self, quantity, market=False):
+        """Round a quantity down to the lot step
+
+        Returns:
+            str: Quantity formatted with the symbol's precision
+        """
+        return self.format_quantity(self.quantity_units(quantity, market))
+
+    def quantize_price(self, price):
+        """Round a price to the nearest tick and check PRICE_FILTER bounds
+
+        Returns:
+            str: Price formatted with the symbol's precision
+        """
+        units = self.price_units(price)
+        self._check_price_units(units, price)
+        return self.format_price(units)
+
+    def _check_price_units(self, units, price):
+        if units <= 0 or units < self.min_price_units:
+            raise ValueError(f"Price {price} below minimum for {self.symbol}")
+        if self.max_price_units and units > self.max_price_units:
+            raise ValueError(f"Price {price} above maximum for {self.symbol}")
+
+    def _check_quantity_units(self, units, quantity, market):
+        min_units = self.market_min_qty_units if market else self.min_qty_units
+        max_units = self.market_max_qty_units if market else self.max_qty_units
+        if units <= 0 or units < min_units:
+            raise ValueError(
+                f"Quantity {quantity} below minimum {self.format_quantity(min_units)} for {self.symbol}"
+            )
+        if max_units and units > max_units:
+            raise ValueError(
+                f"Quantity {quantity} above maximum {self.format_quantity(max_units)} for {self.symbol}"
+            )
+
+    def validate(self, quantity, price=None, market=False):
+        """Quantize and validate an order against the symbol's filters
+
+        Args:
+            quantity (float): Order quantity
+            price (float): Price used for rounding and the notional check;
+                omitted for market orders with no reference price
+            market (bool): Use MARKET_LOT_SIZE instead of LOT_SIZE
+
+        Returns:
+            tuple: (quantity, price) as exchange-formatted strings; price is
+                None when not given
+        """
+        qty_units = self.quantity_units(quantity, market)
+        self._check_quantity_units(qty_units, quantity, market)
+        if price is None:
+            return self.format_quantity(qty_units), None
+
+        price_units = self.price_units(price)
+        self._check_price_units(price_units, price)
+        if qty_units * price_units < self.min_notional_units:
+            raise ValueError(
+                f"Order notional below minimum "
+                f"{self.min_notional_units / (self.qty_scale * self.price_scale)} for {self.symbol}"
+            )
+        return self.format_quantity(qty_units), self.format_price(price_units)
+
+    def split_quantity(self, total_quantity, chunks, market=True):
+        """Split a quantity into lot-aligned chunks summing exactly to the total
+
+        Returns:
+            list: Chunk quantities as strings; the last chunk takes the remainder
+        """
+        step = (self.market_step_units if market else self.step_units) or 1
+        total_units = self.quantity_units(total_quantity, market)
+        base_units = (total_units // chunks) // step * step
+        parts = [base_units] * (chunks - 1)
+        parts.append(total_units - base_units * (chunks - 1))
+        parts = [units for units in parts if units > 0]
+        for units in parts:
+            self._check_quantity_units(units, self.format_quantity(units), market)
+        return [self.format_quantity(units) for units in parts]
+
+
+class SymbolFilterCache:
+    """Exchange-info cache persisted to disk with a TTL and lazy refresh"""
+
+    def __init__(self, client, path="exchange_info.json", ttl=3600, clock=time.time, unknown_refresh=30,
+                 logger=None):
+        """Initialize the cache
+
+        Args:
+            client: Binance client used to fetch futures_exchange_info
+            path (str): JSON file the exchange info is persisted to (None disables)
+            ttl (float): Seconds before cached exchange info is refreshed
+            clock (callable): Wall-clock time source in seconds
+            unknown_refresh (float): Minimum age of the exchange info before a
+                symbol missing from it triggers a refresh (new listings are
+                seen within this delay; typos do not refetch on every order)
+            logger (logging.Logger): Optional logger
+        """
+        self.client = client
+        self.path = path
+        self.ttl = ttl
+        self.clock = clock
+        self.unknown_refresh = unknown_refresh
+        self.logger = logger
+        self._filters = {}
+        self._exchange_info = None
+        self._fetched_at = None
+        self._lock = threading.Lock()
+
+    def load(self, exchange_info, fetched_at=None):
+        """Populate the cache from a futures_exchange_info() response"""
+        filters = {}
+        for symbol_info in exchange_info.get('symbols', []):
+            filters[symbol_info['symbol']] = SymbolFilters.from_symbol_info(symbol_info)
+        self._filters = filters
+        self._exchange_info = exchange_info
+        self._fetched_at = self.clock() if fetched_at is None else fetched_at
+
+    def export(self):
+        """Exchange info and fetch time for load() in another cache, fetching it if needed
+
+        Returns:
+            tuple: (exchange_info, fetched_at)
+        """
+        with self._lock:
+            if self._is_stale() and not self._load_from_disk():
+                self.refresh()
+            return self._exchange_info, self._fetched_at
+
+    def __contains__(self, symbol):
+        return symbol.upper() in self._filters
+
+    def age(self):
+        """Seconds since the exchange info was fetched, None before the first load"""
+        return None if self._fetched_at is None else self.clock() - self._fetched_at
+
+    def _load_from_disk(self):
+        if not self.path or not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path) as f:
+                cached = json.load(f)
+            fetched_at = cached['fetched_at']
+            if self.clock() - fetched_at > self.ttl:
+                return False
+            self.load(cached['exchange_info'], fetched_at)
+            return True
+        except (OSError, ValueError, KeyError):
+            return False
+
+    def refresh(self):
+        """Fetch exchange info from the API and persist it"""
+        if self.client is None:
+            raise ValueError("No client configured to refresh exchange info")
+        exchange_info = self.client.futures_exchange_info()
+        # Only the filters are needed; keep the cache file small
+        slim = {'symbols': [
+            {'symbol': s['symbol'], 'filters': s.get('filters', [])}
+            for s in exchange_info.get('symbols', [])
+        ]}
+        self.load(slim)
+        if self.path:
+            try:
+                write_json_atomic(self.path, {'fetched_at': self._fetched_at, 'exchange_info': slim})
+            except OSError as e:
+                # The filters are in memory; only the next start's disk cache is lost
+                if self.logger:
+                    self.logger.warning("Could not save exchange info to %s: %s", self.path, e)
+
+    def _is_stale(self):
+        if self._fetched_at is None:
+            return True
+        # Without a client, preloaded exchange info never expires
+        return self.client is not None and self.clock() - self._fetched_at > self.ttl
+
+    def get(self, symbol):
+        """Return the SymbolFilters for a symbol, loading or refreshing lazily"""
+        symbol = symbol.upper()
+        filters = self._filters.get(symbol)
+        if filters is not None and not self._is_stale():
+            return filters
+
+        with self._lock:
+            if self._is_stale() and not self._load_from_disk():
+                self.refresh()
+            filters = self._filters.get(symbol)
+            if filters is None and self.client is not None and self.age() > self.unknown_refresh:
+                # Symbol may have been listed since the last fetch
+                self.refresh()
+                filters = self._filters.get(symbol)
+        if filters is None:
+            raise ValueError(f"Unknown symbol: {symbol}")
+        return filters
@@ -0,0 +1,214 @@
+import threading
+import uuid
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Per-endpoint (path) timeouts in seconds; other requests use the defaults
+DEFAULT_ENDPOINT_TIMEOUTS = {
+    "/fapi/v1/order": (3.05, 5),
+    "/fapi/v1/batchOrders": (3.05, 5),
+    "/fapi/v1/exchangeInfo": (3.05, 30),
+}
+
+
+class TransportConfig:
+    """HTTP transport settings shared by every order class"""
+
+    def __init__(self, pool_size=20, connect_timeout=3.05, read_timeout=10, endpoint_timeouts=None,
+                 max_retries=2, backoff_factor=0.2, warm_up_connections=4):
+        """Initialize transport settings
+
+        Args:
+            pool_size (int): Keep-alive connections per host; size it for the
+                number of threads/workers sending requests concurrently
+            connect_timeout (float): Default TCP/TLS connect timeout
+            read_timeout (float): Default response timeout
+            endpoint_timeouts (dict): Path -> (connect, read) timeout overrides
+            max_retries (int): Retries for connection errors and idempotent requests
+            backoff_factor (float): Exponential backoff between retries
+            warm_up_connections (int): Connections opened at startup (0 disables)
+        """
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        self.endpoint_timeouts = dict(DEFAULT_ENDPOINT_TIMEOUTS)
+        if endpoint_timeouts:
+            self.endpoint_timeouts.update(endpoint_timeouts)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.warm_up_connections = warm_up_connections
+
+    def timeout_for(self, url):
+        return self.endpoint_timeouts.get(urlparse(url).path)
+
+
+class TunedSession(requests.Session):
+    """requests.Session with a sized keep-alive pool, retries and per-endpoint timeouts"""
+
+    def __init__(self, config=None):
+        super().__init__()
+        self.config = config or TransportConfig()
+        retry = Retry(
+            total=self.config.max_retries,
+            connect=self.config.max_retries,
+            read=self.config.max_retries,
+            status=self.config.max_retries,
+            # Connection errors are retried for every method (nothing was sent);
+            # read errors and 5xx only for methods that are safe to repeat
+            allowed_methods=frozenset({"GET", "DELETE", "PUT"}),
+            status_forcelist=(502, 503, 504),
+            backoff_factor=self.config.backoff_factor,
+            respect_retry_after_header=False,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=self.config.pool_size,
+            max_retries=retry,
+            pool_block=False,
+        )
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def request(self, method, url, **kwargs):
+        endpoint_timeout = self.config.timeout_for(url)
+        if endpoint_timeout is not None:
+            kwargs["timeout"] = endpoint_timeout
+        elif kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.config.timeout
+        return super().request(method, url, **kwargs)
+
+
+def configure_transport(client, config=None, session=None):
+    """Replace a binance.Client's default session with a TunedSession
+
+    Args:
+        client: binance.Client (not a wrapper)
+        config (TransportConfig): Transport settings
+        session (TunedSession): Already built session to install instead
+
+    Returns:
+        TunedSession: The installed session
+    """
+    session = session or TunedSession(config)
+    old_session = getattr(client, "session", None)
+    if old_session is not None:
+        # Keep the API-key and user-agent headers python-binance set up
+        session.headers.update(old_session.headers)
+        old_session.close()
+    client.session = session
+    return session
+
+
+def warm_up(client, connections=4):
+    """Open pooled connections ahead of the first order (DNS, TCP and TLS)
+
+    Sends concurrent futures_ping requests so ``connections`` keep-alive
+    connections are established and left in the pool.
+
+    Returns:
+        int: Number of successful pings
+    """
+    results = []
+
+    def ping():
+        try:
+            client.futures_ping()
+            results.append(True)
+        except Exception:
+            pass
+
+    threads = [threading.Thread(target=ping, daemon=True) for _ in range(max(0, connections))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(results)
+
+
+# Binance error code for a lookup of an order that was never placed
+ORDER_DOES_NOT_EXIST = -2013
+# Binance error code for a query or cancel naming an order the exchange does not know
+UNKNOWN_ORDER_SENT = -2011
+# Binance error code for a backend timeout: "Send status unknown; execution status unknown"
+EXECUTION_STATUS_UNKNOWN = -1007
+
+
+class OrderStateUnknown(Exception):
+    """An order request failed in transit and the lookup could not tell whether it was placed"""
+
+    def __init__(self, client_order_id, cause):
+        super().__init__(f"Order {client_order_id} may or may not have been placed: {cause}")
+        self.client_order_id = client_order_id
+        self.cause = cause
+
+
+def outcome_unknown(error):
+    """Whether a failed order request may still have been executed by the exchange
+
+    True for connection errors and timeouts, OrderStateUnknown, the -1007
+    backend timeout and 5xx answers; False for rejections (4xx).
+    """
+    if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout, OrderStateUnknown)):
+        return True
+    if getattr(error, "code", None) == EXECUTION_STATUS_UNKNOWN:
+        return True
+    status = getattr(error, "status_code", None)
+    return isinstance(status, int) and status >= 500
+
+
+def new_client_order_id(prefix="sb"):
+    """Unique clientOrderId (Binance allows up to 36 characters)"""
+    return f"{prefix}-{uuid.uuid4().hex[:30]}"
+
+
+class IdempotentOrderClient:
+    """Retry order placement safely using clientOrderId deduplication
+
+    Every new order gets a newClientOrderId. If the request fails with a
+    connection error or timeout it may still have reached the exchange, so
+    the order is looked up by that id before it is sent again. It is only
+    resent when the exchange answers that the order does not exist; if the
+    lookup fails too, OrderStateUnknown is raised rather than risk a
+    duplicate (the caller can query the id later). Other attribute access
+    is forwarded to the wrapped client.
+    """
+
+    def __init__(self, client, max_retries=2, logger=None):
+        self.client = client
+        self.max_retries = max_retries
+        self.logger = logger
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    def futures_create_order(self, **params):
+        if not params.get("newClientOrderId"):
+            params["newClientOrderId"] = new_client_order_id()
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self.client.futures_create_order(**params)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                existing = self._find_order(params)
+                if existing is not None:
+                    return existing
+                if attempt == self.max_retries:
+                    raise
+                if self.logger:
+                    self.logger.warning(
+                        "Order %s not acknowledged (%s), resending", params["newClientOrderId"], e
+                    )
+
+    def _find_order(self, params):
+        """Return the order placed under the request's clientOrderId, None if there is none"""
+        try:
+            return self.client.futures_get_order(
+                symbol=params["symbol"], origClientOrderId=params["newClientOrderId"]
+            )
+        except Exception as e:
+            if getattr(e, "code", None) == ORDER_DOES_NOT_EXIST:
+                return None
+            # A filled or cancelled order would not block a resend under the same id
+            raise OrderStateUnknown(params["newClientOrderId"], e) from e
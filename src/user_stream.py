@@ -0,0 +1,425 @@
+import json
+import threading
+import time
+
+FUTURES_WS_URL = "wss://fstream.binance.com/ws/"
+FUTURES_TESTNET_WS_URL = "wss://stream.binancefuture.com/ws/"
+
+
+# Binance pings every 3 minutes and closes connections that miss pongs for 10
+PING_TIMEOUT = 600
+
+FINAL_ORDER_STATUSES = ("FILLED", "CANCELED", "EXPIRED", "REJECTED")
+
+
+def connect_websocket(url, timeout=10, read_timeout=PING_TIMEOUT):
+    """Open a blocking websocket connection (requires websocket-client)
+
+    Server pings are answered inside recv(), so a quiet stream stays
+    connected; recv() only times out when nothing at all, pings included,
+    arrived for ``read_timeout`` seconds, i.e. the connection is dead.
+
+    Args:
+        url (str): Stream URL
+        timeout (float): Connect and handshake timeout in seconds
+        read_timeout (float): Seconds without any frame before recv() fails
+
+    Returns:
+        object: Connection with recv() -> str and close()
+    """
+    try:
+        import websocket
+    except ImportError:
+        raise ImportError("Streaming requires websocket-client: pip install websocket-client")
+    connection = websocket.create_connection(url, timeout=timeout)
+    connection.settimeout(read_timeout)
+    return connection
+
+
+def order_update_event(order, previous=None):
+    """ORDER_TRADE_UPDATE event equivalent to a REST order response
+
+    Used to deliver the final state of orders that closed while the stream
+    was down. Quantity filled since ``previous`` (the last known state) is
+    reported as one trade at the average price.
+    """
+    executed = float(order.get('executedQty') or 0)
+    last = executed - float((previous or {}).get('executedQty') or 0)
+    return {'e': "ORDER_TRADE_UPDATE", 'E': order.get('updateTime', 0), 'o': {
+        'i': order['orderId'],
+        'c': order.get('clientOrderId'),
+        's': order['symbol'],
+        'S': order.get('side'),
+        'o': order.get('type'),
+        'X': order.get('status'),
+        'x': "TRADE" if last > 0 else order.get('status'),
+        'p': order.get('price'),
+        'sp': order.get('stopPrice'),
+        'q': order.get('origQty'),
+        'z': order.get('executedQty'),
+        'l': str(round(max(last, 0.0), 8)),
+        'L': order.get('avgPrice'),
+        'ap': order.get('avgPrice'),
+        'R': order.get('reduceOnly', False),
+        'T': order.get('updateTime', 0),
+    }}
+
+
+class OrderStateBook:
+    """In-memory order, position and balance state kept current by stream events
+
+    All lookups are dict reads; nothing here makes a REST call.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.orders = {}
+        self.client_ids = {}
+        self.positions = {}
+        self.balances = {}
+
+    def load_snapshot(self, open_orders=(), positions=(), balances=()):
+        """Replace state with REST snapshots (startup and gap recovery)
+
+        Orders the book holds as open that are missing from ``open_orders``
+        closed while no events arrived. They are kept, still open, and
+        returned so their final state can be fetched.
+
+        Args:
+            open_orders (list): futures_get_open_orders() response
+            positions (list): futures_position_information() response
+            balances (list): futures_account_balance() response
+
+        Returns:
+            list: Orders that closed since the book last heard of them
+        """
+        with self._lock:
+            still_open = {o['orderId'] for o in open_orders}
+            closed = [
+                o for oid, o in self.orders.items()
+                if o['status'] not in FINAL_ORDER_STATUSES and oid not in still_open
+            ]
+            for o in open_orders:
+                self._store_order({
+                    'orderId': o['orderId'],
+                    'clientOrderId': o.get('clientOrderId'),
+                    'symbol': o['symbol'],
+                    'side': o.get('side'),
+                    'type': o.get('type'),
+                    'status': o.get('status'),
+                    'price': o.get('price'),
+                    'stopPrice': o.get('stopPrice'),
+                    'origQty': o.get('origQty'),
+                    'executedQty': o.get('executedQty'),
+                    'avgPrice': o.get('avgPrice'),
+                    'updateTime': o.get('updateTime', 0),
+                })
+            for p in positions:
+                self.positions[p['symbol']] = {
+                    'symbol': p['symbol'],
+                    'positionAmt': p.get('positionAmt'),
+                    'entryPrice': p.get('entryPrice'),
+                    'unrealizedProfit': p.get('unRealizedProfit'),
+                    'updateTime': p.get('updateTime', 0),
+                }
+            for b in balances:
+                self.balances[b['asset']] = {
+                    'asset': b['asset'],
+                    'walletBalance': b.get('balance'),
+                    'crossWalletBalance': b.get('crossWalletBalance'),
+                    'updateTime': b.get('updateTime', 0),
+                }
+        return closed
+
+    def _store_order(self, order):
+        self.orders[order['orderId']] = order
+        if order.get('clientOrderId'):
+            self.client_ids[order['clientOrderId']] = order['orderId']
+
+    def apply_order_update(self, event):
+        """Apply an ORDER_TRADE_UPDATE event
+
+        Returns:
+            dict: Updated order state, or None if the event was stale or
+                repeated what the book already holds
+        """
+        o = event['o']
+        with self._lock:
+            current = self.orders.get(o['i'])
+            if current and (current['updateTime'] > o.get('T', 0) or (
+                    current['updateTime'] == o.get('T', 0) and current['status'] == o.get('X')
+                    and current['executedQty'] == o.get('z'))):
+                return None
+            order = {
+                'orderId': o['i'],
+                'clientOrderId': o.get('c'),
+                'symbol': o['s'],
+                'side': o.get('S'),
+                'type': o.get('o'),
+                'status': o.get('X'),
+                'executionType': o.get('x'),
+                'price': o.get('p'),
+                'stopPrice': o.get('sp'),
+                'origQty': o.get('q'),
+                'executedQty': o.get('z'),
+                'lastFilledQty': o.get('l'),
+                'lastFilledPrice': o.get('L'),
+                'avgPrice': o.get('ap'),
+                'realizedProfit': o.get('rp'),
+                'updateTime': o.get('T', 0),
+            }
+            self._store_order(order)
+            return order
+
+    def apply_account_update(self, event):
+        """Apply an ACCOUNT_UPDATE event (balances and positions)
+
+        Entries already newer than the event (from a snapshot taken after
+        it) are left alone.
+        """
+        a = event['a']
+        updated = event.get('T', 0)
+        with self._lock:
+            for b in a.get('B', []):
+                if self.balances.get(b['a'], {}).get('updateTime', 0) > updated:
+                    continue
+                self.balances[b['a']] = {
+                    'asset': b['a'],
+                    'walletBalance': b.get('wb'),
+                    'crossWalletBalance': b.get('cw'),
+                    'updateTime': updated,
+                }
+            for p in a.get('P', []):
+                if self.positions.get(p['s'], {}).get('updateTime', 0) > updated:
+                    continue
+                self.positions[p['s']] = {
+                    'symbol': p['s'],
+                    'positionAmt': p.get('pa'),
+                    'entryPrice': p.get('ep'),
+                    'unrealizedProfit': p.get('up'),
+                    'updateTime': updated,
+                }
+
+    def get_order(self, order_id=None, client_order_id=None):
+        """Look up an order by orderId or clientOrderId"""
+        if order_id is None and client_order_id is not None:
+            order_id = self.client_ids.get(client_order_id)
+        return self.orders.get(order_id)
+
+    def open_orders(self, symbol=None):
+        """Orders not yet in a final state, optionally for one symbol"""
+        with self._lock:
+            return [
+                o for o in self.orders.values()
+                if o['status'] in ("NEW", "PARTIALLY_FILLED")
+                and (symbol is None or o['symbol'] == symbol)
+            ]
+
+    def get_position(self, symbol):
+        return self.positions.get(symbol.upper())
+
+    def get_balance(self, asset="USDT"):
+        return self.balances.get(asset)
+
+    def account_snapshot(self):
+        """Local equivalent of the futures_account fields the bot uses"""
+        with self._lock:
+            usdt = self.balances.get("USDT") or {}
+            return {
+                'totalWalletBalance': usdt.get('walletBalance', "0"),
+                'assets': list(self.balances.values()),
+                'positions': list(self.positions.values()),
+            }
+
+
+class UserDataStream:
+    """Futures user-data stream: listenKey lifecycle, keepalive and reconnect
+
+    Events update an OrderStateBook so order status, positions and balances
+    can be read locally. On every (re)connect the stream is opened first and
+    the book resynced from REST second: events sent meanwhile wait in the
+    connection and are applied on top of the snapshot (older ones are
+    dropped by update time), so nothing falls between the two. Orders that
+    closed while disconnected are looked up and reported to listeners.
+    """
+
+    def __init__(self, client, logger=None, testnet=True, connect=connect_websocket,
+                 keepalive_interval=1800, reconnect_delay=1, max_reconnect_delay=60):
+        """Initialize the stream
+
+        Args:
+            client: Binance client (listenKey and snapshot REST calls)
+            logger (logging.Logger): Optional logger
+            testnet (bool): Use the testnet stream endpoint
+            connect (callable): url -> connection with recv()/close()
+            keepalive_interval (float): Seconds between listenKey keepalives
+            reconnect_delay (float): Initial reconnect backoff in seconds
+            max_reconnect_delay (float): Maximum reconnect backoff in seconds
+        """
+        self.client = client
+        self.logger = logger
+        self.base_url = FUTURES_TESTNET_WS_URL if testnet else FUTURES_WS_URL
+        self.connect = connect
+        self.keepalive_interval = keepalive_interval
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.book = OrderStateBook()
+        self.listen_key = None
+        self._listeners = []
+        self._resync_listeners = []
+        self._connection = None
+        self._stop = threading.Event()
+        self._threads = []
+
+    def add_listener(self, callback):
+        """Call ``callback(event)`` for every stream event after the book is updated"""
+        self._listeners.append(callback)
+
+    def add_resync_listener(self, callback):
+        """Call ``callback(open_orders)`` after each REST resync with the open-order snapshot"""
+        self._resync_listeners.append(callback)
+
+    def resync(self):
+        """Reload open orders, positions and balances from REST
+
+        The final state of each order that closed since the last event is
+        fetched and delivered like a stream event, so listeners see fills
+        and cancels that happened during a gap.
+
+        Returns:
+            list: Final states of the orders that closed during the gap
+        """
+        open_orders = self.client.futures_get_open_orders()
+        closed = self.book.load_snapshot(
+            open_orders,
+            self.client.futures_position_information(),
+            self.client.futures_account_balance(),
+        )
+        final = []
+        for order in closed:
+            try:
+                result = self.client.futures_get_order(symbol=order['symbol'], orderId=order['orderId'])
+            except Exception as e:
+                # Stays open in the book; the next resync tries again
+                if self.logger:
+                    self.logger.warning("Could not fetch final state of order %s: %s", order['orderId'], e)
+                continue
+            self.process_message(order_update_event(result, order))
+            final.append(result)
+        if final and self.logger:
+            self.logger.info("%d order(s) closed while the user stream was down", len(final))
+        for callback in self._resync_listeners:
+            try:
+                callback(open_orders)
+            except Exception as e:
+                if self.logger:
+                    self.logger.error("User stream resync listener failed: %s", e)
+        return final
+
+    def process_message(self, raw):
+        """Apply one raw stream message (also used to replay recorded events)"""
+        event = json.loads(raw) if isinstance(raw, (str, bytes)) else raw
+        event_type = event.get('e')
+        if event_type == "ORDER_TRADE_UPDATE":
+            if self.book.apply_order_update(event) is None:
+                # Stale or repeated (e.g. already reported by a resync)
+                return event
+        elif event_type == "ACCOUNT_UPDATE":
+            self.book.apply_account_update(event)
+        elif event_type == "listenKeyExpired":
+            if self.logger:
+                self.logger.warning("User stream listenKey expired, reconnecting")
+            self._close_connection()
+
+        for callback in self._listeners:
+            try:
+                callback(event)
+            except Exception as e:
+                if self.logger:
+                    self.logger.error("User stream listener failed: %s", e)
+        return event
+
+    def replay(self, path):
+        """Feed a JSONL file of recorded stream events through the book"""
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    self.process_message(line)
+
+    def start(self):
+        """Connect, load a snapshot and start background threads"""
+        self._stop.clear()
+        self._open()
+        for target, name in ((self._run, "UserDataStream"), (self._keepalive, "UserStreamKeepalive")):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        if self.logger:
+            self.logger.info("User data stream started")
+
+    def stop(self):
+        """Stop threads and close the listenKey"""
+        self._stop.set()
+        self._close_connection()
+        for thread in self._threads:
+            thread.join(5)
+        self._threads = []
+        if self.listen_key:
+            try:
+                self.client.futures_stream_close(listenKey=self.listen_key)
+            except Exception:
+                pass
+            self.listen_key = None
+
+    def _close_connection(self):
+        connection, self._connection = self._connection, None
+        if connection:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+    def _open(self):
+        """Connect with a fresh listenKey, then resync from REST
+
+        Connecting first means events from this point on are held by the
+        connection while the snapshot loads, and read after it.
+        """
+        self.listen_key = self.client.futures_stream_get_listen_key()
+        self._connection = self.connect(self.base_url + self.listen_key)
+        try:
+            self.resync()
+        except Exception:
+            self._close_connection()
+            raise
+
+    def _run(self):
+        delay = self.reconnect_delay
+        while not self._stop.is_set():
+            try:
+                if self._connection is None:
+                    # Gap recovery
+                    self._open()
+                delay = self.reconnect_delay
+                while not self._stop.is_set() and self._connection:
+                    raw = self._connection.recv()
+                    if not raw:
+                        break
+                    self.process_message(raw)
+            except Exception as e:
+                if self._stop.is_set():
+                    break
+                if self.logger:
+                    self.logger.warning("User stream disconnected: %s (retry in %ss)", e, delay)
+            self._close_connection()
+            if self._stop.wait(delay):
+                break
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _keepalive(self):
+        while not self._stop.wait(self.keepalive_interval):
+            try:
+                self.client.futures_stream_keepalive(listenKey=self.listen_key)
+            except Exception as e:
+                if self.logger:
+                    self.logger.warning("listenKey keepalive failed: %s", e)
@@ -0,0 +1,49 @@
+import logging
+import os
+import sys
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from bot import SimplifiedBot  # noqa: E402
+from simulator import SimulatedExchange  # noqa: E402
+
+START_MS = 1_700_000_000_000
+
+
+def make_exchange(symbols=("BTCUSDT",), price=30000.0, bars=120, **kwargs):
+    """Exchange with flat one-minute bars at ``price`` for each symbol"""
+    exchange = SimulatedExchange(**kwargs)
+    for symbol in symbols:
+        add_flat_market(exchange, symbol, price, bars)
+    return exchange
+
+
+def add_flat_market(exchange, symbol, price=30000.0, bars=120):
+    times = START_MS + np.arange(bars, dtype=np.int64) * 60_000
+    prices = np.full(bars, float(price))
+    return exchange.add_klines(symbol, times, prices, prices, prices, prices, np.full(bars, 10.0))
+
+
+@pytest.fixture
+def exchange():
+    return make_exchange()
+
+
+@pytest.fixture
+def bot(exchange, tmp_path, monkeypatch):
+    """SimplifiedBot on ``exchange``, run in tmp_path so bot.log stays out of the tree"""
+    monkeypatch.chdir(tmp_path)
+    bot = SimplifiedBot(None, None, client=exchange)
+    yield bot
+    bot.close()
+    bot.log_pipeline.stop()
+
+
+@pytest.fixture
+def logger():
+    logger = logging.getLogger("tests")
+    logger.handlers = [logging.NullHandler()]
+    logger.propagate = False
+    return logger
@@ -0,0 +1,100 @@
+import itertools
+import pytest
+from advanced.amend import AmendError, OrderAmender
+from bot import SimplifiedBot
+from risk import RiskEngine, RiskLimits
+
+
+class _ReplaceOnlyClient:
+    """Records replacements; the cancel reports ``fills`` as the old order's executedQty"""
+
+    def __init__(self):
+        self.created = []
+        self.cancelled = []
+        self.fills = {}
+        self._ids = itertools.count(100)
+
+    def futures_create_order(self, **params):
+        self.created.append(params)
+        return {'orderId': next(self._ids), 'clientOrderId': params['newClientOrderId'], 'symbol': params['symbol'],
+                'side': params['side'], 'status': "NEW", 'origQty': str(params['quantity']), 'executedQty': "0"}
+
+    def futures_cancel_order(self, symbol, orderId):
+        self.cancelled.append(orderId)
+        return {'orderId': orderId, 'status': "CANCELED", 'executedQty': self.fills.get(orderId, "0")}
+
+
+def _stop_limit(order_id=1, executed="0"):
+    return {'orderId': order_id, 'clientOrderId': "sb-1", 'symbol': "BTCUSDT", 'side': "BUY", 'type': "STOP",
+            'status': "PARTIALLY_FILLED" if float(executed) else "NEW", 'origQty': "1.0", 'executedQty': executed,
+            'price': "30100", 'stopPrice': "30050", 'timeInForce': "GTC"}
+
+
+@pytest.fixture
+def amender():
+    client = _ReplaceOnlyClient()
+    amender = OrderAmender(client)
+    yield amender
+    amender.close()
+
+
+def test_replacement_carries_only_the_unfilled_quantity(amender):
+    amender.track(_stop_limit(executed="0.4"))
+    order = amender.amend_now(1, price=30200.0)
+    assert amender.client.created[0]['quantity'] == pytest.approx(0.6)
+    assert amender.client.created[0]['price'] == 30200.0
+    handle = amender.handle(order['orderId'])
+    assert (handle.params['quantity'], handle.executed_qty) == (pytest.approx(0.6), 0.0)
+
+
+def test_fills_during_the_replacement_shrink_it(amender):
+    amender.track(_stop_limit())
+    amender.client.fills[1] = "0.3"
+    order = amender.amend_now(1, price=30200.0)
+    created = [params['quantity'] for params in amender.client.created]
+    assert created == [pytest.approx(1.0), pytest.approx(0.7)]
+    assert amender.client.cancelled == [1, 100]
+    assert amender.current_order_id(1) == order['orderId'] == 101
+
+
+def test_order_filled_during_the_replacement_is_not_re_placed(amender):
+    amender.track(_stop_limit(executed="0.5"))
+    amender.client.fills[1] = "1.0"
+    with pytest.raises(AmendError, match="filled while being replaced"):
+        amender.amend_now(1, price=30200.0)
+    # The half-size replacement was rolled back
+    assert amender.client.cancelled == [1, 100]
+    assert amender.handle(1) is None and amender.handle(100) is None
+
+
+def test_finished_orders_are_pruned(amender):
+    amender.track(_stop_limit())
+    for price in (30200.0, 30300.0, 30400.0):
+        amender.amend_now(1, price=price)
+    assert amender.current_order_id(1) == 102
+    amender.on_order_update({'e': "ORDER_TRADE_UPDATE", 'o': {'i': 102, 'X': "FILLED", 'z': "1.0"}})
+    assert amender._handles == {} and amender._aliases == {}
+
+    amender.track(dict(_stop_limit(order_id=7), clientOrderId="sb-7"))
+    amender.amend_now(7, price=30200.0)
+    amender.forget(7)
+    assert amender._handles == {} and amender._aliases == {}
+    # A finished order is never tracked
+    assert amender.track(dict(_stop_limit(order_id=8), status="FILLED")).state == "FILLED"
+    assert amender._handles == {}
+
+
+def test_amend_checks_risk_against_the_orders_string_price(tmp_path, monkeypatch, exchange):
+    monkeypatch.chdir(tmp_path)
+    risk = RiskEngine(RiskLimits(max_position=1.0, max_notional=45000.0))
+    bot = SimplifiedBot(None, None, client=exchange, risk=risk)
+    try:
+        order = bot.place_limit_order("BTCUSDT", "BUY", 0.5, 29000.0)
+        assert bot.amend_order("BTCUSDT", order['orderId'], quantity=1.0) is not None
+        assert risk.state("BTCUSDT").open_buy == pytest.approx(1.0)
+        # 2.0 @ 29000 breaches both limits: refused, and nothing stays held
+        assert bot.amend_order("BTCUSDT", order['orderId'], quantity=2.0) is None
+        assert risk.state("BTCUSDT").open_buy == pytest.approx(1.0)
+    finally:
+        bot.close()
+        bot.log_pipeline.stop()
@@ -0,0 +1,103 @@
+import asyncio
+from async_bot import AsyncSimplifiedBot
+from simulator import AsyncSimulatedExchange
+from symbol_filters import SymbolFilterCache
+from conftest import add_flat_market, make_exchange
+
+
+def _bot(exchange, logger, max_concurrency=50, latency=0.0, clock=None):
+    client = AsyncSimulatedExchange(exchange, latency)
+    filters = SymbolFilterCache(None, path=None, **({'clock': clock} if clock else {}))
+    return AsyncSimplifiedBot(client, max_concurrency, logger, filters)
+
+
+def test_orders_run_concurrently_within_the_limit(logger):
+    exchange = make_exchange(("BTCUSDT", "ETHUSDT"))
+    bot = _bot(exchange, logger, max_concurrency=8, latency=0.01)
+
+    async def run():
+        await bot.refresh_symbol_filters()
+        return await asyncio.gather(*(
+            bot.place_limit_order(symbol, "BUY", 0.01, 29000 - i)
+            for i in range(20) for symbol in ("BTCUSDT", "ETHUSDT")
+        ))
+
+    orders = asyncio.run(run())
+    assert all(order is not None for order in orders)
+    assert len({order['orderId'] for order in orders}) == 40
+    assert bot.client.max_in_flight == 8
+
+
+def test_order_is_quantized_with_the_cached_filters(logger):
+    bot = _bot(make_exchange(), logger)
+
+    async def run():
+        await bot.refresh_symbol_filters()
+        return await bot.place_limit_order("btcusdt", "SELL", 0.0129, 31000.004)
+
+    order = asyncio.run(run())
+    assert order['origQty'] == "0.012"
+    assert order['price'] == "31000.0"
+
+
+def test_symbol_listed_after_startup_is_loaded(logger):
+    now = [0.0]
+    exchange = make_exchange()
+    bot = _bot(exchange, logger, clock=lambda: now[0])
+
+    async def run():
+        await bot.refresh_symbol_filters()
+        add_flat_market(exchange, "SOLUSDT", 50.0)
+        # A refresh just happened: the unknown symbol is not reloaded again yet
+        assert await bot.place_market_order("SOLUSDT", "BUY", 1) is None
+        now[0] += 60
+        return await bot.place_market_order("SOLUSDT", "BUY", 1)
+
+    order = asyncio.run(run())
+    assert order is not None and order['status'] == "FILLED"
+    # Startup load, one reload once the interval passed, the order
+    assert bot.client.requests == 3
+
+
+def test_unknown_symbol_reloads_exchange_info_at_most_once_per_interval(logger):
+    now = [0.0]
+    bot = _bot(make_exchange(), logger, clock=lambda: now[0])
+
+    async def run():
+        await bot.refresh_symbol_filters()
+        now[0] += 60
+        for _ in range(5):
+            await bot.place_market_order("BTCUSDX", "BUY", 1)
+
+    asyncio.run(run())
+    # Startup load plus one reload for the typo
+    assert bot.client.requests == 2
+
+
+def test_stale_cache_is_reloaded(logger):
+    now = [0.0]
+    bot = _bot(make_exchange(), logger, clock=lambda: now[0])
+
+    async def run():
+        await bot.refresh_symbol_filters()
+        await bot.place_limit_order("BTCUSDT", "BUY", 0.01, 29000)
+        now[0] += bot.symbol_filters.ttl + 1
+        await bot.place_limit_order("BTCUSDT", "BUY", 0.01, 29000)
+
+    asyncio.run(run())
+    # load, order, reload, order
+    assert bot.client.requests == 4
+
+
+def test_oco_rolls_back_the_placed_leg(logger):
+    exchange = make_exchange()
+    bot = _bot(exchange, logger)
+
+    async def run():
+        await bot.refresh_symbol_filters()
+        await bot.place_market_order("BTCUSDT", "BUY", 0.01)
+        # The stop is above the price: it would trigger immediately and is rejected
+        return await bot.place_oco_order("BTCUSDT", "BUY", 0.01, 31000, 30500)
+
+    assert asyncio.run(run()) is None
+    assert exchange.futures_get_open_orders(symbol="BTCUSDT") == []
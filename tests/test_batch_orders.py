@@ -0,0 +1,68 @@
+import pytest
+from advanced.oco import OCOOrder
+from batch_orders import BatchOrderError, BatchOrderSubmitter
+from simulator import LatencyClient
+
+
+def _limit(price, quantity="0.010"):
+    return dict(symbol="BTCUSDT", side="BUY", type="LIMIT", timeInForce="GTC", quantity=quantity, price=price)
+
+
+def test_orders_are_grouped_five_per_request(exchange):
+    client = LatencyClient(exchange, 0)
+    results = BatchOrderSubmitter(client).place_orders([_limit(29000 - i) for i in range(12)])
+    assert client.requests == 3
+    assert [r['price'] for r in results] == [repr(float(29000 - i)) for i in range(12)]
+
+
+def test_per_order_errors_are_mapped_back(exchange):
+    orders = [_limit(29000), _limit(29001, quantity="0.0001"), _limit(29002)]
+    results = BatchOrderSubmitter(exchange).place_orders(orders)
+    assert results[0]['status'] == "NEW" and results[2]['status'] == "NEW"
+    assert isinstance(results[1], BatchOrderError)
+    assert results[1].code == -4003
+    assert results[1].params is orders[1]
+
+
+def test_failed_request_fails_every_order():
+    class Down:
+        def futures_place_batch_order(self, batchOrders):
+            raise ConnectionError("reset")
+
+    results = BatchOrderSubmitter(Down()).place_orders([_limit(29000), _limit(29001)])
+    assert all(isinstance(r, ConnectionError) for r in results)
+
+
+def test_params_are_sent_as_strings(exchange):
+    sent = []
+
+    class Recorder:
+        def futures_place_batch_order(self, batchOrders):
+            sent.extend(batchOrders)
+            return exchange.futures_place_batch_order(batchOrders)
+
+    BatchOrderSubmitter(Recorder()).place_orders([dict(_limit(29000), reduceOnly=False)])
+    assert sent[0]['price'] == "29000" and sent[0]['reduceOnly'] == "false"
+
+
+def test_batch_size_is_bounded():
+    with pytest.raises(ValueError):
+        BatchOrderSubmitter(None, batch_size=6)
+
+
+def test_oco_legs_share_one_request(exchange):
+    client = LatencyClient(exchange, 0)
+    exchange.futures_create_order(symbol="BTCUSDT", side="BUY", type="MARKET", quantity=0.01)
+    tp, sl = OCOOrder(client).place_order("BTCUSDT", "BUY", 0.01, 31000, 29000)
+    assert client.requests == 1
+    assert (tp['type'], sl['type']) == ("TAKE_PROFIT_MARKET", "STOP_MARKET")
+    assert tp['clientOrderId'][:-3] == sl['clientOrderId'][:-3]
+
+
+def test_oco_rolls_back_when_one_leg_is_rejected(exchange):
+    exchange.futures_create_order(symbol="BTCUSDT", side="BUY", type="MARKET", quantity=0.01)
+    # The take-profit is below the market: it would trigger immediately
+    with pytest.raises(BatchOrderError):
+        OCOOrder(exchange).place_order("BTCUSDT", "BUY", 0.01, 29900, 29000)
+    assert exchange.futures_get_open_orders(symbol="BTCUSDT") == []
+    assert exchange.summary()['orders']['CANCELED'] == 1
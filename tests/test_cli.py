@@ -0,0 +1,104 @@
+import io
+import json
+import pytest
+import cli
+from bot import SimplifiedBot
+
+
+def _batch(bot, records, workers=4):
+    output = io.StringIO()
+    summary = cli.run_batch(bot, records, output, workers, poll_interval=0.01)
+    return summary, [json.loads(line) for line in output.getvalue().splitlines()]
+
+
+def test_parse_order_converts_fields():
+    assert cli.parse_order({'type': "stop_limit", 'symbol': "BTCUSDT", 'side': "BUY", 'quantity': "0.01",
+                            'stop_price': "31000", 'limit_price': "31010"}) == (
+        "stop-limit", {'symbol': "BTCUSDT", 'side': "BUY", 'quantity': 0.01, 'stop_price': 31000.0,
+                       'limit_price': 31010.0})
+    with pytest.raises(ValueError, match="Missing field 'price'"):
+        cli.parse_order({'type': "limit", 'symbol': "BTCUSDT", 'side': "BUY", 'quantity': "1"})
+
+
+def test_read_records_sniffs_csv_and_jsonl():
+    csv_rows = list(cli.read_records(io.StringIO("type,symbol\nmarket,BTCUSDT\n")))
+    jsonl_rows = list(cli.read_records(io.StringIO('\n{"type": "market", "symbol": "BTCUSDT"}\n')))
+    assert csv_rows == jsonl_rows == [{'type': "market", 'symbol': "BTCUSDT"}]
+
+
+def test_batch_writes_one_result_per_order(bot):
+    records = [{'type': "limit", 'symbol': "BTCUSDT", 'side': "BUY", 'quantity': 0.01, 'price': 29000 - i}
+               for i in range(10)]
+    records.append({'type': "limit", 'symbol': "BTCUSDT", 'side': "BUY", 'quantity': 0.01})
+    summary, results = _batch(bot, records)
+    assert (summary['total'], summary['succeeded'], summary['failed']) == (11, 10, 1)
+    assert sorted(r['line'] for r in results) == list(range(1, 12))
+
+
+def test_batch_twap_runs_on_the_scheduler(bot):
+    records = [
+        {'type': "twap", 'symbol': "BTCUSDT", 'side': "BUY", 'quantity': 0.02, 'chunks': 2, 'interval': 1},
+        {'type': "market", 'symbol': "BTCUSDT", 'side': "BUY", 'quantity': 0.01},
+    ]
+    summary, results = _batch(bot, records, workers=1)
+    assert summary['succeeded'] == 2
+    # The single worker was free for the market order while the TWAP ran
+    assert [r['line'] for r in results] == [2, 1]
+    twap = results[1]
+    assert twap['ok'] and len(twap['result']) == 2
+    assert bot.twap_scheduler.progress(1)['state'] == "COMPLETED"
+
+
+def test_failed_batch_twap_is_reported(bot):
+    records = [{'type': "twap", 'symbol': "ETHUSDT", 'side': "BUY", 'quantity': 1, 'chunks': 1, 'interval': 1}]
+    summary, results = _batch(bot, records)
+    assert summary['failed'] == 1
+    assert not results[0]['ok']
+
+
+def test_headless_run_closes_the_bot_it_created(exchange, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    created = []
+
+    def create_bot(args, client=None):
+        bot = SimplifiedBot(None, None, client=exchange)
+        bot.schedule_twap_order("BTCUSDT", "BUY", 0.02, chunks=2, interval=3600)
+        created.append(bot)
+        return bot
+
+    monkeypatch.setattr(cli, "create_bot", create_bot)
+    stdout = io.StringIO()
+    assert cli.run(["limit", "BTCUSDT", "BUY", "0.01", "29000"], stdout=stdout, stderr=io.StringIO()) == 0
+    bot = created[0]
+    bot.log_pipeline.stop()
+    assert json.loads(stdout.getvalue())['status'] == "NEW"
+    assert bot.twap_scheduler._thread is None
+
+
+def test_daemon_without_a_token_fails_before_opening_streams(bot, monkeypatch):
+    monkeypatch.delenv("BOT_DAEMON_TOKEN", raising=False)
+    streams = []
+    monkeypatch.setattr(bot, "start_user_stream", lambda: streams.append("user"))
+    stderr = io.StringIO()
+    assert cli.run(["daemon", "--port", "0"], bot=bot, stdout=io.StringIO(), stderr=stderr) == 2
+    assert "❌ Daemon failed to start: HTTP needs a token" in stderr.getvalue()
+    assert streams == []
+
+
+def test_menu_reports_a_twap_as_scheduled_not_completed(exchange, tmp_path, monkeypatch, capsys):
+    import bot as bot_module
+    monkeypatch.chdir(tmp_path)
+    created = []
+
+    def connect(api_key, api_secret, testnet=True):
+        created.append(SimplifiedBot(None, None, client=exchange))
+        return created[-1]
+
+    answers = iter(["key", "secret", "5", "BTCUSDT", "BUY", "0.02", "2", "3600", "", "0"])
+    monkeypatch.setattr(bot_module, "SimplifiedBot", connect)
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+    bot_module.main()
+    created[0].log_pipeline.stop()
+    out = capsys.readouterr().out
+    assert "accepted: 2 chunks, one every 3600s" in out
+    assert "completed successfully" not in out
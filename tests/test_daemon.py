@@ -0,0 +1,80 @@
+import http.client
+import json
+import socket
+import pytest
+from daemon import BotDaemon
+
+TOKEN = "s3cret"
+ORDER = {"type": "limit", "symbol": "BTCUSDT", "side": "BUY", "quantity": 0.01, "price": 29000}
+
+
+class _UnixConnection(http.client.HTTPConnection):
+    def __init__(self, path):
+        super().__init__("bot")
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.path)
+
+
+@pytest.fixture
+def daemon(bot):
+    daemon = BotDaemon(bot, port=0, token=TOKEN).start()
+    yield daemon
+    daemon.stop()
+
+
+def _request(connection, method, path, body=None, headers=None):
+    headers = {"Authorization": f"Bearer {TOKEN}", "Content-Type": "application/json", **(headers or {})}
+    connection.request(method, path, json.dumps(body) if body is not None else None, headers)
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def test_http_needs_a_token_unless_opened_explicitly(bot, tmp_path):
+    with pytest.raises(ValueError, match="token"):
+        BotDaemon(bot, port=0)
+    BotDaemon(bot, port=0, allow_no_token=True)
+    # The owner-only socket alone is fine without one
+    daemon = BotDaemon(bot, port=None, unix_socket=str(tmp_path / "bot.sock")).start()
+    try:
+        status, payload = _request(_UnixConnection(daemon.unix_socket), "POST", "/orders", ORDER,
+                                   headers={"Authorization": ""})
+        assert status == 200 and payload["result"]["status"] == "NEW"
+    finally:
+        daemon.stop()
+
+
+def test_token_json_order_is_placed(daemon, exchange):
+    connection = http.client.HTTPConnection("127.0.0.1", daemon.port)
+    status, payload = _request(connection, "POST", "/orders", ORDER)
+    assert status == 200 and payload["ok"]
+    assert len(exchange.futures_get_open_orders(symbol="BTCUSDT")) == 1
+    # Keep-alive: the same connection serves the next request
+    assert _request(connection, "GET", "/health")[1]["requests"] == 2
+
+
+@pytest.mark.parametrize("headers, status", [
+    ({"Authorization": ""}, 401),
+    ({"Authorization": "Bearer wrong"}, 401),
+    # What an HTML form or a no-preflight fetch() from another site sends
+    ({"Content-Type": "application/x-www-form-urlencoded"}, 415),
+    ({"Content-Type": "text/plain"}, 415),
+    ({"Origin": "https://evil.example"}, 403),
+    ({"Origin": "null"}, 403),
+    # DNS rebinding: a foreign name resolved to 127.0.0.1
+    ({"Host": "evil.example:8765"}, 403),
+])
+def test_cross_site_and_unauthenticated_requests_are_refused(daemon, exchange, headers, status):
+    connection = http.client.HTTPConnection("127.0.0.1", daemon.port)
+    code, payload = _request(connection, "POST", "/orders", ORDER, headers)
+    assert (code, payload["ok"]) == (status, False)
+    assert exchange.futures_get_open_orders(symbol="BTCUSDT") == []
+
+
+def test_local_origin_and_host_names_are_accepted(daemon):
+    connection = http.client.HTTPConnection("localhost", daemon.port)
+    status, _ = _request(connection, "POST", "/orders", ORDER,
+                         headers={"Origin": f"http://localhost:{daemon.port}"})
+    assert status == 200
@@ -0,0 +1,96 @@
+import io
+import json
+import pytest
+import cli
+from advanced.execution import AdaptiveTWAPOrder, ExecutionHalted
+
+
+class _Quotes:
+    trades = False
+
+    def best_bid(self, symbol):
+        return 100.0
+
+    def best_ask(self, symbol):
+        return 100.2
+
+    def mid_price(self, symbol):
+        return 100.1
+
+
+class _StuckClient:
+    """Passive limits rest; cancels fail with ``cancel_errors`` before succeeding"""
+
+    def __init__(self, cancel_errors=0, fill_on_cancel=False):
+        self.cancel_errors = cancel_errors
+        self.fill_on_cancel = fill_on_cancel
+        self.orders = {}
+        self.market_orders = []
+
+    def futures_create_order(self, **params):
+        order = {'orderId': len(self.orders) + 1, 'status': "NEW", 'executedQty': "0", 'avgPrice': "0",
+                 'price': str(params.get('price'))}
+        if params['type'] == "MARKET":
+            self.market_orders.append(params)
+            order.update(status="FILLED", executedQty=str(params['quantity']), avgPrice="100.2")
+        self.orders[order['orderId']] = order
+        return dict(order)
+
+    def futures_cancel_order(self, symbol, orderId):
+        order = self.orders[orderId]
+        if self.fill_on_cancel:
+            order.update(status="FILLED", executedQty="1.0", avgPrice=order['price'])
+            raise ValueError("Unknown order sent.")
+        if self.cancel_errors:
+            self.cancel_errors -= 1
+            raise TimeoutError("cancel timed out")
+        order['status'] = "CANCELED"
+        return dict(order)
+
+    def futures_get_order(self, symbol, orderId):
+        return dict(self.orders[orderId])
+
+
+def _engine(client):
+    return AdaptiveTWAPOrder(client, market_data=_Quotes(), sleep=lambda s: None, clock=lambda: 0.0,
+                             cancel_retry_delay=0)
+
+
+def test_open_passive_order_halts_instead_of_crossing():
+    client = _StuckClient(cancel_errors=10)
+    with pytest.raises(ExecutionHalted) as raised:
+        _engine(client).execute("BTCUSDT", "BUY", 2.0, chunks=2, interval=10, passive_timeout=1)
+    assert client.market_orders == []
+    assert raised.value.order['status'] == "NEW"
+    assert raised.value.report['executed_qty'] == 0
+
+
+def test_cancel_is_retried_until_the_order_is_final():
+    client = _StuckClient(cancel_errors=2)
+    report = _engine(client).execute("BTCUSDT", "BUY", 2.0, chunks=2, interval=10, passive_timeout=1)
+    assert report['executed_qty'] == pytest.approx(2.0)
+    assert len(client.market_orders) == 2
+
+
+def test_failed_cancel_of_a_filled_order_does_not_cross():
+    client = _StuckClient(fill_on_cancel=True)
+    report = _engine(client).execute("BTCUSDT", "BUY", 2.0, chunks=2, interval=10, passive_timeout=1)
+    assert client.market_orders == []
+    assert [s['passive_qty'] for s in report['slices']] == [1.0, 1.0]
+
+
+def test_bot_runs_adaptive_twap_on_the_simulator(bot, exchange):
+    report = bot.place_adaptive_twap_order("BTCUSDT", "BUY", 0.05, chunks=5, interval=60)
+    assert report['executed_qty'] == pytest.approx(0.05)
+    assert len(report['orders']) == 5
+    # Slices were spread over simulated time
+    assert report['slices'][-1]['time'] - report['slices'][0]['time'] == pytest.approx(240)
+
+
+def test_cli_adaptive_twap_command(bot):
+    stdout = io.StringIO()
+    code = cli.run(["adaptive-twap", "BTCUSDT", "SELL", "0.02", "--chunks", "2", "--interval", "30"],
+                   bot=bot, stdout=stdout, stderr=io.StringIO())
+    assert code == 0
+    report = json.loads(stdout.getvalue())
+    assert (report['mode'], report['side'], report['executed_qty']) == ("TWAP", "SELL", 0.02)
@@ -0,0 +1,61 @@
+import pytest
+from advanced.grid import GridOrder
+from symbol_filters import SymbolFilterCache
+
+
+def _open(order_id, side, price, quantity="0.010", cid="grid-x", symbol="BTCUSDT"):
+    return {'orderId': order_id, 'symbol': symbol, 'side': side, 'price': price, 'origQty': quantity,
+            'clientOrderId': cid}
+
+
+def test_plan_keeps_matching_levels_and_diffs_the_rest():
+    grid = GridOrder(client=None)
+    targets = grid.build_orders("BTCUSDT", 100.0, 1.0, 3, 0.01)
+    assert [(t['side'], float(t['price'])) for t in targets] == [
+        ("BUY", 99), ("BUY", 98), ("BUY", 97), ("SELL", 101), ("SELL", 102), ("SELL", 103)]
+    open_orders = [
+        _open(1, "BUY", "99.00", "0.01"),             # kept: formatting differs, same level
+        _open(2, "BUY", "98"),                        # kept
+        _open(3, "BUY", "98"),                        # duplicate of a kept level: cancelled
+        _open(4, "BUY", "96"),                        # no longer a level: cancelled
+        _open(5, "SELL", "101", quantity="0.02"),     # right price, wrong size: cancelled
+        _open(6, "BUY", "97", cid="manual-1"),        # not this grid's: left alone
+        _open(7, "SELL", "102", symbol="ETHUSDT"),    # other symbol: left alone
+        _open(8, "SELL", "103", cid="gridb-1"),       # another grid's prefix: left alone
+    ]
+    plan = grid.plan(targets, open_orders)
+    assert [o['orderId'] for o in plan.kept] == [1, 2]
+    assert plan.cancel == [3, 4, 5]
+    assert sorted((p['side'], float(p['price'])) for p in plan.place) == [
+        ("BUY", 97), ("SELL", 101), ("SELL", 102), ("SELL", 103)]
+    assert all(p['newClientOrderId'].startswith("grid-") and len(p['newClientOrderId']) <= 36 for p in plan.place)
+
+
+def test_recentering_touches_only_the_shifted_levels(exchange):
+    filters = SymbolFilterCache(exchange, path=None)
+    grid = GridOrder(exchange, symbol_filters=filters)
+    first = grid.place_order("BTCUSDT", 30000.0, 10.0, 5, 0.01)
+    assert (len(first['placed']), first['requests']) == (10, 2)
+    # Down one level: the far sell goes and a far buy is new; so is the sell at 30000, which
+    # meets the flat market and fills at once
+    moved = grid.place_order("BTCUSDT", 29990.0, 10.0, 5, 0.01)
+    assert (moved['kept'], len(moved['cancelled']), len(moved['placed']), moved['failed']) == (8, 2, 2, [])
+    assert moved['requests'] == 2
+    assert sorted((o['side'], float(o['price']), o['status']) for o in moved['placed']) == [
+        ("BUY", 29940.0, "NEW"), ("SELL", 30000.0, "FILLED")]
+    resting = sorted((o['side'], float(o['price'])) for o in exchange.futures_get_open_orders(symbol="BTCUSDT"))
+    assert resting == sorted([("BUY", 29990.0 - 10 * i) for i in range(1, 6)] +
+                             [("SELL", 29990.0 + 10 * i) for i in range(2, 6)])
+    # The filled level is placed again; nothing else changes
+    again = grid.place_order("BTCUSDT", 29990.0, 10.0, 5, 0.01)
+    assert (again['kept'], len(again['cancelled']), len(again['placed'])) == (9, 0, 1)
+
+
+def test_invalid_grids_are_rejected():
+    grid = GridOrder(client=None)
+    with pytest.raises(ValueError, match="Grid name"):
+        GridOrder(client=None, name="way-too-long")
+    with pytest.raises(ValueError, match="positive"):
+        grid.build_orders("BTCUSDT", 100.0, 0, 3, 0.01)
+    with pytest.raises(ValueError, match="no orders"):
+        grid.plan([], [])
@@ -0,0 +1,173 @@
+import pytest
+import requests
+from journal import JournaledClient, OrderJournal
+from simulator import SimulatedAPIError
+from transport import IdempotentOrderClient, OrderStateUnknown
+
+
+class _FlakyLookups:
+    """Forwards to the exchange but fails the first ``failures`` order lookups"""
+
+    def __init__(self, exchange, failures, error):
+        self.exchange = exchange
+        self.failures = failures
+        self.error = error
+        self.lookups = 0
+
+    def __getattr__(self, name):
+        return getattr(self.exchange, name)
+
+    def futures_get_order(self, **params):
+        self.lookups += 1
+        if self.lookups <= self.failures:
+            raise self.error
+        return self.exchange.futures_get_order(**params)
+
+
+class _LostAnswer:
+    """Places the order on the exchange, then fails the create (and lookups) with ``error``"""
+
+    def __init__(self, exchange, error, lookup_error=None):
+        self.exchange = exchange
+        self.error = error
+        self.lookup_error = lookup_error
+
+    def __getattr__(self, name):
+        return getattr(self.exchange, name)
+
+    def futures_create_order(self, **params):
+        self.exchange.futures_create_order(**params)
+        raise self.error
+
+    def futures_get_order(self, **params):
+        if self.lookup_error is not None:
+            raise self.lookup_error
+        return self.exchange.futures_get_order(**params)
+
+
+class _ServerError(Exception):
+    status_code = 503
+    code = -1000
+
+
+def _journal(tmp_path):
+    return OrderJournal(str(tmp_path / "orders.journal"), sync_interval=0)
+
+
+def _crash_before_send(journal, cid, quantity=0.01):
+    """An intent the exchange never saw (the process died before sending)"""
+    journal.record_intent(cid, dict(symbol="BTCUSDT", side="BUY", type="MARKET", quantity=quantity,
+                                    newClientOrderId=cid))
+
+
+def test_intent_reported_unknown_by_the_exchange_is_lost(tmp_path, exchange):
+    journal = _journal(tmp_path)
+    _crash_before_send(journal, "sb-never-sent")
+    report = journal.recover(exchange)
+    assert report['lost'] == ["sb-never-sent"]
+    assert journal.orders["sb-never-sent"]['status'] == "LOST"
+    journal.close()
+
+
+def test_intent_that_reached_the_exchange_is_acknowledged(tmp_path, exchange):
+    journal = _journal(tmp_path)
+    _crash_before_send(journal, "sb-sent")
+    exchange.futures_create_order(symbol="BTCUSDT", side="BUY", type="MARKET", quantity=0.01,
+                                  newClientOrderId="sb-sent")
+    report = journal.recover(exchange)
+    assert report['lost'] == []
+    assert journal.orders["sb-sent"]['status'] == "FILLED"
+    journal.close()
+
+
+def test_failed_lookup_is_retried(tmp_path, exchange):
+    journal = _journal(tmp_path)
+    _crash_before_send(journal, "sb-never-sent")
+    client = _FlakyLookups(exchange, failures=2, error=SimulatedAPIError(-1003, "Too many requests."))
+    report = journal.recover(client, lookup_attempts=3, retry_delay=0)
+    assert client.lookups == 3
+    assert report['lost'] == ["sb-never-sent"]
+    journal.close()
+
+
+def test_unanswered_lookup_keeps_the_intent_pending(tmp_path, exchange):
+    journal = _journal(tmp_path)
+    chunks = [dict(symbol="BTCUSDT", side="BUY", type="MARKET", quantity=0.01) for _ in range(2)]
+    journal.begin_schedule("BTCUSDT", "BUY", chunks, 10)
+    _crash_before_send(journal, chunks[0]['newClientOrderId'])
+    client = _FlakyLookups(exchange, failures=99, error=TimeoutError("read timed out"))
+    with pytest.raises(OrderStateUnknown) as raised:
+        journal.recover(client, lookup_attempts=2, retry_delay=0)
+    assert raised.value.client_order_id == chunks[0]['newClientOrderId']
+    journal.close()
+
+    # Not marked LOST on disk, so the chunk cannot be resent twice
+    journal = _journal(tmp_path)
+    assert journal.orders[chunks[0]['newClientOrderId']]['status'] == "INTENT"
+    report = journal.recover(exchange)
+    assert report['lost'] == [chunks[0]['newClientOrderId']]
+    assert len(report['schedules'][0]['chunk_orders']) == 2
+    journal.close()
+
+
+@pytest.mark.parametrize("client_factory, error", [
+    # The send times out and the idempotent client's lookup fails too
+    (lambda exchange: IdempotentOrderClient(_LostAnswer(exchange, requests.exceptions.Timeout("read timed out"),
+                                                        requests.exceptions.ConnectionError("reset"))),
+     OrderStateUnknown),
+    (lambda exchange: _LostAnswer(exchange, SimulatedAPIError(-1007, "Timeout waiting for response from backend "
+                                                                     "server. Send status unknown.")),
+     SimulatedAPIError),
+    (lambda exchange: _LostAnswer(exchange, _ServerError("Service unavailable")), _ServerError),
+])
+def test_unknown_outcome_stays_an_intent_until_recovered(tmp_path, exchange, client_factory, error):
+    journal = _journal(tmp_path)
+    client = JournaledClient(client_factory(exchange), journal)
+    with pytest.raises(error):
+        client.futures_create_order(symbol="BTCUSDT", side="BUY", type="MARKET", quantity=0.01,
+                                    newClientOrderId="sb-maybe")
+    assert journal.orders["sb-maybe"]['status'] == "INTENT"
+    journal.close()
+
+    journal = _journal(tmp_path)
+    assert journal.orders["sb-maybe"]['status'] == "INTENT"
+    report = journal.recover(exchange)
+    assert report['lost'] == []
+    assert journal.orders["sb-maybe"]['status'] == "FILLED"
+    journal.close()
+
+
+def test_rejection_is_final(tmp_path, exchange):
+    journal = _journal(tmp_path)
+    with pytest.raises(SimulatedAPIError):
+        JournaledClient(exchange, journal).futures_create_order(symbol="BTCUSDT", side="BUY", type="MARKET",
+                                                                quantity=-1, newClientOrderId="sb-bad")
+    assert journal.orders["sb-bad"]['status'] == "REJECTED"
+    journal.close()
+
+
+def test_batch_placement_leaves_the_callers_params_alone(tmp_path, exchange):
+    journal = _journal(tmp_path)
+    batch = [dict(symbol="BTCUSDT", side="BUY", type="LIMIT", timeInForce="GTC", quantity=0.01, price=29000.0)
+             for _ in range(3)]
+    results = JournaledClient(exchange, journal).futures_place_batch_order(batchOrders=batch)
+    assert all('newClientOrderId' not in params for params in batch)
+    assert len({r['clientOrderId'] for r in results}) == 3
+    assert all(journal.orders[r['clientOrderId']]['status'] == "NEW" for r in results)
+    journal.close()
+
+
+def test_replay_cuts_a_torn_final_line(tmp_path, exchange):
+    journal = _journal(tmp_path)
+    client = JournaledClient(exchange, journal)
+    order = client.futures_create_order(symbol="BTCUSDT", side="BUY", type="LIMIT", timeInForce="GTC",
+                                        quantity=0.01, price=29000.0)
+    journal.close()
+    with open(journal.path, "a") as f:
+        f.write('["U",1700000000.0,"sb-')
+
+    journal = _journal(tmp_path)
+    assert journal.orders[order['clientOrderId']]['status'] == "NEW"
+    journal.record_update(order['clientOrderId'], "CANCELED")
+    journal.close()
+    assert _journal(tmp_path).orders[order['clientOrderId']]['status'] == "CANCELED"
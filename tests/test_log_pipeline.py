@@ -0,0 +1,76 @@
+import json
+import logging
+import threading
+import pytest
+from bot import SimplifiedBot
+from log_pipeline import LogPipeline, _LazyQueueHandler, get_pipeline
+
+
+@pytest.fixture
+def pipeline_logger():
+    logger = logging.getLogger("tests.pipeline")
+    logger.propagate = False
+    yield logger
+    for handler in list(logger.handlers):
+        pipeline = getattr(handler, "pipeline", None)
+        if pipeline is not None:
+            pipeline.stop()
+
+
+def _record(msg, args):
+    return logging.LogRecord("x", logging.INFO, __file__, 1, msg, args, None)
+
+
+def test_immutable_arguments_are_formatted_later():
+    record = _LazyQueueHandler(None).prepare(_record("%s filled %d at %.1f", ("BTCUSDT", 3, 30000.0)))
+    assert record.args == ("BTCUSDT", 3, 30000.0)
+
+
+@pytest.mark.parametrize("msg, args", [
+    ("order %s", ({'status': "NEW"},)),
+    ("order %(status)s", ({'status': "NEW"},)),
+    ({'status': "NEW"}, None),
+])
+def test_mutable_arguments_are_formatted_at_the_call(msg, args):
+    record = _LazyQueueHandler(None).prepare(_record(msg, args))
+    assert "NEW" in record.msg and record.args is None
+
+
+def test_log_shows_state_at_the_time_of_the_call(pipeline_logger, tmp_path):
+    path = tmp_path / "bot.log"
+    pipeline = LogPipeline(pipeline_logger, str(path), json_lines=True, console=False)
+    order = {'status': "NEW"}
+    pipeline_logger.info("Order placed: %s", order)
+    order['status'] = "FILLED"
+    pipeline.stop()
+    assert json.loads(path.read_text())['msg'] == "Order placed: {'status': 'NEW'}"
+
+
+def test_pipeline_is_shared_per_logger_and_settings(pipeline_logger, tmp_path):
+    path = str(tmp_path / "bot.log")
+    first = get_pipeline(pipeline_logger, path, console=False)
+    assert get_pipeline(pipeline_logger, path, console=False) is first
+    assert len(pipeline_logger.handlers) == 1
+
+    replaced = get_pipeline(pipeline_logger, path, console=False, json_lines=True)
+    assert replaced is not first and first.stopped
+    assert [h.pipeline for h in pipeline_logger.handlers] == [replaced]
+
+
+def test_stopped_pipeline_is_detached_and_rebuilt(pipeline_logger, tmp_path):
+    path = str(tmp_path / "bot.log")
+    first = get_pipeline(pipeline_logger, path, console=False)
+    first.stop()
+    first.stop()
+    assert pipeline_logger.handlers == []
+    assert get_pipeline(pipeline_logger, path, console=False) is not first
+
+
+def test_bots_share_one_listener_thread(exchange, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    bots = [SimplifiedBot(None, None, client=exchange) for _ in range(5)]
+    try:
+        assert len({id(bot.log_pipeline) for bot in bots}) == 1
+        assert sum(1 for t in threading.enumerate() if t.name == "LogPipeline") == 1
+    finally:
+        bots[0].log_pipeline.stop()
@@ -0,0 +1,87 @@
+import threading
+import time
+import pytest
+from advanced.oco import OCOOrder
+from advanced.stop_limit import StopLimitOrder
+from market_data import MarketDataStream
+from rate_limiter import RateLimitGovernor
+
+
+def _stream(**kwargs):
+    return MarketDataStream(symbols=["BTCUSDT"], depth=False, **kwargs)
+
+
+def _feed(stream, mark=None, last=None, bid=None, ask=None):
+    if mark is not None:
+        stream.process_message({'e': "markPriceUpdate", 's': "BTCUSDT", 'p': str(mark)})
+    if last is not None:
+        stream.process_message({'e': "aggTrade", 's': "BTCUSDT", 'p': str(last), 'q': "0.1"})
+    if bid is not None:
+        stream.process_message({'e': "bookTicker", 's': "BTCUSDT", 'u': 1, 'b': str(bid), 'B': "1",
+                                'a': str(ask), 'A': "1"})
+
+
+def test_trigger_price_is_the_last_trade_then_the_mid():
+    now = [1000.0]
+    stream = _stream(clock=lambda: now[0])
+    _feed(stream, mark=30000, bid=30090, ask=30110)
+    assert stream.trigger_price("BTCUSDT") == 30100
+    _feed(stream, last=30120)
+    assert stream.trigger_price("btcusdt") == 30120
+    assert stream.reference_price("BTCUSDT") == 30000
+    now[0] += 60
+    assert stream.trigger_price("BTCUSDT") is None
+
+
+def test_stops_are_checked_against_the_last_price_not_the_mark():
+    # Last price has run above the mark: a BUY stop at 30100 would trigger at once
+    stream = _stream()
+    _feed(stream, mark=30000, last=30200)
+    with pytest.raises(ValueError, match="must be above the market"):
+        StopLimitOrder(None, market_data=stream).build_order("BTCUSDT", "BUY", 0.01, 30100, 30110)
+    with pytest.raises(ValueError, match="must lie between"):
+        OCOOrder(None, market_data=stream).build_orders("BTCUSDT", "BUY", 0.01, 30150, 29000)
+    assert StopLimitOrder(None, market_data=stream).build_order("BTCUSDT", "BUY", 0.01, 30300, 30310)
+
+
+class _Connection:
+    def __init__(self):
+        self.closed = threading.Event()
+
+    def recv(self):
+        self.closed.wait()
+        return ""
+
+    def close(self):
+        self.closed.set()
+
+
+class _DepthClient:
+    def __init__(self):
+        self.snapshots = []
+
+    def futures_order_book(self, symbol, limit):
+        self.snapshots.append(symbol)
+        return {'lastUpdateId': 1, 'bids': [["100", "1"]], 'asks': [["101", "1"]]}
+
+
+@pytest.mark.parametrize("governor, expected", [
+    (None, 5),
+    # Half of 80 weight/min covers two weight-20 snapshots up front, then one per 30 s
+    (RateLimitGovernor(weight_limit=80, headroom=1.0), 2),
+])
+def test_reconnect_snapshots_are_paced_by_the_governor(governor, expected):
+    client = _DepthClient()
+    symbols = [f"SYM{i}USDT" for i in range(5)]
+    stream = MarketDataStream(client, symbols, book_ticker=False, mark_price=False, governor=governor,
+                              connect=lambda url: _Connection(), reconnect_delay=60)
+    stream.start()
+    try:
+        deadline = time.monotonic() + 2
+        while len(client.snapshots) < expected and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.1)
+    finally:
+        stream.stop()
+    assert len(client.snapshots) == expected
+    assert sum(book.synced for book in stream.books.values()) == expected
@@ -0,0 +1,93 @@
+import pytest
+from bot import SimplifiedBot
+from metrics import LATENCY_BUCKETS, NULL_SPAN, Histogram, InstrumentedClient, LatencyRecorder, instrument_signing
+
+
+def test_histogram_percentiles_interpolate_within_buckets():
+    histogram = Histogram()
+    for _ in range(100):
+        histogram.observe(0.003)
+    # Every sample is in the (2.5 ms, 5 ms] bucket
+    assert 0.0025 < histogram.percentile(0.5) <= 0.005
+    assert histogram.percentile(0.99) <= 0.005
+    histogram.observe(60)
+    assert histogram.percentile(1.0) == LATENCY_BUCKETS[-1]
+    assert Histogram().percentile(0.5) is None
+
+
+def test_disabled_recorder_hands_out_the_null_span():
+    recorder = LatencyRecorder(enabled=False)
+    with recorder.span("LIMIT", "btcusdt") as span:
+        span.mark("validate")
+    assert span is NULL_SPAN
+    assert recorder.summary() == {}
+
+
+def test_span_stages_and_errors_are_recorded():
+    recorder = LatencyRecorder()
+
+    class Client:
+        def futures_create_order(self, **params):
+            recorder.current().add("sign", 1000)
+            return {}
+
+    client = InstrumentedClient(Client(), recorder)
+    with recorder.span("LIMIT", "btcusdt"):
+        client.futures_create_order(symbol="BTCUSDT")
+    with pytest.raises(ConnectionError):
+        with recorder.span("LIMIT", "btcusdt"):
+            raise ConnectionError("reset")
+
+    summary = recorder.summary()
+    assert {stage for _, _, stage in summary} == {"validate", "request", "sign", "total"}
+    assert summary[("LIMIT", "BTCUSDT", "sign")]["mean"] == pytest.approx(1e-6)
+    assert summary[("LIMIT", "BTCUSDT", "total")]["count"] == 1
+    assert 'order_errors_total{type="LIMIT",symbol="BTCUSDT"} 1' in recorder.to_prometheus()
+    # Spans nest per thread and are restored on exit
+    assert recorder.current() is NULL_SPAN
+
+
+def test_prometheus_buckets_are_cumulative(tmp_path):
+    recorder = LatencyRecorder()
+    recorder.observe("MARKET", "BTCUSDT", "total", 0.001)
+    recorder.observe("MARKET", "BTCUSDT", "total", 0.2)
+    text = recorder.to_prometheus()
+    assert 'order_latency_seconds_bucket{type="MARKET",symbol="BTCUSDT",stage="total",le="0.001"} 1' in text
+    assert 'order_latency_seconds_bucket{type="MARKET",symbol="BTCUSDT",stage="total",le="0.25"} 2' in text
+    assert 'order_latency_seconds_count{type="MARKET",symbol="BTCUSDT",stage="total"} 2' in text
+    path = tmp_path / "metrics.prom"
+    recorder.write(str(path))
+    assert path.read_text() == text
+
+
+def test_signing_is_timed_into_the_current_span():
+    class Signer:
+        def sign(self, data):
+            return "signature"
+
+    class RawClient:
+        signer = Signer()
+
+    recorder = LatencyRecorder()
+    raw = RawClient()
+    instrument_signing(raw, recorder)
+    with recorder.span("MARKET", "BTCUSDT"):
+        assert raw.signer.sign("query") == "signature"
+    assert ("MARKET", "BTCUSDT", "sign") in recorder.summary()
+
+
+def test_bot_orders_are_instrumented(exchange, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    recorder = LatencyRecorder()
+    bot = SimplifiedBot(None, None, client=exchange, metrics=recorder)
+    try:
+        assert bot.place_limit_order("BTCUSDT", "BUY", 0.01, 29000) is not None
+        assert bot.place_market_order("BTCUSDT", "BUY", 0.01) is not None
+    finally:
+        bot.close()
+        bot.log_pipeline.stop()
+    summary = recorder.summary()
+    for order_type in ("LIMIT", "MARKET"):
+        assert summary[(order_type, "BTCUSDT", "validate")]["count"] == 1
+        assert summary[(order_type, "BTCUSDT", "request")]["count"] == 1
+        assert summary[(order_type, "BTCUSDT", "total")]["count"] == 1
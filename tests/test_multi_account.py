@@ -0,0 +1,77 @@
+import os
+import pytest
+from conftest import add_flat_market
+from multi_account import MultiAccountCoordinator
+from simulator import SimulatedExchange
+
+# Fetch log shared with the worker processes (set before the pool forks)
+_FETCH_LOG = None
+
+
+class _CountingExchange(SimulatedExchange):
+    def futures_exchange_info(self, **params):
+        with open(_FETCH_LOG, "a") as f:
+            f.write(f"{os.getpid()}\n")
+        return super().futures_exchange_info(**params)
+
+
+def _factory(api_key, api_secret, testnet, governor):
+    exchange = _CountingExchange()
+    add_flat_market(exchange, "BTCUSDT")
+    return exchange
+
+
+def _accounts(n):
+    return {f"acct{i}": (f"key{i}", f"secret{i}") for i in range(n)}
+
+
+@pytest.fixture
+def fetch_log(tmp_path, monkeypatch):
+    global _FETCH_LOG
+    monkeypatch.chdir(tmp_path)
+    _FETCH_LOG = str(tmp_path / "fetches.log")
+    yield _FETCH_LOG
+    _FETCH_LOG = None
+
+
+def _fetching_pids(path):
+    with open(path) as f:
+        return [int(pid) for pid in f.read().split()]
+
+
+def test_thread_fan_out_shares_one_filter_cache(fetch_log):
+    coordinator = MultiAccountCoordinator(_accounts(8), client_factory=_factory)
+    try:
+        summary = coordinator.place_limit_order("BTCUSDT", "BUY", 0.0101, 29000.123,
+                                                overrides={'acct0': {'quantity': 0.02}})
+    finally:
+        coordinator.close()
+    assert (summary['succeeded'], summary['failed']) == (8, 0)
+    assert summary['results']['acct0'].result['origQty'] == "0.02"
+    # Quantized by the shared filters
+    assert summary['results']['acct1'].result['price'] == "29000.12"
+    assert _fetching_pids(fetch_log) == [os.getpid()]
+
+
+def test_process_workers_use_the_parents_exchange_info(fetch_log):
+    coordinator = MultiAccountCoordinator(_accounts(6), mode="process", max_workers=3, client_factory=_factory)
+    try:
+        first = coordinator.place_market_order("BTCUSDT", "BUY", 0.0101)
+        second = coordinator.place_market_order("BTCUSDT", "SELL", 0.0101)
+    finally:
+        coordinator.close()
+    assert first['succeeded'] == second['succeeded'] == 6
+    assert first['results']['acct5'].result['origQty'] == "0.01"
+    # Only the parent fetched; workers never fetch or touch the cache file
+    assert _fetching_pids(fetch_log) == [os.getpid()]
+
+
+def test_unknown_accounts_and_operations_are_rejected():
+    coordinator = MultiAccountCoordinator(_accounts(1), client_factory=_factory)
+    try:
+        with pytest.raises(ValueError, match="Unknown accounts"):
+            coordinator.fan_out("market", accounts=["nope"], symbol="BTCUSDT", side="BUY", quantity=1)
+        with pytest.raises(ValueError, match="Unknown operation"):
+            coordinator.fan_out("transfer")
+    finally:
+        coordinator.close()
@@ -0,0 +1,98 @@
+import numpy as np
+from advanced.oco_manager import OCOManager
+from bot import SimplifiedBot
+from conftest import START_MS
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class _Client:
+    def __init__(self, statuses=None):
+        self.statuses = statuses or {}
+        self.cancelled = []
+
+    def futures_cancel_order(self, symbol, orderId):
+        self.cancelled.append(orderId)
+        return {'orderId': orderId, 'status': "CANCELED"}
+
+    def futures_get_order(self, symbol, orderId):
+        return {'orderId': orderId, 'status': self.statuses.get(orderId, "NEW")}
+
+
+def test_take_profit_fill_cancels_the_stop_on_the_simulator(exchange):
+    # Flat at 30000 for an hour, then up to 31500
+    times = START_MS + np.arange(120, dtype=np.int64) * 60_000
+    prices = np.where(np.arange(120) < 60, 30000.0, 31500.0)
+    exchange.add_klines("BTCUSDT", times, prices, prices, prices, prices)
+    manager = OCOManager(exchange)
+    exchange.add_listener(manager.on_event)
+    exchange.futures_create_order(symbol="BTCUSDT", side="BUY", type="MARKET", quantity=0.01)
+    pair, (tp, sl) = manager.place("BTCUSDT", "BUY", 0.01, 31000, 29000)
+
+    exchange.run()
+    manager.shutdown()
+    assert pair.state == "FILLED"
+    assert exchange.futures_get_order(symbol="BTCUSDT", orderId=tp['orderId'])['status'] == "FILLED"
+    assert exchange.futures_get_order(symbol="BTCUSDT", orderId=sl['orderId'])['status'] == "CANCELED"
+    assert manager.active_count() == 0
+
+
+def test_fill_before_register_is_applied_on_register():
+    client = _Client()
+    manager = OCOManager(client, clock=_Clock())
+    assert manager.on_order_update(11, "FILLED") is None
+    pair = manager.register("BTCUSDT", 11, 12)
+    manager.shutdown()
+    assert pair.state == "FILLED"
+    assert client.cancelled == [12]
+    assert manager.active_count() == 0
+
+
+def test_early_statuses_expire():
+    clock = _Clock()
+    client = _Client()
+    manager = OCOManager(client, early_ttl=30, clock=clock)
+    manager.on_order_update(11, "FILLED")
+    clock.now = 31
+    pair = manager.register("BTCUSDT", 11, 12)
+    manager.shutdown()
+    assert pair.state == "ACTIVE"
+    assert client.cancelled == []
+    assert manager._early == {}
+
+
+def test_reconcile_closes_pairs_whose_leg_closed_in_a_gap():
+    client = _Client({21: "FILLED"})
+    manager = OCOManager(client)
+    gapped = manager.register("BTCUSDT", 21, 22)
+    untouched = manager.register("BTCUSDT", 31, 32)
+    open_orders = [{'orderId': 22}, {'orderId': 31}, {'orderId': 32}]
+    assert manager.reconcile(open_orders) == 1
+    manager.shutdown()
+    assert gapped.state == "FILLED"
+    assert client.cancelled == [22]
+    assert untouched.state == "ACTIVE"
+
+
+def test_reconcile_ignores_legs_placed_after_the_snapshot():
+    client = _Client()
+    manager = OCOManager(client)
+    pair = manager.register("BTCUSDT", 41, 42)
+    assert manager.reconcile([]) == 0
+    manager.shutdown()
+    assert pair.state == "ACTIVE"
+
+
+def test_bot_close_waits_for_sibling_cancels(exchange, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    bot = SimplifiedBot(None, None, client=exchange)
+    bot.oco_manager = OCOManager(_Client())
+    bot.close()
+    bot.log_pipeline.stop()
+    assert bot.oco_manager._executor._shutdown
@@ -0,0 +1,127 @@
+import threading
+import time
+import pytest
+from rate_limiter import PRIORITY_CANCEL, PRIORITY_ORDER, RateLimitGovernor, RateLimitedClient, TokenBucket
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class _Response:
+    def __init__(self, headers):
+        self.headers = headers
+
+
+class _RateLimited(Exception):
+    status_code = 429
+
+    def __init__(self, retry_after):
+        super().__init__("Too many requests")
+        self.response = _Response({"Retry-After": str(retry_after)})
+
+
+def test_token_bucket_refills_over_its_period():
+    clock = _Clock()
+    bucket = TokenBucket(60, 60, clock)
+    bucket.consume(60)
+    assert bucket.wait_time(30) == pytest.approx(30)
+    clock.now = 30
+    assert bucket.wait_time(30) == 0
+    # Never more than the capacity, however long it was idle
+    clock.now = 1000
+    assert bucket.wait_time(61) == 0
+    bucket.consume(61)
+    assert bucket.tokens == pytest.approx(-1)
+
+
+def test_headers_resync_the_buckets():
+    clock = _Clock()
+    governor = RateLimitGovernor(weight_limit=1000, headroom=1.0, clock=clock)
+    governor.update_from_headers({"x-mbx-used-weight-1m": "900", "X-MBX-ORDER-COUNT-10S": "300"})
+    assert governor.weight.tokens == 100
+    assert governor.orders_10s.tokens == 0
+    # Headers only ever lower the local count
+    governor.update_from_headers({"X-MBX-USED-WEIGHT-1M": "10"})
+    assert governor.weight.tokens == 100
+
+
+def test_endpoint_weights_are_charged():
+    calls = []
+
+    class Client:
+        def futures_order_book(self, **params):
+            calls.append(params)
+            return {}
+
+        def futures_place_batch_order(self, batchOrders):
+            return []
+
+    governor = RateLimitGovernor(headroom=1.0, clock=_Clock())
+    client = RateLimitedClient(Client(), governor)
+    client.futures_order_book(symbol="BTCUSDT", limit=1000)
+    assert governor.weight.tokens == 2400 - 20
+    client.futures_place_batch_order(batchOrders=[{}, {}, {}])
+    assert governor.weight.tokens == 2400 - 25
+    assert governor.orders_10s.tokens == 300 - 3
+
+
+def test_429_backs_off_and_retries():
+    class Client:
+        calls = 0
+
+        def futures_create_order(self, **params):
+            Client.calls += 1
+            if Client.calls == 1:
+                raise _RateLimited(0)
+            return {'orderId': 1}
+
+    governor = RateLimitGovernor()
+    assert RateLimitedClient(Client(), governor).futures_create_order(symbol="BTCUSDT") == {'orderId': 1}
+    assert Client.calls == 2
+
+
+def test_429_is_raised_once_retries_run_out():
+    class Client:
+        def futures_cancel_order(self, **params):
+            raise _RateLimited(0)
+
+    with pytest.raises(_RateLimited):
+        RateLimitedClient(Client(), max_retries=1).futures_cancel_order(symbol="BTCUSDT", orderId=1)
+
+
+def test_non_futures_attributes_are_not_governed():
+    class Client:
+        API_URL = "https://example"
+
+        def ping(self):
+            return "pong"
+
+    governor = RateLimitGovernor()
+    client = RateLimitedClient(Client(), governor)
+    assert client.API_URL == "https://example"
+    assert client.ping() == "pong"
+    assert governor.weight.tokens == governor.weight.capacity
+
+
+def test_cancels_are_served_before_queued_orders():
+    governor = RateLimitGovernor()
+    governor.backoff(0.3)
+    served = []
+
+    def acquire(name, priority):
+        governor.acquire(1, 0, priority)
+        served.append(name)
+
+    order = threading.Thread(target=acquire, args=("order", PRIORITY_ORDER))
+    cancel = threading.Thread(target=acquire, args=("cancel", PRIORITY_CANCEL))
+    order.start()
+    time.sleep(0.05)
+    cancel.start()
+    order.join(5)
+    cancel.join(5)
+    assert served == ["cancel", "order"]
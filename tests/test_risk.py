@@ -0,0 +1,79 @@
+import threading
+import pytest
+from bot import SimplifiedBot
+from risk import RiskCheckError, RiskEngine, RiskLimits
+from simulator import LatencyClient
+
+
+@pytest.fixture
+def make_bot(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    bots = []
+
+    def make(client, **limits):
+        bot = SimplifiedBot(None, None, client=client, risk=RiskEngine(RiskLimits(**limits)))
+        bots.append(bot)
+        return bot
+    yield make
+    for bot in bots:
+        bot.close()
+        bot.log_pipeline.stop()
+
+
+def test_reservation_is_held_until_settled_or_released():
+    risk = RiskEngine(RiskLimits(max_position=1.0, max_open_orders=2))
+    reservation = risk.reserve("BTCUSDT", "BUY", 0.6, 30000.0)
+    with pytest.raises(RiskCheckError, match="position could reach 1.2"):
+        risk.reserve("BTCUSDT", "BUY", 0.6)
+    with risk.reserve("BTCUSDT", "SELL", 0.6):
+        with pytest.raises(RiskCheckError, match="2 open orders"):
+            risk.check("BTCUSDT", "SELL", 0.1)
+    reservation.settle({'orderId': 1, 'symbol': "BTCUSDT", 'side': "BUY", 'status': "NEW", 'origQty': "0.6",
+                        'executedQty': "0"})
+    state = risk.state("BTCUSDT")
+    assert (state.open_buy, state.open_sell, state.open_orders) == (0.6, 0.0, 1)
+    reservation.release()
+    assert (state.open_buy, state.open_orders) == (0.6, 1)
+
+
+def test_concurrent_orders_cannot_pass_the_same_headroom(make_bot, exchange):
+    bot = make_bot(LatencyClient(exchange, 0.02), max_position=1.0)
+    results = []
+
+    def place():
+        results.append(bot.place_limit_order("BTCUSDT", "BUY", 0.1, 29000.0))
+    threads = [threading.Thread(target=place) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(r is not None for r in results) == 10
+    state = bot.risk.state("BTCUSDT")
+    assert state.open_buy == pytest.approx(1.0)
+    assert state.open_orders == 10
+
+
+def test_failed_order_releases_its_reservation(make_bot, exchange):
+    bot = make_bot(exchange, max_position=1.0)
+    # A buy stop below the market would trigger at once: rejected by the exchange
+    assert bot.place_stop_limit_order("BTCUSDT", "BUY", 0.5, 29000.0, 29000.0) is None
+    state = bot.risk.state("BTCUSDT")
+    assert (state.open_buy, state.open_orders) == (0.0, 0)
+    assert bot.place_limit_order("BTCUSDT", "BUY", 1.0, 29000.0) is not None
+
+
+def test_scheduled_twap_holds_its_unsent_chunks(make_bot, exchange):
+    bot = make_bot(exchange, max_position=1.0)
+    first_chunk = threading.Event()
+    schedule_id = bot.schedule_twap_order("BTCUSDT", "BUY", 1.0, chunks=5, interval=60,
+                                          on_progress=lambda schedule: first_chunk.set())
+    assert first_chunk.wait(5)
+    state = bot.risk.state("BTCUSDT")
+    assert state.position == pytest.approx(0.2)
+    assert state.open_buy == pytest.approx(0.8)
+    assert bot.place_market_order("BTCUSDT", "BUY", 0.1) is None
+
+    bot.twap_scheduler.cancel(schedule_id)
+    assert state.open_buy == pytest.approx(0.0)
+    assert bot.place_market_order("BTCUSDT", "BUY", 0.1) is not None
+    assert state.position == pytest.approx(0.3)
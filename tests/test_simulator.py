@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+from conftest import START_MS, add_flat_market
+from simulator import SimulatedAPIError, SimulatedExchange, first_touch
+
+
+def _path(exchange, closes, highs=None, lows=None, opens=None):
+    times = START_MS + np.arange(len(closes), dtype=np.int64) * 60_000
+    closes = np.asarray(closes, dtype=float)
+    return exchange.add_klines("BTCUSDT", times, closes if opens is None else np.asarray(opens, dtype=float),
+                               closes if highs is None else np.asarray(highs, dtype=float),
+                               closes if lows is None else np.asarray(lows, dtype=float), closes)
+
+
+def test_first_touch_matches_a_bar_by_bar_scan():
+    rng = np.random.default_rng(0)
+    closes = 100 + np.cumsum(rng.normal(0, 1, 500))
+    highs, lows = closes + rng.uniform(0, 1, 500), closes - rng.uniform(0, 1, 500)
+    levels = rng.uniform(closes.min() - 5, closes.max() + 5, 300)
+    upward = rng.random(300) < 0.5
+    hit = np.where(upward[None, :], highs[:, None] >= levels[None, :], lows[:, None] <= levels[None, :])
+    expected = np.where(hit.any(axis=0), hit.argmax(axis=0), -1)
+    assert (first_touch(highs, lows, levels, upward) == expected).all()
+    assert (first_touch(highs[:0], lows[:0], levels, upward) == -1).all()
+
+
+def test_clock_needs_market_data():
+    exchange = SimulatedExchange()
+    with pytest.raises(ValueError, match="clock not started"):
+        exchange.now()
+    with pytest.raises(ValueError, match="clock not started"):
+        exchange.sleep(1)
+    exchange.run()
+    add_flat_market(exchange, "BTCUSDT")
+    assert exchange.now() == START_MS / 1000
+    exchange.sleep(90)
+    assert exchange.now() == START_MS / 1000 + 90
+
+
+def test_market_order_fills_at_the_close_with_slippage_and_fee():
+    exchange = SimulatedExchange(balance=1000, taker_fee=0.001, slippage_bps=10)
+    add_flat_market(exchange, "BTCUSDT", price=100.0)
+    order = exchange.futures_create_order(symbol="BTCUSDT", side="BUY", type="MARKET", quantity=1)
+    assert order['status'] == "FILLED"
+    assert float(order['avgPrice']) == pytest.approx(100.1)
+    assert exchange.balance == pytest.approx(1000 - 100.1 * 0.001)
+
+
+def test_resting_limit_fills_when_a_bar_reaches_it():
+    exchange = SimulatedExchange(maker_fee=0.0)
+    _path(exchange, [100, 100, 99, 100], lows=[100, 100, 98, 100])
+    events = []
+    exchange.add_listener(events.append)
+    order = exchange.futures_create_order(symbol="BTCUSDT", side="BUY", type="LIMIT", timeInForce="GTC",
+                                          quantity=1, price=98.5)
+    exchange.sleep(60)
+    assert exchange.futures_get_order(symbol="BTCUSDT", orderId=order['orderId'])['status'] == "NEW"
+    exchange.run()
+    filled = exchange.futures_get_order(symbol="BTCUSDT", orderId=order['orderId'])
+    assert (filled['status'], float(filled['avgPrice'])) == ("FILLED", 98.5)
+    assert [e['o']['x'] for e in events if e['e'] == "ORDER_TRADE_UPDATE"] == ["NEW", "TRADE"]
+
+
+def test_stop_gapped_through_fills_at_the_open():
+    exchange = SimulatedExchange()
+    _path(exchange, [100, 100, 90], opens=[100, 100, 92], highs=[100, 100, 92], lows=[100, 100, 89])
+    exchange.futures_create_order(symbol="BTCUSDT", side="BUY", type="MARKET", quantity=1)
+    stop = exchange.futures_create_order(symbol="BTCUSDT", side="SELL", type="STOP_MARKET", stopPrice=95,
+                                         quantity=1, reduceOnly=True)
+    exchange.run()
+    filled = exchange.futures_get_order(symbol="BTCUSDT", orderId=stop['orderId'])
+    assert float(filled['avgPrice']) == 92
+    assert exchange.markets["BTCUSDT"].position == 0
+
+
+def test_rejections_use_binance_error_codes():
+    exchange = SimulatedExchange()
+    add_flat_market(exchange, "BTCUSDT", price=100.0)
+    with pytest.raises(SimulatedAPIError) as raised:
+        exchange.futures_create_order(symbol="BTCUSDT", side="BUY", type="LIMIT", timeInForce="GTX",
+                                      quantity=1, price=101)
+    assert raised.value.code == -5022
+    with pytest.raises(SimulatedAPIError) as raised:
+        exchange.futures_create_order(symbol="BTCUSDT", side="SELL", type="STOP_MARKET", stopPrice=101,
+                                      quantity=1)
+    assert raised.value.code == -2021
+    with pytest.raises(SimulatedAPIError) as raised:
+        exchange.futures_create_order(symbol="ETHUSDT", side="BUY", type="MARKET", quantity=1)
+    assert raised.value.code == -1121
@@ -0,0 +1,53 @@
+import os
+import subprocess
+import sys
+import pytest
+from bot import SimplifiedBot
+from simulator import SimulatedAPIError
+from startup import TimeOffsetCache
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+
+def test_importing_the_bot_loads_no_order_modules_or_sdk():
+    code = (f"import sys; sys.path.insert(0, {SRC!r}); import bot; "
+            "print(' '.join(sorted(m for m in sys.modules if m.split('.')[0] in "
+            "('binance', 'advanced', 'market_orders', 'limit_orders', 'batch_orders', 'journal', 'market_data'))))")
+    loaded = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout.split()
+    assert loaded == []
+
+
+class _RejectedCredentials:
+    def __init__(self, exchange):
+        self.exchange = exchange
+
+    def __getattr__(self, name):
+        return getattr(self.exchange, name)
+
+    def futures_account(self, **params):
+        raise SimulatedAPIError(-2015, "Invalid API-key, IP, or permissions for action.")
+
+
+def test_fast_start_reports_a_failed_check_later(tmp_path, monkeypatch, exchange):
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(SimulatedAPIError):
+        SimplifiedBot(None, None, client=_RejectedCredentials(exchange))
+
+    bot = SimplifiedBot(None, None, client=_RejectedCredentials(exchange), fast_start=True)
+    try:
+        assert bot.check_connection(timeout=5) is None
+        assert bot.place_market_order("BTCUSDT", "BUY", 0.01)['status'] == "FILLED"
+    finally:
+        bot.close()
+        bot.log_pipeline.stop()
+
+
+def test_time_offset_cache_expires(tmp_path):
+    now = [1000.0]
+    cache = TimeOffsetCache(str(tmp_path / "time_offset.json"), max_age=60, clock=lambda: now[0])
+    assert cache.load() is None
+    cache.save(-250)
+    now[0] += 59
+    assert cache.load() == -250
+    now[0] += 2
+    assert cache.load() is None
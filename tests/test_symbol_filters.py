@@ -0,0 +1,124 @@
+import json
+import multiprocessing
+import os
+import pytest
+from startup import TimeOffsetCache
+from symbol_filters import SymbolFilters, SymbolFilterCache
+
+
+def _filters():
+    return SymbolFilters("BTCUSDT", step_size="0.001", min_qty="0.001", max_qty="1000", tick_size="0.10",
+                         min_price="0.10", max_price="1000000", min_notional="5",
+                         market_step_size="0.001", market_min_qty="0.001", market_max_qty="120")
+
+
+class _CountingClient:
+    def __init__(self, symbols=("BTCUSDT",)):
+        self.symbols = list(symbols)
+        self.calls = 0
+
+    def futures_exchange_info(self):
+        self.calls += 1
+        return {'symbols': [{'symbol': s, 'filters': [
+            {'filterType': "LOT_SIZE", 'stepSize': "0.001", 'minQty': "0.001", 'maxQty': "1000"},
+            {'filterType': "PRICE_FILTER", 'tickSize': "0.10", 'minPrice': "0.10", 'maxPrice': "1000000"},
+            {'filterType': "MIN_NOTIONAL", 'notional': "5"},
+        ]} for s in self.symbols]}
+
+
+def test_validate_quantizes_to_step_and_tick():
+    assert _filters().validate(0.0129, 30000.04) == ("0.012", "30000.0")
+    assert _filters().validate(1.23456, None, market=True) == ("1.234", None)
+
+
+@pytest.mark.parametrize("quantity, price, message", [
+    (0.0004, 30000, "below minimum"),
+    (2000, 30000, "above maximum"),
+    (0.001, 1000, "notional below minimum"),
+    (0.01, 0.01, "Price"),
+])
+def test_validate_rejects_locally(quantity, price, message):
+    with pytest.raises(ValueError, match=message):
+        _filters().validate(quantity, price)
+
+
+def test_market_lot_size_applies_to_market_orders():
+    with pytest.raises(ValueError, match="above maximum"):
+        _filters().validate(500, market=True)
+    assert _filters().validate(500, 30000) == ("500.000", "30000.0")
+
+
+def test_split_quantity_sums_to_the_total():
+    parts = _filters().split_quantity(1.0, 3)
+    assert parts == ["0.333", "0.333", "0.334"]
+    assert _filters().split_quantity(0.002, 5) == ["0.002"]
+
+
+def test_cache_is_persisted_and_reused(tmp_path):
+    path = str(tmp_path / "exchange_info.json")
+    client = _CountingClient()
+    SymbolFilterCache(client, path=path).get("btcusdt")
+    again = SymbolFilterCache(client, path=path)
+    assert again.get("BTCUSDT").tick_units == 1
+    assert client.calls == 1
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_expired_cache_is_refreshed(tmp_path):
+    now = [1000.0]
+    client = _CountingClient()
+    cache = SymbolFilterCache(client, path=str(tmp_path / "x.json"), ttl=60, clock=lambda: now[0])
+    cache.get("BTCUSDT")
+    now[0] += 61
+    cache.get("BTCUSDT")
+    assert client.calls == 2
+
+
+def test_failed_save_is_not_fatal(tmp_path):
+    cache = SymbolFilterCache(_CountingClient(), path=str(tmp_path / "missing" / "exchange_info.json"))
+    assert cache.get("BTCUSDT").symbol == "BTCUSDT"
+
+
+def test_unknown_symbol_refreshes_at_most_once_per_interval(tmp_path):
+    now = [1000.0]
+    client = _CountingClient()
+    cache = SymbolFilterCache(client, path=None, clock=lambda: now[0], unknown_refresh=30)
+    cache.get("BTCUSDT")
+    for _ in range(100):
+        with pytest.raises(ValueError, match="Unknown symbol"):
+            cache.get("BTCUSDX")
+        now[0] += 0.5
+    # One load, then one reload once the exchange info was older than 30 s
+    assert client.calls == 2
+
+    client.symbols.append("SOLUSDT")
+    now[0] += 31
+    assert cache.get("SOLUSDT").symbol == "SOLUSDT"
+    assert client.calls == 3
+
+
+def _refresh_in_process(path, barrier):
+    barrier.wait()
+    SymbolFilterCache(_CountingClient(), path=path).refresh()
+
+
+def test_concurrent_processes_share_the_cache_file(tmp_path):
+    path = str(tmp_path / "exchange_info.json")
+    context = multiprocessing.get_context("fork")
+    barrier = context.Barrier(8)
+    processes = [context.Process(target=_refresh_in_process, args=(path, barrier)) for _ in range(8)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(10)
+    assert [process.exitcode for process in processes] == [0] * 8
+    with open(path) as f:
+        assert json.load(f)['exchange_info']['symbols'][0]['symbol'] == "BTCUSDT"
+    assert os.listdir(tmp_path) == ["exchange_info.json"]
+
+
+def test_time_offset_cache_round_trip(tmp_path):
+    cache = TimeOffsetCache(str(tmp_path / "time_offset.json"))
+    cache.save(-42)
+    assert cache.load() == -42
+    TimeOffsetCache(str(tmp_path / "missing" / "time_offset.json")).save(5)
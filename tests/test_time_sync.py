@@ -0,0 +1,88 @@
+import hashlib
+import hmac
+import pytest
+from urllib.parse import parse_qsl
+from time_sync import TIMESTAMP_ERROR_CODE, FastSigner, ServerTimeSync
+
+
+class _ServerClock:
+    """futures_time() of a server ``offset_ms`` ahead, reached over a ``rtt``-second round trip"""
+
+    def __init__(self, offset_ms, rtt=0.01):
+        self.now = 1_700_000_000.0
+        self.offset_ms = offset_ms
+        self.rtt = rtt
+        self.timestamp_offset = 0
+
+    def clock(self):
+        return self.now
+
+    def futures_time(self):
+        self.now += self.rtt / 2
+        server_time = int(self.now * 1000 + self.offset_ms)
+        self.now += self.rtt / 2
+        return {'serverTime': server_time}
+
+
+class _TimestampError(Exception):
+    code = TIMESTAMP_ERROR_CODE
+
+
+def test_signature_matches_python_binance():
+    from binance.client import BaseClient
+    library = BaseClient.__new__(BaseClient)
+    library.API_SECRET = "s3cret"
+    params = {'symbol': "BTCUSDT", 'side': "BUY", 'quantity': "0.010", 'price': "42000.10", 'timestamp': 1700000000000}
+    query, signature = FastSigner("s3cret").sign(dict(params, newClientOrderId=None))
+    assert query == "price=42000.10&quantity=0.010&side=BUY&symbol=BTCUSDT&timestamp=1700000000000"
+    assert signature == library._generate_signature(params)
+
+
+def test_installed_signer_builds_signed_get_params():
+    from startup import create_client
+    client = create_client("key", "s3cret")
+    client.timestamp_offset = -1500
+    kwargs = client._get_request_kwargs("get", True, data={'symbol': "BTCUSDT", 'orderId': 42})
+    query, _, signature = kwargs['params'].rpartition("&signature=")
+    fields = dict(parse_qsl(query))
+    assert (fields['symbol'], fields['orderId']) == ("BTCUSDT", "42")
+    assert signature == hmac.new(b"s3cret", query.encode(), hashlib.sha256).hexdigest()
+    assert client.signer.count == 1
+
+
+def test_samples_are_smoothed_and_slow_ones_discarded():
+    server = _ServerClock(offset_ms=250)
+    sync = ServerTimeSync(server, alpha=0.5, clock=server.clock)
+    assert sync.sample() == pytest.approx(250, abs=1)
+    server.offset_ms = 270
+    assert sync.sample() == pytest.approx(260, abs=1)
+    # A round trip far above the best seen says little about the offset
+    server.offset_ms, server.rtt = 400, 0.5
+    assert sync.sample() == pytest.approx(260, abs=1)
+    assert sync.stats['discarded'] == 1
+    # A step above max_step is a clock jump, applied in full
+    server.offset_ms, server.rtt = 5000, 0.01
+    assert sync.sample() == pytest.approx(5000, abs=1)
+    assert sync.stats['jumps'] == 1
+
+
+def test_timestamp_reject_resyncs_and_retries_once():
+    server = _ServerClock(offset_ms=3000)
+    calls = []
+
+    def request(method, uri, signed, force_params=False, **kwargs):
+        calls.append(server.timestamp_offset)
+        if abs(server.timestamp_offset - 3000) > 1:
+            raise _TimestampError("Timestamp for this request is outside of the recvWindow.")
+        return {'ok': True}
+    server._request = request
+    sync = ServerTimeSync(server, clock=server.clock).install()
+    assert server._request("get", "order", True) == {'ok': True}
+    assert calls == [0, pytest.approx(3000, abs=1)]
+    assert (sync.stats['resyncs'], sync.stats['retries']) == (1, 1)
+
+    # Unsigned requests and other errors are not retried
+    server.timestamp_offset = 0
+    with pytest.raises(_TimestampError):
+        server._request("get", "ping", False)
+    assert calls[-1] == 0 and len(calls) == 3
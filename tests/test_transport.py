@@ -0,0 +1,118 @@
+import threading
+import pytest
+import requests
+from rate_limiter import RateLimitGovernor, RateLimitedClient
+from simulator import SimulatedAPIError
+from transport import IdempotentOrderClient, OrderStateUnknown
+
+
+class _LostResponseClient:
+    """Takes the first order, then loses the response"""
+
+    def __init__(self, exchange, lookup_error=None):
+        self.exchange = exchange
+        self.lookup_error = lookup_error
+        self.sent = 0
+
+    def futures_create_order(self, **params):
+        self.sent += 1
+        if self.sent == 1:
+            if self.lookup_error is None:
+                self.exchange.futures_create_order(**params)
+            raise requests.exceptions.ReadTimeout("read timed out")
+        return self.exchange.futures_create_order(**params)
+
+    def futures_get_order(self, **params):
+        if self.lookup_error is not None:
+            raise self.lookup_error
+        return self.exchange.futures_get_order(**params)
+
+
+def _order():
+    return dict(symbol="BTCUSDT", side="BUY", type="LIMIT", timeInForce="GTC", quantity="0.010", price="29000")
+
+
+def test_order_taken_before_the_timeout_is_not_resent(exchange):
+    client = _LostResponseClient(exchange)
+    order = IdempotentOrderClient(client).futures_create_order(**_order())
+    assert client.sent == 1
+    assert order['status'] == "NEW"
+    assert len(exchange.orders) == 1
+
+
+def test_order_is_resent_when_the_exchange_has_no_record(exchange):
+    client = _LostResponseClient(exchange, SimulatedAPIError(-2013, "Order does not exist."))
+    order = IdempotentOrderClient(client).futures_create_order(**_order())
+    assert client.sent == 2
+    assert order['status'] == "NEW"
+    assert len(exchange.orders) == 1
+
+
+@pytest.mark.parametrize("error", [
+    requests.exceptions.ConnectionError("reset"),
+    SimulatedAPIError(-1003, "Too many requests"),
+])
+def test_failed_lookup_raises_instead_of_resending(exchange, error):
+    client = _LostResponseClient(exchange, error)
+    with pytest.raises(OrderStateUnknown) as raised:
+        IdempotentOrderClient(client).futures_create_order(**_order(), newClientOrderId="abc")
+    assert client.sent == 1
+    assert raised.value.client_order_id == "abc"
+
+
+class _Response:
+    def __init__(self, weight):
+        self.headers = {"X-MBX-USED-WEIGHT-1M": str(weight)}
+
+
+class _Session:
+    def __init__(self):
+        self.hooks = {'response': []}
+
+
+class _SharedResponseClient:
+    """Keeps only the latest response on ``self.response``, like binance.Client"""
+
+    def __init__(self):
+        self.session = _Session()
+        self.response = None
+        self.barrier = threading.Barrier(2)
+
+    def futures_get_order(self, weight, first):
+        response = _Response(weight)
+        for hook in self.session.hooks['response']:
+            hook(response)
+        self.response = response
+        if first:
+            # Let the other thread's request replace client.response
+            self.barrier.wait()
+            self.barrier.wait()
+        else:
+            self.barrier.wait()
+            self.barrier.wait()
+            self.response = _Response(weight)
+        return {}
+
+
+class _RecordingGovernor(RateLimitGovernor):
+    def __init__(self):
+        super().__init__()
+        self.synced = {}
+
+    def update_from_headers(self, headers):
+        self.synced[threading.current_thread().name] = headers["X-MBX-USED-WEIGHT-1M"]
+
+
+def test_headers_come_from_each_threads_own_response():
+    client = _SharedResponseClient()
+    governor = _RecordingGovernor()
+    governed = RateLimitedClient(client, governor)
+    threads = [
+        threading.Thread(target=governed.futures_get_order, args=(100, True), name="first"),
+        threading.Thread(target=governed.futures_get_order, args=(200, False), name="second"),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert governor.synced == {"first": "100", "second": "200"}
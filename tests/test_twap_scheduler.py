@@ -0,0 +1,141 @@
+import threading
+import time
+import pytest
+from advanced.twap_scheduler import TWAPScheduler
+from simulator import LatencyClient
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_chunks_are_sent_on_schedule(exchange):
+    clock = _Clock()
+    scheduler = TWAPScheduler(exchange, clock=clock)
+    schedule_id = scheduler.submit("BTCUSDT", "BUY", 0.03, chunks=3, interval=10)
+
+    assert scheduler.run_pending() == 1
+    assert scheduler.next_due() == 10
+    clock.now = 9.9
+    assert scheduler.run_pending() == 0
+    clock.now = 25
+    assert scheduler.run_pending() == 1
+    # The next chunk is due relative to the previous due time, not to when it ran
+    assert scheduler.next_due() == 20
+    assert scheduler.run_pending() == 1
+    assert scheduler.progress(schedule_id)['state'] == "COMPLETED"
+    assert exchange.summary()['positions']['BTCUSDT']['positionAmt'] == pytest.approx(0.03)
+
+
+def test_pause_resume_and_cancel(exchange):
+    clock = _Clock()
+    scheduler = TWAPScheduler(exchange, clock=clock)
+    schedule_id = scheduler.submit("BTCUSDT", "BUY", 0.04, chunks=4, interval=10)
+    scheduler.run_pending()
+
+    scheduler.pause(schedule_id)
+    clock.now = 50
+    assert scheduler.run_pending() == 0
+    scheduler.resume(schedule_id)
+    assert scheduler.run_pending() == 1
+    scheduler.cancel(schedule_id)
+    clock.now = 100
+    assert scheduler.run_pending() == 0
+    progress = scheduler.progress(schedule_id)
+    assert progress['state'] == "CANCELLED"
+    assert progress['executed_chunks'] == 2
+
+
+def test_due_chunks_are_sent_concurrently(exchange):
+    scheduler = TWAPScheduler(LatencyClient(exchange, 0.05), workers=20)
+    scheduler.start()
+    try:
+        start = time.monotonic()
+        ids = [scheduler.submit("BTCUSDT", "BUY", 0.01, chunks=1, interval=1) for _ in range(20)]
+        while scheduler.active_count():
+            time.sleep(0.005)
+        elapsed = time.monotonic() - start
+    finally:
+        scheduler.stop()
+    assert all(scheduler.progress(i)['state'] == "COMPLETED" for i in ids)
+    # Sequential sends would take 20 x 50 ms
+    assert elapsed < 0.5
+
+
+class _BlockingClient:
+    def __init__(self, exchange):
+        self.exchange = exchange
+        self.sending = threading.Event()
+        self.release = threading.Event()
+
+    def futures_create_order(self, **params):
+        self.sending.set()
+        assert self.release.wait(5)
+        return self.exchange.futures_create_order(**params)
+
+
+def test_cancel_during_the_last_chunk_is_kept(exchange):
+    client = _BlockingClient(exchange)
+    scheduler = TWAPScheduler(client)
+    scheduler.start()
+    try:
+        schedule_id = scheduler.submit("BTCUSDT", "BUY", 0.01, chunks=1, interval=1)
+        assert client.sending.wait(5)
+        scheduler.cancel(schedule_id)
+        client.release.set()
+    finally:
+        scheduler.stop()
+    progress = scheduler.progress(schedule_id)
+    assert progress['state'] == "CANCELLED"
+    assert progress['executed_chunks'] == 1
+
+
+def test_resume_during_a_send_does_not_duplicate_the_chunk(exchange):
+    client = _BlockingClient(exchange)
+    scheduler = TWAPScheduler(client)
+    scheduler.start()
+    try:
+        schedule_id = scheduler.submit("BTCUSDT", "BUY", 0.02, chunks=2, interval=0.01)
+        assert client.sending.wait(5)
+        scheduler.pause(schedule_id)
+        scheduler.resume(schedule_id)
+        client.release.set()
+        deadline = time.monotonic() + 5
+        while scheduler.active_count() and time.monotonic() < deadline:
+            time.sleep(0.005)
+    finally:
+        scheduler.stop()
+    assert scheduler.progress(schedule_id)['state'] == "COMPLETED"
+    assert len(exchange.orders) == 2
+
+
+def test_failed_chunk_fails_the_schedule(exchange):
+    scheduler = TWAPScheduler(exchange, clock=_Clock())
+    schedule_id = scheduler.submit_chunks("ETHUSDT", "BUY", [dict(symbol="ETHUSDT", side="BUY", type="MARKET",
+                                                                   quantity="1")], interval=1)
+    scheduler.run_pending()
+    progress = scheduler.progress(schedule_id)
+    assert progress['state'] == "FAILED"
+    assert "Invalid symbol" in progress['error']
+
+
+def test_finished_schedules_are_dropped_after_retention(exchange):
+    clock = _Clock()
+    scheduler = TWAPScheduler(exchange, clock=clock, retention=60)
+    finished = scheduler.submit("BTCUSDT", "BUY", 0.01, chunks=1, interval=1)
+    scheduler.run_pending()
+    running = scheduler.submit("BTCUSDT", "BUY", 0.02, chunks=2, interval=100)
+    scheduler.run_pending()
+
+    clock.now = 30
+    scheduler.run_pending()
+    assert scheduler.progress(finished)['state'] == "COMPLETED"
+    clock.now = 61
+    scheduler.run_pending()
+    with pytest.raises(ValueError):
+        scheduler.get(finished)
+    assert scheduler.progress(running)['state'] == "ACTIVE"
@@ -0,0 +1,184 @@
+import json
+import queue
+import time
+import websocket
+from user_stream import UserDataStream, connect_websocket
+
+
+def _order(order_id, status="NEW", executed="0", update_time=100, symbol="BTCUSDT"):
+    return {'orderId': order_id, 'clientOrderId': f"c{order_id}", 'symbol': symbol, 'side': "BUY",
+            'type': "LIMIT", 'status': status, 'price': "29000", 'stopPrice': "0", 'origQty': "0.010",
+            'executedQty': executed, 'avgPrice': "29000" if executed != "0" else "0",
+            'updateTime': update_time}
+
+
+def _order_event(order_id, status, executed, update_time, execution="TRADE", last="0.010"):
+    return {'e': "ORDER_TRADE_UPDATE", 'T': update_time, 'o': {
+        'i': order_id, 'c': f"c{order_id}", 's': "BTCUSDT", 'S': "BUY", 'o': "LIMIT", 'X': status,
+        'x': execution, 'q': "0.010", 'z': executed, 'l': last, 'L': "29000", 'T': update_time}}
+
+
+class _Client:
+    """REST side of the account; ``orders`` is the exchange's view"""
+
+    def __init__(self, orders=(), position_time=0):
+        self.orders = {o['orderId']: o for o in orders}
+        self.position_time = position_time
+        self.calls = []
+
+    def futures_stream_get_listen_key(self):
+        self.calls.append("listen_key")
+        return "key"
+
+    def futures_get_open_orders(self):
+        self.calls.append("snapshot")
+        return [o for o in self.orders.values() if o['status'] in ("NEW", "PARTIALLY_FILLED")]
+
+    def futures_position_information(self):
+        return [{'symbol': "BTCUSDT", 'positionAmt': "0.010", 'entryPrice': "29000",
+                 'unRealizedProfit': "0", 'updateTime': self.position_time}]
+
+    def futures_account_balance(self):
+        return [{'asset': "USDT", 'balance': "1000", 'crossWalletBalance': "1000", 'updateTime': 0}]
+
+    def futures_get_order(self, symbol, orderId):
+        return self.orders[orderId]
+
+    def futures_stream_keepalive(self, listenKey):
+        pass
+
+    def futures_stream_close(self, listenKey):
+        pass
+
+
+class _Connection:
+    def __init__(self, messages=()):
+        self.messages = queue.Queue()
+        for message in messages:
+            self.send(message)
+
+    def send(self, event):
+        self.messages.put(json.dumps(event))
+
+    def drop(self):
+        self.messages.put(ConnectionResetError("reset by peer"))
+
+    def recv(self):
+        message = self.messages.get()
+        if isinstance(message, Exception):
+            raise message
+        return message
+
+    def close(self):
+        self.messages.put("")
+
+
+def _stream(client, connections):
+    def connect(url):
+        client.calls.append("connect")
+        return connections.pop(0)
+    return UserDataStream(client, connect=connect, reconnect_delay=0.01)
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_stream_connects_before_the_snapshot():
+    client = _Client([_order(1)])
+    stream = _stream(client, [_Connection()])
+    stream.start()
+    stream.stop()
+    assert client.calls == ["listen_key", "connect", "snapshot"]
+    assert stream.book.get_order(1)['status'] == "NEW"
+
+
+def test_orders_closed_during_a_gap_are_reported():
+    client = _Client([_order(1), _order(2)])
+    first, second = _Connection(), _Connection()
+    stream = _stream(client, [first, second])
+    events = []
+    stream.add_listener(events.append)
+    stream.start()
+    try:
+        first.drop()
+        # While disconnected, order 1 fills and order 2 is cancelled
+        client.orders[1] = _order(1, "FILLED", "0.010", update_time=200)
+        client.orders[2] = _order(2, "CANCELED", update_time=210)
+        _wait_for(lambda: len(events) == 2)
+    finally:
+        stream.stop()
+    fill, cancel = events[0]['o'], events[1]['o']
+    assert (fill['X'], fill['x'], fill['l']) == ("FILLED", "TRADE", "0.01")
+    assert (cancel['X'], cancel['x']) == ("CANCELED", "CANCELED")
+    assert stream.book.open_orders() == []
+    assert client.calls.count("connect") == 2
+
+
+def test_events_held_during_the_snapshot_are_replayed_on_top_of_it():
+    client = _Client([_order(1, "PARTIALLY_FILLED", "0.005", update_time=300)], position_time=300)
+    connection = _Connection([
+        # Sent before the snapshot was taken: already reflected in it
+        _order_event(1, "PARTIALLY_FILLED", "0.005", 250, last="0.005"),
+        {'e': "ACCOUNT_UPDATE", 'T': 250, 'a': {'B': [], 'P': [{'s': "BTCUSDT", 'pa': "0.005"}]}},
+        # Sent after it
+        _order_event(1, "FILLED", "0.010", 400, last="0.005"),
+    ])
+    stream = _stream(client, [connection])
+    events = []
+    stream.add_listener(events.append)
+    stream.start()
+    try:
+        _wait_for(lambda: stream.book.get_order(1)['status'] == "FILLED")
+    finally:
+        stream.stop()
+    assert stream.book.get_position("BTCUSDT")['positionAmt'] == "0.010"
+    assert [e['o']['X'] for e in events if e['e'] == "ORDER_TRADE_UPDATE"] == ["FILLED"]
+
+
+def test_a_final_state_is_reported_once():
+    client = _Client([_order(1)])
+    stream = _stream(client, [_Connection()])
+    events = []
+    stream.add_listener(events.append)
+    stream.book.load_snapshot([_order(1)])
+    client.orders[1] = _order(1, "FILLED", "0.010", update_time=200)
+    stream.resync()
+    # The buffered stream event for the same fill arrives afterwards
+    stream.process_message(_order_event(1, "FILLED", "0.010", 200))
+    assert len(events) == 1
+
+
+def test_unreachable_final_state_keeps_the_order(logger):
+    class Client(_Client):
+        def futures_get_order(self, symbol, orderId):
+            raise ConnectionError("timeout")
+
+    client = Client([_order(1)])
+    stream = UserDataStream(client, logger)
+    stream.book.load_snapshot([_order(1)])
+    client.orders[1] = _order(1, "FILLED", "0.010", update_time=200)
+    assert stream.resync() == []
+    assert [o['orderId'] for o in stream.book.open_orders()] == [1]
+
+
+def test_connection_reads_have_no_short_timeout(monkeypatch):
+    class Socket:
+        def settimeout(self, timeout):
+            self.timeout = timeout
+
+    opened = {}
+
+    def create_connection(url, timeout):
+        opened['connect_timeout'] = timeout
+        return socket
+
+    socket = Socket()
+    monkeypatch.setattr(websocket, "create_connection", create_connection)
+    connect_websocket("wss://example/ws/key")
+    assert opened['connect_timeout'] == 10
+    # Longer than the server's 3-minute ping interval, so quiet streams stay up
+    assert socket.timeout > 180